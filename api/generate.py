@@ -10,6 +10,9 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
 from src.main import DocumentAutoFormatter
+from src.llm_provider import SERVICE_LLM_PROVIDER
+from src.semantic_cache import SECTION_CACHE
+from src.concurrency import ADAPTIVE_CONCURRENCY
 
 
 def handler(request):
@@ -66,12 +69,11 @@ def handler(request):
                     }, ensure_ascii=False)
                 }
             
-            # 안전장치: 항상 'mock' 사용 (요금 방지)
-            llm_provider_type = 'mock'  # 강제로 mock 사용
-            
-            # 문서 생성기 초기화
+            # 문서 생성기 초기화 (다른 진입점과 같은 제공자, 기본: 오프라인 템플릿 엔진)
             try:
-                formatter = DocumentAutoFormatter(llm_provider_type=llm_provider_type)
+                formatter = DocumentAutoFormatter(llm_provider_type=SERVICE_LLM_PROVIDER, coalesce=True,
+                                                  section_cache=SECTION_CACHE,
+                                                  adaptive_concurrency=bool(ADAPTIVE_CONCURRENCY))
             except Exception as e:
                 return {
                     'statusCode': 500,
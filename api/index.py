@@ -11,6 +11,16 @@ sys.path.insert(0, project_root)
 
 try:
     from src.main import DocumentAutoFormatter
+    from src.llm_provider import PROVIDER_CLASS_NAMES, SERVICE_LLM_PROVIDER
+    from src.single_flight import coalescing_stats
+    from src.semantic_cache import SECTION_CACHE
+    from src.concurrency import ADAPTIVE_CONCURRENCY, concurrency_stats
+    from src.input_parser import InputParser
+    from src.result_cache import RESULT_CACHE, etag_matches, make_etag
+    from src.cancellation import CancelToken, OperationCancelled
+    from src.admission import ADMISSION
+    from src.degradation import DEGRADATION
+    from src.structure_generator import StructureGenerator
 except ImportError as e:
     print(f"Import error: {e}")
     print(f"Python path: {sys.path}")
@@ -18,6 +28,151 @@ except ImportError as e:
     raise
 
 
+# 요청당 생성 마감 시간 (초, 0이면 없음)
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "0"))
+
+
+def _get_header(request, name: str):
+    """요청 헤더 조회 (대소문자 무시)"""
+    headers = getattr(request, 'headers', None) or {}
+    for key, value in headers.items():
+        if key.lower() == name.lower():
+            return value
+    return None
+
+
+def _document_response(request, headers: dict, result: str, etag: str, degradation: str = 'full') -> dict:
+    """생성된 문서 응답 (If-None-Match가 일치하면 304, degradation은 생성에 쓰인 품질 단계)"""
+    headers = {**headers, 'ETag': etag}
+    if etag_matches(_get_header(request, 'If-None-Match'), etag, request.method):
+        return {
+            'statusCode': 304,
+            'headers': headers,
+            'body': ''
+        }
+    return {
+        'statusCode': 200,
+        'headers': headers,
+        'body': json.dumps({
+            'success': True,
+            'document': result,
+            'degradation': degradation,
+            'message': '문서가 성공적으로 생성되었습니다.'
+        }, ensure_ascii=False)
+    }
+
+
+def _shed_response(request, headers: dict, user_input: dict, parsed_input, admission) -> dict:
+    """
+    포화 상태 응답 (DocumentAutoFormatter를 만들지 않음)
+    
+    클라이언트가 Prefer: respond-async를 보냈고 공유 작업 큐(JOB_QUEUE_PATH)가 있으면 작업 큐에 넣고 202 + 작업 주소,
+    아니면 503 + Retry-After
+    (이관된 작업은 워커가 같은 SERVICE_LLM_PROVIDER로 생성하므로 수락된 요청과 같은 문서를 받음)
+    """
+    from src.job_queue import JobQueue, queue_configured
+    
+    headers = {**headers, 'Retry-After': str(admission.retry_after)}
+    if queue_configured() and 'respond-async' in (_get_header(request, 'Prefer') or '').lower():
+        from src.scheduler import section_cost
+        
+        try:
+            cost = section_cost(InputParser().parse_length_to_chars(parsed_input.length), admission.sections)
+            job_id = JobQueue().enqueue(user_input, cost=cost)
+        except Exception as e:
+            # 작업 큐를 쓸 수 없는 환경 (읽기 전용 파일 시스템 등)이면 거절로 처리
+            print(f"Job enqueue error: {e}")
+        else:
+            ADMISSION.record_shed(deferred=True)
+            return {
+                'statusCode': 202,
+                'headers': {**headers, 'Location': f'/api/jobs?id={job_id}'},
+                'body': json.dumps({
+                    'success': True,
+                    'job_id': job_id,
+                    'status': 'queued',
+                    'estimated_wait_seconds': admission.wait_seconds,
+                    'message': '요청이 많아 작업 큐에 등록했습니다. Location의 주소로 진행 상황을 조회하세요.'
+                }, ensure_ascii=False)
+            }
+    
+    ADMISSION.record_shed()
+    return {
+        'statusCode': 503,
+        'headers': headers,
+        'body': json.dumps({
+            'success': False,
+            'retry_after': admission.retry_after,
+            'estimated_wait_seconds': admission.wait_seconds,
+            'message': f'요청이 많아 처리할 수 없습니다. {admission.retry_after}초 후 다시 시도하세요.'
+        }, ensure_ascii=False)
+    }
+
+
+def _generate_response(request, headers: dict, user_input: dict, cache_key: str) -> dict:
+    """문서 생성 및 결과 캐시 저장 (부하 제어를 통과한 요청만)"""
+    # 문서 생성기 초기화
+    # 작업 큐 경로와 같은 제공자 (기본: 오프라인 템플릿 엔진, 요금 방지)
+    try:
+        formatter = DocumentAutoFormatter(llm_provider_type=SERVICE_LLM_PROVIDER, coalesce=True,
+                                          section_cache=SECTION_CACHE, degradation=DEGRADATION,
+                                          adaptive_concurrency=bool(ADAPTIVE_CONCURRENCY))
+    except Exception as e:
+        import traceback
+        error_trace = traceback.format_exc()
+        print(f"Formatter initialization error: {error_trace}")
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': json.dumps({
+                'success': False,
+                'message': f'문서 생성기 초기화 실패: {str(e)}'
+            }, ensure_ascii=False)
+        }
+    
+    # 문서 생성 (ASGI 서버의 연결 종료 토큰 + 마감 시간으로 취소)
+    cancel_token = CancelToken(
+        timeout=REQUEST_DEADLINE_SECONDS or None,
+        parent=getattr(request, 'cancel_token', None)
+    )
+    try:
+        result = formatter.generate(user_input, cancel_token=cancel_token)
+    except OperationCancelled as e:
+        # 같은 문서 요청을 합쳐 실행하면 e.reason은 대표 실행의 사유이므로 이 요청의 토큰 사유로 판단
+        reason = cancel_token.reason or e.reason
+        print(f"Document generation cancelled: {reason}")
+        return {
+            'statusCode': 504 if reason == 'deadline' else 499,
+            'headers': headers,
+            'body': json.dumps({
+                'success': False,
+                'message': str(e),
+                'error_type': type(e).__name__
+            }, ensure_ascii=False)
+        }
+    except Exception as e:
+        import traceback
+        error_trace = traceback.format_exc()
+        print(f"Document generation error: {str(e)}")
+        print(f"Traceback: {error_trace}")
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': json.dumps({
+                'success': False,
+                'message': f'문서 생성 오류: {str(e)}',
+                'error_type': type(e).__name__
+            }, ensure_ascii=False)
+        }
+    finally:
+        cancel_token.close()
+    
+    # 결과 캐시 저장 후 응답 반환 (품질을 낮춰 만든 문서는 캐시에 남기지 않음)
+    mode = formatter.last_degradation.mode_name if formatter.last_degradation else 'full'
+    etag = RESULT_CACHE.put(cache_key, result) if mode == 'full' else make_etag(result)
+    return _document_response(request, headers, result, etag, mode)
+
+
 def handler(request):
     """
     Vercel Serverless Function Handler
@@ -33,7 +188,8 @@ def handler(request):
         'Content-Type': 'application/json; charset=utf-8',
         'Access-Control-Allow-Origin': '*',
         'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
-        'Access-Control-Allow-Headers': 'Content-Type',
+        'Access-Control-Allow-Headers': 'Content-Type, If-None-Match, Prefer',
+        'Access-Control-Expose-Headers': 'ETag, Retry-After, Location',
     }
     
     # OPTIONS 요청 처리 (CORS preflight)
@@ -79,53 +235,28 @@ def handler(request):
                     }, ensure_ascii=False)
                 }
             
-            # 안전장치: 항상 'mock' 사용 (요금 방지)
-            llm_provider_type = 'mock'
-            
-            # 문서 생성기 초기화
-            try:
-                formatter = DocumentAutoFormatter(llm_provider_type=llm_provider_type)
-            except Exception as e:
-                import traceback
-                error_trace = traceback.format_exc()
-                print(f"Formatter initialization error: {error_trace}")
-                return {
-                    'statusCode': 500,
-                    'headers': headers,
-                    'body': json.dumps({
-                        'success': False,
-                        'message': f'문서 생성기 초기화 실패: {str(e)}'
-                    }, ensure_ascii=False)
-                }
+            # 결과 캐시 조회 (정규화된 입력 기준, 생성기 초기화 전에 확인)
+            parsed_input = InputParser().parse(user_input)
+            cache_key = RESULT_CACHE.make_key(
+                parsed_input, PROVIDER_CLASS_NAMES.get(SERVICE_LLM_PROVIDER, SERVICE_LLM_PROVIDER)
+            )
+            cached = RESULT_CACHE.get(cache_key)
+            if cached:
+                result, etag = cached
+                return _document_response(request, headers, result, etag)
             
-            # 문서 생성
+            # 부하 제어: 추정 대기 시간이 길면 생성기를 만들기 전에 거절(503) 또는 작업 큐로 이관(202)
+            admission = ADMISSION.try_admit(StructureGenerator().section_count(parsed_input.document_type))
+            if not admission.admitted:
+                return _shed_response(request, headers, user_input, parsed_input, admission)
             try:
-                result = formatter.generate(user_input)
-            except Exception as e:
-                import traceback
-                error_trace = traceback.format_exc()
-                print(f"Document generation error: {str(e)}")
-                print(f"Traceback: {error_trace}")
-                return {
-                    'statusCode': 500,
-                    'headers': headers,
-                    'body': json.dumps({
-                        'success': False,
-                        'message': f'문서 생성 오류: {str(e)}',
-                        'error_type': type(e).__name__
-                    }, ensure_ascii=False)
-                }
-            
-            # 응답 반환
-            return {
-                'statusCode': 200,
-                'headers': headers,
-                'body': json.dumps({
-                    'success': True,
-                    'document': result,
-                    'message': '문서가 성공적으로 생성되었습니다.'
-                }, ensure_ascii=False)
-            }
+                response = _generate_response(request, headers, user_input, cache_key)
+            except Exception:
+                ADMISSION.release(admission, completed=False)
+                raise
+            ADMISSION.release(admission, completed=response['statusCode'] in (200, 304))
+            return response
+        
         
         # GET 요청 처리 (헬스 체크)
         elif request.method == 'GET':
@@ -139,7 +270,13 @@ def handler(request):
                     'endpoints': {
                         'generate': '/api (POST) - 문서 생성',
                         'health': '/api (GET) - 상태 확인'
-                    }
+                    },
+                    'coalescing': coalescing_stats(),
+                    'concurrency': concurrency_stats(),
+                    'admission': ADMISSION.stats(),
+                    'degradation': DEGRADATION.stats(),
+                    'result_cache': RESULT_CACHE.stats(),
+                    'semantic_cache': SECTION_CACHE.stats() if SECTION_CACHE is not None else None
                 }, ensure_ascii=False)
             }
         
@@ -0,0 +1,252 @@
+"""
+Vercel Serverless Function - Async Job Endpoint
+대용량 문서 생성을 작업 큐에 등록하고 진행 상황을 조회
+"""
+import sys
+import os
+import json
+from urllib.parse import urlparse, parse_qs
+
+# 프로젝트 루트를 경로에 추가
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.job_queue import JobQueue, queue_configured
+from src.scheduler import LANE_INTERACTIVE, LANES, estimate_cost
+from src.main import DocumentAutoFormatter
+from src.llm_provider import SERVICE_LLM_PROVIDER
+
+
+def _get_query(request) -> dict:
+    """요청 쿼리 파라미터 추출"""
+    query = getattr(request, 'query', None)
+    if isinstance(query, dict):
+        return {k: (v[0] if isinstance(v, list) else v) for k, v in query.items()}
+    
+    url = getattr(request, 'url', None) or getattr(request, 'path', '') or ''
+    return {k: v[0] for k, v in parse_qs(urlparse(url).query).items()}
+
+
+def handler(request):
+    """
+    Vercel Serverless Function Handler for async jobs
+    
+    POST: {"input": {...}[, "sections": [순서, ...]][, "lane": "interactive"|"batch"]} → 202 + job_id + 개요/목차 (즉시)
+          sections를 주면 해당 섹션만 생성, 빈 목록이면 개요만 반환하고 대기
+          lane은 스케줄러 레인 (기본 interactive, 묶음 처리 클라이언트는 batch)
+    POST: ?id=<job_id> {"sections": [순서, ...] | null} → 섹션 추가 요청 (null이면 전체)
+    GET:  ?id=<job_id>[&since=<cursor>][&wait=<초>] → 상태/진행률/섹션/결과
+          (since에는 이전 응답의 cursor를 넘김: 그 뒤에 완료/갱신된 섹션만 받음)
+    
+    JOB_QUEUE_PATH(API 인스턴스와 워커가 공유하는 DB 경로)가 없으면 503
+    """
+    # CORS 헤더 설정
+    headers = {
+        'Content-Type': 'application/json; charset=utf-8',
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+        'Access-Control-Allow-Headers': 'Content-Type',
+    }
+    
+    # OPTIONS 요청 처리
+    if request.method == 'OPTIONS':
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': ''
+        }
+    
+    if not queue_configured():
+        # 서버리스 인스턴스마다 다른 로컬 파일에 등록/조회하지 않도록 공유 경로 없이는 제공하지 않음
+        return {
+            'statusCode': 503,
+            'headers': headers,
+            'body': json.dumps({
+                'success': False,
+                'message': '작업 큐가 설정되지 않았습니다. 공유 DB 경로(JOB_QUEUE_PATH)를 지정하세요.'
+            }, ensure_ascii=False)
+        }
+    
+    try:
+        queue = JobQueue()
+        
+        if request.method == 'POST':
+            # 요청 본문 파싱
+            body = {}
+            try:
+                if hasattr(request, 'body'):
+                    if isinstance(request.body, str):
+                        body = json.loads(request.body) if request.body else {}
+                    elif isinstance(request.body, dict):
+                        body = request.body
+                    elif request.body:
+                        body = json.loads(request.body)
+            except json.JSONDecodeError as e:
+                return {
+                    'statusCode': 400,
+                    'headers': headers,
+                    'body': json.dumps({
+                        'success': False,
+                        'message': f'JSON 파싱 오류: {str(e)}'
+                    }, ensure_ascii=False)
+                }
+            
+            query = _get_query(request)
+            sections = body.get('sections')
+            # bool은 int의 하위 클래스이므로 type으로 확인 (true/false를 섹션 1/0으로 받지 않음)
+            if sections is not None and not (
+                isinstance(sections, list) and all(type(o) is int for o in sections)
+            ):
+                return {
+                    'statusCode': 400,
+                    'headers': headers,
+                    'body': json.dumps({
+                        'success': False,
+                        'message': '"sections"는 섹션 순서(정수) 목록이어야 합니다.'
+                    }, ensure_ascii=False)
+                }
+            
+            if query.get('id'):
+                # 기존 작업에 섹션 추가 요청
+                if not queue.request_sections(query['id'], sections):
+                    return {
+                        'statusCode': 404,
+                        'headers': headers,
+                        'body': json.dumps({
+                            'success': False,
+                            'message': f"작업을 찾을 수 없습니다: {query['id']}"
+                        }, ensure_ascii=False)
+                    }
+                return {
+                    'statusCode': 202,
+                    'headers': headers,
+                    'body': json.dumps({'success': True, **queue.get(query['id'])}, ensure_ascii=False)
+                }
+            
+            user_input = body.get('input', {})
+            lane = body.get('lane', LANE_INTERACTIVE)
+            if lane not in LANES:
+                return {
+                    'statusCode': 400,
+                    'headers': headers,
+                    'body': json.dumps({
+                        'success': False,
+                        'message': f'"lane"은 {", ".join(LANES)} 중 하나여야 합니다.'
+                    }, ensure_ascii=False)
+                }
+            if not user_input:
+                return {
+                    'statusCode': 400,
+                    'headers': headers,
+                    'body': json.dumps({
+                        'success': False,
+                        'message': '입력 데이터가 없습니다. "input" 필드가 필요합니다.'
+                    }, ensure_ascii=False)
+                }
+            
+            # 개요/목차는 LLM 호출 없이 바로 계산해 함께 반환 (워커/동기 API와 같은 제공자 설정)
+            formatter = DocumentAutoFormatter(llm_provider_type=SERVICE_LLM_PROVIDER)
+            parsed = formatter.input_parser.parse(user_input)
+            plan = formatter.plan(parsed)
+            outline = formatter.outline(parsed, plan=plan)
+            
+            valid_orders = {section['order'] for section in outline['sections']}
+            unknown = sorted(set(sections or []) - valid_orders)
+            if unknown:
+                return {
+                    'statusCode': 400,
+                    'headers': headers,
+                    'body': json.dumps({
+                        'success': False,
+                        'message': f'존재하지 않는 섹션 순서입니다: {unknown}'
+                    }, ensure_ascii=False)
+                }
+            
+            # 개요만 요청한 작업은 나중에 섹션이 추가될 수 있으므로 전체 비용으로 추정
+            cost = estimate_cost(*plan, only_orders=sections or None)
+            job_id = queue.enqueue(user_input, sections, lane=lane, cost=cost)
+            return {
+                'statusCode': 202,
+                'headers': headers,
+                'body': json.dumps({
+                    'success': True,
+                    'job_id': job_id,
+                    'status': 'outline' if sections == [] else 'queued',
+                    'requested_sections': sorted(set(sections)) if sections is not None else None,
+                    'lane': lane,
+                    **outline,
+                    'message': '작업이 등록되었습니다. job_id로 진행 상황을 조회하세요.'
+                }, ensure_ascii=False)
+            }
+        
+        elif request.method == 'GET':
+            query = _get_query(request)
+            job_id = query.get('id')
+            if not job_id:
+                return {
+                    'statusCode': 400,
+                    'headers': headers,
+                    'body': json.dumps({
+                        'success': False,
+                        'message': '"id" 쿼리 파라미터가 필요합니다.'
+                    }, ensure_ascii=False)
+                }
+            
+            try:
+                since = int(query.get('since', 0))
+                wait = min(float(query.get('wait', 0)), 25.0)
+            except ValueError:
+                return {
+                    'statusCode': 400,
+                    'headers': headers,
+                    'body': json.dumps({
+                        'success': False,
+                        'message': '"since"는 정수, "wait"는 숫자(초)여야 합니다.'
+                    }, ensure_ascii=False)
+                }
+            if wait > 0:
+                job = queue.wait_for_update(job_id, since, timeout=wait)
+            else:
+                job = queue.get(job_id, since)
+            
+            if job is None:
+                return {
+                    'statusCode': 404,
+                    'headers': headers,
+                    'body': json.dumps({
+                        'success': False,
+                        'message': f'작업을 찾을 수 없습니다: {job_id}'
+                    }, ensure_ascii=False)
+                }
+            
+            return {
+                'statusCode': 200,
+                'headers': headers,
+                'body': json.dumps({'success': True, **job}, ensure_ascii=False)
+            }
+        
+        else:
+            return {
+                'statusCode': 405,
+                'headers': headers,
+                'body': json.dumps({
+                    'success': False,
+                    'message': 'Method not allowed'
+                }, ensure_ascii=False)
+            }
+    
+    except Exception as e:
+        import traceback
+        error_msg = str(e)
+        error_trace = traceback.format_exc()
+        print(f"Unexpected error in jobs.py: {error_msg}")
+        print(f"Traceback: {error_trace}")
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': json.dumps({
+                'success': False,
+                'message': f'서버 오류: {error_msg}',
+                'error_type': type(e).__name__
+            }, ensure_ascii=False)
+        }
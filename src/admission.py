@@ -0,0 +1,281 @@
+"""
+Admission 모듈
+진행 중인 생성 작업량과 최근 섹션 지연으로 대기 시간을 추정해, 포화 상태에서는 새 요청을 바로 거절(503 + Retry-After)하거나
+작업 큐로 넘기는(202) 부하 제어
+
+- 판단은 요청 입력 파싱과 섹션 수 계산만으로 끝나므로 거절 비용이 작다 (DocumentAutoFormatter를 만들지 않음)
+- 대기 시간 추정: 진행 중인 요청들의 남은 작업(섹션 수 * 섹션 지연 - 진행분) / 동시 처리 용량
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import itertools
+import json
+import math
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+
+# 추정 대기 시간이 이 값(초)을 넘으면 새 요청을 받지 않음
+ADMISSION_MAX_WAIT_SECONDS = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "10"))
+# 서로 느려지지 않고 동시에 진행되는 생성 수 (상위 LLM 동시 처리량 기준)
+ADMISSION_CAPACITY = int(os.getenv("ADMISSION_CAPACITY", "4"))
+# 측정값이 없을 때 쓰는 섹션 하나의 처리 시간 (초)
+ADMISSION_SECTION_SECONDS = float(os.getenv("ADMISSION_SECTION_SECONDS", "0.5"))
+# 동시에 받는 최대 요청 수 (0이면 대기 시간 추정만 사용). 서버 스레드 수보다 작게 두면 거절 응답이 항상 스레드를 얻음
+ADMISSION_MAX_INFLIGHT = int(os.getenv("ADMISSION_MAX_INFLIGHT", "0"))
+
+
+@dataclass
+class Admission:
+    """부하 제어 판단 결과"""
+    admitted: bool
+    wait_seconds: float     # 추정 대기 시간
+    retry_after: int        # 거절 시 다시 시도할 때까지의 시간 (초)
+    sections: int = 0
+    ticket: Optional[int] = None
+
+
+class AdmissionController:
+    """
+    대기 시간 추정 기반 부하 제어기
+    
+    - 섹션 지연: 완료된 요청의 (소요 시간 / 섹션 수)를 그 동안의 혼잡도(동시 요청 수 / 용량)로 나눈 값의 EMA
+    - 남은 작업: 요청마다 섹션 수 * 섹션 지연 - 경과 시간 * 현재 처리 비율(용량 / 동시 요청 수, 최대 1), 최소 섹션 하나 분량
+    - 동시 요청 수가 용량보다 적으면 대기 없음, 아니면 남은 작업 합 / 용량을 대기 시간으로 본다
+    """
+    
+    def __init__(self, max_wait_seconds: Optional[float] = None, capacity: Optional[int] = None,
+                 section_seconds: Optional[float] = None, max_inflight: Optional[int] = None,
+                 smoothing: float = 0.2):
+        """
+        초기화
+        
+        Args:
+            max_wait_seconds: 허용 추정 대기 시간 (기본: ADMISSION_MAX_WAIT_SECONDS)
+            capacity: 동시 처리 용량 (기본: ADMISSION_CAPACITY)
+            section_seconds: 초기 섹션 처리 시간 추정 (기본: ADMISSION_SECTION_SECONDS)
+            max_inflight: 최대 동시 요청 수 (기본: ADMISSION_MAX_INFLIGHT, 0이면 제한 없음)
+            smoothing: 섹션 지연 EMA 반영 비율
+        """
+        self.max_wait_seconds = ADMISSION_MAX_WAIT_SECONDS if max_wait_seconds is None else max_wait_seconds
+        self.capacity = max(1, capacity or ADMISSION_CAPACITY)
+        self.section_seconds = section_seconds or ADMISSION_SECTION_SECONDS
+        self.max_inflight = ADMISSION_MAX_INFLIGHT if max_inflight is None else max_inflight
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self._tickets = itertools.count(1)
+        # 티켓 → (섹션 수, 시작 시각, 시작 시 동시 요청 수)
+        self._inflight: Dict[int, tuple] = {}
+        self._stats = {"admitted": 0, "rejected": 0, "deferred": 0, "completed": 0}
+    
+    def _pending_seconds(self, now: float) -> float:
+        """진행 중인 요청들의 남은 작업 합 (초, 잠금 안에서 호출)"""
+        rate = min(1.0, self.capacity / max(len(self._inflight), 1))
+        # 예상보다 오래 걸리는 요청도 끝나기 전까지는 섹션 하나 분량이 남은 것으로 봄
+        return sum(
+            max(sections * self.section_seconds - (now - started) * rate, self.section_seconds)
+            for sections, started, _ in self._inflight.values()
+        )
+    
+    def _wait_seconds(self, now: float) -> float:
+        """새 요청의 추정 대기 시간 (잠금 안에서 호출)"""
+        if len(self._inflight) < self.capacity:
+            return 0.0
+        return self._pending_seconds(now) / self.capacity
+    
+    def estimate_wait(self) -> float:
+        """현재 새 요청의 추정 대기 시간 (초)"""
+        with self._lock:
+            return self._wait_seconds(time.monotonic())
+    
+    def try_admit(self, sections: int) -> Admission:
+        """
+        요청 수락 여부 판단
+        
+        Args:
+            sections: 요청이 생성할 섹션 수
+        
+        Returns:
+            Admission (수락했으면 ticket이 있고, 끝난 뒤 release()를 호출해야 함)
+        """
+        now = time.monotonic()
+        with self._lock:
+            wait = self._wait_seconds(now)
+            full = self.max_inflight > 0 and len(self._inflight) >= self.max_inflight
+            if wait > self.max_wait_seconds or full:
+                # 허용 대기 시간 아래로 내려갈 때까지 걸리는 시간 (꽉 찬 경우는 섹션 하나 분량 이상)
+                retry_after = max(wait - self.max_wait_seconds, self.section_seconds if full else 0.0)
+                return Admission(False, round(wait, 3), max(1, math.ceil(retry_after)), sections)
+            
+            ticket = next(self._tickets)
+            self._inflight[ticket] = (max(sections, 1), now, len(self._inflight) + 1)
+            self._stats["admitted"] += 1
+            return Admission(True, round(wait, 3), 0, sections, ticket)
+    
+    def release(self, admission: Admission, completed: bool = True):
+        """
+        수락한 요청 종료
+        
+        Args:
+            admission: try_admit()의 결과
+            completed: 정상 완료 여부 (완료된 요청만 섹션 지연 측정에 반영)
+        """
+        if admission.ticket is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            entry = self._inflight.pop(admission.ticket, None)
+            if entry is None or not completed:
+                return
+            sections, started, inflight_at_start = entry
+            # 혼잡으로 늘어난 시간은 빼고 섹션 하나의 처리 시간만 반영
+            crowd = max((inflight_at_start + len(self._inflight) + 1) / 2 / self.capacity, 1.0)
+            sample = (now - started) / sections / crowd
+            self.section_seconds += self.smoothing * (sample - self.section_seconds)
+            self._stats["completed"] += 1
+    
+    def record_shed(self, deferred: bool = False):
+        """거절(503) 또는 작업 큐 이관(202) 집계"""
+        with self._lock:
+            self._stats["deferred" if deferred else "rejected"] += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """부하 제어 통계"""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                **self._stats,
+                "shed": self._stats["rejected"] + self._stats["deferred"],
+                "inflight": len(self._inflight),
+                "capacity": self.capacity,
+                "section_seconds": round(self.section_seconds, 4),
+                "pending_seconds": round(self._pending_seconds(now), 3),
+                "estimated_wait_seconds": round(self._wait_seconds(now), 3),
+                "max_wait_seconds": self.max_wait_seconds,
+            }
+
+
+# API 핸들러(api/index.py)가 공유하는 전역 부하 제어기
+ADMISSION = AdmissionController()
+
+
+class _LoadTestServer(ThreadingHTTPServer):
+    """검증용 HTTP 서버 (동시 접속이 몰려도 연결이 거부되지 않게 대기열을 늘림)"""
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def _serve(controller: Optional[AdmissionController], formatter, section_count, body: bytes):
+    """검증용 생성 요청 처리 → (상태 코드, 헤더, 응답 본문)"""
+    user_input = json.loads(body or b"{}").get("input", {})
+    admission = None
+    if controller is not None:
+        admission = controller.try_admit(section_count(user_input))
+        if not admission.admitted:
+            controller.record_shed()
+            return 503, {"Retry-After": str(admission.retry_after)}, b"{}"
+    completed = False
+    try:
+        formatter.generate(user_input)
+        completed = True
+        return 200, {}, b"{}"
+    except Exception:
+        return 500, {}, b"{}"
+    finally:
+        if admission is not None:
+            controller.release(admission, completed)
+
+
+def validate(clients: int = 48, requests: int = 240, capacity: int = 8, latency_ms: float = 150.0,
+             max_wait_seconds: float = 1.0) -> Dict[str, Dict[str, Any]]:
+    """
+    로컬 부하 테스트로 부하 제어 효과 검증
+    
+    용량이 capacity인 LLM 스탠드인(넘으면 느려지고 3배를 넘으면 429)을 쓰는 생성 서버를 띄우고,
+    부하 제어 없이/있이 같은 부하(src/loadtest.py)를 보낸다.
+    
+    Args:
+        clients: 동시 클라이언트 수
+        requests: 전체 요청 수
+        capacity: 스탠드인 동시 처리 용량 (부하 제어기 용량도 같은 값)
+        latency_ms: 스탠드인 호출 지연 (ms)
+        max_wait_seconds: 부하 제어기 허용 대기 시간
+    
+    Returns:
+        모드 → 부하 테스트 결과
+    """
+    from src.loadtest import run_load_test
+    from src.loadtest_provider import LoadTestLLMProvider
+    from src.main import DocumentAutoFormatter
+    from src.input_parser import InputParser
+    from src.structure_generator import StructureGenerator
+    
+    parser, structures = InputParser(), StructureGenerator()
+    
+    def section_count(user_input: dict) -> int:
+        return structures.section_count(parser.parse(user_input).document_type)
+    
+    results = {}
+    for mode in ("off", "on"):
+        formatter = DocumentAutoFormatter(llm_provider_type="mock")
+        formatter.content_generator.llm_provider = LoadTestLLMProvider(
+            latency_ms=latency_ms, tokens_per_second=0, capacity=capacity
+        )
+        controller = None
+        if mode == "on":
+            controller = AdmissionController(max_wait_seconds=max_wait_seconds, capacity=capacity,
+                                             section_seconds=latency_ms / 1000.0)
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                status, headers, payload = _serve(controller, formatter, section_count, body)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def log_message(self, *args):
+                pass
+        
+        server = _LoadTestServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            result = run_load_test(f"http://127.0.0.1:{server.server_address[1]}/api", requests, clients,
+                                   vary_topic=True, honor_retry_after=True)
+        finally:
+            server.shutdown()
+            server.server_close()
+        if controller is not None:
+            result["admission"] = controller.stats()
+        results[mode] = result
+    return results
+
+
+def main():
+    """명령행 실행: 부하 제어 유무 비교 부하 테스트"""
+    parser = argparse.ArgumentParser(description="부하 제어(503 + Retry-After) 로컬 부하 테스트")
+    parser.add_argument("-c", "--clients", type=int, default=48)
+    parser.add_argument("-n", "--requests", type=int, default=240)
+    parser.add_argument("--capacity", type=int, default=8, help="스탠드인 동시 처리 용량")
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    parser.add_argument("--max-wait", type=float, default=1.0, help="허용 추정 대기 시간 (초)")
+    args = parser.parse_args()
+    
+    results = validate(args.clients, args.requests, args.capacity, args.latency_ms, args.max_wait)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+"""
+Batch CLI 모듈
+JSONL 입력 묶음을 문서로 생성해 DocumentStore에 저장 (일반 모드: 문서별 생성, 일괄 모드: OpenAI Batch API 파일 제출)
+
+일괄 모드는 모든 섹션 프롬프트를 Batch JSONL 파일 하나로 제출하고 완료를 기다린 뒤,
+결과 파일에서 섹션별 호출 없이 GeneratedDocument를 조립한다. 작업 디렉터리의 상태 파일로 중단 후 재개한다.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import time
+import urllib.error
+import urllib.request
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.document_store import DocumentStore
+from src.llm_provider import HTTPChatProvider
+from src.models import GeneratedDocument, UserInput
+from src.replay import call_key
+
+
+# 배치 상태 중 더 이상 바뀌지 않는 상태
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+class BatchAPIError(Exception):
+    """Batch API 호출 실패"""
+
+
+def read_inputs(path: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    JSONL 입력 읽기 (한 줄에 사용자 입력 하나, "id"가 없으면 줄 번호)
+    
+    Returns:
+        [(문서 ID, 사용자 입력 딕셔너리)]
+    """
+    inputs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            doc_id = str(item.pop("id", line_no))
+            inputs.append((doc_id, item.get("input", item)))
+    return inputs
+
+
+class BatchAPIClient:
+    """OpenAI Files/Batches API 클라이언트 (표준 라이브러리만 사용)"""
+    
+    def __init__(self, base_url: str = None, api_key: str = None, timeout: float = 60.0):
+        """
+        초기화
+        
+        Args:
+            base_url: API 주소 (기본: 환경 변수 LLM_BASE_URL, 예: https://api.openai.com/v1)
+            api_key: Bearer 토큰 (기본: 환경 변수 OPENAI_API_KEY)
+            timeout: 요청 타임아웃 (초)
+        """
+        self.base_url = (base_url or os.getenv("LLM_BASE_URL", "http://127.0.0.1:8100/v1")).rstrip("/")
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.timeout = timeout
+    
+    def _request(self, method: str, path: str, body: bytes = None, content_type: str = None) -> bytes:
+        request = urllib.request.Request(self.base_url + path, data=body, method=method)
+        if content_type:
+            request.add_header("Content-Type", content_type)
+        if self.api_key:
+            request.add_header("Authorization", f"Bearer {self.api_key}")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            detail = e.read().decode("utf-8", "replace")
+            raise BatchAPIError(f"Batch API 호출 실패 ({e.code} {method} {path}): {detail[:200]}") from e
+    
+    def upload_file(self, path: str) -> str:
+        """배치 입력 파일 업로드 (purpose=batch), 파일 ID 반환"""
+        boundary = uuid.uuid4().hex
+        with open(path, "rb") as f:
+            content = f.read()
+        body = b"".join([
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"purpose\"\r\n\r\nbatch\r\n".encode("utf-8"),
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; "
+            f"filename=\"{os.path.basename(path)}\"\r\nContent-Type: application/jsonl\r\n\r\n".encode("utf-8"),
+            content,
+            f"\r\n--{boundary}--\r\n".encode("utf-8"),
+        ])
+        data = self._request("POST", "/files", body, f"multipart/form-data; boundary={boundary}")
+        return json.loads(data)["id"]
+    
+    def create_batch(self, input_file_id: str, endpoint: str = "/v1/chat/completions",
+                     completion_window: str = "24h") -> Dict[str, Any]:
+        """배치 생성"""
+        body = json.dumps({"input_file_id": input_file_id, "endpoint": endpoint,
+                           "completion_window": completion_window}).encode("utf-8")
+        return json.loads(self._request("POST", "/batches", body, "application/json"))
+    
+    def get_batch(self, batch_id: str) -> Dict[str, Any]:
+        """배치 상태 조회"""
+        return json.loads(self._request("GET", f"/batches/{batch_id}"))
+    
+    def file_lines(self, file_id: str) -> Iterator[Dict[str, Any]]:
+        """결과/오류 파일 내용 (JSONL 줄 단위)"""
+        for line in self._request("GET", f"/files/{file_id}/content").decode("utf-8").splitlines():
+            if line.strip():
+                yield json.loads(line)
+
+
+class BulkRun:
+    """
+    일괄 모드 실행 (작업 디렉터리 단위로 재개 가능)
+    
+    작업 디렉터리:
+    - state.json: 제출한 배치 목록 {"batches": [{"id", "file", "requests", "status", "merged", "keys": {custom_id: 요청 키}}]}
+    - requests-N.jsonl: N번째 제출 파일 (첫 제출은 전체, 이후는 결과가 없는 요청만)
+    - results.jsonl: 병합된 성공 결과 {"custom_id", "key", "content"} (추가 전용)
+    
+    custom_id(문서 ID:섹션 순서:조각 번호)는 입력이나 구조가 바뀌어도 같을 수 있으므로,
+    결과는 요청 키(프롬프트 + 파라미터 해시)가 지금 요청과 같을 때만 사용하고 다르면 다시 제출한다.
+    """
+    
+    def __init__(self, formatter, client: BatchAPIClient, work_dir: str, model: str = "gpt-4o-mini",
+                 max_section_chars: Optional[int] = 3000, poll_seconds: float = 30.0, max_rounds: int = 3):
+        """
+        초기화
+        
+        Args:
+            formatter: 분석/구조/후처리에 쓸 DocumentAutoFormatter (LLM은 호출하지 않음)
+            client: Batch API 클라이언트
+            work_dir: 작업 디렉터리
+            model: 배치 요청 모델
+            max_section_chars: 호출당 섹션 최대 글자 수 (넘는 섹션은 하위 조각 요청으로 나눔)
+            poll_seconds: 상태 확인 간격 (초)
+            max_rounds: 실패/만료 요청 재제출을 포함한 최대 제출 횟수
+        """
+        self.formatter = formatter
+        self.client = client
+        self.work_dir = work_dir
+        self.model = model
+        self.max_section_chars = max_section_chars
+        self.poll_seconds = poll_seconds
+        self.max_rounds = max_rounds
+        os.makedirs(work_dir, exist_ok=True)
+        self._state_path = os.path.join(work_dir, "state.json")
+        self._results_path = os.path.join(work_dir, "results.jsonl")
+        self.state = self._load_state()
+    
+    def _load_state(self) -> Dict[str, Any]:
+        if os.path.exists(self._state_path):
+            with open(self._state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {"batches": []}
+    
+    def _save_state(self):
+        # 중간에 끊겨도 이전 상태가 남도록 임시 파일 후 교체
+        tmp_path = self._state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self._state_path)
+    
+    def _load_results(self) -> Dict[str, Tuple[Optional[str], str]]:
+        """{custom_id: (요청 키, 결과)} (같은 custom_id는 나중 기록 우선)"""
+        results: Dict[str, Tuple[Optional[str], str]] = {}
+        if os.path.exists(self._results_path):
+            with open(self._results_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        results[record["custom_id"]] = (record.get("key"), record["content"])
+        return results
+    
+    def request_key(self, prompt: str, kwargs: Dict[str, Any]) -> str:
+        """제출 요청 본문을 결정하는 값(모델, 프롬프트, 파라미터)의 키"""
+        return call_key(prompt, {
+            "model": self.model,
+            "temperature": kwargs.get("temperature", 0.7),
+            "max_tokens": kwargs.get("max_tokens", 2000),
+        })
+    
+    def plan(self, inputs: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        문서별 분석/구조 설계와 섹션 요청 목록 (LLM 호출 없음)
+        
+        Returns:
+            [{"id", "user_input", "plan", "sections": {order: [custom_id, ...]}, "requests": [(custom_id, prompt, kwargs)]}]
+        """
+        generator = self.formatter.content_generator
+        docs = []
+        for doc_id, user_input_dict in inputs:
+            user_input = self.formatter.input_parser.parse(user_input_dict)
+            metadata, structure = self.formatter.plan(user_input)
+            sections: Dict[int, List[str]] = {}
+            requests = []
+            for section in structure.sections:
+                calls = generator.section_calls(section, metadata, user_input, structure, self.max_section_chars)
+                ids = [f"{doc_id}:{section.order}:{index}" for index in range(len(calls))]
+                sections[section.order] = ids
+                requests.extend((custom_id, prompt, kwargs) for custom_id, (prompt, kwargs) in zip(ids, calls))
+            docs.append({"id": doc_id, "user_input": user_input, "plan": (metadata, structure),
+                         "sections": sections, "requests": requests})
+        return docs
+    
+    def _write_batch_file(self, requests: List[Tuple[str, str, Dict[str, Any]]], path: str):
+        """OpenAI Batch JSONL 형식으로 요청 파일 작성"""
+        with open(path, "w", encoding="utf-8") as f:
+            for custom_id, prompt, kwargs in requests:
+                f.write(json.dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": self.model,
+                        "messages": [
+                            {"role": "system", "content": HTTPChatProvider.SYSTEM_PROMPT},
+                            {"role": "user", "content": prompt},
+                        ],
+                        "temperature": kwargs.get("temperature", 0.7),
+                        "max_tokens": kwargs.get("max_tokens", 2000),
+                    },
+                }, ensure_ascii=False) + "\n")
+    
+    def _wait(self, batch: Dict[str, Any]) -> Dict[str, Any]:
+        """배치가 끝날 때까지 상태 확인"""
+        while True:
+            status = self.client.get_batch(batch["id"])
+            counts = status.get("request_counts", {})
+            print(f"배치 {batch['id']}: {status['status']} "
+                  f"({counts.get('completed', 0)}/{counts.get('total', 0)}, 실패 {counts.get('failed', 0)})")
+            if status["status"] in TERMINAL_STATUSES:
+                return status
+            time.sleep(self.poll_seconds)
+    
+    def _merge(self, batch: Dict[str, Any], status: Dict[str, Any]) -> int:
+        """완료된 배치의 성공 결과를 results.jsonl에 추가"""
+        merged = 0
+        if status.get("output_file_id"):
+            with open(self._results_path, "a", encoding="utf-8") as f:
+                for line in self.client.file_lines(status["output_file_id"]):
+                    response = line.get("response") or {}
+                    if response.get("status_code") != 200:
+                        continue
+                    content = response["body"]["choices"][0]["message"]["content"]
+                    # 요청 키가 없는 이전 형식 배치의 결과는 키 없이 기록 (collect에서 다시 제출됨)
+                    key = batch.get("keys", {}).get(line["custom_id"])
+                    f.write(json.dumps({"custom_id": line["custom_id"], "key": key, "content": content},
+                                       ensure_ascii=False) + "\n")
+                    merged += 1
+        batch.update(status=status["status"], merged=True)
+        self._save_state()
+        return merged
+    
+    def collect(self, docs: List[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        이전 배치 재개 → 결과가 없는 요청만 새 배치로 제출 → 완료 대기/병합 반복
+        
+        Returns:
+            {custom_id: 생성 결과} (요청 키가 지금 요청과 같은 결과만)
+        """
+        wanted = {
+            custom_id: (self.request_key(prompt, kwargs), prompt, kwargs)
+            for doc in docs for custom_id, prompt, kwargs in doc["requests"]
+        }
+        
+        # 중단 전에 제출했지만 병합하지 못한 배치부터 마무리
+        for batch in self.state["batches"]:
+            if not batch.get("merged"):
+                print(f"이전 배치 재개: {batch['id']}")
+                self._merge(batch, self._wait(batch))
+        
+        results = self._matching_results(wanted)
+        while True:
+            missing = [(custom_id, prompt, kwargs) for custom_id, (_, prompt, kwargs) in wanted.items()
+                       if custom_id not in results]
+            if not missing or len(self.state["batches"]) >= self.max_rounds:
+                break
+            path = os.path.join(self.work_dir, f"requests-{len(self.state['batches']) + 1}.jsonl")
+            self._write_batch_file(missing, path)
+            file_id = self.client.upload_file(path)
+            created = self.client.create_batch(file_id)
+            batch = {"id": created["id"], "file": os.path.basename(path), "requests": len(missing),
+                     "status": created["status"], "merged": False,
+                     "keys": {custom_id: wanted[custom_id][0] for custom_id, _, _ in missing}}
+            self.state["batches"].append(batch)
+            self._save_state()
+            print(f"배치 제출: {batch['id']} (요청 {len(missing)}개)")
+            merged = self._merge(batch, self._wait(batch))
+            print(f"결과 병합: {merged}/{len(missing)}")
+            results = self._matching_results(wanted)
+        return results
+    
+    def _matching_results(self, wanted: Dict[str, Tuple[str, str, Dict[str, Any]]]) -> Dict[str, str]:
+        """병합된 결과 중 요청 키가 지금 요청과 같은 것만 (입력/구조가 바뀐 이전 결과는 버림)"""
+        results = {}
+        stale = 0
+        for custom_id, (key, content) in self._load_results().items():
+            if custom_id not in wanted:
+                continue
+            if key == wanted[custom_id][0]:
+                results[custom_id] = content
+            else:
+                stale += 1
+        if stale:
+            print(f"요청이 바뀐 이전 결과 {stale}개는 다시 제출")
+        return results
+    
+    def assemble(self, doc: Dict[str, Any], results: Dict[str, str]) -> Optional[GeneratedDocument]:
+        """
+        결과 파일 내용으로 문서 조립 (섹션별 LLM 호출 없음)
+        
+        Returns:
+            GeneratedDocument (결과가 빠진 섹션이 있으면 None)
+        """
+        generator = self.formatter.content_generator
+        metadata, structure = doc["plan"]
+        user_input: UserInput = doc["user_input"]
+        completed = {}
+        for section in structure.sections:
+            ids = doc["sections"][section.order]
+            if any(custom_id not in results for custom_id in ids):
+                return None
+            completed[section.order] = generator.finish_section(
+                [results[custom_id] for custom_id in ids], section, user_input
+            )
+        return generator.generate(structure, metadata, user_input, completed_sections=completed)
+    
+    def run(self, inputs: List[Tuple[str, Dict[str, Any]]], store: DocumentStore) -> Dict[str, Any]:
+        """
+        전체 실행
+        
+        Returns:
+            {"documents", "stored", "incomplete": [문서 ID], "requests", "batches"}
+        """
+        docs = self.plan(inputs)
+        results = self.collect(docs)
+        stored, incomplete = 0, []
+        for doc in docs:
+            document = self.assemble(doc, results)
+            if document is None:
+                incomplete.append(doc["id"])
+                continue
+            store.put_for_input(doc["user_input"], document)
+            stored += 1
+        return {
+            "documents": len(docs),
+            "stored": stored,
+            "incomplete": incomplete,
+            "requests": sum(len(doc["requests"]) for doc in docs),
+            "batches": len(self.state["batches"]),
+        }
+
+
+def run_direct(inputs: List[Tuple[str, Dict[str, Any]]], store: DocumentStore, formatter) -> Dict[str, Any]:
+    """일반 모드: 문서마다 바로 생성해 저장"""
+    for _, user_input_dict in inputs:
+        formatter.generate_and_store(user_input_dict, store)
+    return {"documents": len(inputs), "stored": len(inputs), "incomplete": []}
+
+
+def main():
+    """명령행 실행: JSONL 입력 묶음 생성"""
+    from src.main import DocumentAutoFormatter
+    
+    parser = argparse.ArgumentParser(description="JSONL 입력 묶음 문서 생성")
+    parser.add_argument("inputs", help="사용자 입력 JSONL (한 줄에 하나, 선택 필드 id)")
+    parser.add_argument("--store", required=True, help="결과 DocumentStore 디렉터리")
+    parser.add_argument("--provider", default="mock", help="일반 모드 LLM 제공자 (mock, http, openai 등)")
+    parser.add_argument("--bulk", action="store_true", help="일괄 모드 (OpenAI Batch API 파일 제출)")
+    parser.add_argument("--work-dir", help="일괄 모드 작업 디렉터리 (기본: <store>.bulk, 같은 디렉터리로 재개)")
+    parser.add_argument("--base-url", help="Batch API 주소 (기본: LLM_BASE_URL)")
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--max-section-chars", type=int, default=3000, help="요청당 섹션 최대 글자 수 (0이면 분할 안 함)")
+    parser.add_argument("--poll-seconds", type=float, default=30.0)
+    parser.add_argument("--max-rounds", type=int, default=3, help="실패/만료 요청 재제출을 포함한 최대 제출 횟수")
+    args = parser.parse_args()
+    
+    inputs = read_inputs(args.inputs)
+    started = time.perf_counter()
+    with DocumentStore(args.store) as store:
+        if args.bulk:
+            # 일괄 모드의 formatter는 분석/구조/후처리만 하므로 LLM 제공자는 mock
+            run = BulkRun(
+                DocumentAutoFormatter(llm_provider_type="mock"),
+                BatchAPIClient(args.base_url),
+                args.work_dir or args.store.rstrip("/\\") + ".bulk",
+                model=args.model,
+                max_section_chars=args.max_section_chars or None,
+                poll_seconds=args.poll_seconds,
+                max_rounds=args.max_rounds,
+            )
+            summary = run.run(inputs, store)
+        else:
+            summary = run_direct(inputs, store, DocumentAutoFormatter(llm_provider_type=args.provider))
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    print(json.dumps(summary, ensure_ascii=False))
+    if summary["incomplete"]:
+        print(f"경고: 결과가 모두 모이지 않은 문서 {len(summary['incomplete'])}개 (같은 --work-dir로 다시 실행하면 재개)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""
+Batch Metrics 모듈
+생성된 문서들을 열(column) 단위 배열로 적재하여 분량/키워드/평가 기준 지표를 벡터 연산으로 계산
+(NumPy가 없으면 같은 지표를 순수 Python으로 계산)
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import List, Dict, Any, Optional, Sequence
+
+from src.models import GeneratedDocument, Section
+from src.stats import percentile
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class DocumentColumns:
+    """
+    문서 묶음의 열 단위 표현
+    
+    - section_doc: 섹션별 소속 문서 인덱스 (n_sections,)
+    - section_length / section_target: 섹션별 실제/목표 글자 수 (n_sections,)
+    - doc_target: 문서별 목표 글자 수 (n_docs,)
+    - required: 문서별 필수 키워드 여부 행렬 (n_docs, n_keywords)
+    - section_hits: 섹션별 키워드 포함 여부 행렬 (n_sections, n_keywords)
+    - criteria: 문서별 평가 기준 여부 행렬 (n_docs, n_criteria)
+    """
+    
+    def __init__(self, section_doc, section_length, section_target, doc_target,
+                 keywords: List[str], required, section_hits,
+                 criteria_names: List[str], criteria):
+        self.section_doc = section_doc
+        self.section_length = section_length
+        self.section_target = section_target
+        self.doc_target = doc_target
+        self.keywords = keywords
+        self.required = required
+        self.section_hits = section_hits
+        self.criteria_names = criteria_names
+        self.criteria = criteria
+    
+    @property
+    def n_docs(self) -> int:
+        return len(self.doc_target)
+    
+    @classmethod
+    def from_documents(cls, documents: Sequence[GeneratedDocument],
+                       keywords: Optional[Sequence[Sequence[str]]] = None) -> "DocumentColumns":
+        """
+        GeneratedDocument 목록을 열 단위로 적재
+        
+        Args:
+            documents: 생성된 문서 목록 (sections가 채워져 있어야 함)
+            keywords: 문서별 필수 키워드 (없으면 document.required_keywords 사용)
+        
+        Returns:
+            DocumentColumns 객체
+        """
+        return cls.from_sections(
+            [doc.sections for doc in documents],
+            [doc.metadata.target_length_chars for doc in documents],
+            keywords if keywords is not None else [doc.required_keywords for doc in documents],
+            [doc.metadata.evaluation_focus for doc in documents],
+        )
+    
+    @classmethod
+    def from_sections(cls, sections_per_doc: Sequence[Sequence[Section]],
+                      doc_targets: Sequence[int],
+                      keywords_per_doc: Sequence[Sequence[str]],
+                      criteria_per_doc: Optional[Sequence[Sequence[str]]] = None) -> "DocumentColumns":
+        """
+        섹션 목록으로부터 열 단위 적재
+        
+        Args:
+            sections_per_doc: 문서별 섹션 목록
+            doc_targets: 문서별 목표 글자 수
+            keywords_per_doc: 문서별 필수 키워드
+            criteria_per_doc: 문서별 평가 기준
+        
+        Returns:
+            DocumentColumns 객체
+        """
+        criteria_per_doc = criteria_per_doc or [[] for _ in doc_targets]
+        keyword_index: Dict[str, int] = {}
+        for kws in keywords_per_doc:
+            for kw in kws:
+                keyword_index.setdefault(kw, len(keyword_index))
+        criteria_index: Dict[str, int] = {}
+        for crits in criteria_per_doc:
+            for crit in crits:
+                criteria_index.setdefault(crit, len(criteria_index))
+        
+        section_doc, section_length, section_target = [], [], []
+        hit_rows: List[List[bool]] = []
+        required_rows: List[List[bool]] = []
+        criteria_rows: List[List[bool]] = []
+        n_kw, n_crit = len(keyword_index), len(criteria_index)
+        
+        for doc_i, (sections, kws, crits) in enumerate(zip(sections_per_doc, keywords_per_doc, criteria_per_doc)):
+            required_row = [False] * n_kw
+            for kw in kws:
+                required_row[keyword_index[kw]] = True
+            required_rows.append(required_row)
+            
+            criteria_row = [False] * n_crit
+            for crit in crits:
+                criteria_row[criteria_index[crit]] = True
+            criteria_rows.append(criteria_row)
+            
+            for section in sections:
+                section_doc.append(doc_i)
+                section_length.append(len(section.content))
+                section_target.append(section.target_length_chars)
+                # 문서의 필수 키워드만 검사 (섹션 내용을 이어 붙이지 않음)
+                hit_row = [False] * n_kw
+                for kw in kws:
+                    if kw in section.content:
+                        hit_row[keyword_index[kw]] = True
+                hit_rows.append(hit_row)
+        
+        keywords = list(keyword_index)
+        criteria_names = list(criteria_index)
+        if np is None:
+            return cls(section_doc, section_length, section_target, list(doc_targets),
+                       keywords, required_rows, hit_rows, criteria_names, criteria_rows)
+        
+        return cls(
+            np.asarray(section_doc, dtype=np.int64),
+            np.asarray(section_length, dtype=np.int64),
+            np.asarray(section_target, dtype=np.int64),
+            np.asarray(doc_targets, dtype=np.int64),
+            keywords,
+            np.asarray(required_rows, dtype=bool).reshape(len(doc_targets), n_kw),
+            np.asarray(hit_rows, dtype=bool).reshape(len(section_doc), n_kw),
+            criteria_names,
+            np.asarray(criteria_rows, dtype=bool).reshape(len(doc_targets), n_crit),
+        )
+
+
+class BatchEvaluator:
+    """열 단위 문서 지표 계산기"""
+    
+    def __init__(self, length_tolerance: float = 0.3):
+        """
+        초기화
+        
+        Args:
+            length_tolerance: 분량 적정 판정 허용 편차 비율 (±)
+        """
+        self.length_tolerance = length_tolerance
+    
+    def evaluate(self, columns: DocumentColumns) -> Dict[str, Any]:
+        """
+        문서/섹션별 지표 계산
+        
+        Args:
+            columns: 열 단위 문서 묶음
+        
+        Returns:
+            doc_length, length_deviation, section_deviation,
+            included_keywords, required_keywords, keyword_coverage 배열
+        """
+        if np is None:
+            return self._evaluate_python(columns)
+        
+        n_docs = columns.n_docs
+        doc_length = np.bincount(
+            columns.section_doc, weights=columns.section_length, minlength=n_docs
+        ).astype(np.int64)
+        length_deviation = (doc_length - columns.doc_target) / np.maximum(columns.doc_target, 1)
+        section_deviation = (
+            (columns.section_length - columns.section_target) / np.maximum(columns.section_target, 1)
+        )
+        
+        doc_hits = np.zeros_like(columns.required)
+        if doc_hits.size and len(columns.section_doc):
+            np.logical_or.at(doc_hits, columns.section_doc, columns.section_hits)
+        included = (doc_hits & columns.required).sum(axis=1)
+        required = columns.required.sum(axis=1)
+        coverage = np.where(required > 0, included / np.maximum(required, 1), 1.0)
+        
+        return {
+            "doc_length": doc_length,
+            "length_deviation": length_deviation,
+            "section_deviation": section_deviation,
+            "included_keywords": included,
+            "required_keywords": required,
+            "keyword_coverage": coverage,
+            "doc_hits": doc_hits,
+        }
+    
+    def _evaluate_python(self, columns: DocumentColumns) -> Dict[str, Any]:
+        """NumPy 없이 같은 지표 계산"""
+        n_docs = columns.n_docs
+        n_kw = len(columns.keywords)
+        doc_length = [0] * n_docs
+        doc_hits = [[False] * n_kw for _ in range(n_docs)]
+        for doc_i, length, hits in zip(columns.section_doc, columns.section_length, columns.section_hits):
+            doc_length[doc_i] += length
+            row = doc_hits[doc_i]
+            for k, hit in enumerate(hits):
+                row[k] = row[k] or hit
+        
+        length_deviation = [
+            (length - target) / max(target, 1) for length, target in zip(doc_length, columns.doc_target)
+        ]
+        section_deviation = [
+            (length - target) / max(target, 1)
+            for length, target in zip(columns.section_length, columns.section_target)
+        ]
+        included = [
+            sum(1 for hit, req in zip(hits, required) if hit and req)
+            for hits, required in zip(doc_hits, columns.required)
+        ]
+        required = [sum(row) for row in columns.required]
+        coverage = [inc / req if req else 1.0 for inc, req in zip(included, required)]
+        
+        return {
+            "doc_length": doc_length,
+            "length_deviation": length_deviation,
+            "section_deviation": section_deviation,
+            "included_keywords": included,
+            "required_keywords": required,
+            "keyword_coverage": coverage,
+            "doc_hits": doc_hits,
+        }
+    
+    def summarize(self, columns: DocumentColumns) -> Dict[str, Any]:
+        """
+        배치 전체 통계
+        
+        Args:
+            columns: 열 단위 문서 묶음
+        
+        Returns:
+            분량 편차/키워드 커버리지 분포 및 평가 기준별 통계
+        """
+        metrics = self.evaluate(columns)
+        deviation = metrics["length_deviation"]
+        coverage = metrics["keyword_coverage"]
+        
+        if np is None:
+            within = [abs(d) <= self.length_tolerance for d in deviation]
+            per_criterion = {}
+            for c, name in enumerate(columns.criteria_names):
+                idx = [i for i, row in enumerate(columns.criteria) if row[c]]
+                per_criterion[name] = {
+                    "documents": len(idx),
+                    "mean_length_deviation": _mean([deviation[i] for i in idx]),
+                    "mean_keyword_coverage": _mean([coverage[i] for i in idx]),
+                    "length_within_tolerance": _mean([within[i] for i in idx]),
+                }
+            return {
+                "documents": columns.n_docs,
+                "sections": len(columns.section_doc),
+                "length_deviation": _distribution(deviation),
+                "keyword_coverage": _distribution(coverage),
+                "length_within_tolerance": _mean(within),
+                "full_keyword_coverage": _mean([c >= 1.0 for c in coverage]),
+                "per_criterion": per_criterion,
+            }
+        
+        within = np.abs(deviation) <= self.length_tolerance
+        criteria = columns.criteria.astype(np.float64)
+        counts = criteria.sum(axis=0)
+        safe_counts = np.maximum(counts, 1)
+        mean_dev = criteria.T @ deviation / safe_counts
+        mean_cov = criteria.T @ coverage / safe_counts
+        mean_within = criteria.T @ within.astype(np.float64) / safe_counts
+        
+        return {
+            "documents": columns.n_docs,
+            "sections": int(len(columns.section_doc)),
+            "length_deviation": _distribution(deviation),
+            "keyword_coverage": _distribution(coverage),
+            "length_within_tolerance": float(within.mean()) if columns.n_docs else 0.0,
+            "full_keyword_coverage": float((coverage >= 1.0).mean()) if columns.n_docs else 0.0,
+            "per_criterion": {
+                name: {
+                    "documents": int(counts[c]),
+                    "mean_length_deviation": float(mean_dev[c]),
+                    "mean_keyword_coverage": float(mean_cov[c]),
+                    "length_within_tolerance": float(mean_within[c]),
+                }
+                for c, name in enumerate(columns.criteria_names)
+            },
+        }
+    
+    def evaluate_document(self, sections: Sequence[Section], target_length_chars: int,
+                          keywords: Sequence[str]) -> Dict[str, Any]:
+        """
+        단일 문서 지표 (체크포인트 생성용)
+        
+        Args:
+            sections: 생성된 섹션 목록
+            target_length_chars: 목표 글자 수
+            keywords: 필수 키워드
+        
+        Returns:
+            total_length, included_keywords(목록), length_deviation
+        """
+        columns = DocumentColumns.from_sections([sections], [target_length_chars], [list(keywords)])
+        metrics = self.evaluate(columns)
+        hits = metrics["doc_hits"][0]
+        return {
+            "total_length": int(metrics["doc_length"][0]),
+            "included_keywords": [kw for kw, hit in zip(columns.keywords, hits) if hit],
+            "length_deviation": float(metrics["length_deviation"][0]),
+        }
+
+
+def _mean(values) -> float:
+    """평균 (빈 목록이면 0.0)"""
+    values = list(values)
+    return float(sum(values)) / len(values) if values else 0.0
+
+
+def _distribution(values) -> Dict[str, float]:
+    """평균 및 백분위 요약"""
+    if np is not None:
+        values = np.asarray(values, dtype=np.float64)
+        if not values.size:
+            return {"mean": 0.0, "p50": 0.0, "p90": 0.0, "min": 0.0, "max": 0.0}
+        p50, p90 = np.percentile(values, [50, 90])
+        return {
+            "mean": float(values.mean()), "p50": float(p50), "p90": float(p90),
+            "min": float(values.min()), "max": float(values.max()),
+        }
+    
+    values = [float(v) for v in values]
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p90": 0.0, "min": 0.0, "max": 0.0}
+    return {
+        "mean": _mean(values), "p50": percentile(values, 50), "p90": percentile(values, 90),
+        "min": min(values), "max": max(values),
+    }
@@ -0,0 +1,186 @@
+"""
+Cancellation 모듈
+요청 단위 취소 토큰과 마감 시간 (클라이언트 연결 종료/마감 초과 시 상위 LLM 호출 중단)
+
+토큰은 cancel_scope()로 현재 실행 문맥에 걸어 두고, 생성 경로(섹션 사이, 제공자 대기/HTTP 호출)는
+current_token()/check_cancelled()로 조회한다. 기존 호출 시그니처는 바뀌지 않는다.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional
+
+
+class OperationCancelled(Exception):
+    """취소 또는 마감 초과로 중단된 작업"""
+    
+    def __init__(self, reason: str = "cancelled"):
+        super().__init__(f"작업이 취소되었습니다: {reason}")
+        self.reason = reason
+
+
+class CancelToken:
+    """
+    취소 토큰
+    
+    - cancel(): 취소 표시 후 등록된 콜백(진행 중인 HTTP 연결 끊기 등)을 즉시 실행
+    - timeout/deadline: 마감 시간이 지나면 타이머가 자동으로 cancel("deadline") 호출
+    - parent: 부모 토큰이 취소되면 함께 취소 (서버 연결 토큰 + 핸들러 마감 시간 등)
+    """
+    
+    def __init__(self, timeout: Optional[float] = None, deadline: Optional[float] = None,
+                 parent: Optional["CancelToken"] = None):
+        """
+        초기화
+        
+        Args:
+            timeout: 지금부터의 제한 시간 (초)
+            deadline: time.monotonic() 기준 마감 시각 (timeout보다 우선)
+            parent: 부모 토큰 (선택)
+        """
+        if deadline is None and timeout is not None:
+            deadline = time.monotonic() + timeout
+        if parent is not None and parent.deadline is not None:
+            deadline = parent.deadline if deadline is None else min(deadline, parent.deadline)
+        self.deadline = deadline
+        self.reason: Optional[str] = None
+        
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: Dict[int, Callable[[], None]] = {}
+        self._next_id = 0
+        self._timer: Optional[threading.Timer] = None
+        self._unlink_parent = None
+        
+        if parent is not None:
+            self._unlink_parent = parent.on_cancel(lambda: self.cancel(parent.reason or "cancelled"))
+        if self.deadline is not None and not self._event.is_set():
+            self._timer = threading.Timer(max(self.deadline - time.monotonic(), 0.0),
+                                          self.cancel, args=("deadline",))
+            self._timer.daemon = True
+            self._timer.start()
+    
+    @property
+    def cancelled(self) -> bool:
+        """취소 여부"""
+        return self._event.is_set()
+    
+    def remaining(self) -> Optional[float]:
+        """마감까지 남은 시간 (초, 마감이 없으면 None)"""
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0.0)
+    
+    def cancel(self, reason: str = "cancelled") -> bool:
+        """
+        취소
+        
+        Args:
+            reason: 취소 사유 ("client disconnected", "deadline" 등)
+        
+        Returns:
+            이번 호출로 처음 취소되었는지 여부
+        """
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        self._release()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"경고: 취소 콜백 실패: {e}")
+        return True
+    
+    def check(self):
+        """취소되었으면 OperationCancelled 발생"""
+        if self._event.is_set():
+            raise OperationCancelled(self.reason or "cancelled")
+    
+    def wait(self, seconds: Optional[float]) -> bool:
+        """
+        취소될 때까지 최대 seconds 동안 대기
+        
+        Returns:
+            대기 중 취소되었는지 여부
+        """
+        return self._event.wait(seconds)
+    
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        취소 시 실행할 콜백 등록 (이미 취소되었으면 바로 실행)
+        
+        Args:
+            callback: 인자 없는 함수 (취소를 호출한 스레드에서 실행됨)
+        
+        Returns:
+            등록 해제 함수
+        """
+        with self._lock:
+            if not self._event.is_set():
+                handle = self._next_id
+                self._next_id += 1
+                self._callbacks[handle] = callback
+                return lambda: self._callbacks.pop(handle, None)
+        callback()
+        return lambda: None
+    
+    def close(self):
+        """취소 없이 끝난 토큰의 타이머/부모 연결 정리"""
+        self._release()
+    
+    def _release(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._unlink_parent is not None:
+            self._unlink_parent()
+            self._unlink_parent = None
+
+
+_CURRENT: ContextVar[Optional[CancelToken]] = ContextVar("cancel_token", default=None)
+
+
+def current_token() -> Optional[CancelToken]:
+    """현재 문맥의 취소 토큰 (없으면 None)"""
+    return _CURRENT.get()
+
+
+def check_cancelled():
+    """현재 문맥의 토큰이 취소되었으면 OperationCancelled 발생"""
+    token = _CURRENT.get()
+    if token is not None:
+        token.check()
+
+
+def sleep(seconds: float):
+    """취소 가능한 대기 (대기 중 취소되면 OperationCancelled, 토큰이 없으면 time.sleep과 같음)"""
+    token = _CURRENT.get()
+    if token is None:
+        time.sleep(seconds)
+    elif token.wait(seconds):
+        token.check()
+
+
+@contextmanager
+def cancel_scope(token: Optional[CancelToken]) -> Iterator[Optional[CancelToken]]:
+    """
+    with 블록 동안 현재 문맥의 취소 토큰 지정 (None이면 취소 불가 문맥)
+    
+    다른 스레드로 넘기는 작업은 contextvars.copy_context()로 문맥을 함께 넘겨야 한다.
+    """
+    reset = _CURRENT.set(token)
+    try:
+        yield token
+    finally:
+        _CURRENT.reset(reset)
+
@@ -0,0 +1,184 @@
+"""
+Chunking 모듈
+제공자 출력 한도를 넘는 큰 섹션을 요점별 하위 조각으로 나누어 병렬 생성하기 위한 분할 계획과 벤치마크
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.models import Section
+from src.stats import split_list
+
+
+# 하위 조각 요점 (조각 수가 더 많으면 "세부 논의 N"을 이어 붙임)
+CHUNK_POINTS = [
+    "핵심 개념과 범위",
+    "주요 특징과 구성 요소",
+    "구체적 사례와 근거",
+    "쟁점과 다양한 관점",
+    "시사점과 정리",
+]
+
+# 조각 병렬 생성용 공유 실행기 크기 (프로세스 전체의 동시 조각 호출 상한)
+CHUNK_WORKERS = int(os.getenv("CHUNK_WORKERS", "8"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+@dataclass
+class Chunk:
+    """섹션 하위 조각"""
+    index: int  # 0부터
+    total: int
+    point: str  # 이 조각이 다룰 요점
+    target_length_chars: int
+
+
+def chunk_limit(provider) -> Optional[int]:
+    """제공자의 섹션당 최대 글자 수 (None이면 나누지 않음)"""
+    return getattr(provider, "max_section_chars", None)
+
+
+def plan_chunks(section: Section, limit: Optional[int]) -> List[Chunk]:
+    """
+    섹션 분할 계획
+    
+    Args:
+        section: 섹션
+        limit: 호출 하나가 생성할 최대 글자 수
+    
+    Returns:
+        Chunk 목록 (나눌 필요가 없으면 빈 목록)
+    """
+    if not limit or section.target_length_chars <= limit:
+        return []
+    total = math.ceil(section.target_length_chars / limit)
+    base, remainder = divmod(section.target_length_chars, total)
+    points = CHUNK_POINTS[:total] if total <= len(CHUNK_POINTS) else (
+        CHUNK_POINTS[:-1] + [f"세부 논의 {i}" for i in range(1, total - len(CHUNK_POINTS) + 1)] + CHUNK_POINTS[-1:]
+    )
+    return [
+        Chunk(index=i, total=total, point=points[i], target_length_chars=base + (1 if i < remainder else 0))
+        for i in range(total)
+    ]
+
+
+def chunk_prompt(base_prompt: str, section: Section, chunks: Sequence[Chunk], chunk: Chunk) -> str:
+    """
+    조각 프롬프트 (섹션 프롬프트 + 전체 요점 목록 + 앞뒤 조각과의 연결 지시)
+    
+    조각은 병렬로 생성되므로 앞 조각의 본문 대신 요점 목록으로 흐름을 맞춘다.
+    """
+    lines = [
+        base_prompt,
+        "",
+        f"이 섹션은 길어서 {chunk.total}부분으로 나누어 작성합니다. 섹션 구성:",
+    ]
+    for other in chunks:
+        marker = " ← 지금 작성할 부분" if other.index == chunk.index else ""
+        lines.append(f"{other.index + 1}. {other.point}{marker}")
+    lines.append("")
+    instruction = f"'{section.title}' 섹션의 {chunk.index + 1}번째 부분('{chunk.point}')만 약 {chunk.target_length_chars}자로 작성하세요. "
+    if chunk.index > 0:
+        instruction += f"앞 부분('{chunks[chunk.index - 1].point}')에 이어지는 문장으로 시작하고, "
+    if chunk.index < chunk.total - 1:
+        instruction += f"뒤 부분('{chunks[chunk.index + 1].point}')의 내용은 미리 쓰지 마세요. "
+    else:
+        instruction += "섹션 전체를 마무리하는 문장으로 끝내세요. "
+    instruction += "섹션 제목이나 번호는 쓰지 마세요."
+    lines.append(instruction)
+    return "\n".join(lines)
+
+
+def chunk_executor() -> ThreadPoolExecutor:
+    """조각 병렬 생성용 공유 실행기 (처음 사용할 때 생성)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=CHUNK_WORKERS, thread_name_prefix="chunk")
+    return _executor
+
+
+def benchmark_chunking(lengths: Sequence[str] = ("A4 3장", "A4 10장", "A4 25장", "A4 50장"),
+                       chunk_sizes: Sequence[Optional[int]] = (None, 4000, 2000, 1000),
+                       latency_ms: float = 300.0, tokens_per_second: float = 2000.0,
+                       topic: str = "기후 변화와 도시") -> List[Dict[str, Any]]:
+    """
+    문서 분량별 생성 시간 곡선 측정 (부하 테스트 제공자, 실제 대기)
+    
+    Args:
+        lengths: 분량 목록
+        chunk_sizes: 섹션당 최대 글자 수 후보 (None은 나누지 않음)
+        latency_ms: 호출당 첫 토큰 지연
+        tokens_per_second: 토큰 생성 속도
+        topic: 주제
+    
+    Returns:
+        [{"length", "chunk_chars", "seconds", "calls", "max_call_tokens", "chars"}]
+    """
+    from src.main import DocumentAutoFormatter
+    
+    rows = []
+    for length in lengths:
+        for size in chunk_sizes:
+            formatter = DocumentAutoFormatter(
+                llm_provider_type="loadtest", latency_ms=latency_ms,
+                tokens_per_second=tokens_per_second, max_section_chars=size
+            )
+            user_input = formatter.input_parser.parse({"topic": topic, "document_type": "레포트", "length": length})
+            started = time.perf_counter()
+            document = formatter.build_document(user_input)
+            elapsed = time.perf_counter() - started
+            stats = formatter.llm_provider.stats()
+            rows.append({
+                "length": length,
+                "chunk_chars": size,
+                "seconds": round(elapsed, 3),
+                "calls": stats["calls"],
+                "max_call_tokens": stats["max_call_tokens"],
+                "chars": len(document.content),
+            })
+    return rows
+
+
+def main():
+    """분량별 생성 시간 곡선과 분량별 최적 조각 크기 출력"""
+    parser = argparse.ArgumentParser(description="큰 섹션 분할 병렬 생성 벤치마크")
+    parser.add_argument("--lengths", default="A4 3장,A4 10장,A4 25장,A4 50장", help="쉼표로 구분한 분량 목록")
+    parser.add_argument("--chunk-sizes", default="0,4000,2000,1000", help="섹션당 최대 글자 수 후보 (0은 분할 안 함)")
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--tokens-per-second", type=float, default=2000.0)
+    parser.add_argument("--json", action="store_true", help="JSON으로 출력")
+    args = parser.parse_args()
+    
+    lengths = split_list(args.lengths)
+    sizes = [size or None for size in split_list(args.chunk_sizes, int)]
+    rows = benchmark_chunking(lengths, sizes, args.latency_ms, args.tokens_per_second)
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return
+    
+    print(f"{'분량':<10}{'조각 크기':>10}{'시간(초)':>10}{'호출 수':>8}{'최대 호출 토큰':>14}{'글자 수':>10}")
+    for row in rows:
+        size = row["chunk_chars"] or "-"
+        print(f"{row['length']:<10}{size:>10}{row['seconds']:>10}{row['calls']:>8}"
+              f"{row['max_call_tokens']:>14}{row['chars']:>10}")
+    print()
+    for length in lengths:
+        best = min((r for r in rows if r["length"] == length), key=lambda r: r["seconds"])
+        print(f"{length}: 가장 빠른 조각 크기 {best['chunk_chars'] or '분할 안 함'} ({best['seconds']}초)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,449 @@
+"""
+Concurrency 모듈
+관측한 상위 LLM 지연/오류로 동시 호출 한도를 조절하는 적응형 리미터 (AIMD, gradient 방식)
+
+- 지연이 평소 수준이면 한도를 올리고, 지연이 늘거나 오류가 나면 한도를 내린다.
+- 같은 상위 백엔드(제공자 종류 + 주소 + 모델 + API 키)를 쓰는 모든 요청이 리미터 하나를 공유한다.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import math
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from src.cancellation import OperationCancelled, current_token
+from src.llm_provider import LLMProvider, backend_key
+from src.stats import percentile, split_list
+
+
+# 취소 토큰이 있는 대기자가 취소 여부를 확인하는 간격 (초)
+_WAIT_POLL_SECONDS = 0.05
+
+# 서비스 경로(api/, 작업 워커)에서 적응형 동시 호출 제한 사용 여부 (1이면 사용)
+ADAPTIVE_CONCURRENCY = int(os.getenv("ADAPTIVE_CONCURRENCY", "0"))
+
+
+class AdaptiveLimiter:
+    """
+    적응형 동시 호출 리미터
+    
+    - 기준 지연: 관측한 최소 지연 (평균은 과부하 지연을 따라 올라가므로 최소값 사용)
+      window개 표본마다 그 구간의 최소값 쪽으로 최대 drift 비율만큼만 올라가서 상위가 실제로 느려지면 천천히 따라감
+    - gradient: tolerance * 기준 지연 / 단기 지연(EMA)으로 한도를 곱해 줄이고,
+      지연이 평소 수준(gradient 1.0)이면 sqrt(한도)만큼 여유를 더한다 (Netflix Gradient 방식)
+    - aimd: 정상 응답이 한도만큼 쌓일 때마다 1씩 올리고, 오류나 기준 지연의 tolerance배를 넘는 지연이면 backoff배로 내린다
+    - 한도의 절반도 쓰지 않는 동안(호출이 적음)에는 한도를 올리지 않는다
+    """
+    
+    ALGORITHMS = ("gradient", "aimd")
+    
+    def __init__(self, algorithm: str = "gradient", initial_limit: int = 4, min_limit: int = 1,
+                 max_limit: int = 64, tolerance: float = 1.5, backoff: float = 0.9,
+                 short_window: int = 10, window: int = 100, drift: float = 0.05, smoothing: float = 0.5):
+        """
+        초기화
+        
+        Args:
+            algorithm: "gradient" 또는 "aimd"
+            initial_limit: 초기 한도
+            min_limit: 최소 한도
+            max_limit: 최대 한도
+            tolerance: 기준 지연 대비 허용 배수 (gradient = tolerance * 기준 / 단기, 최대 1.0)
+            backoff: 오류(aimd는 지연 초과 포함) 시 한도 배수
+            short_window: 단기 지연 EMA 표본 수
+            window: 기준 지연 갱신 구간 표본 수
+            drift: 구간마다 기준 지연이 올라갈 수 있는 최대 비율
+            smoothing: gradient 방식의 한도 변경 반영 비율
+        """
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(f"지원하지 않는 알고리즘: {algorithm}")
+        self.algorithm = algorithm
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self._short_alpha = 2.0 / (short_window + 1)
+        self.window = max(1, window)
+        self.drift = drift
+        
+        self._cond = threading.Condition()
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._inflight = 0
+        self._waiting = 0
+        self._short_rtt: Optional[float] = None
+        self._baseline_rtt: Optional[float] = None
+        self._window_min: Optional[float] = None
+        self._window_samples = 0
+        self._gradient = 1.0
+        self._last_decrease = 0.0
+        self._last_update = 0.0
+        self._stats = {"calls": 0, "drops": 0, "samples": 0, "wait_ms": 0.0}
+    
+    @property
+    def limit(self) -> int:
+        """현재 동시 호출 한도"""
+        return max(int(self._limit), self.min_limit)
+    
+    def acquire(self) -> float:
+        """
+        빈자리가 날 때까지 대기 후 호출 시작 (현재 취소 토큰이 취소되면 OperationCancelled)
+        
+        Returns:
+            시작 시각 (time.perf_counter())
+        """
+        token = current_token()
+        waited = time.perf_counter()
+        with self._cond:
+            self._waiting += 1
+            try:
+                while self._inflight >= self.limit:
+                    if token is not None:
+                        token.check()
+                        self._cond.wait(_WAIT_POLL_SECONDS)
+                    else:
+                        self._cond.wait()
+            finally:
+                self._waiting -= 1
+            self._inflight += 1
+            self._stats["calls"] += 1
+            started = time.perf_counter()
+            self._stats["wait_ms"] += (started - waited) * 1000
+        return started
+    
+    def release(self, rtt_ms: Optional[float], dropped: bool = False):
+        """
+        호출 종료와 관측 반영
+        
+        Args:
+            rtt_ms: 관측 지연 (ms, None이면 한도 조절에 쓰지 않음: 취소 등)
+            dropped: 상위 오류/과부하로 실패했는지 여부
+        """
+        with self._cond:
+            inflight = self._inflight
+            self._inflight -= 1
+            if dropped:
+                self._stats["drops"] += 1
+                self._decrease()
+            elif rtt_ms is not None:
+                self._stats["samples"] += 1
+                self._observe(rtt_ms, inflight)
+            self._cond.notify_all()
+    
+    def _decrease(self):
+        """한도를 backoff배로 (aimd는 같은 혼잡에서 동시에 끝난 호출들이 거듭 줄이지 않도록 단기 지연당 한 번)"""
+        now = time.monotonic()
+        if (self.algorithm == "aimd" and self._short_rtt is not None
+                and now - self._last_decrease < self._short_rtt / 1000.0):
+            return
+        self._last_decrease = now
+        self._limit = max(self._limit * self.backoff, self.min_limit)
+    
+    def _observe(self, rtt_ms: float, inflight: int):
+        """지연 표본 반영 (조건 잠금 안에서 호출)"""
+        if self._short_rtt is None:
+            self._short_rtt = rtt_ms
+        else:
+            self._short_rtt += self._short_alpha * (rtt_ms - self._short_rtt)
+        self._window_min = rtt_ms if self._window_min is None else min(self._window_min, rtt_ms)
+        self._window_samples += 1
+        if self._baseline_rtt is None or rtt_ms < self._baseline_rtt:
+            self._baseline_rtt = rtt_ms
+        elif self._window_samples >= self.window:
+            self._baseline_rtt = min(self._window_min, self._baseline_rtt * (1 + self.drift))
+        if self._window_samples >= self.window:
+            self._window_min, self._window_samples = None, 0
+        baseline = self._baseline_rtt
+        self._gradient = max(0.5, min(1.0, self.tolerance * baseline / self._short_rtt))
+        
+        if self.algorithm == "aimd":
+            if rtt_ms > self.tolerance * baseline:
+                self._decrease()
+            elif inflight * 2 >= self._limit:
+                # 한도만큼의 호출이 끝날 때마다 1 증가 (TCP 혼잡 회피와 같은 증가 속도)
+                self._limit = min(self._limit + 1 / self._limit, self.max_limit)
+            return
+        
+        if self._gradient >= 1.0 and inflight * 2 < self._limit:
+            # 한도의 절반도 쓰지 않는 동안에는 올리지 않음
+            return
+        now = time.monotonic()
+        if now - self._last_update < self._short_rtt / 1000.0:
+            # 한도 변경의 효과가 지연에 나타나기 전에 거듭 바꾸지 않도록 단기 지연당 한 번만 갱신
+            return
+        self._last_update = now
+        new_limit = self._limit * self._gradient + math.sqrt(self._limit)
+        new_limit = self._limit * (1 - self.smoothing) + new_limit * self.smoothing
+        self._limit = min(max(new_limit, self.min_limit), self.max_limit)
+    
+    def stats(self) -> Dict[str, Any]:
+        """현재 한도, 진행/대기 중인 호출 수, 지연 gradient와 단기/기준 지연"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "algorithm": self.algorithm,
+                "limit": self.limit,
+                "inflight": self._inflight,
+                "waiting": self._waiting,
+                "gradient": round(self._gradient, 3),
+                "short_rtt_ms": round(self._short_rtt, 3) if self._short_rtt is not None else None,
+                "baseline_rtt_ms": round(self._baseline_rtt, 3) if self._baseline_rtt is not None else None,
+            })
+        stats["wait_ms"] = round(stats["wait_ms"], 3)
+        return stats
+
+
+# 상위 백엔드별 공유 리미터
+_LIMITERS: Dict[tuple, AdaptiveLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def limiter_for(provider: LLMProvider, **limiter_kwargs) -> AdaptiveLimiter:
+    """
+    상위 백엔드별 공유 리미터 (처음 요청될 때 생성)
+    
+    Args:
+        provider: 실제 LLM 제공자
+        **limiter_kwargs: 처음 생성할 때의 AdaptiveLimiter 설정 (기본: 환경 변수 LLM_CONCURRENCY_ALGORITHM 등)
+    """
+    key = backend_key(provider)
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(key)
+        if limiter is None:
+            limiter_kwargs.setdefault("algorithm", os.getenv("LLM_CONCURRENCY_ALGORITHM", "gradient"))
+            limiter_kwargs.setdefault("initial_limit", int(os.getenv("LLM_CONCURRENCY_INITIAL", "4")))
+            limiter_kwargs.setdefault("max_limit", int(os.getenv("LLM_CONCURRENCY_MAX", "64")))
+            limiter = _LIMITERS[key] = AdaptiveLimiter(**limiter_kwargs)
+        return limiter
+
+
+def concurrency_stats() -> Dict[str, Dict[str, Any]]:
+    """백엔드별 리미터 지표 {"제공자|주소|모델|키 지문": stats}"""
+    with _LIMITERS_LOCK:
+        items = list(_LIMITERS.items())
+    return {"|".join(str(part) for part in key if part is not None): limiter.stats() for key, limiter in items}
+
+
+def _units(kwargs: dict) -> float:
+    """지연 정규화 단위 (요청 토큰 1000개당, 섹션마다 다른 출력 길이의 영향 제거)"""
+    return max(int(kwargs.get("max_tokens", 2000) or 2000), 1) / 1000.0
+
+
+class AdaptiveConcurrencyProvider(LLMProvider):
+    """
+    적응형 동시 호출 제한 래퍼
+    
+    - generate(): 요청 토큰 1000개당 지연을 표본으로 사용
+    - generate_stream(): 첫 조각까지의 지연을 표본으로 사용 (자리는 스트림이 끝날 때 반환)
+    - 취소된 호출은 표본에서 제외, 그 밖의 예외는 오류(drop)로 반영
+    """
+    
+    def __init__(self, provider: LLMProvider, limiter: AdaptiveLimiter = None):
+        self.provider = provider
+        self.limiter = limiter or limiter_for(provider)
+    
+    @property
+    def supports_streaming(self) -> bool:
+        return getattr(self.provider, "supports_streaming", False)
+    
+    @property
+    def supports_batching(self) -> bool:
+        return getattr(self.provider, "supports_batching", False)
+    
+    @property
+    def supports_sections(self) -> bool:
+        return getattr(self.provider, "supports_sections", False)
+    
+    @property
+    def max_section_chars(self):
+        return getattr(self.provider, "max_section_chars", None)
+    
+    def generate_section(self, section, metadata, user_input) -> str:
+        """구조화 섹션 생성 (상위 LLM 호출이 아니므로 한도 밖에서 바로 위임)"""
+        return self.provider.generate_section(section, metadata, user_input)
+    
+    def generate(self, prompt: str, **kwargs) -> str:
+        """한도 안에서 텍스트 생성"""
+        started = self.limiter.acquire()
+        try:
+            result = self.provider.generate(prompt, **kwargs)
+        except OperationCancelled:
+            self.limiter.release(None)
+            raise
+        except Exception:
+            self.limiter.release(None, dropped=True)
+            raise
+        self.limiter.release((time.perf_counter() - started) * 1000 / _units(kwargs))
+        return result
+    
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """한도 안에서 스트리밍 생성"""
+        started = self.limiter.acquire()
+        first_ms = None
+        dropped = False
+        try:
+            for chunk in self.provider.generate_stream(prompt, **kwargs):
+                if first_ms is None:
+                    first_ms = (time.perf_counter() - started) * 1000
+                yield chunk
+        except OperationCancelled:
+            first_ms = None
+            raise
+        except Exception:
+            dropped = True
+            raise
+        finally:
+            self.limiter.release(first_ms, dropped=dropped)
+    
+    def generate_batch(self, calls: Sequence[Tuple[str, Dict[str, Any]]]) -> List[Union[str, Exception]]:
+        """배치 호출 하나를 한 자리로 계산 (가장 긴 항목 기준으로 정규화)"""
+        started = self.limiter.acquire()
+        try:
+            results = self.provider.generate_batch(calls)
+        except OperationCancelled:
+            self.limiter.release(None)
+            raise
+        except Exception:
+            self.limiter.release(None, dropped=True)
+            raise
+        units = max((_units(kwargs) for _, kwargs in calls), default=1.0)
+        dropped = any(isinstance(result, Exception) for result in results)
+        self.limiter.release((time.perf_counter() - started) * 1000 / units, dropped=dropped)
+        return results
+    
+    def stats(self) -> Dict[str, Any]:
+        return self.limiter.stats()
+
+
+class _TimedProvider(LLMProvider):
+    """검증용: 리미터 대기를 뺀 상위 호출 지연 기록"""
+    
+    def __init__(self, provider: LLMProvider):
+        self.provider = provider
+        self.latencies: List[float] = []
+        self._lock = threading.Lock()
+    
+    def generate(self, prompt: str, **kwargs) -> str:
+        started = time.perf_counter()
+        try:
+            return self.provider.generate(prompt, **kwargs)
+        finally:
+            with self._lock:
+                self.latencies.append((time.perf_counter() - started) * 1000)
+    
+    def take(self) -> List[float]:
+        with self._lock:
+            latencies, self.latencies = self.latencies, []
+        return latencies
+
+
+def validate(modes: Sequence[str] = ("fixed:64", "fixed:4", "aimd", "gradient"), clients: int = 64,
+             capacity: int = 16, phase_seconds: float = 4.0, latency_ms: float = 200.0,
+             max_tokens: int = 300) -> List[Dict[str, Any]]:
+    """
+    지연 주입 스탠드인으로 리미터 검증
+    
+    스탠드인은 동시 호출이 capacity를 넘으면 지연이 비례해 늘고 3배를 넘으면 429를 돌려준다.
+    1단계는 capacity, 2단계는 capacity의 절반으로 상위 용량이 줄어든다.
+    
+    Args:
+        modes: "fixed:N"(고정 한도) 또는 리미터 알고리즘
+        clients: 쉬지 않고 호출하는 동시 클라이언트 수
+        capacity: 1단계 상위 용량
+        phase_seconds: 단계별 시간 (초)
+        latency_ms: 용량 안에서의 호출 지연
+        max_tokens: 호출당 max_tokens
+    
+    Returns:
+        [{"mode", "phase", "capacity", "ok_per_s", "p50_ms", "p95_ms"(대기 포함), "upstream_p50_ms",
+          "upstream_p95_ms", "errors", "limit", "gradient"}]
+    """
+    from src.llm_provider import HTTPChatProvider
+    from src.loadtest_provider import ChatStandInServer, LoadTestLLMProvider
+    
+    rows = []
+    for mode in modes:
+        stand_in = LoadTestLLMProvider(seed=0, latency_ms=latency_ms, tokens_per_second=0, capacity=capacity)
+        with ChatStandInServer(stand_in) as server:
+            upstream = _TimedProvider(HTTPChatProvider(base_url=server.base_url, timeout=60.0))
+            if mode.startswith("fixed:"):
+                fixed = int(mode.split(":", 1)[1])
+                limiter = AdaptiveLimiter("aimd", initial_limit=fixed, min_limit=fixed, max_limit=fixed)
+            else:
+                limiter = AdaptiveLimiter(mode, initial_limit=4, max_limit=clients)
+            provider = AdaptiveConcurrencyProvider(upstream, limiter)
+            
+            for phase, phase_capacity in enumerate((capacity, max(capacity // 2, 1)), 1):
+                stand_in.capacity = phase_capacity
+                latencies: List[float] = []
+                errors = [0]
+                lock = threading.Lock()
+                stop_at = time.perf_counter() + phase_seconds
+                
+                def client(index: int):
+                    n = 0
+                    while time.perf_counter() < stop_at:
+                        started = time.perf_counter()
+                        try:
+                            provider.generate(f"주제: 검증 {index}-{n}", max_tokens=max_tokens)
+                            with lock:
+                                latencies.append((time.perf_counter() - started) * 1000)
+                        except Exception:
+                            with lock:
+                                errors[0] += 1
+                        n += 1
+                
+                threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                stats = limiter.stats()
+                upstream_latencies = upstream.take()
+                rows.append({
+                    "mode": mode,
+                    "phase": phase,
+                    "capacity": phase_capacity,
+                    "ok_per_s": round(len(latencies) / phase_seconds, 2),
+                    "p50_ms": round(percentile(latencies, 50), 1),
+                    "p95_ms": round(percentile(latencies, 95), 1),
+                    "upstream_p50_ms": round(percentile(upstream_latencies, 50), 1),
+                    "upstream_p95_ms": round(percentile(upstream_latencies, 95), 1),
+                    "errors": errors[0],
+                    "limit": stats["limit"],
+                    "gradient": stats["gradient"],
+                })
+    return rows
+
+
+def main():
+    """지연 주입 스탠드인에서 고정 한도와 적응형 리미터 비교"""
+    parser = argparse.ArgumentParser(description="적응형 동시 호출 리미터 검증 (지연 주입 스탠드인)")
+    parser.add_argument("--modes", default="fixed:64,fixed:4,aimd,gradient", help="fixed:N 또는 aimd/gradient")
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--capacity", type=int, default=16)
+    parser.add_argument("--phase-seconds", type=float, default=4.0)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--json", action="store_true", help="JSON으로 출력")
+    args = parser.parse_args()
+    
+    rows = validate(split_list(args.modes), args.clients, args.capacity,
+                    args.phase_seconds, args.latency_ms)
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return
+    print(f"{'방식':<10}{'단계':>4}{'용량':>6}{'성공/초':>9}{'p50(ms)':>10}{'p95(ms)':>10}"
+          f"{'상위 p50':>10}{'상위 p95':>10}{'오류':>7}{'한도':>6}{'gradient':>10}")
+    for row in rows:
+        print(f"{row['mode']:<10}{row['phase']:>4}{row['capacity']:>6}{row['ok_per_s']:>9}{row['p50_ms']:>10}"
+              f"{row['p95_ms']:>10}{row['upstream_p50_ms']:>10}{row['upstream_p95_ms']:>10}{row['errors']:>7}"
+              f"{row['limit']:>6}{row['gradient']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,28 +6,56 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from typing import List
+import contextvars
+import threading
+import time
+from dataclasses import replace
+from typing import Any, List, Dict, Optional, Callable, Iterable, Tuple
 from src.models import (
     DocumentStructure, Section, DocumentMetadata,
     UserInput, GeneratedDocument
 )
 from src.llm_provider import LLMProvider
+from src.batch_metrics import BatchEvaluator
+from src.stream_postprocess import StreamPostProcessor
+from src.cancellation import check_cancelled
+from src.chunking import chunk_executor, chunk_limit, chunk_prompt, plan_chunks
+from src.degradation import FULL, current_degradation
+from src.context_memory import (
+    CONTEXT_WORKERS, ContextMemory, current_memory, memory_scope, section_dependencies, section_executor
+)
+from src.pipeline import Pipeline, PipelineExecutor, Stage, StageEvent
 
 
 class ContentGenerator:
     """내용 생성기"""
     
-    def __init__(self, llm_provider: LLMProvider):
+    def __init__(self, llm_provider: LLMProvider, section_cache=None, repair=None):
         """
         초기화
         
         Args:
             llm_provider: LLM 제공자
+            section_cache: 섹션 근사 중복 캐시 (NearDuplicateSectionCache, 선택)
+            repair: 섹션 검증-수리 루프 (RepairLoop, 선택, 있으면 후처리 전에 실패한 섹션만 다시 요청)
         """
         self.llm_provider = llm_provider
+        self.section_cache = section_cache
+        self.repair = repair
+        self.evaluator = BatchEvaluator()
+        self.stream_stats = {"streamed_sections": 0, "early_stops": 0, "raw_chars": 0, "emitted_chars": 0}
+        self.chunk_stats = {"chunked_sections": 0, "chunks": 0}
+        # 의존 관계가 풀린 섹션을 동시에 생성하는 최대 수 (1이면 순서대로)
+        self.context_workers = CONTEXT_WORKERS
+        # 섹션 단계 계측 훅 (StageEvent를 받음, DocumentAutoFormatter가 파이프라인 훅과 공유)
+        self.stage_hooks = []
+        self._offline_generator = None
     
     def generate(self, structure: DocumentStructure, metadata: DocumentMetadata,
-                 user_input: UserInput) -> GeneratedDocument:
+                 user_input: UserInput,
+                 on_section: Optional[Callable[[Section], None]] = None,
+                 completed_sections: Optional[Dict[int, str]] = None,
+                 only_orders: Optional[Iterable[int]] = None) -> GeneratedDocument:
         """
         문서 내용 생성
         
@@ -35,19 +63,58 @@ class ContentGenerator:
             structure: 문서 구조
             metadata: 문서 메타데이터
             user_input: 사용자 입력
+            on_section: 섹션 생성 완료 시 호출되는 콜백 (진행 상황/체크포인트용, 수리 루프가 있으면
+                수리/후처리로 내용이 바뀐 섹션에 대해 한 번 더 호출)
+            completed_sections: 이미 생성된 섹션 내용 {order: content} (중단 후 재개용)
+            only_orders: 생성할 섹션 순서 목록 (없으면 전체, 선택하지 않은 섹션은 건너뜀)
         
         Returns:
             GeneratedDocument 객체
         """
-        # 각 섹션별 내용 생성
+        completed_sections = completed_sections or {}
+        selected = set(only_orders) if only_orders is not None else None
+        # 지연 SLO 품질 저하 상태 (없으면 기본 생성)
+        state = current_degradation()
+        
+        # 품질 저하 중(full 이외 단계)에는 시간 예산이 우선이므로 수리 호출 없이 후처리만
+        repair = self.repair if state is None or state.mode == FULL else None
+        
+        # 이전 섹션 문맥은 원문 대신 완료된 섹션의 추출 요약으로 구성
+        memory = ContextMemory()
         generated_sections = []
+        fresh_sections = []
         for section in structure.sections:
-            content = self._generate_section_content(
-                section, metadata, user_input, structure
-            )
-            section.content = content
+            if selected is not None and section.order not in selected:
+                continue
+            if section.order in completed_sections:
+                # 체크포인트에 저장된 섹션은 다시 생성하지 않음
+                section.content = completed_sections[section.order]
+                memory.record(section)
+            else:
+                fresh_sections.append(section)
             generated_sections.append(section)
         
+        def finished(section: Section):
+            memory.record(section)
+            if on_section:
+                # 수리 루프가 있어도 생성 직후 체크포인트를 남겨 수리 전에 중단되어도 다시 생성하지 않음
+                on_section(section)
+        
+        # 각 섹션별 내용 생성 (문맥 의존 섹션이 끝난 섹션부터)
+        with memory_scope(memory):
+            self._generate_sections(fresh_sections, structure, metadata, user_input, state, finished)
+        
+        if self.repair is not None and generated_sections:
+            # 체크포인트는 수리 전 원문일 수 있으므로 재개한 섹션도 함께 점검
+            checkpointed = {section.order: section.content for section in generated_sections}
+            # 기준 미달 섹션만 수리 호출 후 남은 문제는 기존 후처리로 마무리
+            if repair is not None:
+                repair.run(generated_sections, user_input)
+            for section in generated_sections:
+                section.content = self._postprocess(section.content, section, user_input, final=True)
+                if on_section and section.content != checkpointed[section.order]:
+                    on_section(section)
+        
         # 전체 문서 개요 생성
         overview = self._generate_overview(metadata, user_input)
         
@@ -63,21 +130,152 @@ class ContentGenerator:
             structure_summary=structure_summary,
             content=self._format_content(generated_sections),
             checkpoints=checkpoints,
-            metadata=metadata
+            metadata=metadata,
+            sections=generated_sections,
+            required_keywords=list(user_input.required_keywords)
         )
     
+    def _generate_sections(self, sections: List[Section], structure: DocumentStructure,
+                           metadata: DocumentMetadata, user_input: UserInput, state,
+                           finished: Callable[[Section], None]):
+        """
+        섹션 생성 스케줄링 (섹션마다 파이프라인 단계 하나)
+        
+        structure.dependencies의 의존 섹션이 모두 끝난 섹션부터 시작해 최대 context_workers개를 동시에 생성한다.
+        의존 관계가 없는 구조는 바로 앞 섹션들에 의존하므로 순서대로 생성된다.
+        
+        Args:
+            sections: 생성할 섹션 (문서 순서)
+            structure: 문서 구조
+            metadata: 문서 메타데이터
+            user_input: 사용자 입력
+            state: 품질 저하 상태 (없으면 None)
+            finished: 섹션 완료 콜백 (이 스레드에서 완료 순서대로 호출)
+        """
+        def generate_one(section: Section, remaining: int) -> str:
+            if state is not None:
+                return self._generate_degraded(state, remaining, section, metadata, user_input, structure)
+            return self._generate_section_content(section, metadata, user_input, structure)
+        
+        # 템플릿 엔진처럼 즉시 끝나는 구조화 제공자는 동시 생성 이득이 없음
+        workers = 1 if getattr(self.llm_provider, "supports_sections", False) else self.context_workers
+        orders = {section.order for section in sections}
+        by_stage = {f"section:{section.order}": section for section in sections}
+        started = [0]
+        lock = threading.Lock()
+        
+        def node(section: Section) -> Stage:
+            def run(*_dependencies) -> str:
+                # 클라이언트 연결 종료/마감 초과 시 다음 섹션을 시작하지 않음
+                check_cancelled()
+                with lock:
+                    remaining = len(sections) - started[0]
+                    started[0] += 1
+                return generate_one(section, remaining)
+            
+            # 뒤 섹션에 의존하는 잘못된 의존 관계는 무시 (문서 순서대로 진행)
+            dependencies = sorted(
+                order for order in set(section_dependencies(structure, section)) & orders if order < section.order
+            )
+            return Stage(f"section:{section.order}", run,
+                         inputs=tuple(f"section:{order}" for order in dependencies), output_type=str)
+        
+        def on_finish(event: StageEvent):
+            # 실행기는 훅을 이 스레드에서 호출하므로 의존 섹션이 시작하기 전에 내용/요약이 기록됨
+            if event.event == "finish" and event.stage in by_stage:
+                section = by_stage[event.stage]
+                section.content = event.value
+                finished(section)
+        
+        pipeline = Pipeline(node(section) for section in sections)
+        executor = PipelineExecutor(max_workers=workers, memo_size=0, pool=section_executor())
+        executor.run(pipeline, {}, list(by_stage), hooks=[on_finish] + list(self.stage_hooks))
+    
+    def _generate_degraded(self, state, remaining: int, section: Section, metadata: DocumentMetadata,
+                           user_input: UserInput, structure: DocumentStructure) -> str:
+        """
+        품질 저하 단계를 적용한 섹션 생성
+        
+        Args:
+            state: DegradationState
+            remaining: 이 섹션을 포함해 남은 섹션 수 (마감 점검용)
+            section: 섹션
+            metadata: 문서 메타데이터
+            user_input: 사용자 입력
+            structure: 문서 구조
+        
+        Returns:
+            섹션 내용
+        """
+        state.before_section(remaining)
+        mode = state.mode
+        generator = self
+        if state.offline:
+            if self._offline_generator is None:
+                from src.llm_provider import get_llm_provider
+                self._offline_generator = ContentGenerator(get_llm_provider("template"))
+            generator = self._offline_generator
+        started = time.monotonic()
+        # short 단계부터는 목표 분량(max_tokens 포함)을 줄인 사본으로 생성
+        content = generator._generate_section_content(state.shape(section), metadata, user_input, structure)
+        state.record_section(mode, time.monotonic() - started)
+        return content
+    
     def _generate_section_content(self, section: Section, metadata: DocumentMetadata,
                                   user_input: UserInput, structure: DocumentStructure) -> str:
         """섹션별 내용 생성"""
+        if getattr(self.llm_provider, "supports_sections", False):
+            # 구조화된 섹션 정보로 바로 생성 (프롬프트 구성/캐시 조회 없음)
+            content = self.llm_provider.generate_section(section, metadata, user_input)
+            return self._postprocess(content, section, user_input)
+        
+        limit = chunk_limit(self.llm_provider)
+        if plan_chunks(section, limit):
+            # 제공자 한도를 넘는 섹션: 요점별 하위 조각을 병렬 생성해 이어 붙임
+            calls = self.section_calls(section, metadata, user_input, structure, limit)
+            parts = self._generate_chunked(section, calls, user_input)
+            return self._postprocess(self._join_parts(parts), section, user_input)
+        
         # 프롬프트 구성
         prompt = self._build_prompt(section, metadata, user_input, structure)
         
         # LLM을 통한 생성
-        content = self.llm_provider.generate(
-            prompt,
-            temperature=0.7,
-            max_tokens=section.target_length_chars // 2  # 대략적 토큰 수
-        )
+        def call_llm() -> str:
+            return self.llm_provider.generate(
+                prompt,
+                temperature=0.7,
+                max_tokens=section.target_length_chars // 2  # 대략적 토큰 수
+            )
+        
+        if self.section_cache is None and self.repair is None and getattr(self.llm_provider, "supports_streaming", False):
+            # 스트리밍 제공자: 조각 단위로 후처리하고 목표 분량에 도달하면 생성 중단 (수리 루프는 원문이 필요해 제외)
+            return self._generate_section_stream(prompt, section, user_input)
+        
+        if self.section_cache is not None:
+            # 근사 중복 프롬프트의 이전 결과 재사용 (주제만 치환)
+            content = self.section_cache.get_or_generate(
+                prompt, section.title, user_input.topic, call_llm
+            )
+        else:
+            content = call_llm()
+        
+        return self._postprocess(content, section, user_input)
+    
+    def _postprocess(self, content: str, section: Section, user_input: UserInput, final: bool = False) -> str:
+        """
+        키워드/제외 내용/분량 후처리
+        
+        Args:
+            content: 생성된 섹션 원문
+            section: 섹션
+            user_input: 사용자 입력
+            final: 수리 루프가 끝난 뒤의 마무리 호출인지 여부 (수리 루프가 있으면 그 전까지는 원문 유지)
+        
+        Returns:
+            섹션 내용
+        """
+        if self.repair is not None and not final:
+            return content
         
         # 키워드 포함 확인 및 보완
         content = self._ensure_keywords(content, user_input.required_keywords)
@@ -90,6 +288,112 @@ class ContentGenerator:
         
         return content
     
+    def section_calls(self, section: Section, metadata: DocumentMetadata, user_input: UserInput,
+                      structure: DocumentStructure, limit: Optional[int] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        섹션 하나를 만드는 LLM 호출 목록 (일괄 배치 파일 작성에도 사용)
+        
+        Args:
+            section: 섹션
+            metadata: 문서 메타데이터
+            user_input: 사용자 입력
+            structure: 문서 구조
+            limit: 호출당 최대 글자 수 (넘는 섹션은 하위 조각별 호출, None이면 나누지 않음)
+        
+        Returns:
+            [(프롬프트, 파라미터)] 목록 (하위 조각 순서)
+        """
+        chunks = plan_chunks(section, limit)
+        if not chunks:
+            prompt = self._build_prompt(section, metadata, user_input, structure)
+            return [(prompt, {"temperature": 0.7, "max_tokens": section.target_length_chars // 2})]
+        
+        calls = []
+        for chunk in chunks:
+            # 조각마다 전체 요점 목록과 앞뒤 요점을 넘겨 흐름을 맞춤
+            part = replace(section, target_length_chars=chunk.target_length_chars)
+            prompt = chunk_prompt(self._build_prompt(part, metadata, user_input, structure),
+                                  section, chunks, chunk)
+            calls.append((prompt, {"temperature": 0.7, "max_tokens": chunk.target_length_chars // 2}))
+        return calls
+    
+    def finish_section(self, parts: List[str], section: Section, user_input: UserInput) -> str:
+        """
+        호출 결과를 이어 붙이고 키워드/제외 내용/분량 후처리
+        
+        Args:
+            parts: section_calls() 순서대로의 생성 결과
+            section: 섹션
+            user_input: 사용자 입력
+        
+        Returns:
+            섹션 내용
+        """
+        return self._postprocess(self._join_parts(parts), section, user_input, final=True)
+    
+    @staticmethod
+    def _join_parts(parts: List[str]) -> str:
+        """하위 조각 결과를 문단으로 이어 붙임"""
+        if len(parts) == 1:
+            return parts[0]
+        return "\n\n".join(part.strip() for part in parts if part.strip())
+    
+    def _generate_chunked(self, section: Section, calls: List[Tuple[str, Dict[str, Any]]],
+                          user_input: UserInput) -> List[str]:
+        """하위 조각 호출 병렬 실행 (조각 순서대로의 결과)"""
+        def call_chunk(prompt: str, kwargs: Dict[str, Any]) -> str:
+            def call_llm() -> str:
+                return self.llm_provider.generate(prompt, **kwargs)
+            
+            if self.section_cache is not None:
+                return self.section_cache.get_or_generate(prompt, section.title, user_input.topic, call_llm)
+            return call_llm()
+        
+        # 취소 토큰이 조각 호출까지 전달되도록 현재 문맥을 복사해 실행
+        futures = [
+            chunk_executor().submit(contextvars.copy_context().run, call_chunk, prompt, kwargs)
+            for prompt, kwargs in calls
+        ]
+        parts = [future.result() for future in futures]
+        
+        self.chunk_stats["chunked_sections"] += 1
+        self.chunk_stats["chunks"] += len(calls)
+        return parts
+    
+    def _generate_section_stream(self, prompt: str, section: Section, user_input: UserInput) -> str:
+        """스트리밍 생성 + 온라인 후처리 (제외 내용, 키워드, 분량)"""
+        processor = StreamPostProcessor(
+            section.target_length_chars,
+            user_input.required_keywords,
+            user_input.excluded_content
+        )
+        stream = self.llm_provider.generate_stream(
+            prompt,
+            temperature=0.7,
+            max_tokens=section.target_length_chars // 2  # 대략적 토큰 수
+        )
+        parts = []
+        try:
+            for chunk in stream:
+                check_cancelled()
+                parts.append(processor.feed(chunk))
+                if processor.done:
+                    break
+        finally:
+            # 조기 종료 시 상위 스트림(HTTP 연결)을 닫아 남은 토큰 생성을 멈춤
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+        early_stop = processor.done
+        parts.append(processor.finish())
+        
+        stats = processor.stats()
+        self.stream_stats["streamed_sections"] += 1
+        self.stream_stats["early_stops"] += int(early_stop)
+        self.stream_stats["raw_chars"] += stats["raw_chars"]
+        self.stream_stats["emitted_chars"] += stats["emitted_chars"]
+        return "".join(parts)
+    
     def _build_prompt(self, section: Section, metadata: DocumentMetadata,
                       user_input: UserInput, structure: DocumentStructure) -> str:
         """섹션 생성 프롬프트 구성"""
@@ -109,13 +413,14 @@ class ContentGenerator:
             f"",
         ]
         
-        # 이전 섹션 정보 (연결성 보장)
-        prev_sections = [s for s in structure.sections if s.order < section.order]
-        if prev_sections:
-            prompt_parts.append("이전 섹션들:")
-            for prev in prev_sections[-2:]:  # 최근 2개만
-                prompt_parts.append(f"- {prev.title}: {prev.content[:200]}...")
-            prompt_parts.append("")
+        # 의존 섹션 요약 (연결성 보장, 문서 길이와 관계없이 일정한 크기, 과부하 시 no_context 단계부터 생략)
+        state = current_degradation()
+        if not (state is not None and state.skip_context):
+            # 일괄 배치처럼 문서 생성 밖에서 프롬프트만 만들 때는 현재 내용으로 요약
+            context = (current_memory() or ContextMemory()).context_lines(section, structure)
+            if context:
+                prompt_parts.extend(context)
+                prompt_parts.append("")
         
         # 키워드 포함 요청
         if user_input.required_keywords:
@@ -202,14 +507,16 @@ class ContentGenerator:
             elif criterion == "설득력":
                 checkpoints.append("[OK] 설득력 있는 논증: 근거와 예시를 통해 주장을 뒷받침함")
         
-        # 분량 체크
-        total_length = sum(len(s.content) for s in sections)
+        # 분량/키워드 체크 (배치 평가와 같은 엔진 사용)
+        scores = self.evaluator.evaluate_document(
+            sections, metadata.target_length_chars, user_input.required_keywords
+        )
+        total_length = scores["total_length"]
         checkpoints.append(f"[OK] 분량 적정성: 목표 분량({metadata.target_length_chars}자) 대비 실제 분량({total_length}자)")
         
-        # 키워드 체크
         if user_input.required_keywords:
-            all_content = " ".join(s.content for s in sections)
-            included_keywords = [kw for kw in user_input.required_keywords if kw in all_content]
+            included = set(scores["included_keywords"])
+            included_keywords = [kw for kw in user_input.required_keywords if kw in included]
             checkpoints.append(f"[OK] 필수 키워드 포함: {len(included_keywords)}/{len(user_input.required_keywords)}개 포함")
         
         # 보완 제안
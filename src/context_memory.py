@@ -0,0 +1,265 @@
+"""
+Context Memory 모듈
+섹션 프롬프트의 이전 섹션 문맥을 원문 앞부분 대신 추출 요약으로 만드는 문맥 메모리
+
+- 섹션이 끝나면 문장 점수(단어 가중치 합, 반복/상투 문장 감점)로 고른 짧은 추출 요약을 저장
+- 의존 섹션이 많으면(결론부 등) 그 요약들을 다시 요약한 문서 요약 한 줄로 압축
+- 프롬프트 문맥 길이는 문서 길이와 관계없이 CONTEXT_SECTION_CHARS * 2 + CONTEXT_DOCUMENT_CHARS 이하
+
+섹션이 어떤 섹션의 요약을 문맥으로 쓰는지는 DocumentStructure.dependencies로 정한다.
+기본 구조는 의존 관계가 없어 모든 섹션이 앞의 모든 섹션을 문맥으로 받고 문서 순서대로 생성된다.
+CONTEXT_PARALLEL=1이면 본문 섹션이 도입부에만 의존하는 축소 문맥 구조(group_dependencies)를 써서
+의존 섹션의 요약이 준비되는 대로 앞 섹션을 기다리지 않고 생성을 시작한다. 이때 본문 섹션은 서로의 내용을
+보지 못하고 섹션 완료 순서가 문서 순서와 달라진다 (작업 큐 since 커서는 완료 순번 기준이라 영향 없음).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+from src.models import DocumentStructure, Section
+
+
+# 섹션 하나의 요약 최대 길이 (글자)
+CONTEXT_SECTION_CHARS = int(os.getenv("CONTEXT_SECTION_CHARS", "150"))
+# 의존 섹션 요약들을 압축한 문서 요약 최대 길이 (글자)
+CONTEXT_DOCUMENT_CHARS = int(os.getenv("CONTEXT_DOCUMENT_CHARS", "240"))
+# 1이면 본문 섹션이 도입부에만 의존하는 축소 문맥 구조로 동시 생성 (기본 0: 앞의 모든 섹션을 문맥으로 순서대로 생성)
+CONTEXT_PARALLEL = int(os.getenv("CONTEXT_PARALLEL", "0"))
+# 의존 관계가 풀린 섹션을 동시에 생성하는 최대 수 (1이면 순서대로)
+CONTEXT_WORKERS = int(os.getenv("CONTEXT_WORKERS", "4"))
+
+# 프롬프트에 요약을 그대로 넣는 최근 의존 섹션 수 (나머지는 문서 요약으로 압축)
+RECENT_SECTIONS = 2
+
+# 점수 계산에서 빼는 조사/어미 (단어 끝에서 한 번만 제거)
+_SUFFIXES = ("으로써", "에서는", "에서의", "으로는", "이라는", "에서", "으로", "에게", "까지", "부터", "라는",
+             "하는", "하고", "하며", "이며", "이다", "한다", "된다", "은", "는", "이", "가", "을", "를",
+             "에", "의", "와", "과", "도", "로", "만")
+# 내용 없이 분량만 채우는 상투 표현 (들어간 문장은 감점)
+_FILLER = ("다양한 관점에서 접근할 수 있다", "더 깊이 있게 살펴보면", "고려할 필요가 있다",
+           "실제 LLM 연동 시", "살펴볼 필요가 있다")
+
+_WORD = re.compile(r"[가-힣A-Za-z0-9]{2,}")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+
+_CURRENT: ContextVar = ContextVar("context_memory", default=None)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+            return word[:-len(suffix)]
+    return word
+
+
+def _words(sentence: str) -> List[str]:
+    return [_stem(word) for word in _WORD.findall(sentence)]
+
+
+@lru_cache(maxsize=4096)
+def summarize(text: str, max_chars: int = CONTEXT_SECTION_CHARS) -> str:
+    """
+    추출 요약 (LLM 호출 없음)
+    
+    문장마다 단어 가중치(빈도 x 문장 분포 역수) 평균으로 점수를 매기고, 첫 문장은 가산,
+    상투 표현이 든 문장은 감점한다. 이미 고른 문장과 단어가 대부분 겹치는 문장(반복 보충 문장)은 건너뛴다.
+    점수 순으로 max_chars까지 고른 뒤 원래 순서로 이어 붙인다.
+    
+    Args:
+        text: 원문
+        max_chars: 요약 최대 길이
+    
+    Returns:
+        요약 (첫 문장부터 max_chars를 넘으면 잘라서 "…"을 붙임)
+    """
+    sentences = [s.strip() for s in _SENTENCE_END.split(text.strip()) if s.strip()]
+    if not sentences:
+        return ""
+    if len(" ".join(sentences)) <= max_chars:
+        return " ".join(sentences)
+    
+    tokens = [_words(sentence) for sentence in sentences]
+    frequency = Counter(word for words in tokens for word in words)
+    spread = Counter(word for words in tokens for word in set(words))
+    total = len(sentences)
+    
+    def weight(word: str) -> float:
+        return frequency[word] * math.log(1 + total / spread[word])
+    
+    scored = []
+    for index, (sentence, words) in enumerate(zip(sentences, tokens)):
+        if not words:
+            continue
+        score = sum(weight(word) for word in set(words)) / math.sqrt(len(words))
+        if index == 0:
+            score *= 1.3
+        if any(filler in sentence for filler in _FILLER):
+            score *= 0.3
+        scored.append((score, index))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    
+    chosen: List[int] = []
+    chosen_words: List[set] = []
+    length = 0
+    for _, index in scored:
+        words = set(tokens[index])
+        if any(len(words & other) >= 0.7 * len(words) for other in chosen_words):
+            continue
+        extra = len(sentences[index]) + (1 if chosen else 0)
+        if length + extra > max_chars:
+            continue
+        chosen.append(index)
+        chosen_words.append(words)
+        length += extra
+    
+    if not chosen:
+        return sentences[0][:max_chars - 1] + "…"
+    return " ".join(sentences[index] for index in sorted(chosen))
+
+
+def group_dependencies(groups: Sequence[Sequence[int]]) -> Dict[int, List[int]]:
+    """
+    템플릿 섹션 묶음(상위 섹션별 서브섹션 순서 목록)으로 축소 문맥 의존 관계 구성 (CONTEXT_PARALLEL=1일 때만 사용)
+    
+    - 첫 묶음(도입부): 묶음 안에서 앞 섹션에 차례로 의존
+    - 중간 묶음(본문): 도입부에만 의존하므로 서로 기다리지 않고 동시에 생성
+    - 마지막 묶음(마무리): 앞의 모든 섹션에 의존 (문서 요약으로 압축)
+    
+    Args:
+        groups: [[order, ...], ...] 문서 순서대로의 묶음
+    
+    Returns:
+        {order: [문맥으로 쓸 섹션 order, ...]}
+    """
+    groups = [list(group) for group in groups if group]
+    if not groups:
+        return {}
+    dependencies: Dict[int, List[int]] = {}
+    opening = groups[0]
+    for i, order in enumerate(opening):
+        dependencies[order] = opening[:i]
+    if len(groups) == 1:
+        return dependencies
+    for group in groups[1:-1]:
+        for order in group:
+            dependencies[order] = list(opening)
+    before_closing = [order for group in groups[:-1] for order in group]
+    for order in groups[-1]:
+        dependencies[order] = list(before_closing)
+    return dependencies
+
+
+def section_dependencies(structure: DocumentStructure, section: Section) -> List[int]:
+    """섹션의 문맥 의존 섹션 order 목록 (구조에 의존 관계가 없으면 앞의 모든 섹션, 순서대로 생성)"""
+    if section.order in structure.dependencies:
+        return structure.dependencies[section.order]
+    return [s.order for s in structure.sections if s.order < section.order]
+
+
+class ContextMemory:
+    """
+    문서 하나의 문맥 메모리 (완료된 섹션별 요약 + 문서 요약)
+    
+    record()는 섹션이 끝날 때마다 호출하고, 프롬프트는 context_lines()로 만든다.
+    기록되지 않은 섹션(체크포인트 재개, 일괄 배치 경로)은 현재 내용으로 그때 요약한다.
+    """
+    
+    def __init__(self, section_chars: int = None, document_chars: int = None):
+        """
+        초기화
+        
+        Args:
+            section_chars: 섹션 요약 최대 길이 (기본: CONTEXT_SECTION_CHARS)
+            document_chars: 문서 요약 최대 길이 (기본: CONTEXT_DOCUMENT_CHARS)
+        """
+        self.section_chars = section_chars or CONTEXT_SECTION_CHARS
+        self.document_chars = document_chars or CONTEXT_DOCUMENT_CHARS
+        self.summaries: Dict[int, str] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, section: Section) -> str:
+        """섹션 완료 시 요약 저장"""
+        summary = summarize(section.content, self.section_chars)
+        with self._lock:
+            self.summaries[section.order] = summary
+        return summary
+    
+    def summary(self, section: Section) -> str:
+        """섹션 요약 (기록이 없으면 현재 내용으로 계산)"""
+        with self._lock:
+            summary = self.summaries.get(section.order)
+        return summary if summary is not None else summarize(section.content, self.section_chars)
+    
+    def document_summary(self, sections: Sequence[Section]) -> str:
+        """여러 섹션 요약을 하나로 압축한 문서 요약 (문서 순서 기준)"""
+        joined = " ".join(self.summary(section) for section in sorted(sections, key=lambda s: s.order))
+        return summarize(joined, self.document_chars)
+    
+    def context_lines(self, section: Section, structure: DocumentStructure) -> List[str]:
+        """
+        섹션 프롬프트에 넣을 문맥 줄
+        
+        의존 섹션 중 최근 RECENT_SECTIONS개는 섹션별 요약, 나머지는 문서 요약 한 줄로 넣는다.
+        
+        Args:
+            section: 작성할 섹션
+            structure: 문서 구조
+        
+        Returns:
+            프롬프트 줄 목록 (문맥이 없으면 빈 목록)
+        """
+        by_order = {s.order: s for s in structure.sections}
+        dependencies = [
+            by_order[order] for order in section_dependencies(structure, section)
+            if order in by_order and by_order[order].content
+        ]
+        if not dependencies:
+            return []
+        
+        lines = []
+        earlier, recent = dependencies[:-RECENT_SECTIONS], dependencies[-RECENT_SECTIONS:]
+        if earlier:
+            lines.append(f"앞선 내용 요약: {self.document_summary(earlier)}")
+        lines.append("이전 섹션 요약:")
+        for dependency in recent:
+            lines.append(f"- {dependency.title}: {self.summary(dependency)}")
+        return lines
+
+
+@contextmanager
+def memory_scope(memory: Optional[ContextMemory]):
+    """이 블록 안의 프롬프트 구성이 current_memory()로 memory를 보게 함"""
+    reset = _CURRENT.set(memory)
+    try:
+        yield memory
+    finally:
+        _CURRENT.reset(reset)
+
+
+def current_memory() -> Optional[ContextMemory]:
+    """현재 문서의 문맥 메모리 (없으면 None)"""
+    return _CURRENT.get()
+
+
+def section_executor() -> ThreadPoolExecutor:
+    """의존 관계가 풀린 섹션 동시 생성용 공유 실행기 (조각 실행기와 분리해 중첩 대기로 막히지 않게 함)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=max(CONTEXT_WORKERS, 1) * 4, thread_name_prefix="section")
+    return _executor
+
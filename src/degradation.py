@@ -0,0 +1,207 @@
+"""
+Degradation 모듈
+요청별 지연 SLO를 지키기 위해 점점 저렴한 생성 방식으로 내려가는 단계적 품질 저하(degradation ladder)
+
+단계 (아래로 갈수록 빠르고 문서가 조금씩 단순해짐):
+- full: 기본 생성
+- no_context: 섹션 프롬프트에서 이전 섹션 요약 제외 (프롬프트 토큰 감소)
+- short: 섹션 목표 분량과 max_tokens 축소
+- merged: 서브섹션을 상위 섹션으로 합쳐 섹션 호출 수 감소
+- offline: 오프라인 템플릿 엔진으로 생성 (LLM 호출 없음)
+
+요청 시작 시 예상 시간이 SLO 안에 드는 가장 높은 단계를 고르고, 생성 중에도 남은 섹션이
+남은 시간 안에 끝나지 않을 것 같으면 더 낮은 단계로 내려간다 (merged는 구조가 정해진 뒤에는 건너뜀).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import replace
+from typing import Any, Dict, List, Optional
+
+
+FULL, NO_CONTEXT, SHORT, MERGED, OFFLINE = range(5)
+MODES = ("full", "no_context", "short", "merged", "offline")
+
+# 요청당 지연 목표 (초)
+DEGRADATION_SLO_SECONDS = float(os.getenv("DEGRADATION_SLO_SECONDS", "30"))
+# short 단계 이상에서 섹션 목표 분량/max_tokens에 곱하는 비율
+DEGRADATION_SHORT_RATIO = float(os.getenv("DEGRADATION_SHORT_RATIO", "0.6"))
+# 시작 단계를 고를 때 SLO 중 예상 시간에 쓸 수 있는 비율 (나머지는 변동 여유)
+DEGRADATION_HEADROOM = float(os.getenv("DEGRADATION_HEADROOM", "0.8"))
+
+# 부하 배수가 새 관측 없이 1.0 쪽으로 절반 돌아가는 시간 (초, 오프라인으로만 처리하는 동안 다시 상위 호출을 시도하기 위함)
+DEGRADATION_LOAD_HALF_LIFE = float(os.getenv("DEGRADATION_LOAD_HALF_LIFE", "10"))
+
+# 측정 전 full 대비 섹션당 상대 비용 추정 (merged 섹션은 서브섹션 약 2개 분량)
+_MODE_COST = (1.0, 0.9, DEGRADATION_SHORT_RATIO, DEGRADATION_SHORT_RATIO * 2, 0.0)
+
+_CURRENT: contextvars.ContextVar = contextvars.ContextVar("degradation", default=None)
+
+
+class DegradationState:
+    """요청 하나의 품질 저하 상태 (현재 단계, 마감 시각)"""
+    
+    def __init__(self, controller: "DegradationController", mode: int, slo_seconds: float):
+        self.controller = controller
+        self.mode = mode
+        self.initial_mode = mode
+        self.started = time.monotonic()
+        self.deadline = self.started + slo_seconds
+    
+    @property
+    def mode_name(self) -> str:
+        return MODES[self.mode]
+    
+    @property
+    def skip_context(self) -> bool:
+        return self.mode >= NO_CONTEXT
+    
+    @property
+    def offline(self) -> bool:
+        return self.mode >= OFFLINE
+    
+    def shape(self, section):
+        """short 단계 이상이면 목표 분량을 줄인 섹션 사본 (아니면 그대로)"""
+        if self.mode < SHORT:
+            return section
+        return replace(section, target_length_chars=max(int(section.target_length_chars * DEGRADATION_SHORT_RATIO), 1))
+    
+    def before_section(self, remaining_sections: int):
+        """
+        섹션 시작 전 남은 시간 점검: 남은 섹션이 마감 안에 끝나지 않을 것 같으면 한 단계 낮춤
+        (한 번에 한 단계씩만 내려가서 일시적인 지연 튐에 offline까지 떨어지지 않게 함)
+        
+        Args:
+            remaining_sections: 이 섹션을 포함해 남은 섹션 수
+        """
+        budget = self.deadline - time.monotonic()
+        if self.mode < OFFLINE and remaining_sections * self.controller.estimate(self.mode) > budget:
+            # 구조는 이미 정해졌으므로 merged는 건너뜀
+            self.mode = OFFLINE if self.mode + 1 == MERGED else self.mode + 1
+    
+    def record_section(self, mode: int, seconds: float):
+        """섹션 하나의 소요 시간 기록"""
+        self.controller.observe(mode, seconds)
+
+
+class DegradationController:
+    """
+    SLO 기반 품질 저하 제어기
+    
+    - 단계별 기준 섹션 시간: 관측한 최소값 (없으면 full 기준 * 단계별 상대 비용)
+    - 부하 배수: 관측 섹션 시간 / 그 단계의 기준 시간의 EMA (LLM을 쓰는 모든 단계 관측이 함께 갱신)
+      새 관측이 없으면 DEGRADATION_LOAD_HALF_LIFE마다 절반씩 1.0으로 돌아가 부하가 풀렸는지 다시 시도함
+    - 단계별 예상 섹션 시간 = 기준 * 부하 배수 (offline은 부하와 무관)
+    """
+    
+    def __init__(self, slo_seconds: Optional[float] = None, headroom: Optional[float] = None,
+                 smoothing: float = 0.2):
+        """
+        초기화
+        
+        Args:
+            slo_seconds: 요청당 지연 목표 (기본: DEGRADATION_SLO_SECONDS)
+            headroom: 시작 단계 선택 시 SLO 중 쓸 수 있는 비율 (기본: DEGRADATION_HEADROOM)
+            smoothing: 부하 배수 EMA 반영 비율
+        """
+        self.slo_seconds = slo_seconds or DEGRADATION_SLO_SECONDS
+        self.headroom = headroom or DEGRADATION_HEADROOM
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self._base: List[Optional[float]] = [None] * len(MODES)
+        self._load = 1.0
+        self._observed = time.monotonic()
+        self._counts = {name: 0 for name in MODES}
+        self._stats = {"requests": 0, "slo_misses": 0, "escalations": 0}
+    
+    def estimate(self, mode: int) -> float:
+        """단계별 예상 섹션 시간 (초, 관측 전이면 0)"""
+        with self._lock:
+            base = self._base[mode]
+            if base is None:
+                full = next((b / _MODE_COST[m] for m, b in enumerate(self._base) if b and _MODE_COST[m]), None)
+                base = full * _MODE_COST[mode] if full else 0.0
+            return base if mode == OFFLINE else base * self._current_load()
+    
+    def _current_load(self) -> float:
+        """시간 감쇠를 반영한 부하 배수 (잠금 안에서 호출)"""
+        idle = time.monotonic() - self._observed
+        return 1.0 + (self._load - 1.0) * 0.5 ** (idle / DEGRADATION_LOAD_HALF_LIFE)
+    
+    def observe(self, mode: int, seconds: float):
+        """섹션 소요 시간 반영"""
+        with self._lock:
+            base = self._base[mode]
+            self._base[mode] = seconds if base is None else min(base, seconds)
+            if mode != OFFLINE and self._base[mode] > 0:
+                load = self._current_load()
+                self._load = load + self.smoothing * (seconds / self._base[mode] - load)
+                self._observed = time.monotonic()
+    
+    def start(self, sections: int, merged_sections: Optional[int] = None) -> DegradationState:
+        """
+        요청 시작: 예상 시간이 SLO 안에 드는 가장 높은 단계 선택
+        
+        Args:
+            sections: 기본 구조의 섹션 수
+            merged_sections: 서브섹션을 합친 구조의 섹션 수 (없으면 sections)
+        
+        Returns:
+            DegradationState
+        """
+        budget = self.slo_seconds * self.headroom
+        mode = FULL
+        while mode < OFFLINE:
+            count = merged_sections if mode == MERGED and merged_sections else sections
+            if count * self.estimate(mode) <= budget:
+                break
+            mode += 1
+        return DegradationState(self, mode, self.slo_seconds)
+    
+    def finish(self, state: DegradationState):
+        """요청 종료: 사용한 단계와 SLO 달성 여부 집계"""
+        elapsed = time.monotonic() - state.started
+        with self._lock:
+            self._stats["requests"] += 1
+            self._counts[state.mode_name] += 1
+            if state.mode != state.initial_mode:
+                self._stats["escalations"] += 1
+            if elapsed > self.slo_seconds:
+                self._stats["slo_misses"] += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """품질 저하 통계 (단계별 요청 수, SLO 초과 수, 부하 배수, 단계별 예상 섹션 시간)"""
+        estimates = {name: round(self.estimate(mode), 4) for mode, name in enumerate(MODES)}
+        with self._lock:
+            return {
+                **self._stats,
+                "slo_seconds": self.slo_seconds,
+                "modes": dict(self._counts),
+                "load": round(self._current_load(), 3),
+                "section_seconds": estimates,
+            }
+
+
+# API 핸들러(api/index.py)가 공유하는 전역 제어기
+DEGRADATION = DegradationController()
+
+
+@contextmanager
+def degrade_scope(state: Optional[DegradationState]):
+    """이 블록 안의 생성 단계들이 current_degradation()으로 state를 보게 함"""
+    reset = _CURRENT.set(state)
+    try:
+        yield state
+    finally:
+        _CURRENT.reset(reset)
+
+
+def current_degradation() -> Optional[DegradationState]:
+    """현재 요청의 품질 저하 상태 (없으면 None)"""
+    return _CURRENT.get()
+
@@ -0,0 +1,329 @@
+"""
+Document Store 모듈
+생성된 문서를 추가 전용(append-only) 세그먼트 파일에 길이 접두 레코드로 저장하고
+mmap으로 임의 접근하는 저장소 (문서마다 작은 파일을 만드는 대신 사용)
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import mmap
+import struct
+import threading
+import zlib
+from typing import Dict, Iterator, Optional, Tuple
+
+from src.models import GeneratedDocument, UserInput
+
+
+# 레코드 헤더: 본문 길이(uint32) + 플래그(uint8) + 본문 CRC32(uint32)
+_RECORD_HEADER = struct.Struct("<IBI")
+# 인덱스 항목: 키 다이제스트(16바이트) + 세그먼트 번호(uint32) + 오프셋(uint64)
+_INDEX_ENTRY = struct.Struct("<16sIQ")
+
+FLAG_COMPRESSED = 0x01
+
+
+def _digest(key: str) -> bytes:
+    """16바이트 인덱스 키 (16진수 해시 키의 앞부분)"""
+    try:
+        raw = bytes.fromhex(key)
+    except ValueError:
+        raw = key.encode("utf-8")
+    return raw[:16].ljust(16, b"\0")
+
+
+def _scan_records(mapped) -> Iterator[Tuple[int, int, int, int]]:
+    """
+    세그먼트의 온전한 레코드를 앞에서부터 순회 (길이나 CRC가 맞지 않는 첫 레코드에서 멈춤)
+    
+    Yields:
+        (레코드 오프셋, 플래그, 본문 시작, 본문 길이)
+    """
+    offset = 0
+    while offset + _RECORD_HEADER.size <= len(mapped):
+        length, flags, crc = _RECORD_HEADER.unpack_from(mapped, offset)
+        start = offset + _RECORD_HEADER.size
+        if start + length > len(mapped):
+            return  # 기록 중 중단된 마지막 레코드
+        view = memoryview(mapped)[start:start + length]
+        try:
+            if zlib.crc32(view) != crc:
+                return  # 일부만 디스크에 남은 레코드
+        finally:
+            view.release()
+        yield offset, flags, start, length
+        offset = start + length
+
+
+def _decode(view, flags: int) -> Dict:
+    """레코드 본문 → {"key", "document"}"""
+    payload = zlib.decompress(view) if flags & FLAG_COMPRESSED else bytes(view)
+    return json.loads(payload)
+
+
+class DocumentStore:
+    """
+    추가 전용 세그먼트 문서 저장소
+    
+    - 세그먼트: segment-00000.dat ... (최대 크기 초과 시 새 세그먼트)
+    - 인덱스: index.dat (키 → 세그먼트/오프셋, 고정 길이 항목, 나중 항목 우선)
+    - 읽기: 세그먼트별 mmap으로 레코드 위치에 바로 접근
+    - 복구: 열 때 마지막 세그먼트의 레코드 길이/CRC를 확인해 추가 중 중단된 꼬리를 잘라냄
+    """
+    
+    def __init__(self, directory: str, compress: bool = True,
+                 max_segment_bytes: int = 256 * 1024 * 1024):
+        """
+        초기화
+        
+        Args:
+            directory: 저장소 디렉터리
+            compress: 레코드 zlib 압축 여부
+            max_segment_bytes: 세그먼트 최대 크기 (바이트)
+        """
+        self.directory = directory
+        self.compress = compress
+        self.max_segment_bytes = max_segment_bytes
+        os.makedirs(directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._index: Dict[bytes, Tuple[int, int]] = {}
+        self._maps: Dict[int, Tuple[int, mmap.mmap]] = {}
+        self._load_index()
+        
+        self._segment_id = self._last_segment_id()
+        self._recover(self._segment_id)
+        self._segment_file = open(self._segment_path(self._segment_id), "ab")
+        self._index_file = open(os.path.join(directory, "index.dat"), "ab")
+    
+    def _segment_path(self, segment_id: int) -> str:
+        return os.path.join(self.directory, f"segment-{segment_id:05d}.dat")
+    
+    def _last_segment_id(self) -> int:
+        """가장 최근 세그먼트 번호"""
+        ids = [
+            int(name[8:13]) for name in os.listdir(self.directory)
+            if name.startswith("segment-") and name.endswith(".dat")
+        ]
+        return max(ids) if ids else 0
+    
+    def _load_index(self):
+        """인덱스 파일 적재 (마지막 불완전 항목은 잘라내서 이후 항목의 정렬을 유지)"""
+        path = os.path.join(self.directory, "index.dat")
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            data = f.read()
+        usable = len(data) - len(data) % _INDEX_ENTRY.size
+        if usable < len(data):
+            with open(path, "r+b") as f:
+                f.truncate(usable)
+        for digest, segment_id, offset in _INDEX_ENTRY.iter_unpack(data[:usable]):
+            self._index[digest] = (segment_id, offset)
+    
+    def _recover(self, segment_id: int):
+        """
+        추가 중 중단된 세그먼트 꼬리 잘라내기
+        
+        마지막으로 온전한 레코드 뒤를 잘라야 새 레코드가 깨진 바이트 뒤에 붙지 않는다.
+        잘린 구간을 가리키는 인덱스 항목은 버리고 인덱스 파일을 다시 쓴다.
+        
+        Args:
+            segment_id: 추가 대상 세그먼트 번호
+        """
+        path = self._segment_path(segment_id)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size == 0:
+            return
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            good = 0
+            for _, _, start, length in _scan_records(mapped):
+                good = start + length
+        if good == size:
+            return
+        
+        print(f"경고: {path}의 깨진 꼬리 {size - good}바이트를 잘라냅니다 (오프셋 {good})")
+        with open(path, "r+b") as f:
+            f.truncate(good)
+            os.fsync(f.fileno())
+        stale = [digest for digest, (sid, offset) in self._index.items() if sid == segment_id and offset >= good]
+        if stale:
+            for digest in stale:
+                del self._index[digest]
+            index_path = os.path.join(self.directory, "index.dat")
+            with open(index_path + ".tmp", "wb") as f:
+                for digest, (sid, offset) in self._index.items():
+                    f.write(_INDEX_ENTRY.pack(digest, sid, offset))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(index_path + ".tmp", index_path)
+    
+    def put(self, key: str, document: GeneratedDocument) -> str:
+        """
+        문서 추가
+        
+        Args:
+            key: 문서 키 (정규화된 입력 해시 등)
+            document: 생성된 문서
+        
+        Returns:
+            저장한 키
+        """
+        payload = json.dumps(
+            {"key": key, "document": document.to_dict()}, ensure_ascii=False
+        ).encode("utf-8")
+        flags = 0
+        if self.compress:
+            payload = zlib.compress(payload, 6)
+            flags |= FLAG_COMPRESSED
+        record = _RECORD_HEADER.pack(len(payload), flags, zlib.crc32(payload)) + payload
+        
+        with self._lock:
+            if self._segment_file.tell() + len(record) > self.max_segment_bytes \
+                    and self._segment_file.tell() > 0:
+                self._roll_segment()
+            offset = self._segment_file.tell()
+            self._segment_file.write(record)
+            self._segment_file.flush()
+            
+            digest = _digest(key)
+            self._index_file.write(_INDEX_ENTRY.pack(digest, self._segment_id, offset))
+            self._index_file.flush()
+            self._index[digest] = (self._segment_id, offset)
+        return key
+    
+    def put_for_input(self, user_input: UserInput, document: GeneratedDocument) -> str:
+        """정규화된 입력 해시를 키로 문서 추가"""
+        return self.put(user_input.cache_key(), document)
+    
+    def _roll_segment(self):
+        """새 세그먼트로 전환"""
+        self._segment_file.close()
+        self._segment_id += 1
+        self._segment_file = open(self._segment_path(self._segment_id), "ab")
+    
+    def _map(self, segment_id: int, min_size: int) -> mmap.mmap:
+        """세그먼트 mmap (파일이 커졌으면 다시 매핑)"""
+        cached = self._maps.get(segment_id)
+        if cached is not None and cached[0] >= min_size:
+            return cached[1]
+        if cached is not None:
+            cached[1].close()
+        with open(self._segment_path(segment_id), "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps[segment_id] = (size, mapped)
+        return mapped
+    
+    def _read_record(self, segment_id: int, offset: int) -> Dict:
+        """레코드 하나 읽기"""
+        with self._lock:
+            mapped = self._map(segment_id, offset + _RECORD_HEADER.size)
+            length, flags, crc = _RECORD_HEADER.unpack_from(mapped, offset)
+            start = offset + _RECORD_HEADER.size
+            if len(mapped) < start + length:
+                mapped = self._map(segment_id, start + length)
+            view = memoryview(mapped)[start:start + length]
+            try:
+                if zlib.crc32(view) != crc:
+                    raise ValueError(f"손상된 레코드입니다: 세그먼트 {segment_id}, 오프셋 {offset}")
+                return _decode(view, flags)
+            finally:
+                view.release()
+    
+    def get(self, key: str) -> Optional[GeneratedDocument]:
+        """
+        키로 문서 조회
+        
+        Args:
+            key: 문서 키
+        
+        Returns:
+            GeneratedDocument (없으면 None)
+        """
+        location = self._index.get(_digest(key))
+        if location is None:
+            return None
+        return GeneratedDocument.from_dict(self._read_record(*location)["document"])
+    
+    def get_for_input(self, user_input: UserInput) -> Optional[GeneratedDocument]:
+        """정규화된 입력 해시로 문서 조회"""
+        return self.get(user_input.cache_key())
+    
+    def __contains__(self, key: str) -> bool:
+        return _digest(key) in self._index
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def iter_records(self, latest_only: bool = True) -> Iterator[Tuple[str, Dict]]:
+        """
+        세그먼트 순서대로 레코드를 순차 스트리밍
+        
+        Args:
+            latest_only: 같은 키가 여러 번 저장된 경우 최신 레코드만 반환
+        
+        Yields:
+            (키, 문서 딕셔너리)
+        """
+        with self._lock:
+            self._segment_file.flush()
+            segment_ids = sorted(
+                int(name[8:13]) for name in os.listdir(self.directory)
+                if name.startswith("segment-") and name.endswith(".dat")
+            )
+        
+        for segment_id in segment_ids:
+            path = self._segment_path(segment_id)
+            if os.path.getsize(path) == 0:
+                continue
+            with open(path, "rb") as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for offset, flags, start, length in _scan_records(mapped):
+                    view = memoryview(mapped)[start:start + length]
+                    try:
+                        record = _decode(view, flags)
+                    finally:
+                        view.release()
+                    if not latest_only or self._index.get(_digest(record["key"])) == (segment_id, offset):
+                        yield record["key"], record["document"]
+    
+    def iter_documents(self) -> Iterator[GeneratedDocument]:
+        """최신 문서를 GeneratedDocument로 스트리밍"""
+        for _, data in self.iter_records():
+            yield GeneratedDocument.from_dict(data)
+    
+    def export_jsonl(self, output_path: str) -> int:
+        """
+        전체 문서를 JSONL로 내보내기
+        
+        Args:
+            output_path: 출력 파일 경로
+        
+        Returns:
+            내보낸 문서 수
+        """
+        count = 0
+        with open(output_path, "w", encoding="utf-8") as f:
+            for key, data in self.iter_records():
+                f.write(json.dumps({"key": key, "document": data}, ensure_ascii=False))
+                f.write("\n")
+                count += 1
+        return count
+    
+    def close(self):
+        """파일 및 매핑 정리"""
+        with self._lock:
+            self._segment_file.close()
+            self._index_file.close()
+            for _, mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
@@ -6,11 +6,16 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from typing import Dict
+
 from src.models import GeneratedDocument
+from src.render import BACKENDS, build_render_tree, get_backend, render_many
 
 
 class Formatter:
-    """문서 포맷터"""
+    """문서 포맷터 (렌더 트리 + 형식별 백엔드)"""
+    
+    FORMATS = tuple(BACKENDS)
     
     def format(self, document: GeneratedDocument) -> str:
         """
@@ -22,84 +27,36 @@ class Formatter:
         Returns:
             포맷팅된 문자열
         """
-        parts = []
-        
-        # [1] 전체 문서 개요
-        parts.append("=" * 80)
-        parts.append("[1] 전체 문서 개요")
-        parts.append("=" * 80)
-        parts.append("")
-        parts.append(document.overview)
-        parts.append("")
-        parts.append("전체 구조:")
-        for item in document.structure_summary:
-            parts.append(f"  {item}")
-        parts.append("")
-        parts.append("")
-        
-        # [2] 자동 생성된 문서 본문
-        parts.append("=" * 80)
-        parts.append("[2] 자동 생성된 문서 본문")
-        parts.append("=" * 80)
-        parts.append("")
-        parts.append(document.content)
-        parts.append("")
-        
-        # [3] 제출용 체크포인트
-        parts.append("=" * 80)
-        parts.append("[3] 제출용 체크포인트")
-        parts.append("=" * 80)
-        parts.append("")
-        for checkpoint in document.checkpoints:
-            parts.append(checkpoint)
-        parts.append("")
-        
-        return "\n".join(parts)
+        return BACKENDS["text"].render_to_string(build_render_tree(document))
     
     def format_markdown(self, document: GeneratedDocument) -> str:
         """마크다운 형식으로 포맷팅"""
-        parts = []
-        
-        # 제목
-        parts.append("# 문서/레포트 자동 생성 결과\n")
-        
-        # 개요
-        parts.append("## 📋 전체 문서 개요\n")
-        parts.append(document.overview)
-        parts.append("\n")
-        
-        # 구조
-        parts.append("### 문서 구조\n")
-        for item in document.structure_summary:
-            parts.append(f"- {item}")
-        parts.append("\n")
-        
-        # 본문
-        parts.append("## 📄 자동 생성된 문서 본문\n")
-        parts.append(document.content)
-        parts.append("\n")
-        
-        # 체크포인트
-        parts.append("## ✅ 제출용 체크포인트\n")
-        for checkpoint in document.checkpoints:
-            parts.append(f"- {checkpoint}")
-        parts.append("\n")
-        
-        return "\n".join(parts)
+        return BACKENDS["markdown"].render_to_string(build_render_tree(document))
+    
+    def format_html(self, document: GeneratedDocument) -> str:
+        """HTML 형식으로 포맷팅"""
+        return BACKENDS["html"].render_to_string(build_render_tree(document))
     
     def save_to_file(self, document: GeneratedDocument, filepath: str, format_type: str = "text"):
         """
-        파일로 저장
+        파일로 저장 (백엔드가 파일에 바로 스트리밍)
         
         Args:
             document: 생성된 문서
             filepath: 저장 경로
-            format_type: "text" 또는 "markdown"
+            format_type: "text", "markdown", "html" 또는 "docx"
+        """
+        get_backend(format_type).render_to_file(build_render_tree(document), filepath)
+    
+    def save_many(self, document: GeneratedDocument, outputs: Dict[str, str]) -> Dict[str, str]:
         """
-        if format_type == "markdown":
-            content = self.format_markdown(document)
-        else:
-            content = self.format(document)
+        여러 형식을 하나의 렌더 트리에서 병렬로 저장
         
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(content)
+        Args:
+            document: 생성된 문서
+            outputs: {형식: 저장 경로}
+        
+        Returns:
+            {형식: 저장 경로}
+        """
+        return render_many(document, outputs)
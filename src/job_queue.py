@@ -0,0 +1,699 @@
+"""
+Job Queue 모듈
+대용량 문서 생성을 위한 SQLite 기반 영속 작업 큐와 워커 풀
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+import multiprocessing
+import traceback
+from typing import Dict, Any, Optional, List
+
+from src.llm_provider import SERVICE_LLM_PROVIDER
+from src.scheduler import LANE_INTERACTIVE, LANES, Scheduler
+
+
+# 작업 큐 SQLite 파일 경로 (필수, API 인스턴스와 워커가 함께 쓰는 쓰기 가능한 경로)
+# 기본 상대 경로를 두지 않음: 서버리스 환경에서는 읽기 전용이거나 인스턴스마다 달라 등록과 조회가 다른 DB로 감
+DEFAULT_DB_PATH = os.getenv("JOB_QUEUE_PATH") or None
+
+
+def queue_configured() -> bool:
+    """공유 작업 큐 경로(JOB_QUEUE_PATH)가 설정되었는지 여부 (없으면 /api/jobs와 202 이관을 제공하지 않음)"""
+    return bool(DEFAULT_DB_PATH)
+
+
+def _require_db_path(db_path: Optional[str]) -> str:
+    """지정한 경로 또는 JOB_QUEUE_PATH (둘 다 없으면 ValueError)"""
+    db_path = db_path or DEFAULT_DB_PATH
+    if not db_path:
+        raise ValueError("작업 큐 경로가 없습니다. JOB_QUEUE_PATH 환경 변수 또는 db_path를 지정하세요.")
+    return db_path
+
+# 작업 상태
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+# 개요/목차만 제공한 상태 (섹션이 요청되면 queued로 전환, 워커는 가져가지 않음)
+STATUS_OUTLINE = "outline"
+
+
+class LeaseLost(Exception):
+    """lease가 만료되어 다른 워커가 작업을 가져감 (이 워커는 작업을 더 기록하지 않고 중단)"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    input TEXT NOT NULL,
+    sections TEXT,
+    total_sections INTEGER NOT NULL DEFAULT 0,
+    done_sections INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lane TEXT NOT NULL DEFAULT 'interactive',
+    cost REAL NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS job_sections (
+    job_id TEXT NOT NULL,
+    section_order INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    seq INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (job_id, section_order)
+);
+CREATE TABLE IF NOT EXISTS lanes (
+    lane TEXT PRIMARY KEY,
+    vtime REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+class JobQueue:
+    """
+    SQLite 기반 영속 작업 큐
+    
+    작업은 lease(임대) 방식으로 워커에 할당된다. 워커가 죽어 lease가 만료되면
+    다른 워커가 작업을 다시 가져가며, 이미 저장된 섹션 체크포인트부터 재개한다.
+    다음 작업은 등록 순서가 아니라 Scheduler 정책(레인 공정 분배 + 예상 비용 최단 우선 + 노화)으로 고른다.
+    """
+    
+    def __init__(self, db_path: str = None, lease_seconds: float = 60.0, max_attempts: int = 3,
+                 scheduler: Scheduler = None):
+        """
+        초기화
+        
+        Args:
+            db_path: SQLite 파일 경로 (기본: JOB_QUEUE_PATH, 둘 다 없으면 ValueError)
+            lease_seconds: 워커 작업 임대 시간 (heartbeat 없이 이 시간이 지나면 재할당)
+            max_attempts: 작업당 최대 시도 횟수
+            scheduler: 다음 작업 선택 정책 (기본: 환경 변수 설정의 Scheduler)
+        """
+        self.db_path = _require_db_path(db_path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.scheduler = scheduler or Scheduler()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "sections" not in columns:
+                # 섹션 선택 기능 이전에 만들어진 DB
+                conn.execute("ALTER TABLE jobs ADD COLUMN sections TEXT")
+            if "lane" not in columns:
+                # 스케줄러 이전에 만들어진 DB (기존 작업은 비용 0으로 먼저 처리)
+                conn.execute("ALTER TABLE jobs ADD COLUMN lane TEXT NOT NULL DEFAULT 'interactive'")
+                conn.execute("ALTER TABLE jobs ADD COLUMN cost REAL NOT NULL DEFAULT 0")
+            section_columns = {row["name"] for row in conn.execute("PRAGMA table_info(job_sections)")}
+            if "seq" not in section_columns:
+                # 완료 순번 이전에 만들어진 DB (기존 섹션은 순서를 순번으로 사용)
+                conn.execute("ALTER TABLE job_sections ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+                conn.execute("UPDATE job_sections SET seq = section_order")
+    
+    def _connect(self) -> sqlite3.Connection:
+        """DB 연결 (autocommit, WAL 모드)"""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def enqueue(self, user_input_dict: Dict[str, Any], sections: Optional[List[int]] = None,
+                lane: str = LANE_INTERACTIVE, cost: float = 0.0) -> str:
+        """
+        작업 등록
+        
+        Args:
+            user_input_dict: 사용자 입력 딕셔너리
+            sections: 생성할 섹션 순서 목록 (None이면 전체, 빈 목록이면 개요만 두고 대기)
+            lane: 스케줄러 레인 ("interactive" 또는 "batch")
+            cost: 예상 비용 (scheduler.estimate_cost)
+        
+        Returns:
+            작업 ID
+        """
+        if lane not in LANES:
+            raise ValueError(f"알 수 없는 레인입니다: {lane}")
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        status = STATUS_OUTLINE if sections is not None and not sections else STATUS_QUEUED
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, input, sections, lane, cost, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, status, json.dumps(user_input_dict, ensure_ascii=False),
+                 self._encode_sections(sections), lane, cost, now, now)
+            )
+        return job_id
+    
+    @staticmethod
+    def _encode_sections(sections: Optional[List[int]]) -> Optional[str]:
+        return None if sections is None else json.dumps(sorted(set(int(o) for o in sections)))
+    
+    def request_sections(self, job_id: str, sections: Optional[List[int]]) -> bool:
+        """
+        섹션 추가 요청 (이미 끝난 작업이면 다시 대기열에 넣고 체크포인트부터 이어서 생성)
+        
+        Args:
+            job_id: 작업 ID
+            sections: 추가할 섹션 순서 목록 (None이면 전체)
+        
+        Returns:
+            작업 존재 여부
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT status, sections FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return False
+            
+            if sections is None or row["sections"] is None:
+                merged = None
+            else:
+                merged = set(json.loads(row["sections"])) | set(int(o) for o in sections)
+            if row["status"] in (STATUS_OUTLINE, STATUS_DONE) and merged != set():
+                # 새 요청으로 보고 시도 횟수와 이전 결과를 초기화
+                conn.execute(
+                    "UPDATE jobs SET sections = ?, status = ?, result = NULL, attempts = 0, updated_at = ? "
+                    "WHERE id = ?",
+                    (self._encode_sections(merged), STATUS_QUEUED, time.time(), job_id)
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET sections = ?, updated_at = ? WHERE id = ?",
+                    (self._encode_sections(merged), time.time(), job_id)
+                )
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+    
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        대기 중이거나 lease가 만료된 작업 중 스케줄러가 고른 작업 하나를 가져옴
+        
+        Args:
+            worker_id: 워커 식별자
+        
+        Returns:
+            작업 정보 딕셔너리 (없으면 None)
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            candidates = [
+                dict(row) for row in conn.execute(
+                    "SELECT id, lane, cost, created_at FROM jobs "
+                    "WHERE status = ? OR (status = ? AND lease_expires < ?)",
+                    (STATUS_QUEUED, STATUS_RUNNING, now)
+                )
+            ]
+            running = {
+                row["lane"]: row["count"] for row in conn.execute(
+                    "SELECT lane, COUNT(*) AS count FROM jobs "
+                    "WHERE status = ? AND lease_expires >= ? GROUP BY lane",
+                    (STATUS_RUNNING, now)
+                )
+            }
+            vtimes = {row["lane"]: row["vtime"] for row in conn.execute("SELECT lane, vtime FROM lanes")}
+            picked = self.scheduler.pick(candidates, vtimes, running, now)
+            if picked is None:
+                conn.execute("COMMIT")
+                return None
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (picked["id"],)).fetchone()
+            
+            attempts = row["attempts"] + 1
+            if attempts > self.max_attempts:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                    (STATUS_FAILED, "최대 시도 횟수 초과", now, row["id"])
+                )
+                conn.execute("COMMIT")
+                return self.claim(worker_id)
+            
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, attempts = ?, lease_expires = ?, updated_at = ? "
+                "WHERE id = ?",
+                (STATUS_RUNNING, worker_id, attempts, now + self.lease_seconds, now, row["id"])
+            )
+            vtime = self.scheduler.charge(vtimes, row["lane"], row["cost"], {job["lane"] for job in candidates})
+            conn.execute(
+                "INSERT INTO lanes (lane, vtime) VALUES (?, ?) "
+                "ON CONFLICT(lane) DO UPDATE SET vtime = excluded.vtime",
+                (row["lane"], vtime)
+            )
+            conn.execute("COMMIT")
+            return {
+                "id": row["id"],
+                "input": json.loads(row["input"]),
+                "sections": json.loads(row["sections"]) if row["sections"] else None,
+                "attempts": attempts,
+                "lane": row["lane"],
+            }
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+    
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """
+        작업 lease 연장
+        
+        Returns:
+            연장 여부 (False면 다른 워커가 작업을 가져감)
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = ?",
+                (now + self.lease_seconds, now, job_id, worker_id, STATUS_RUNNING)
+            )
+            return cursor.rowcount > 0
+    
+    def owns(self, job_id: str, worker_id: str) -> bool:
+        """worker_id가 실행 중인 작업의 lease를 가지고 있는지 여부"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM jobs WHERE id = ? AND worker = ? AND status = ?",
+                (job_id, worker_id, STATUS_RUNNING)
+            ).fetchone()
+        return row is not None
+    
+    def set_total_sections(self, job_id: str, worker_id: str, total: int) -> bool:
+        """
+        전체 섹션 수 기록
+        
+        Returns:
+            기록 여부 (False면 다른 워커가 작업을 가져감)
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET total_sections = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = ?",
+                (total, time.time(), job_id, worker_id, STATUS_RUNNING)
+            )
+            return cursor.rowcount > 0
+    
+    def save_section(self, job_id: str, worker_id: str, order: int, title: str, content: str) -> bool:
+        """
+        완료된 섹션 체크포인트 저장 및 진행률 갱신
+        
+        저장할 때마다 작업별 완료 순번(seq)이 하나씩 커지므로, 순서와 관계없이 나중에 끝난 섹션
+        (나중에 추가 요청된 앞 순서 섹션, 수리로 바뀐 섹션 포함)도 since 커서로 받을 수 있다.
+        
+        Args:
+            job_id: 작업 ID
+            worker_id: lease를 가진 워커 식별자
+            order: 섹션 순서
+            title: 섹션 제목
+            content: 섹션 내용
+        
+        Returns:
+            저장 여부 (False면 lease가 만료되어 다른 워커가 작업을 가져감)
+        """
+        with self._connect() as conn:
+            # 소유권 확인과 저장을 한 트랜잭션에서 처리
+            cursor = conn.execute(
+                "UPDATE jobs SET updated_at = ? WHERE id = ? AND worker = ? AND status = ?",
+                (time.time(), job_id, worker_id, STATUS_RUNNING)
+            )
+            if cursor.rowcount == 0:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO job_sections (job_id, section_order, title, content, seq) "
+                "VALUES (?, ?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM job_sections WHERE job_id = ?))",
+                (job_id, order, title, content, job_id)
+            )
+            conn.execute(
+                "UPDATE jobs SET done_sections = "
+                "(SELECT COUNT(*) FROM job_sections WHERE job_id = ?), updated_at = ? WHERE id = ?",
+                (job_id, time.time(), job_id)
+            )
+            return True
+    
+    def get_sections(self, job_id: str, since: int = 0) -> List[Dict[str, Any]]:
+        """
+        저장된 섹션 목록
+        
+        Args:
+            job_id: 작업 ID
+            since: 이 완료 순번(seq) 이후에 저장된 섹션만 반환
+        
+        Returns:
+            [{"order", "title", "content", "seq"}, ...] (섹션 순서대로)
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT section_order, title, content, seq FROM job_sections "
+                "WHERE job_id = ? AND seq > ? ORDER BY section_order",
+                (job_id, since)
+            ).fetchall()
+        return [
+            {"order": row["section_order"], "title": row["title"], "content": row["content"], "seq": row["seq"]}
+            for row in rows
+        ]
+    
+    def complete(self, job_id: str, worker_id: str, result: str) -> bool:
+        """
+        작업 완료 처리
+        
+        Returns:
+            완료 처리 여부 (False면 다른 워커가 작업을 가져감)
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (STATUS_DONE, result, time.time(), job_id, worker_id, STATUS_RUNNING)
+            )
+            return cursor.rowcount > 0
+    
+    def complete_if_unchanged(self, job_id: str, worker_id: str, result: str,
+                              sections: Optional[List[int]]) -> bool:
+        """
+        요청 섹션 목록이 실행 시작 시점과 같을 때만 완료 처리
+        
+        Args:
+            job_id: 작업 ID
+            worker_id: lease를 가진 워커 식별자
+            result: 포맷팅된 문서
+            sections: 워커가 생성한 섹션 순서 목록 (None이면 전체)
+        
+        Returns:
+            완료 처리 여부 (False면 실행 중 섹션이 추가되었거나 다른 워커가 작업을 가져감, owns()로 구분)
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = ? AND sections IS ?",
+                (STATUS_DONE, result, time.time(), job_id, worker_id, STATUS_RUNNING,
+                 self._encode_sections(sections))
+            )
+            return cursor.rowcount > 0
+    
+    def get_requested_sections(self, job_id: str) -> Optional[List[int]]:
+        """요청된 섹션 순서 목록 (None이면 전체)"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT sections FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row["sections"]) if row and row["sections"] else None
+    
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        """
+        작업 실패 처리
+        시도 횟수가 남아 있으면 다시 대기 상태로 돌린다.
+        
+        Returns:
+            처리 여부 (False면 다른 워커가 작업을 가져가 지금 실행 중이므로 건드리지 않음)
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            status = STATUS_QUEUED if row and row["attempts"] < self.max_attempts else STATUS_FAILED
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (status, error, time.time(), job_id, worker_id, STATUS_RUNNING)
+            )
+            return cursor.rowcount > 0
+    
+    def get(self, job_id: str, since: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        작업 상태 조회
+        
+        Args:
+            job_id: 작업 ID
+            since: 이 완료 순번 이후의 섹션만 포함 (이전 응답의 cursor)
+        
+        Returns:
+            상태/진행률/섹션/다음 조회용 cursor/결과 딕셔너리 (없으면 None)
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        
+        sections = self.get_sections(job_id, since)
+        return {
+            "job_id": row["id"],
+            "status": row["status"],
+            "requested_sections": json.loads(row["sections"]) if row["sections"] else None,
+            "lane": row["lane"],
+            "progress": {
+                "done_sections": row["done_sections"],
+                "total_sections": row["total_sections"],
+            },
+            "sections": sections,
+            "cursor": max([since] + [section["seq"] for section in sections]),
+            "result": row["result"],
+            "error": row["error"],
+        }
+    
+    def wait_for_update(self, job_id: str, since: int = 0, timeout: float = 10.0,
+                        poll_interval: float = 0.2) -> Optional[Dict[str, Any]]:
+        """
+        새 섹션이 생기거나 작업이 끝날 때까지 대기 (long-poll 구독용)
+        
+        Args:
+            job_id: 작업 ID
+            since: 클라이언트가 이미 받은 마지막 완료 순번 (이전 응답의 cursor)
+            timeout: 최대 대기 시간 (초)
+            poll_interval: 확인 간격 (초)
+        
+        Returns:
+            get()과 동일한 상태 딕셔너리
+        """
+        deadline = time.time() + timeout
+        while True:
+            job = self.get(job_id, since)
+            if job is None or job["sections"] or job["status"] in (STATUS_DONE, STATUS_FAILED, STATUS_OUTLINE):
+                return job
+            if time.time() >= deadline:
+                return job
+            time.sleep(poll_interval)
+
+
+class LeaseKeeper:
+    """
+    작업 실행 중 lease를 주기적으로 연장하는 타이머 스레드
+    
+    섹션 완료와 무관하게 lease_seconds / 3마다 연장하므로, 섹션 하나(또는 개요 계산)가
+    lease보다 오래 걸려도 다른 워커가 같은 작업을 다시 가져가지 않는다.
+    """
+    
+    def __init__(self, queue: JobQueue, job_id: str, worker_id: str, interval: float = None):
+        """
+        초기화
+        
+        Args:
+            queue: 작업 큐
+            job_id: 작업 ID
+            worker_id: 워커 식별자
+            interval: 연장 간격 (초, 기본: lease_seconds / 3)
+        """
+        self.queue = queue
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.interval = interval or max(queue.lease_seconds / 3, 0.05)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def __enter__(self) -> "LeaseKeeper":
+        self._thread = threading.Thread(target=self._run, name=f"lease-{self.job_id[:8]}", daemon=True)
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if not self.queue.heartbeat(self.job_id, self.worker_id):
+                    # 이미 lease를 잃었으면 더 연장하지 않음
+                    return
+            except sqlite3.Error as e:
+                # 일시적인 DB 잠금 등은 다음 주기에 다시 시도
+                print(f"[{self.worker_id}] lease 연장 실패: {e}")
+
+
+def run_job(queue: JobQueue, job: Dict[str, Any], worker_id: str, formatter=None):
+    """
+    작업 하나 실행 (체크포인트 기반 재개 지원)
+    
+    Args:
+        queue: 작업 큐
+        job: claim()이 반환한 작업 정보
+        worker_id: 워커 식별자
+        formatter: DocumentAutoFormatter (없으면 SERVICE_LLM_PROVIDER로 생성)
+    """
+    with LeaseKeeper(queue, job["id"], worker_id):
+        _run_job(queue, job, worker_id, formatter)
+
+
+def _run_job(queue: JobQueue, job: Dict[str, Any], worker_id: str, formatter=None):
+    """
+    run_job() 본체 (LeaseKeeper가 lease를 유지하는 동안 실행)
+    
+    모든 기록은 lease를 가진 경우에만 반영되며, 기록이 거부되면 LeaseLost로 중단한다.
+    """
+    from src.main import DocumentAutoFormatter
+    from src.concurrency import ADAPTIVE_CONCURRENCY
+    
+    formatter = formatter or DocumentAutoFormatter(llm_provider_type=SERVICE_LLM_PROVIDER,
+                                                   adaptive_concurrency=bool(ADAPTIVE_CONCURRENCY))
+    job_id = job["id"]
+    
+    user_input = formatter.input_parser.parse(job["input"])
+    metadata, structure = formatter.plan(user_input)
+    # 섹션을 선택한 작업은 요청한 섹션만 생성 (나머지는 건너뜀)
+    only_orders = job.get("sections")
+    _set_total(queue, job_id, worker_id, structure, only_orders)
+    
+    def on_section(section):
+        if not queue.save_section(job_id, worker_id, section.order, section.title, section.content):
+            raise LeaseLost(job_id)
+    
+    while True:
+        completed = {s["order"]: s["content"] for s in queue.get_sections(job_id)}
+        document = formatter.build_document(
+            user_input,
+            on_section=on_section,
+            completed_sections=completed,
+            plan=(metadata, structure),
+            only_orders=only_orders
+        )
+        # 실행 중에 섹션이 추가 요청되었으면 그 섹션까지 이어서 생성
+        if queue.complete_if_unchanged(job_id, worker_id, formatter.formatter.format(document), only_orders):
+            return
+        if not queue.owns(job_id, worker_id):
+            raise LeaseLost(job_id)
+        only_orders = queue.get_requested_sections(job_id)
+        _set_total(queue, job_id, worker_id, structure, only_orders)
+
+
+def _set_total(queue: JobQueue, job_id: str, worker_id: str, structure, only_orders: Optional[List[int]]):
+    """생성 대상 섹션 수 기록 (섹션을 선택했으면 선택한 것만, lease를 잃었으면 LeaseLost)"""
+    if only_orders is None:
+        total = len(structure.sections)
+    else:
+        selected = set(only_orders)
+        total = sum(1 for s in structure.sections if s.order in selected)
+    if not queue.set_total_sections(job_id, worker_id, total):
+        raise LeaseLost(job_id)
+
+
+def worker_loop(db_path: str, worker_id: str, llm_provider_type: str = SERVICE_LLM_PROVIDER,
+                poll_interval: float = 0.5, stop_event=None, batch_slots: Optional[int] = None):
+    """
+    워커 프로세스 메인 루프
+    
+    Args:
+        db_path: 작업 큐 DB 경로
+        worker_id: 워커 식별자
+        llm_provider_type: LLM 제공자 타입
+        poll_interval: 대기 작업이 없을 때 확인 간격 (초)
+        stop_event: 종료 신호 (multiprocessing.Event)
+        batch_slots: batch 레인 동시 실행 한도 (None이면 SCHEDULER_BATCH_SLOTS)
+    """
+    from src.main import DocumentAutoFormatter
+    
+    queue = JobQueue(db_path, scheduler=Scheduler(batch_slots=batch_slots))
+    formatter = DocumentAutoFormatter(llm_provider_type=llm_provider_type)
+    
+    while stop_event is None or not stop_event.is_set():
+        job = queue.claim(worker_id)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        try:
+            run_job(queue, job, worker_id, formatter)
+        except LeaseLost:
+            # 새 소유 워커가 이어서 실행하므로 실패로 기록하지 않음
+            print(f"[{worker_id}] 작업 {job['id']}의 lease를 잃어 중단합니다.")
+        except Exception as e:
+            print(f"[{worker_id}] 작업 {job['id']} 실패: {traceback.format_exc()}")
+            queue.fail(job["id"], worker_id, f"{type(e).__name__}: {str(e)}")
+
+
+class WorkerPool:
+    """작업 큐를 처리하는 워커 프로세스 풀"""
+    
+    def __init__(self, db_path: str = None, num_workers: int = 2, llm_provider_type: str = SERVICE_LLM_PROVIDER):
+        """
+        초기화
+        
+        Args:
+            db_path: 작업 큐 DB 경로 (기본: JOB_QUEUE_PATH, 둘 다 없으면 ValueError)
+            num_workers: 워커 프로세스 수
+            llm_provider_type: LLM 제공자 타입 (기본: API와 같은 SERVICE_LLM_PROVIDER)
+        """
+        self.db_path = _require_db_path(db_path)
+        self.num_workers = num_workers
+        self.llm_provider_type = llm_provider_type
+        # 워커 하나는 interactive 작업 몫으로 남김 (SCHEDULER_BATCH_SLOTS가 있으면 그 값)
+        self.batch_slots = None if os.getenv("SCHEDULER_BATCH_SLOTS") else max(1, num_workers - 1)
+        self._stop_event = multiprocessing.Event()
+        self._processes: List[multiprocessing.Process] = []
+    
+    def start(self):
+        """워커 프로세스 시작"""
+        # 스키마를 미리 만들어 워커 간 경합을 피함
+        JobQueue(self.db_path)
+        for i in range(self.num_workers):
+            process = multiprocessing.Process(
+                target=worker_loop,
+                args=(self.db_path, f"worker-{os.getpid()}-{i}", self.llm_provider_type),
+                kwargs={"stop_event": self._stop_event, "batch_slots": self.batch_slots},
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+    
+    def stop(self, timeout: float = 30.0):
+        """진행 중인 작업을 마친 뒤 워커 종료"""
+        self._stop_event.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+
+def main():
+    """워커 풀 실행: python src/job_queue.py [워커 수] [DB 경로]"""
+    num_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    db_path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_DB_PATH
+    if not db_path:
+        print("사용법: python src/job_queue.py [워커 수] <DB 경로> (또는 JOB_QUEUE_PATH 환경 변수)")
+        sys.exit(2)
+    
+    pool = WorkerPool(db_path, num_workers)
+    pool.start()
+    print(f"워커 {num_workers}개 실행 중 (DB: {db_path}). 종료하려면 Ctrl+C")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
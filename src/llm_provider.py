@@ -6,13 +6,46 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import hashlib
+import json
+import http.client
+import socket
+import threading
+from types import SimpleNamespace
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Tuple, Union
+from urllib.parse import urlparse
+
+from src.cancellation import OperationCancelled, current_token
+
+
+# 서비스 진입점(동기 API, 작업 큐 개요/워커, 과부하 이관 작업)이 함께 쓰는 제공자 종류
+# 어느 경로로 들어온 요청이든 같은 입력이면 같은 문서가 나오도록 한 곳에서 정함 (기본: 요금 없는 오프라인 템플릿 엔진)
+SERVICE_LLM_PROVIDER = os.getenv("SERVICE_LLM_PROVIDER", "template")
+
+# provider_type → 제공자 클래스 이름 (생성기를 만들기 전에 결과 캐시 키를 정할 때 사용)
+PROVIDER_CLASS_NAMES = {
+    "mock": "MockLLMProvider",
+    "template": "TemplateLLMProvider",
+    "openai": "OpenAIProvider",
+    "http": "HTTPChatProvider",
+    "loadtest": "LoadTestLLMProvider",
+    "replay": "ReplayProvider",
+}
 
 
 class LLMProvider(ABC):
     """LLM 제공자 추상 클래스"""
     
+    # generate_stream()이 실제로 조각 단위 스트리밍을 하는지 여부
+    supports_streaming = False
+    # generate_section(section, metadata, user_input)으로 프롬프트 없이 섹션을 생성하는지 여부
+    supports_sections = False
+    # 호출 하나로 생성할 섹션 최대 글자 수 (넘는 섹션은 하위 조각으로 나누어 병렬 생성, None이면 나누지 않음)
+    max_section_chars = None
+    # generate_batch()가 여러 호출을 상위에 한 번에 보내는지 여부 (기본 구현은 순차 호출)
+    supports_batching = False
+    
     @abstractmethod
     def generate(self, prompt: str, **kwargs) -> str:
         """
@@ -26,6 +59,39 @@ class LLMProvider(ABC):
             생성된 텍스트
         """
         pass
+    
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """
+        스트리밍 텍스트 생성 (기본: generate() 결과를 한 조각으로 반환)
+        
+        Args:
+            prompt: 프롬프트
+            **kwargs: 추가 파라미터 (temperature, max_tokens 등)
+        
+        Yields:
+            생성된 텍스트 조각
+        """
+        yield self.generate(prompt, **kwargs)
+    
+    def generate_batch(self, calls: Sequence[Tuple[str, Dict[str, Any]]]) -> List[Union[str, Exception]]:
+        """
+        여러 호출을 한 번에 생성 (기본 구현은 순차 호출)
+        
+        Args:
+            calls: [(프롬프트, 추가 파라미터)] 목록
+        
+        Returns:
+            호출 순서대로의 결과 (실패한 항목은 예외 객체, 취소는 전체 중단)
+        """
+        results: List[Union[str, Exception]] = []
+        for prompt, kwargs in calls:
+            try:
+                results.append(self.generate(prompt, **kwargs))
+            except OperationCancelled:
+                raise
+            except Exception as e:
+                results.append(e)
+        return results
 
 
 class MockLLMProvider(LLMProvider):
@@ -43,19 +109,19 @@ class MockLLMProvider(LLMProvider):
             return """본 문서는 [주제]에 대해 체계적으로 분석하고 논의하기 위해 작성되었다. 
 현대 사회에서 [주제]는 중요한 의미를 갖고 있으며, 이에 대한 깊이 있는 이해가 필요하다. 
 이 글에서는 [주제]의 배경, 주요 내용, 그리고 향후 전망을 다룬다."""
-        
+
         elif "본론" in prompt or "분석" in prompt:
             return """[주제]에 대한 분석을 시작하자면, 먼저 핵심 개념을 명확히 정의할 필요가 있다. 
 [주제]는 다음과 같은 특징을 가진다: 첫째, [특징1]. 둘째, [특징2]. 셋째, [특징3]. 
 이러한 특징들은 서로 밀접하게 연관되어 있으며, 종합적으로 이해해야 한다. 
 또한, [주제]와 관련된 다양한 관점들이 존재한다. 한 관점에서는 [관점1]을 강조하는 반면, 
 다른 관점에서는 [관점2]를 중시한다. 이러한 다양한 접근 방식은 [주제]의 복잡성을 보여준다."""
-        
+
         elif "결론" in prompt:
             return """이상의 논의를 통해 [주제]에 대한 종합적인 이해를 도모할 수 있었다. 
 주요 내용을 요약하면 다음과 같다: [요약1], [요약2], [요약3]. 
 앞으로 [주제]는 더욱 발전할 것으로 예상되며, 지속적인 관심과 연구가 필요하다."""
-        
+
         else:
             return f"[주제]에 대한 내용: {prompt[:100]}... (실제 LLM 연동 시 더 상세한 내용이 생성됩니다.)"
 
@@ -63,6 +129,9 @@ class MockLLMProvider(LLMProvider):
 class OpenAIProvider(LLMProvider):
     """OpenAI API 제공자"""
     
+    # max_tokens 1500 안팎에서 출력이 끊기지 않고 호출 지연도 짧게 유지되는 분량
+    max_section_chars = 3000
+    
     def __init__(self, api_key: str = None, model: str = "gpt-4"):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.model = model
@@ -90,12 +159,234 @@ class OpenAIProvider(LLMProvider):
             raise Exception(f"OpenAI API 호출 실패: {str(e)}")
 
 
+class HTTPChatProvider(LLMProvider):
+    """
+    OpenAI chat completions 형식 HTTP 제공자 (openai 패키지 없이 동작)
+    로컬 스탠드인 서버(src/loadtest_provider.py)나 호환 게이트웨이에 연결한다.
+    """
+    
+    SYSTEM_PROMPT = "당신은 전문적인 문서 작성 보조 AI입니다. 논리적이고 체계적인 문서를 작성합니다."
+    supports_streaming = True
+    supports_batching = True
+    
+    def __init__(self, base_url: str = None, model: str = "gpt-4", api_key: str = None,
+                 timeout: float = 60.0, max_section_chars: Optional[int] = None):
+        """
+        초기화
+        
+        Args:
+            base_url: 서버 주소 (예: http://127.0.0.1:8100/v1, 기본: 환경 변수 LLM_BASE_URL)
+            model: 모델 이름
+            api_key: Bearer 토큰 (선택)
+            timeout: 요청 타임아웃 (초)
+            max_section_chars: 호출당 섹션 최대 글자 수 (기본: 환경 변수 LLM_MAX_SECTION_CHARS 또는 3000, 0이면 분할 안 함)
+        """
+        self.base_url = (base_url or os.getenv("LLM_BASE_URL", "http://127.0.0.1:8100/v1")).rstrip("/")
+        self.model = model
+        self.api_key = api_key
+        self.timeout = timeout
+        if max_section_chars is None:
+            max_section_chars = int(os.getenv("LLM_MAX_SECTION_CHARS", "3000"))
+        self.max_section_chars = max_section_chars or None
+        parsed = urlparse(self.base_url)
+        self._host = parsed.hostname
+        self._port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        self._https = parsed.scheme == "https"
+        self._path = parsed.path + "/chat/completions"
+        # 스레드별 keep-alive 연결
+        self._local = threading.local()
+    
+    def _state(self):
+        """스레드별 연결 상태 (취소 콜백이 다른 스레드에서 현재 연결을 찾을 수 있도록 객체로 보관)"""
+        state = getattr(self._local, "state", None)
+        if state is None:
+            state = self._local.state = SimpleNamespace(conn=None)
+        return state
+    
+    def _connection(self) -> http.client.HTTPConnection:
+        state = self._state()
+        if state.conn is None:
+            cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+            state.conn = cls(self._host, self._port, timeout=self.timeout)
+        return state.conn
+    
+    def _reset_connection(self):
+        state = self._state()
+        if state.conn is not None:
+            state.conn.close()
+        state.conn = None
+    
+    def _watch(self, token):
+        """
+        취소 시 이 스레드의 연결 소켓을 끊어 진행 중인 호출(응답 대기/본문 수신)을 즉시 중단
+        
+        Returns:
+            등록 해제 함수
+        """
+        state = self._state()
+        
+        def abort():
+            conn = state.conn
+            sock = conn.sock if conn is not None else None
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        
+        return token.on_cancel(abort)
+    
+    def _cancelled(self, token, error: BaseException):
+        """취소로 끊긴 호출이면 연결을 버리고 OperationCancelled로 바꿔 발생"""
+        if token is not None and token.cancelled:
+            self._reset_connection()
+            raise OperationCancelled(token.reason or "cancelled") from error
+    
+    def _payload(self, prompt: str, stream: bool, kwargs: dict) -> Dict[str, Any]:
+        """chat completions 요청 본문"""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            "temperature": kwargs.get("temperature", 0.7),
+            "max_tokens": kwargs.get("max_tokens", 2000),
+            "stream": stream,
+        }
+    
+    def _post(self, prompt: str, stream: bool, kwargs: dict, token=None) -> http.client.HTTPResponse:
+        """chat completions 요청 전송"""
+        return self._send(self._path, self._payload(prompt, stream, kwargs), token)
+    
+    def _send(self, path: str, payload: Dict[str, Any], token=None) -> http.client.HTTPResponse:
+        """JSON 요청 전송 (응답 전에 끊긴 재사용 keep-alive 연결만 한 번 다시 연결)"""
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        
+        conn = self._connection()
+        reused = conn.sock is not None
+        try:
+            conn.request("POST", path, body=body, headers=headers)
+            response = conn.getresponse()
+        except (http.client.RemoteDisconnected, BrokenPipeError) as e:
+            self._cancelled(token, e)
+            self._reset_connection()
+            if not reused:
+                raise
+            # 응답 전에 서버가 닫은 재사용 keep-alive 연결만 한 번 다시 연결 (타임아웃은 중복 과금 위험이 있어 재시도 안 함)
+            conn = self._connection()
+            conn.request("POST", path, body=body, headers=headers)
+            response = conn.getresponse()
+        except (OSError, http.client.HTTPException) as e:
+            self._cancelled(token, e)
+            self._reset_connection()
+            raise
+        
+        if response.status >= 400:
+            detail = response.read().decode("utf-8", "replace")
+            raise Exception(f"LLM HTTP 호출 실패 ({response.status}): {detail[:200]}")
+        return response
+    
+    def _call_json(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """JSON 응답 호출 (현재 취소 토큰이 취소되면 연결을 끊고 중단)"""
+        token = current_token()
+        if token is None:
+            return json.loads(self._send(path, payload).read())
+        
+        token.check()
+        unwatch = self._watch(token)
+        try:
+            return json.loads(self._send(path, payload, token).read())
+        except Exception as e:
+            self._cancelled(token, e)
+            raise
+        finally:
+            unwatch()
+    
+    def generate(self, prompt: str, **kwargs) -> str:
+        """HTTP chat completions 호출 (현재 취소 토큰이 취소되면 연결을 끊고 중단)"""
+        data = self._call_json(self._path, self._payload(prompt, False, kwargs))
+        return data["choices"][0]["message"]["content"]
+    
+    def generate_batch(self, calls: Sequence[Tuple[str, Dict[str, Any]]]) -> List[Union[str, Exception]]:
+        """
+        배치 엔드포인트(POST .../chat/completions/batch) 한 번으로 여러 호출 생성
+        
+        요청: {"requests": [chat completions 본문, ...]}
+        응답: {"results": [chat completion 또는 {"error": {...}}, ...]} (요청 순서)
+        """
+        payload = {"requests": [self._payload(prompt, False, kwargs) for prompt, kwargs in calls]}
+        data = self._call_json(self._path + "/batch", payload)
+        results: List[Union[str, Exception]] = []
+        for item in data["results"]:
+            if "error" in item:
+                results.append(Exception(f"LLM 배치 항목 실패: {item['error'].get('message', '')[:200]}"))
+            else:
+                results.append(item["choices"][0]["message"]["content"])
+        return results
+    
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """SSE 스트리밍 호출 (data: {...} 줄 단위, 현재 취소 토큰이 취소되면 연결을 끊고 중단)"""
+        token = current_token()
+        if token is not None:
+            token.check()
+        unwatch = self._watch(token) if token is not None else None
+        try:
+            response = self._post(prompt, True, kwargs, token)
+        except Exception as e:
+            if unwatch is not None:
+                unwatch()
+            self._cancelled(token, e)
+            raise
+        try:
+            for raw in response:
+                line = raw.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                payload = line[5:].strip()
+                if payload == "[DONE]":
+                    response.read()  # 남은 본문을 비워 keep-alive 연결 재사용
+                    break
+                delta = json.loads(payload)["choices"][0].get("delta", {})
+                if delta.get("content"):
+                    yield delta["content"]
+            else:
+                # [DONE] 없이 끝난 스트림: 취소로 끊긴 경우 구분
+                self._cancelled(token, ConnectionAbortedError("stream closed"))
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            self._cancelled(token, e)
+            raise
+        finally:
+            if unwatch is not None:
+                unwatch()
+            # 중간에 멈춘 스트림은 연결을 재사용할 수 없음
+            if not response.isclosed():
+                response.close()
+                self._reset_connection()
+
+
+def backend_key(provider: LLMProvider) -> tuple:
+    """
+    상위 백엔드 키 (제공자 종류, 주소, 모델, 인증 지문)
+    
+    API 키가 다르면 과금/한도 주체가 다르므로 다른 백엔드로 본다.
+    키 원문 대신 해시 앞부분을 넣어 지표 이름 등에 노출되지 않게 한다.
+    """
+    api_key = getattr(provider, "api_key", None)
+    fingerprint = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:8] if api_key else None
+    return (type(provider).__name__, getattr(provider, "base_url", None), getattr(provider, "model", None), fingerprint)
+
+
 def get_llm_provider(provider_type: str = "mock", **kwargs) -> LLMProvider:
     """
     LLM 제공자 팩토리 함수
     
     Args:
-        provider_type: "mock" 또는 "openai"
+        provider_type: "mock", "openai", "loadtest"(부하 테스트용 지연 모델), "http"(OpenAI 호환 HTTP)
+            "replay"(기록 재생, log_path 필요) 또는 "template"(오프라인 템플릿 엔진)
         **kwargs: 제공자별 설정
     
     Returns:
@@ -122,6 +413,19 @@ def get_llm_provider(provider_type: str = "mock", **kwargs) -> LLMProvider:
             print("경고: OpenAI API 키가 없습니다. Mock Provider를 사용합니다.")
             return MockLLMProvider()
         return OpenAIProvider(**kwargs)
+    elif provider_type == "loadtest":
+        from src.loadtest_provider import LoadTestLLMProvider
+        return LoadTestLLMProvider(**kwargs)
+    elif provider_type == "http":
+        # 로컬 스탠드인 또는 OpenAI 호환 게이트웨이 (기본 주소는 localhost)
+        return HTTPChatProvider(**kwargs)
+    elif provider_type == "replay":
+        from src.replay import ReplayProvider
+        return ReplayProvider(**kwargs)
+    elif provider_type == "template":
+        # LLM 없이 섹션 템플릿 코퍼스로 생성 (요금 없음)
+        from src.template_engine import TemplateLLMProvider
+        return TemplateLLMProvider(**kwargs)
     else:
         # 알 수 없는 타입은 mock으로 폴백
         print(f"경고: 알 수 없는 provider_type '{provider_type}'. Mock Provider를 사용합니다.")
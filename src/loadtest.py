@@ -0,0 +1,151 @@
+"""
+부하 테스트 스크립트
+실행 중인 서버(src/server.py)에 keep-alive 연결로 동시 요청을 보내고 RPS와 지연시간 백분위를 보고
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import http.client
+import json
+import threading
+import time
+from collections import Counter
+from typing import List, Dict, Any
+from urllib.parse import urlparse
+
+from src.stats import percentile
+
+
+DEFAULT_INPUT = {
+    "document_type": "과제 레포트",
+    "target_audience": "대학교",
+    "topic": "인공지능의 미래와 사회적 영향",
+    "length": "A4 3장",
+    "writing_style": "학술적",
+    "required_keywords": ["AI", "머신러닝"],
+}
+
+
+def run_load_test(url: str, total_requests: int = 200, concurrency: int = 16,
+                  payload: Dict[str, Any] = None, vary_topic: bool = False,
+                  timeout: float = 60.0, honor_retry_after: bool = False) -> Dict[str, Any]:
+    """
+    부하 테스트 실행
+    
+    Args:
+        url: 대상 URL (예: http://127.0.0.1:8000/api)
+        total_requests: 전체 요청 수
+        concurrency: 동시 연결 수 (연결마다 keep-alive 재사용)
+        payload: 요청 입력 (기본: DEFAULT_INPUT)
+        vary_topic: 요청마다 주제를 바꿔 캐시/병합 효과를 배제할지 여부
+        timeout: 요청 타임아웃 (초)
+        honor_retry_after: 503 + Retry-After 응답이면 그만큼 기다렸다가 같은 요청을 다시 보낼지 여부
+                           (지연은 첫 시도부터 최종 응답까지)
+    
+    Returns:
+        결과 요약 딕셔너리 (rps, 지연시간 백분위, 상태 코드 분포 등)
+    """
+    parsed = urlparse(url)
+    path = parsed.path or "/"
+    payload = payload or DEFAULT_INPUT
+    
+    latencies: List[float] = []
+    ok_latencies: List[float] = []
+    statuses: Counter = Counter()
+    retries = [0]
+    lock = threading.Lock()
+    counter = iter(range(total_requests))
+    
+    def worker():
+        conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=timeout)
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            
+            request_input = dict(payload)
+            if vary_topic:
+                request_input["topic"] = f"{payload.get('topic', '')} {i}"
+            body = json.dumps({"input": request_input}, ensure_ascii=False).encode("utf-8")
+            
+            start = time.perf_counter()
+            while True:
+                retry_after = None
+                try:
+                    conn.request("POST", path, body=body, headers={
+                        "Content-Type": "application/json",
+                        "Connection": "keep-alive",
+                    })
+                    response = conn.getresponse()
+                    response.read()
+                    status = response.status
+                    retry_after = response.getheader("retry-after")
+                    if response.getheader("connection", "").lower() == "close":
+                        conn.close()
+                except (OSError, http.client.HTTPException):
+                    status = "error"
+                    conn.close()
+                    conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=timeout)
+                if not (honor_retry_after and status == 503 and retry_after):
+                    break
+                with lock:
+                    retries[0] += 1
+                time.sleep(float(retry_after))
+            elapsed = time.perf_counter() - start
+            
+            with lock:
+                latencies.append(elapsed)
+                if status in (200, 202, 304):
+                    ok_latencies.append(elapsed)
+                statuses[status] += 1
+        conn.close()
+    
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - started
+    
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "duration_s": round(duration, 3),
+        "rps": round(len(latencies) / duration, 2) if duration > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p90": round(percentile(latencies, 90) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "max": round(max(latencies) * 1000, 2) if latencies else 0.0,
+        },
+        # 성공 응답만의 지연 (빠른 거절 응답이 섞이면 전체 백분위가 좋아 보임)
+        "ok_latency_ms": {
+            "p50": round(percentile(ok_latencies, 50) * 1000, 2),
+            "p99": round(percentile(ok_latencies, 99) * 1000, 2),
+        },
+        "status_codes": {str(k): v for k, v in statuses.items()},
+        "retries": retries[0],
+    }
+
+
+def main():
+    """명령행 실행"""
+    parser = argparse.ArgumentParser(description="문서 생성 API 부하 테스트")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/api")
+    parser.add_argument("-n", "--requests", type=int, default=200)
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("--vary-topic", action="store_true", help="요청마다 다른 주제 사용")
+    parser.add_argument("--honor-retry-after", action="store_true", help="503 + Retry-After면 기다렸다가 재시도")
+    args = parser.parse_args()
+    
+    result = run_load_test(args.url, args.requests, args.concurrency, vary_topic=args.vary_topic,
+                           honor_retry_after=args.honor_retry_after)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,732 @@
+"""
+Load Test Provider 모듈
+운영 환경의 LLM 지연/오류/출력 길이를 재현하는 결정적(시드 고정) 부하 테스트용 제공자와
+OpenAI chat completions 형식(과 Files/Batches API)을 말하는 로컬 HTTP 스탠드인 서버
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import select
+import socket
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from src.cancellation import sleep as cancellable_sleep
+from src.llm_provider import LLMProvider
+
+
+class InjectedLLMError(Exception):
+    """부하 테스트용으로 주입된 LLM 오류"""
+    
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class LatencyModel:
+    """
+    첫 토큰까지의 지연 분포
+    
+    - fixed: 항상 latency_ms
+    - lognormal: 중앙값 latency_ms, 로그 표준편차 sigma
+    - trace: 기록된 운영 지연(ms) 목록을 순서대로 반복 재생
+    """
+    
+    KINDS = ("fixed", "lognormal", "trace")
+    
+    def __init__(self, kind: str = "fixed", latency_ms: float = 200.0, sigma: float = 0.5,
+                 trace: Optional[Union[str, Sequence[float]]] = None):
+        """
+        초기화
+        
+        Args:
+            kind: "fixed", "lognormal", "trace"
+            latency_ms: 고정 지연 또는 lognormal 중앙값 (ms)
+            sigma: lognormal 로그 표준편차
+            trace: 지연 목록 또는 파일 경로 (한 줄에 ms 값 하나, 또는 JSON 배열)
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"지원하지 않는 지연 분포입니다: {kind}")
+        self.kind = kind
+        self.latency_ms = latency_ms
+        self.sigma = sigma
+        self.trace = self._load_trace(trace) if kind == "trace" else []
+        if kind == "trace" and not self.trace:
+            raise ValueError("trace 분포에는 지연 기록이 필요합니다.")
+    
+    @staticmethod
+    def _load_trace(trace) -> List[float]:
+        if trace is None:
+            return []
+        if isinstance(trace, str):
+            with open(trace, "r", encoding="utf-8") as f:
+                text = f.read().strip()
+            if text.startswith("["):
+                return [float(v) for v in json.loads(text)]
+            return [float(line) for line in text.splitlines() if line.strip()]
+        return [float(v) for v in trace]
+    
+    def sample(self, rng: random.Random, call_index: int) -> float:
+        """지연 표본 (ms)"""
+        if self.kind == "fixed":
+            return self.latency_ms
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(self.latency_ms), self.sigma)
+        return self.trace[call_index % len(self.trace)]
+
+
+# 출력 본문을 만드는 문장 틀 (결정적으로 골라 이어 붙임)
+_SENTENCES = [
+    "{topic}은(는) 여러 측면에서 살펴볼 필요가 있다.",
+    "먼저 {topic}의 핵심 개념을 정리하면 다음과 같다.",
+    "이러한 특징은 서로 밀접하게 연관되어 있으며 종합적으로 이해해야 한다.",
+    "최근 연구에 따르면 {topic}의 영향은 점점 커지고 있다.",
+    "다양한 관점에서 접근하면 {topic}의 복잡성을 더 잘 이해할 수 있다.",
+    "구체적인 사례를 통해 이 내용을 확인할 수 있다.",
+    "따라서 {topic}에 대한 지속적인 관심과 논의가 필요하다.",
+    "이 과정에서 고려해야 할 한계와 과제도 함께 검토해야 한다.",
+]
+
+
+class LoadTestLLMProvider(LLMProvider):
+    """
+    부하 테스트용 LLM 제공자
+    
+    같은 시드와 같은 호출 순서에서는 지연, 오류, 출력이 항상 같다.
+    출력 길이는 max_tokens에 비례하고, 스트리밍은 tokens_per_second 속도로 토큰을 내보낸다.
+    """
+    
+    supports_streaming = True
+    supports_batching = True
+    
+    def __init__(self, seed: int = 0, latency: str = "fixed", latency_ms: float = 200.0,
+                 sigma: float = 0.5, trace: Optional[Union[str, Sequence[float]]] = None,
+                 tokens_per_second: float = 50.0, chars_per_token: float = 1.5,
+                 error_rate: float = 0.0, error_status: int = 500,
+                 output_ratio: float = 0.8, sleep: bool = True,
+                 max_section_chars: Optional[int] = None, batch_slowdown: float = 0.03,
+                 capacity: Optional[int] = None, overload_factor: float = 3.0,
+                 keyword_rate: float = 0.0):
+        """
+        초기화
+        
+        Args:
+            seed: 난수 시드
+            latency: 지연 분포 ("fixed", "lognormal", "trace")
+            latency_ms: 첫 토큰까지의 지연 (ms)
+            sigma: lognormal 로그 표준편차
+            trace: trace 분포의 지연 기록 (목록 또는 파일 경로)
+            tokens_per_second: 토큰 생성 속도 (0이면 즉시)
+            chars_per_token: 토큰당 글자 수 (한국어 기준 대략 1.5)
+            error_rate: 오류 주입 비율 (0~1)
+            error_status: 주입 오류의 HTTP 상태 코드 (429, 500, 503 등)
+            output_ratio: max_tokens 대비 실제 출력 토큰 비율
+            sleep: 실제로 대기할지 여부 (False면 지연은 통계에만 기록)
+            max_section_chars: 호출당 섹션 최대 글자 수 (큰 섹션 분할 생성 측정용, None이면 분할 안 함)
+            batch_slowdown: 배치 항목 하나가 늘 때마다 느려지는 토큰 생성 속도 비율 (배치 생성 모델)
+            capacity: 지연이 늘지 않는 동시 호출 수 (넘으면 지연이 동시 호출 수/capacity 배로 늘어남, None이면 무제한)
+            overload_factor: 동시 호출이 capacity * overload_factor를 넘으면 429 과부하 오류
+            keyword_rate: 프롬프트의 필수 키워드를 출력에 넣을 확률 (키워드마다, 0이면 넣지 않음)
+        """
+        self.seed = seed
+        self.latency_model = LatencyModel(latency, latency_ms, sigma, trace)
+        self.tokens_per_second = tokens_per_second
+        self.chars_per_token = chars_per_token
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.output_ratio = output_ratio
+        self.sleep = sleep
+        self.max_section_chars = max_section_chars
+        self.batch_slowdown = batch_slowdown
+        self.keyword_rate = keyword_rate
+        # 실행 중에 바꿀 수 있음 (상위 용량 변화 재현)
+        self.capacity = capacity
+        self.overload_factor = overload_factor
+        
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._stats = {"calls": 0, "errors": 0, "output_tokens": 0, "simulated_ms": 0.0, "max_call_tokens": 0,
+                       "batches": 0, "overloaded": 0}
+        self._inflight = 0
+    
+    def _plan_call(self, prompt: str, kwargs: dict):
+        """호출 하나의 지연/오류/출력 결정 (호출 순서 + 프롬프트로 시드)"""
+        with self._lock:
+            call_index = self._calls
+            self._calls += 1
+        digest = hashlib.sha256(f"{self.seed}:{call_index}:{prompt}".encode("utf-8")).digest()
+        rng = random.Random(int.from_bytes(digest[:8], "big"))
+        
+        first_token_ms = self.latency_model.sample(rng, call_index)
+        failed = rng.random() < self.error_rate
+        max_tokens = int(kwargs.get("max_tokens", 512) or 512)
+        target_tokens = max(1, int(max_tokens * self.output_ratio * rng.uniform(0.85, 1.0)))
+        with self._lock:
+            self._stats["max_call_tokens"] = max(self._stats["max_call_tokens"], max_tokens)
+        text = "" if failed else self._compose(rng, prompt, int(target_tokens * self.chars_per_token))
+        return first_token_ms, failed, text
+    
+    @staticmethod
+    def _topic(prompt: str) -> str:
+        match = re.search(r"주제: (.+)", prompt)
+        return match.group(1).strip() if match else "주제"
+    
+    def _compose(self, rng: random.Random, prompt: str, target_chars: int) -> str:
+        """목표 글자 수까지 문장을 이어 붙여 본문 생성 (문장 경계에서 끝남)"""
+        topic = self._topic(prompt)
+        # 프롬프트가 금지한 표현이 들어간 문장은 쓰지 않음 (수리 프롬프트 측정용)
+        match = re.search(r"언급하지 말 내용: (.+)", prompt)
+        avoid = [item.strip() for item in match.group(1).split(",") if item.strip()] if match else []
+        sentences = [s for s in _SENTENCES if not any(item in s for item in avoid)] or _SENTENCES
+        parts: List[str] = []
+        length = 0
+        if self.keyword_rate > 0:
+            # 실제 모델처럼 요청한 키워드 일부만 반영
+            match = re.search(r"반드시 포함할 키워드: (.+)", prompt)
+            keywords = [kw.strip() for kw in match.group(1).split(",") if kw.strip()] if match else []
+            for keyword in keywords:
+                if rng.random() < self.keyword_rate:
+                    parts.append(f"{keyword} 역시 {topic}에서 중요한 요소이다.")
+                    length += len(parts[-1]) + 1
+        while length < target_chars:
+            sentence = rng.choice(sentences).format(topic=topic)
+            parts.append(sentence)
+            length += len(sentence) + 1
+        return " ".join(parts)
+    
+    def _tokens(self, text: str) -> List[str]:
+        """chars_per_token 단위로 자른 토큰 목록"""
+        size = max(1, int(round(self.chars_per_token)))
+        return [text[i:i + size] for i in range(0, len(text), size)]
+    
+    def _wait(self, ms: float):
+        with self._lock:
+            self._stats["simulated_ms"] += ms
+        if self.sleep and ms > 0:
+            # 현재 문맥의 취소 토큰이 취소되면 대기 중에도 바로 중단
+            cancellable_sleep(ms / 1000.0)
+    
+    def _record(self, tokens: int, failed: bool):
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["output_tokens"] += tokens
+            if failed:
+                self._stats["errors"] += 1
+    
+    def _enter(self) -> float:
+        """
+        호출 시작 (동시 호출 수 집계)
+        
+        Returns:
+            용량 초과에 따른 지연 배수 (과부하면 InjectedLLMError 429)
+        """
+        with self._lock:
+            self._inflight += 1
+            inflight = self._inflight
+            capacity = self.capacity
+            overloaded = bool(capacity) and inflight > capacity * self.overload_factor
+            if overloaded:
+                self._inflight -= 1
+                self._stats["calls"] += 1
+                self._stats["errors"] += 1
+                self._stats["overloaded"] += 1
+        if overloaded:
+            raise InjectedLLMError(429, f"과부하: 동시 호출 {inflight}개 (용량 {capacity})")
+        return max(1.0, inflight / capacity) if capacity else 1.0
+    
+    def _leave(self):
+        with self._lock:
+            self._inflight -= 1
+    
+    def generate(self, prompt: str, **kwargs) -> str:
+        """지연 후 전체 본문 반환 (전체 토큰 생성 시간 포함)"""
+        first_token_ms, failed, text = self._plan_call(prompt, kwargs)
+        tokens = self._tokens(text)
+        slowdown = self._enter()
+        try:
+            if failed:
+                self._wait(first_token_ms * slowdown)
+                self._record(0, True)
+                raise InjectedLLMError(self.error_status, f"주입된 LLM 오류 ({self.error_status})")
+            generation_ms = len(tokens) / self.tokens_per_second * 1000 if self.tokens_per_second > 0 else 0.0
+            self._wait((first_token_ms + generation_ms) * slowdown)
+        finally:
+            self._leave()
+        self._record(len(tokens), False)
+        return text
+    
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """첫 토큰 지연 후 tokens_per_second 속도로 토큰 스트리밍"""
+        first_token_ms, failed, text = self._plan_call(prompt, kwargs)
+        slowdown = self._enter()
+        try:
+            self._wait(first_token_ms * slowdown)
+            if failed:
+                self._record(0, True)
+                raise InjectedLLMError(self.error_status, f"주입된 LLM 오류 ({self.error_status})")
+            
+            interval_ms = 1000.0 / self.tokens_per_second * slowdown if self.tokens_per_second > 0 else 0.0
+            emitted = 0
+            try:
+                for token in self._tokens(text):
+                    if emitted:
+                        self._wait(interval_ms)
+                    emitted += 1
+                    yield token
+            finally:
+                # 소비자가 중간에 멈추면 그때까지 나간 토큰만 집계
+                self._record(emitted, False)
+        finally:
+            self._leave()
+    
+    def generate_batch(self, calls: Sequence[Tuple[str, Dict]]) -> List[Union[str, Exception]]:
+        """
+        배치 생성 모델: 첫 토큰 지연은 배치당 한 번(가장 긴 항목 기준), 토큰 생성은 가장 긴 항목 길이만큼이고
+        항목이 늘 때마다 batch_slowdown 비율씩 느려진다 (GPU 배치 디코딩 근사).
+        """
+        planned = [self._plan_call(prompt, kwargs) for prompt, kwargs in calls]
+        if not planned:
+            return []
+        token_counts = [0 if failed else len(self._tokens(text)) for _, failed, text in planned]
+        first_token_ms = max(p[0] for p in planned)
+        generation_ms = 0.0
+        if self.tokens_per_second > 0:
+            generation_ms = max(token_counts) / self.tokens_per_second * 1000 * (1 + self.batch_slowdown * (len(planned) - 1))
+        self._wait(first_token_ms + generation_ms)
+        
+        results: List[Union[str, Exception]] = []
+        for (_, failed, text), tokens in zip(planned, token_counts):
+            self._record(tokens, failed)
+            if failed:
+                results.append(InjectedLLMError(self.error_status, f"주입된 LLM 오류 ({self.error_status})"))
+            else:
+                results.append(text)
+        with self._lock:
+            self._stats["batches"] += 1
+        return results
+    
+    def stats(self) -> Dict[str, float]:
+        """호출/오류/출력 토큰/모의 지연 합계와 호출당 최대 max_tokens"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["simulated_ms"] = round(stats["simulated_ms"], 3)
+        stats["error_rate"] = round(stats["errors"] / stats["calls"], 4) if stats["calls"] else 0.0
+        return stats
+
+
+class _BatchService:
+    """
+    OpenAI Files/Batches API 스탠드인 상태 (메모리)
+    
+    배치는 백그라운드 스레드에서 group_size개씩 generate_batch()로 처리하고,
+    request_limit개를 처리하면 남은 요청을 batch_expired 오류로 두고 "expired"로 끝난다 (부분 완료 재현).
+    """
+    
+    def __init__(self, provider: LoadTestLLMProvider, request_limit: Optional[int] = None, group_size: int = 32):
+        self.provider = provider
+        self.request_limit = request_limit
+        self.group_size = max(1, group_size)
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+    
+    def add_file(self, content: bytes, purpose: str) -> dict:
+        file_id = f"file-{uuid.uuid4().hex[:24]}"
+        with self._lock:
+            self.files[file_id] = content
+        return {"id": file_id, "object": "file", "bytes": len(content), "created_at": int(time.time()),
+                "filename": f"{file_id}.jsonl", "purpose": purpose}
+    
+    def create_batch(self, request: dict) -> Optional[dict]:
+        input_file_id = request.get("input_file_id")
+        with self._lock:
+            if input_file_id not in self.files:
+                return None
+            batch = {
+                "id": f"batch_{uuid.uuid4().hex[:24]}",
+                "object": "batch",
+                "endpoint": request.get("endpoint", "/v1/chat/completions"),
+                "input_file_id": input_file_id,
+                "completion_window": request.get("completion_window", "24h"),
+                "status": "validating",
+                "output_file_id": None,
+                "error_file_id": None,
+                "created_at": int(time.time()),
+                "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            }
+            self.batches[batch["id"]] = batch
+        threading.Thread(target=self._process, args=(batch["id"],), name="batch-stand-in", daemon=True).start()
+        return dict(batch)
+    
+    def get_batch(self, batch_id: str) -> Optional[dict]:
+        with self._lock:
+            batch = self.batches.get(batch_id)
+            return json.loads(json.dumps(batch)) if batch is not None else None
+    
+    def _update(self, batch_id: str, **fields):
+        with self._lock:
+            self.batches[batch_id].update(fields)
+    
+    def _process(self, batch_id: str):
+        with self._lock:
+            batch = self.batches[batch_id]
+            content = self.files[batch["input_file_id"]]
+        lines = [json.loads(line) for line in content.decode("utf-8").splitlines() if line.strip()]
+        self._update(batch_id, status="in_progress", in_progress_at=int(time.time()),
+                     request_counts={"total": len(lines), "completed": 0, "failed": 0})
+        
+        outputs: List[str] = []
+        errors: List[str] = []
+        limit = len(lines) if self.request_limit is None else min(self.request_limit, len(lines))
+        for start in range(0, limit, self.group_size):
+            group = lines[start:min(start + self.group_size, limit)]
+            calls = [_ChatHandler._parse_call(line.get("body", {})) for line in group]
+            for line, (prompt, _), result in zip(group, calls, self.provider.generate_batch(calls)):
+                request_id = f"req_{uuid.uuid4().hex[:24]}"
+                if isinstance(result, Exception):
+                    errors.append(json.dumps({
+                        "id": f"batch_req_{uuid.uuid4().hex[:24]}", "custom_id": line.get("custom_id"),
+                        "response": {"status_code": getattr(result, "status", 500), "request_id": request_id,
+                                     "body": {"error": {"message": str(result), "type": "server_error"}}},
+                        "error": None,
+                    }, ensure_ascii=False))
+                    continue
+                body = _ChatHandler._completion(self.provider, prompt, result, line.get("body", {}).get("model", "stand-in"))
+                outputs.append(json.dumps({
+                    "id": f"batch_req_{uuid.uuid4().hex[:24]}", "custom_id": line.get("custom_id"),
+                    "response": {"status_code": 200, "request_id": request_id, "body": body},
+                    "error": None,
+                }, ensure_ascii=False))
+            with self._lock:
+                self.batches[batch_id]["request_counts"].update(completed=len(outputs), failed=len(errors))
+        
+        # 처리 한도를 넘긴 요청: 시간 창 만료와 같은 형식
+        for line in lines[limit:]:
+            errors.append(json.dumps({
+                "id": f"batch_req_{uuid.uuid4().hex[:24]}", "custom_id": line.get("custom_id"), "response": None,
+                "error": {"code": "batch_expired", "message": "This request could not be executed before the completion window expired."},
+            }, ensure_ascii=False))
+        
+        fields = {"status": "completed" if limit == len(lines) else "expired",
+                  "completed_at": int(time.time()),
+                  "request_counts": {"total": len(lines), "completed": len(outputs), "failed": len(errors)}}
+        if outputs:
+            fields["output_file_id"] = self.add_file(("\n".join(outputs) + "\n").encode("utf-8"), "batch_output")["id"]
+        if errors:
+            fields["error_file_id"] = self.add_file(("\n".join(errors) + "\n").encode("utf-8"), "batch_output")["id"]
+        self._update(batch_id, **fields)
+
+
+def _parse_multipart(body: bytes, content_type: str) -> Dict[str, bytes]:
+    """multipart/form-data 본문을 {필드 이름: 값}으로 (파일 업로드용 최소 구현)"""
+    match = re.search(r'boundary="?([^";]+)"?', content_type)
+    if match is None:
+        return {}
+    fields: Dict[str, bytes] = {}
+    for part in body.split(b"--" + match.group(1).encode("ascii")):
+        head, sep, value = part.partition(b"\r\n\r\n")
+        if not sep:
+            continue
+        name = re.search(rb'name="([^"]+)"', head)
+        if name is not None:
+            fields[name.group(1).decode("utf-8")] = value[:-2] if value.endswith(b"\r\n") else value
+    return fields
+
+
+class _ChatHandler(BaseHTTPRequestHandler):
+    """
+    POST /v1/chat/completions (OpenAI 형식, stream=true면 SSE), POST /v1/chat/completions/batch (배치),
+    POST /v1/files, GET /v1/files/{id}/content, POST /v1/batches, GET /v1/batches/{id} (OpenAI Batch API)
+    """
+    
+    protocol_version = "HTTP/1.1"
+    server_version = "LLMStandIn/1.0"
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _client_gone(self) -> bool:
+        """클라이언트가 연결을 닫았는지 확인 (읽을 수 있는데 데이터가 없으면 EOF)"""
+        try:
+            readable, _, _ = select.select([self.connection], [], [], 0)
+            return bool(readable) and self.connection.recv(1, socket.MSG_PEEK) == b""
+        except (OSError, ValueError):
+            return True
+    
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+    
+    def do_GET(self):
+        service: _BatchService = self.server.batch_service
+        match = re.search(r"/files/([^/]+)/content$", self.path)
+        if match is not None:
+            content = service.files.get(match.group(1))
+            if content is None:
+                self._send_json(404, {"error": {"message": "file not found", "type": "invalid_request_error"}})
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/jsonl")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+            return
+        match = re.search(r"/batches/([^/]+)$", self.path)
+        batch = service.get_batch(match.group(1)) if match is not None else None
+        if batch is None:
+            self._send_json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+            return
+        self._send_json(200, batch)
+    
+    def do_POST(self):
+        if self.path.rstrip("/").endswith("/chat/completions/batch"):
+            self._batch()
+            return
+        if self.path.rstrip("/").endswith("/files"):
+            fields = _parse_multipart(self._read_body(), self.headers.get("Content-Type", ""))
+            if "file" not in fields:
+                self._send_json(400, {"error": {"message": "file is required", "type": "invalid_request_error"}})
+                return
+            purpose = fields.get("purpose", b"batch").decode("utf-8")
+            self._send_json(200, self.server.batch_service.add_file(fields["file"], purpose))
+            return
+        if self.path.rstrip("/").endswith("/batches"):
+            try:
+                request = json.loads(self._read_body() or b"{}")
+            except json.JSONDecodeError as e:
+                self._send_json(400, {"error": {"message": str(e), "type": "invalid_request_error"}})
+                return
+            batch = self.server.batch_service.create_batch(request)
+            if batch is None:
+                self._send_json(400, {"error": {"message": "input file not found", "type": "invalid_request_error"}})
+                return
+            self._send_json(200, batch)
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as e:
+            self._send_json(400, {"error": {"message": str(e), "type": "invalid_request_error"}})
+            return
+        
+        prompt, kwargs = self._parse_call(request)
+        provider: LoadTestLLMProvider = self.server.provider
+        model = request.get("model", "stand-in")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        
+        if request.get("stream"):
+            self._stream(provider, prompt, kwargs, model, completion_id)
+            return
+        
+        # 전체 응답도 토큰 단위로 만들어, 클라이언트가 연결을 끊으면 남은 생성을 멈춤
+        stream = provider.generate_stream(prompt, **kwargs)
+        tokens = []
+        try:
+            for token in stream:
+                if self._client_gone():
+                    stream.close()
+                    self.close_connection = True
+                    return
+                tokens.append(token)
+        except InjectedLLMError as e:
+            self._send_json(e.status, {"error": {"message": str(e), "type": "server_error"}})
+            return
+        self._send_json(200, self._completion(provider, prompt, "".join(tokens), model))
+    
+    @staticmethod
+    def _parse_call(request: dict):
+        prompt = "\n".join(m.get("content", "") for m in request.get("messages", []) if m.get("role") == "user")
+        kwargs = {"max_tokens": request.get("max_tokens", 512), "temperature": request.get("temperature", 0.7)}
+        return prompt, kwargs
+    
+    @staticmethod
+    def _completion(provider: LoadTestLLMProvider, prompt: str, text: str, model: str) -> dict:
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": int(len(prompt) / provider.chars_per_token),
+                "completion_tokens": len(provider._tokens(text)),
+            },
+        }
+    
+    def _batch(self):
+        """POST .../chat/completions/batch: {"requests": [...]} → {"results": [...]} (배치 한 번으로 생성)"""
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as e:
+            self._send_json(400, {"error": {"message": str(e), "type": "invalid_request_error"}})
+            return
+        provider: LoadTestLLMProvider = self.server.provider
+        requests = body.get("requests", [])
+        calls = [self._parse_call(request) for request in requests]
+        outputs = provider.generate_batch(calls)
+        results = []
+        for request, (prompt, _), output in zip(requests, calls, outputs):
+            if isinstance(output, InjectedLLMError):
+                results.append({"error": {"message": str(output), "type": "server_error", "status": output.status}})
+            else:
+                results.append(self._completion(provider, prompt, output, request.get("model", "stand-in")))
+        self._send_json(200, {"object": "chat.completion.batch", "results": results})
+    
+    def _stream(self, provider: LoadTestLLMProvider, prompt: str, kwargs: dict,
+                model: str, completion_id: str):
+        """SSE 스트리밍 응답 (chunked 전송)"""
+        stream = provider.generate_stream(prompt, **kwargs)
+        try:
+            first = next(stream, None)
+        except InjectedLLMError as e:
+            self._send_json(e.status, {"error": {"message": str(e), "type": "server_error"}})
+            return
+        
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        
+        def send_event(data: str):
+            payload = f"data: {data}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(payload):x}\r\n".encode("ascii") + payload + b"\r\n")
+            self.wfile.flush()
+        
+        def chunk(content: Optional[str], finish: Optional[str] = None) -> str:
+            delta = {"content": content} if content is not None else {}
+            return json.dumps({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }, ensure_ascii=False)
+        
+        try:
+            if first is not None:
+                send_event(chunk(first))
+                for token in stream:
+                    send_event(chunk(token))
+            send_event(chunk(None, "stop"))
+            send_event("[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트가 스트림을 끊음 (조기 종료)
+            stream.close()
+            self.close_connection = True
+
+
+class ChatStandInServer:
+    """
+    OpenAI chat completions 형식 로컬 스탠드인 서버
+    
+    with ChatStandInServer(LoadTestLLMProvider(latency="lognormal")) as server:
+        provider = HTTPChatProvider(server.base_url)
+    """
+    
+    def __init__(self, provider: Optional[LoadTestLLMProvider] = None,
+                 host: str = "127.0.0.1", port: int = 0, batch_request_limit: Optional[int] = None):
+        """
+        초기화
+        
+        Args:
+            provider: 응답을 만들 부하 테스트 제공자 (기본: 기본 설정)
+            host: 바인딩 주소
+            port: 포트 (0이면 임의 포트)
+            batch_request_limit: Batch API 배치 하나에서 처리할 최대 요청 수 (넘으면 expired, 재개 확인용)
+        """
+        self.provider = provider or LoadTestLLMProvider()
+        self.batch_service = _BatchService(self.provider, batch_request_limit)
+        self._server = ThreadingHTTPServer((host, port), _ChatHandler)
+        self._server.daemon_threads = True
+        self._server.provider = self.provider
+        self._server.batch_service = self.batch_service
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+    
+    def start(self) -> "ChatStandInServer":
+        """백그라운드 스레드에서 서버 시작"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="llm-stand-in", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """서버 종료"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    """명령행 실행: 스탠드인 서버 기동"""
+    parser = argparse.ArgumentParser(description="OpenAI 형식 LLM 스탠드인 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", choices=LatencyModel.KINDS, default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=400.0)
+    parser.add_argument("--sigma", type=float, default=0.5)
+    parser.add_argument("--trace", help="지연 기록 파일 (ms, 한 줄에 하나)")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--capacity", type=int, help="지연이 늘지 않는 동시 호출 수 (넘으면 지연 증가/과부하 429)")
+    parser.add_argument("--batch-request-limit", type=int, help="Batch API 배치당 처리 요청 수 (넘으면 expired)")
+    args = parser.parse_args()
+    
+    provider = LoadTestLLMProvider(
+        seed=args.seed, latency=args.latency, latency_ms=args.latency_ms, sigma=args.sigma,
+        trace=args.trace, tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate, error_status=args.error_status, capacity=args.capacity,
+    )
+    server = ChatStandInServer(provider, args.host, args.port, args.batch_request_limit)
+    print(f"LLM 스탠드인 실행 중: {server.base_url} (LLM_BASE_URL로 지정, 종료: Ctrl+C)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
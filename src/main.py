@@ -12,16 +12,25 @@ from src.structure_generator import StructureGenerator
 from src.content_generator import ContentGenerator
 from src.formatter import Formatter
 from src.llm_provider import get_llm_provider
-from src.models import UserInput
+from contextlib import nullcontext
+from src.models import UserInput, GeneratedDocument, DocumentMetadata, DocumentStructure
+from src.single_flight import DOCUMENT_FLIGHT, CoalescingLLMProvider
+from src.cancellation import CancelToken, cancel_scope
+from src.degradation import MERGED, current_degradation, degrade_scope
+from src.pipeline import Pipeline, PipelineExecutor, Stage, registered_stages
 
 
+# 모든 생성기가 공유하는 파이프라인 실행기 (API는 요청마다 생성기를 만들므로 순수 단계 재사용/통계를 프로세스 단위로 유지)
+PIPELINE_EXECUTOR = PipelineExecutor()
+
 class DocumentAutoFormatter:
     """문서 자동 포맷 생성기 메인 클래스"""
     
-    def __init__(self, llm_provider_type: str = "mock", **llm_kwargs):
+    def __init__(self, llm_provider_type: str = "mock", coalesce: bool = False,
+                 section_cache=None, scaffold=None, micro_batch=False, adaptive_concurrency: bool = False,
+                 degradation=None, repair=False, **llm_kwargs):
         # 안전장치: 요금 방지를 위해 기본값은 항상 'mock'
         if llm_provider_type != "mock":
-            import os
             # OpenAI 사용 시 환경 변수 확인
             if llm_provider_type == "openai" and not os.getenv("OPENAI_API_KEY"):
                 print("경고: OPENAI_API_KEY가 설정되지 않았습니다. Mock Provider를 사용합니다.")
@@ -30,59 +39,248 @@ class DocumentAutoFormatter:
         초기화
         
         Args:
-            llm_provider_type: LLM 제공자 타입 ("mock" 또는 "openai")
+            llm_provider_type: LLM 제공자 타입 ("mock", "template", "openai" 등)
+            coalesce: 동일 입력/프롬프트의 동시 요청 병합 여부 (single-flight)
+            section_cache: 섹션 근사 중복 캐시 (NearDuplicateSectionCache, 선택)
+            scaffold: 프로필별 예열 뼈대 캐시 (prewarmer.ScaffoldCache, 선택)
+            micro_batch: 동시 문서들의 섹션 호출을 모아 배치로 보낼지 여부 (True면 전역 배처, MicroBatcher면 그 배처)
+            adaptive_concurrency: 관측 지연/오류로 상위 동시 호출 수를 조절할지 여부 (백엔드별 공유 리미터)
+            degradation: 요청별 지연 SLO에 맞춰 생성 단계를 낮추는 DegradationController (선택)
+            repair: 기준(키워드/제외 내용/분량) 미달 섹션만 다시 요청하는 검증-수리 루프 사용 여부 (True면 기본 설정, RepairLoop면 그 루프)
             **llm_kwargs: LLM 제공자별 설정
         """
         self.input_parser = InputParser()
         self.document_analyzer = DocumentAnalyzer()
         self.structure_generator = StructureGenerator()
+        self.coalesce = coalesce
         self.llm_provider = get_llm_provider(llm_provider_type, **llm_kwargs)
-        self.content_generator = ContentGenerator(self.llm_provider)
+        self.provider_name = type(self.llm_provider).__name__
+        self.recorder = None
+        if os.getenv("LLM_RECORD_PATH"):
+            # 운영 트래픽 기록 (오프라인 재생 벤치마크용, src/replay.py)
+            from src.replay import RecordingProvider
+            self.recorder = RecordingProvider(self.llm_provider, os.getenv("LLM_RECORD_PATH"))
+            self.llm_provider = self.recorder
+        if adaptive_concurrency:
+            # 같은 백엔드를 쓰는 모든 요청이 리미터 하나를 공유 (src/concurrency.py)
+            from src.concurrency import AdaptiveConcurrencyProvider
+            self.llm_provider = AdaptiveConcurrencyProvider(self.llm_provider)
+        if micro_batch and getattr(self.llm_provider, "supports_batching", False):
+            # 배치 엔드포인트가 있는 백엔드만 (순차 기본 구현으로는 대기 시간만 늘어남)
+            from src.micro_batch import MicroBatchingProvider
+            batcher = None if micro_batch is True else micro_batch
+            self.llm_provider = MicroBatchingProvider(self.llm_provider, batcher)
+        if coalesce and not getattr(self.llm_provider, "supports_sections", False):
+            # 템플릿 엔진처럼 즉시 끝나는 구조화 제공자는 섹션 병합이 이득이 없음 (문서 병합은 유지)
+            self.llm_provider = CoalescingLLMProvider(self.llm_provider)
+        self.scaffold = scaffold
+        if scaffold is not None:
+            # 예열된 일반 섹션을 먼저 조회하고, 없으면 기존 섹션 캐시로 넘김
+            section_cache = scaffold.wrap(section_cache)
+        if repair is True:
+            # 섹션 생성과 같은 제공자로 수리 호출 (src/repair.py)
+            from src.repair import RepairLoop
+            repair = RepairLoop(self.llm_provider)
+        self.content_generator = ContentGenerator(self.llm_provider, section_cache=section_cache,
+                                                  repair=repair or None)
         self.formatter = Formatter()
+        self.degradation = degradation
+        # 문서 생성 단계 DAG와 공유 실행기 (register_stage()로 등록한 단계 포함, src/pipeline.py)
+        self.pipeline = self.default_pipeline()
+        self.executor = PIPELINE_EXECUTOR
+        # 이 생성기의 계측 훅 (섹션 단계도 같은 목록을 받음)
+        self.stage_hooks = []
+        self.content_generator.stage_hooks = self.stage_hooks
+        # 마지막 generate()가 사용한 품질 저하 상태 (요청마다 formatter를 만들 때 응답/지표 기록용)
+        self.last_degradation = None
     
-    def generate(self, user_input_dict: dict) -> str:
+    def generate(self, user_input_dict: dict, cancel_token: CancelToken = None) -> str:
         """
         문서 생성 메인 프로세스
         
         Args:
             user_input_dict: 사용자 입력 딕셔너리
+            cancel_token: 취소 토큰 (클라이언트 연결 종료/마감 초과 시 섹션 사이와 진행 중인 LLM 호출에서 중단)
         
         Returns:
             포맷팅된 문서 문자열
         """
         # 1. 입력 파싱
-        print("[1단계] 사용자 입력 파싱 중...")
-        user_input = self.input_parser.parse(user_input_dict)
+        values = self._run({"user_input_dict": user_input_dict}, ("user_input",))
+        user_input = values["user_input"]
         
-        # 2. 분량 계산
-        target_length_chars = self.input_parser.parse_length_to_chars(user_input.length)
+        # 지연 SLO에 맞춰 시작 단계 선택 (과부하면 더 저렴한 생성 방식)
+        state = None
+        if self.degradation is not None:
+            state = self.degradation.start(
+                self.structure_generator.section_count(user_input.document_type),
+                self.structure_generator.section_count(user_input.document_type, merge_subsections=True)
+            )
+            self.last_degradation = state
         
-        # 3. 문서 분석
-        print("[2단계] 문서 목적 및 구조 분석 중...")
-        metadata = self.document_analyzer.analyze(user_input, target_length_chars)
+        try:
+            # 2-5. 분석, 구조 설계, 내용 생성, 포맷팅
+            with degrade_scope(state), cancel_scope(cancel_token) if cancel_token is not None else nullcontext():
+                values = self._run(values, ("formatted",))
+            formatted_document = values["formatted"]
+        finally:
+            if state is not None:
+                self.degradation.finish(state)
+        
+        print("문서 생성 완료!")
+        return formatted_document
+    
+    def build_document(self, user_input: UserInput, on_section=None,
+                       completed_sections: dict = None, plan=None,
+                       only_orders=None) -> GeneratedDocument:
+        """
+        파싱된 입력으로 GeneratedDocument 생성
+        coalesce가 켜져 있으면 동일 입력의 동시 요청은 하나의 생성 결과를 공유한다.
+        
+        Args:
+            user_input: 파싱된 사용자 입력
+            on_section: 섹션 완료 콜백 (작업 큐 진행 상황/체크포인트용)
+            completed_sections: 이미 생성된 섹션 {order: content} (재개용)
+            plan: 미리 계산된 plan() 결과 (없으면 새로 계산)
+            only_orders: 생성할 섹션 순서 목록 (없으면 전체)
+        
+        Returns:
+            GeneratedDocument 객체
+        """
+        if self.recorder is not None:
+            self.recorder.record_request(user_input)
+        
+        if not self.coalesce or on_section or completed_sections or only_orders is not None:
+            # 진행 콜백/재개/섹션 선택은 작업 단위이므로 병합하지 않음
+            return self._build_document(user_input, on_section, completed_sections, plan, only_orders)
+        
+        key = f"{self.provider_name}:{user_input.cache_key()}"
+        state = current_degradation()
+        if state is not None:
+            # 단계가 다른 요청끼리는 결과를 공유하지 않음
+            key = f"{state.mode_name}:{key}"
+        return DOCUMENT_FLIGHT.do(key, lambda: self._build_document(user_input, plan=plan))
+    
+    def plan(self, user_input: UserInput):
+        """
+        분석 및 구조 설계 (LLM 호출 없음)
+        
+        Args:
+            user_input: 파싱된 사용자 입력
+        
+        Returns:
+            (DocumentMetadata, DocumentStructure) 튜플
+        """
+        # 예열된 구조 조회는 structure 단계에서 처리
+        values = self._run({"user_input": user_input}, ("metadata", "structure"))
+        return values["metadata"], values["structure"]
+    
+    def _run(self, values: dict, targets) -> dict:
+        """이 생성기의 파이프라인을 공유 실행기로 실행 (이 생성기의 계측 훅 포함)"""
+        return self.executor.run(self.pipeline, values, targets, hooks=self.stage_hooks)
+    
+    def default_pipeline(self) -> Pipeline:
+        """
+        기본 문서 생성 파이프라인
+        
+        user_input_dict → user_input → target_length_chars → metadata → structure → document → formatted
+        (document 단계 안에서는 섹션마다 단계 하나씩 의존 관계대로 실행)
         
-        # 4. 구조 생성
+        Returns:
+            register_stage()로 등록한 단계까지 끼워 넣은 Pipeline
+        """
+        pipeline = Pipeline([
+            Stage("parse", self._parse_stage, ("user_input_dict",), "user_input", UserInput, pure=True),
+            Stage("length", self._length_stage, ("user_input",), "target_length_chars", int, pure=True),
+            Stage("analyze", self._analyze_stage, ("user_input", "target_length_chars"), "metadata",
+                  DocumentMetadata, pure=True),
+            # 품질 저하 단계(서브섹션 병합)와 예열 뼈대를 읽으므로 순수 단계가 아님
+            Stage("structure", self._structure_stage, ("user_input", "metadata"), "structure", DocumentStructure),
+            Stage("content", self._content_stage, ("user_input", "metadata", "structure"), "document",
+                  GeneratedDocument),
+            Stage("format", self._format_stage, ("document",), "formatted", str),
+        ])
+        for stage, before, after in registered_stages():
+            pipeline.insert(stage, before=before, after=after)
+        return pipeline
+    
+    def _parse_stage(self, user_input_dict: dict) -> UserInput:
+        print("[1단계] 사용자 입력 파싱 중...")
+        return self.input_parser.parse(user_input_dict)
+    
+    def _length_stage(self, user_input: UserInput) -> int:
+        return self.input_parser.parse_length_to_chars(user_input.length)
+    
+    def _analyze_stage(self, user_input: UserInput, target_length_chars: int) -> DocumentMetadata:
+        print("[2단계] 문서 목적 및 구조 분석 중...")
+        return self.document_analyzer.analyze(user_input, target_length_chars)
+    
+    def _structure_stage(self, user_input: UserInput, metadata: DocumentMetadata) -> DocumentStructure:
+        state = current_degradation()
+        merge_subsections = state is not None and state.mode >= MERGED
+        if self.scaffold is not None and not merge_subsections:
+            cached = self.scaffold.plan_for(user_input)
+            if cached is not None:
+                print("[3단계] 예열된 문서 구조 사용")
+                return cached[1]
         print("[3단계] 문서 구조 설계 중...")
-        structure = self.structure_generator.generate(
+        return self.structure_generator.generate(
             user_input.document_type,
             metadata,
-            user_input.topic
+            user_input.topic,
+            merge_subsections=merge_subsections
         )
+    
+    def _content_stage(self, user_input: UserInput, metadata: DocumentMetadata,
+                       structure: DocumentStructure) -> GeneratedDocument:
+        return self.build_document(user_input, plan=(metadata, structure))
+    
+    def _format_stage(self, document: GeneratedDocument) -> str:
+        print("[5단계] 문서 포맷팅 중...")
+        return self.formatter.format(document)
+    
+    def outline(self, user_input: UserInput, plan=None) -> dict:
+        """
+        개요와 목차만 즉시 구성 (LLM 호출 없음)
+        
+        Args:
+            user_input: 파싱된 사용자 입력
+            plan: 미리 계산된 plan() 결과 (없으면 새로 계산)
+        
+        Returns:
+            {"overview", "structure_summary", "sections": [{"order", "title", "level", "target_length_chars"}]}
+        """
+        metadata, structure = plan or self.plan(user_input)
+        return {
+            "overview": self.content_generator._generate_overview(metadata, user_input),
+            "structure_summary": structure.outline,
+            "sections": [
+                {
+                    "order": section.order,
+                    "title": section.title,
+                    "level": section.level,
+                    "target_length_chars": section.target_length_chars,
+                }
+                for section in structure.sections
+            ],
+        }
+    
+    def _build_document(self, user_input: UserInput, on_section=None,
+                        completed_sections: dict = None, plan=None,
+                        only_orders=None) -> GeneratedDocument:
+        """분석 → 구조 → 내용 생성"""
+        metadata, structure = plan or self.plan(user_input)
         
-        # 5. 내용 생성
+        # 내용 생성
         print("[4단계] 문서 내용 생성 중...")
-        document = self.content_generator.generate(
+        return self.content_generator.generate(
             structure,
             metadata,
-            user_input
+            user_input,
+            on_section=on_section,
+            completed_sections=completed_sections,
+            only_orders=only_orders
         )
-        
-        # 6. 포맷팅
-        print("[5단계] 문서 포맷팅 중...")
-        formatted_document = self.formatter.format(document)
-        
-        print("문서 생성 완료!")
-        return formatted_document
     
     def generate_and_save(self, user_input_dict: dict, output_path: str, format_type: str = "text"):
         """
@@ -91,26 +289,28 @@ class DocumentAutoFormatter:
         Args:
             user_input_dict: 사용자 입력 딕셔너리
             output_path: 출력 파일 경로
-            format_type: "text" 또는 "markdown"
+            format_type: "text", "markdown", "html" 또는 "docx"
         """
-        # 1-5단계는 동일
-        user_input = self.input_parser.parse(user_input_dict)
-        target_length_chars = self.input_parser.parse_length_to_chars(user_input.length)
-        metadata = self.document_analyzer.analyze(user_input, target_length_chars)
-        structure = self.structure_generator.generate(
-            user_input.document_type,
-            metadata,
-            user_input.topic
-        )
-        document = self.content_generator.generate(
-            structure,
-            metadata,
-            user_input
-        )
+        # 1-4단계는 generate()와 같은 파이프라인
+        document = self._run({"user_input_dict": user_input_dict}, ("document",))["document"]
         
         # 파일 저장
         self.formatter.save_to_file(document, output_path, format_type)
         print(f"문서가 '{output_path}'에 저장되었습니다.")
+    
+    def generate_and_store(self, user_input_dict: dict, store) -> str:
+        """
+        문서 생성 후 추가 전용 저장소에 기록 (배치 실행용)
+        
+        Args:
+            user_input_dict: 사용자 입력 딕셔너리
+            store: DocumentStore 인스턴스
+        
+        Returns:
+            저장 키 (정규화된 입력 해시)
+        """
+        values = self._run({"user_input_dict": user_input_dict}, ("user_input", "document"))
+        return store.put_for_input(values["user_input"], values["document"])
 
 
 def main():
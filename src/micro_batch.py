@@ -0,0 +1,349 @@
+"""
+Micro-batching 모듈
+동시에 생성 중인 여러 문서의 섹션 프롬프트를 짧은 시간 창 안에서 모아 배치 호출 한 번으로 보냄
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+from src.cancellation import CancelToken, cancel_scope, current_token
+from src.llm_provider import LLMProvider, backend_key
+from src.stats import split_list
+
+
+# 첫 프롬프트가 들어온 뒤 배치를 더 모으는 시간 (ms)
+MICRO_BATCH_WINDOW_MS = float(os.getenv("MICRO_BATCH_WINDOW_MS", "20"))
+# 배치 하나의 최대 프롬프트 수 (다 차면 시간 창을 기다리지 않고 바로 보냄)
+MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", "16"))
+# 동시에 상위로 보내는 배치 수
+MICRO_BATCH_INFLIGHT = int(os.getenv("MICRO_BATCH_INFLIGHT", "4"))
+
+# 취소 토큰이 있는 대기자가 취소 여부를 확인하는 간격 (초)
+_WAIT_POLL_SECONDS = 0.05
+
+
+class _Item:
+    """배치를 기다리는 호출 하나"""
+    
+    def __init__(self, provider: LLMProvider, prompt: str, kwargs: dict, token: Optional[CancelToken]):
+        self.provider = provider
+        self.prompt = prompt
+        self.kwargs = kwargs
+        self.token = token
+        self.enqueued = time.monotonic()
+        self.done = threading.Event()
+        self.result: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self.abandoned = False
+
+
+class MicroBatcher:
+    """
+    프로세스 전역 마이크로 배처
+    
+    - 같은 상위 백엔드(제공자 종류 + 주소 + 모델 + API 키)로 가는 호출끼리 모음 (다른 키의 호출이 앞 호출자 키로 과금되지 않음)
+    - 가장 오래 기다린 호출 기준으로 window_ms가 지나거나 max_batch_size가 차면 generate_batch()로 전송
+    - 배치 결과는 각 호출자에게 순서대로 돌려주고, 실패한 항목은 그 호출자에게만 예외로 전달
+    - 대기 중 취소된 호출은 배치에서 빠지고, 전송된 배치는 항목이 모두 취소되었을 때만 상위 호출을 끊음
+    """
+    
+    def __init__(self, window_ms: float = MICRO_BATCH_WINDOW_MS, max_batch_size: int = MICRO_BATCH_MAX_SIZE,
+                 max_inflight: int = MICRO_BATCH_INFLIGHT):
+        """
+        초기화
+        
+        Args:
+            window_ms: 배치 수집 시간 창 (ms)
+            max_batch_size: 배치 최대 크기
+            max_inflight: 동시에 진행하는 배치 수
+        """
+        self.window_ms = window_ms
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_inflight = max(1, max_inflight)
+        
+        self._cond = threading.Condition()
+        self._queues: Dict[tuple, Deque[_Item]] = {}
+        self._inflight = 0
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stats = {"calls": 0, "batches": 0, "cancelled": 0, "max_batch": 0, "queue_ms": 0.0}
+    
+    def _start(self):
+        if self._thread is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_inflight, thread_name_prefix="micro-batch")
+            self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            self._thread.start()
+    
+    def submit(self, provider: LLMProvider, prompt: str, kwargs: dict) -> str:
+        """
+        호출을 배치 대기열에 넣고 결과를 기다림
+        
+        Args:
+            provider: 배치를 보낼 상위 제공자 (supports_batching)
+            prompt: 프롬프트
+            kwargs: 추가 파라미터 (temperature, max_tokens 등)
+        
+        Returns:
+            생성된 텍스트
+        """
+        token = current_token()
+        if token is not None:
+            token.check()
+        item = _Item(provider, prompt, kwargs, token)
+        with self._cond:
+            self._start()
+            self._queues.setdefault(backend_key(provider), deque()).append(item)
+            self._stats["calls"] += 1
+            self._cond.notify_all()
+        
+        if token is None:
+            item.done.wait()
+        else:
+            while not item.done.wait(_WAIT_POLL_SECONDS):
+                if token.cancelled:
+                    self._abandon(item)
+                    token.check()
+        if item.error is not None:
+            raise item.error
+        return item.result
+    
+    def _abandon(self, item: _Item):
+        """취소된 호출 표시 (아직 전송 전이면 배치에서 빠짐)"""
+        with self._cond:
+            item.abandoned = True
+            self._stats["cancelled"] += 1
+    
+    def _next_batch(self) -> Optional[List[_Item]]:
+        """보낼 배치 고르기 (조건 잠금 안에서 호출, 아직 보낼 것이 없으면 None)"""
+        now = time.monotonic()
+        for group, queue in list(self._queues.items()):
+            while queue and queue[0].abandoned:
+                queue.popleft()
+            if not queue:
+                del self._queues[group]
+        if not self._queues or self._inflight >= self.max_inflight:
+            return None
+        
+        group, queue = min(self._queues.items(), key=lambda entry: entry[1][0].enqueued)
+        live = sum(1 for item in queue if not item.abandoned)
+        if live < self.max_batch_size and now - queue[0].enqueued < self.window_ms / 1000.0:
+            return None
+        batch = []
+        while queue and len(batch) < self.max_batch_size:
+            item = queue.popleft()
+            if not item.abandoned:
+                batch.append(item)
+        if not queue:
+            del self._queues[group]
+        return batch
+    
+    def _wait_timeout(self) -> Optional[float]:
+        """다음 시간 창 마감까지 남은 시간 (초)"""
+        if not self._queues or self._inflight >= self.max_inflight:
+            return None
+        oldest = min(queue[0].enqueued for queue in self._queues.values() if queue)
+        return max(oldest + self.window_ms / 1000.0 - time.monotonic(), 0.0)
+    
+    def _run(self):
+        """수집 스레드: 시간 창/크기 조건이 되면 배치를 실행기로 넘김"""
+        while True:
+            with self._cond:
+                batch = self._next_batch()
+                while batch is None:
+                    self._cond.wait(self._wait_timeout())
+                    batch = self._next_batch()
+                if not batch:
+                    continue
+                self._inflight += 1
+                now = time.monotonic()
+                self._stats["batches"] += 1
+                self._stats["max_batch"] = max(self._stats["max_batch"], len(batch))
+                self._stats["queue_ms"] += sum(now - item.enqueued for item in batch) * 1000
+            self._executor.submit(self._dispatch, batch)
+    
+    def _dispatch(self, batch: List[_Item]):
+        """배치 호출 후 결과를 호출자들에게 나눠 줌"""
+        # 배치 토큰: 모든 항목이 취소되면 진행 중인 상위 호출도 끊음
+        token = CancelToken()
+        tokens = [item.token for item in batch]
+        unlinks = []
+        if all(t is not None for t in tokens):
+            def item_cancelled():
+                if all(t.cancelled for t in tokens):
+                    token.cancel("all callers cancelled")
+            unlinks = [t.on_cancel(item_cancelled) for t in tokens]
+        try:
+            with cancel_scope(token):
+                # 같은 backend_key(API 키 포함)끼리만 모이므로 첫 항목의 제공자로 보냄
+                results = batch[0].provider.generate_batch([(item.prompt, item.kwargs) for item in batch])
+            for item, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    item.error = result
+                else:
+                    item.result = result
+        except BaseException as e:
+            for item in batch:
+                item.error = e
+        finally:
+            for unlink in unlinks:
+                unlink()
+            token.close()
+            for item in batch:
+                item.done.set()
+            with self._cond:
+                self._inflight -= 1
+                self._cond.notify_all()
+    
+    def stats(self) -> Dict[str, float]:
+        """호출/배치 수, 평균/최대 배치 크기, 평균 대기열 시간"""
+        with self._cond:
+            stats = dict(self._stats)
+        batched = stats["calls"] - stats["cancelled"]
+        stats["mean_batch"] = round(batched / stats["batches"], 2) if stats["batches"] else 0.0
+        stats["mean_queue_ms"] = round(stats["queue_ms"] / batched, 3) if batched else 0.0
+        stats["queue_ms"] = round(stats["queue_ms"], 3)
+        return stats
+
+
+# 프로세스 전역 배처 (요청마다 새로 만든 제공자도 같은 백엔드면 함께 배치됨)
+SECTION_BATCHER = MicroBatcher()
+
+
+class MicroBatchingProvider(LLMProvider):
+    """
+    섹션 호출 마이크로 배치 래퍼
+    generate()는 전역 배처에 호출을 넣고, 다른 문서의 호출과 함께 배치로 생성된 결과를 기다린다.
+    """
+    
+    def __init__(self, provider: LLMProvider, batcher: MicroBatcher = None):
+        self.provider = provider
+        self.batcher = batcher or SECTION_BATCHER
+    
+    @property
+    def max_section_chars(self):
+        return getattr(self.provider, "max_section_chars", None)
+    
+    def generate(self, prompt: str, **kwargs) -> str:
+        """배치로 텍스트 생성"""
+        return self.batcher.submit(self.provider, prompt, kwargs)
+    
+    def stats(self) -> Dict[str, float]:
+        return self.batcher.stats()
+
+
+def benchmark(concurrency: Sequence[int] = (1, 4, 16, 32), window_ms: Sequence[float] = (0, 10, 30),
+              max_batch_size: int = 16, latency_ms: float = 300.0, tokens_per_second: float = 400.0,
+              batch_slowdown: float = 0.03, length: str = "A4 3장") -> List[Dict[str, Any]]:
+    """
+    처리량 대비 추가 지연 측정 (로컬 배치 스탠드인 서버, HTTP)
+    
+    동시 사용자 수마다 배치 없이(window None) 한 번, 시간 창별로 한 번씩 문서를 동시에 생성한다.
+    
+    Args:
+        concurrency: 동시 문서 수 목록
+        window_ms: 시간 창 후보 (ms)
+        max_batch_size: 배치 최대 크기
+        latency_ms: 호출/배치당 첫 토큰 지연
+        tokens_per_second: 토큰 생성 속도
+        batch_slowdown: 배치 항목당 생성 속도 저하 비율
+        length: 문서 분량
+    
+    Returns:
+        [{"concurrency", "window_ms", "docs_per_s", "p50_ms", "p95_ms", "upstream_calls", "mean_batch", "mean_queue_ms"}]
+    """
+    from src.main import DocumentAutoFormatter
+    from src.loadtest_provider import ChatStandInServer, LoadTestLLMProvider
+    
+    rows = []
+    for users in concurrency:
+        for window in [None] + list(window_ms):
+            stand_in = LoadTestLLMProvider(seed=0, latency_ms=latency_ms, tokens_per_second=tokens_per_second,
+                                           batch_slowdown=batch_slowdown)
+            batcher = MicroBatcher(window_ms=window or 0.0, max_batch_size=max_batch_size, max_inflight=users)
+            with ChatStandInServer(stand_in) as server:
+                latencies: List[float] = []
+                lock = threading.Lock()
+                
+                def one_document(index: int):
+                    formatter = DocumentAutoFormatter(llm_provider_type="http", base_url=server.base_url,
+                                                      micro_batch=batcher if window is not None else False)
+                    started = time.perf_counter()
+                    formatter.build_document(formatter.input_parser.parse(
+                        {"topic": f"주제 {index}", "document_type": "레포트", "length": length}
+                    ))
+                    with lock:
+                        latencies.append((time.perf_counter() - started) * 1000)
+                
+                started = time.perf_counter()
+                threads = [threading.Thread(target=one_document, args=(i,)) for i in range(users)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                elapsed = time.perf_counter() - started
+            
+            latencies.sort()
+            upstream = stand_in.stats()
+            batch_stats = batcher.stats()
+            rows.append({
+                "concurrency": users,
+                "window_ms": window,
+                "docs_per_s": round(users / elapsed, 3),
+                "p50_ms": round(latencies[len(latencies) // 2], 1),
+                "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1),
+                "upstream_calls": upstream["batches"] if window is not None else upstream["calls"],
+                "mean_batch": batch_stats["mean_batch"] if window is not None else 1.0,
+                "mean_queue_ms": batch_stats["mean_queue_ms"],
+            })
+    return rows
+
+
+def main():
+    """동시 사용자 수별 처리량 대비 추가 지연 표 출력"""
+    parser = argparse.ArgumentParser(description="섹션 호출 마이크로 배치 벤치마크 (로컬 배치 스탠드인)")
+    parser.add_argument("--concurrency", default="1,4,16,32", help="쉼표로 구분한 동시 문서 수")
+    parser.add_argument("--windows", default="0,10,30", help="쉼표로 구분한 시간 창 후보 (ms)")
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--tokens-per-second", type=float, default=400.0)
+    parser.add_argument("--batch-slowdown", type=float, default=0.03)
+    parser.add_argument("--length", default="A4 3장")
+    parser.add_argument("--json", action="store_true", help="JSON으로 출력")
+    args = parser.parse_args()
+    
+    rows = benchmark(
+        split_list(args.concurrency, int),
+        split_list(args.windows, float),
+        args.max_batch, args.latency_ms, args.tokens_per_second, args.batch_slowdown, args.length
+    )
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return
+    
+    print(f"{'동시':>4}{'창(ms)':>8}{'문서/초':>9}{'p50(ms)':>10}{'p95(ms)':>10}{'상위 호출':>10}{'평균 배치':>10}{'대기(ms)':>10}")
+    baseline: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        window = "배치 없음" if row["window_ms"] is None else f"{row['window_ms']:g}"
+        if row["window_ms"] is None:
+            baseline[row["concurrency"]] = row
+        print(f"{row['concurrency']:>4}{window:>8}{row['docs_per_s']:>9}{row['p50_ms']:>10}{row['p95_ms']:>10}"
+              f"{row['upstream_calls']:>10}{row['mean_batch']:>10}{row['mean_queue_ms']:>10}")
+    print()
+    for row in rows:
+        base = baseline.get(row["concurrency"])
+        if row["window_ms"] is None or base is None:
+            continue
+        print(f"동시 {row['concurrency']}, 창 {row['window_ms']:g}ms: 처리량 x{row['docs_per_s'] / base['docs_per_s']:.2f}, "
+              f"p50 지연 {row['p50_ms'] - base['p50_ms']:+.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 """
 데이터 모델 정의
 """
-from dataclasses import dataclass, field
+import hashlib
+import json
+from dataclasses import dataclass, field, asdict
 from typing import List, Optional, Dict, Any
 from enum import Enum
 
@@ -54,6 +56,11 @@ class UserInput:
     required_keywords: List[str] = field(default_factory=list)
     excluded_content: List[str] = field(default_factory=list)
     evaluation_criteria: List[str] = field(default_factory=list)
+    
+    def cache_key(self) -> str:
+        """정규화된 입력의 해시 키 (동일 입력 판별용)"""
+        payload = json.dumps(asdict(self), ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
 
 @dataclass
@@ -83,6 +90,8 @@ class DocumentStructure:
     """문서 구조"""
     sections: List[Section]
     outline: List[str]  # 목차
+    # 섹션별 문맥 의존 관계 {order: [이전 섹션 order, ...]} (비어 있으면 앞의 모든 섹션, src/context_memory.py)
+    dependencies: Dict[int, List[int]] = field(default_factory=dict)
 
 
 @dataclass
@@ -93,3 +102,26 @@ class GeneratedDocument:
     content: str
     checkpoints: List[str]
     metadata: DocumentMetadata
+    sections: List[Section] = field(default_factory=list)  # 섹션별 내용 (분석/재렌더링용)
+    required_keywords: List[str] = field(default_factory=list)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """직렬화용 딕셔너리 변환"""
+        data = asdict(self)
+        data["metadata"]["purpose"] = self.metadata.purpose.value
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GeneratedDocument":
+        """to_dict() 결과로부터 복원"""
+        metadata = dict(data["metadata"])
+        metadata["purpose"] = DocumentPurpose(metadata["purpose"])
+        return cls(
+            overview=data["overview"],
+            structure_summary=list(data["structure_summary"]),
+            content=data["content"],
+            checkpoints=list(data["checkpoints"]),
+            metadata=DocumentMetadata(**metadata),
+            sections=[Section(**section) for section in data.get("sections", [])],
+            required_keywords=list(data.get("required_keywords", [])),
+        )
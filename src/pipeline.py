@@ -0,0 +1,341 @@
+"""
+Pipeline 모듈
+문서 생성 단계를 입력/출력 이름으로 선언한 DAG와 실행기
+
+- Stage: 함수 + 입력 산출물 이름 + 출력 산출물 이름(+ 출력 형식)
+- Pipeline: 단계 목록 (입력은 그보다 앞에 있는 같은 이름의 마지막 출력에서 받음)
+  같은 이름을 다시 출력하는 단계(예: structure → structure)를 넣으면 뒤 단계들은 바뀐 값을 받는다.
+- PipelineExecutor: 필요한 단계만 의존 순서대로 실행하고, 서로 독립인 단계는 병렬 실행,
+  순수 단계는 입력 지문으로 결과를 재사용(memo), 단계별 캐시(get/put)와 계측 훅 지원
+
+기본 문서 생성 파이프라인은 DocumentAutoFormatter.default_pipeline()에 있으며,
+register_stage()로 등록한 단계는 main.py를 고치지 않아도 새 생성기마다 끼워 넣어진다.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import contextvars
+import copy
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Executor, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# 파이프라인 하나에서 동시에 실행하는 최대 단계 수
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "4"))
+# 순수 단계 결과 재사용 항목 수 (실행기별)
+PIPELINE_MEMO_SIZE = int(os.getenv("PIPELINE_MEMO_SIZE", "256"))
+
+
+@dataclass
+class Stage:
+    """파이프라인 단계"""
+    name: str
+    func: Callable[..., Any]  # inputs 순서대로 인자를 받음
+    inputs: Tuple[str, ...] = ()
+    output: str = ""  # 비우면 name
+    output_type: Optional[type] = None  # 지정하면 출력 형식 확인 (다르면 TypeError)
+    pure: bool = False  # 같은 입력이면 같은 출력 (입력 지문으로 결과 재사용)
+    cache: Any = None  # get(key) / put(key, value)를 가진 단계별 캐시 (선택)
+    
+    def __post_init__(self):
+        self.inputs = tuple(self.inputs)
+        self.output = self.output or self.name
+
+
+@dataclass
+class StageEvent:
+    """계측 훅에 전달되는 단계 이벤트"""
+    stage: str
+    event: str  # "start", "finish", "error"
+    source: str = "run"  # "run", "memo", "cache"
+    seconds: float = 0.0
+    value: Any = None  # finish: 단계 출력
+    error: Optional[BaseException] = None
+
+
+_REGISTERED: List[Tuple[Stage, Optional[str], Optional[str]]] = []
+
+
+def register_stage(stage: Stage, before: Optional[str] = None, after: Optional[str] = None):
+    """
+    이후 만들어지는 기본 파이프라인마다 끼워 넣을 단계 등록
+    
+    Args:
+        stage: 단계
+        before: 이 이름의 단계 앞에 넣음
+        after: 이 이름의 단계 뒤에 넣음 (둘 다 없으면 맨 뒤)
+    """
+    _REGISTERED.append((stage, before, after))
+
+
+def registered_stages() -> List[Tuple[Stage, Optional[str], Optional[str]]]:
+    """register_stage()로 등록된 (단계, before, after) 목록"""
+    return list(_REGISTERED)
+
+
+class Pipeline:
+    """단계 목록 (순서가 같은 이름 산출물의 우선순위를 정함)"""
+    
+    def __init__(self, stages: Iterable[Stage] = ()):
+        self.stages: List[Stage] = list(stages)
+    
+    def _index(self, name: str) -> int:
+        for i, stage in enumerate(self.stages):
+            if stage.name == name:
+                return i
+        raise KeyError(f"단계가 없습니다: {name}")
+    
+    def stage(self, name: str) -> Stage:
+        """이름으로 단계 조회"""
+        return self.stages[self._index(name)]
+    
+    def add(self, stage: Stage) -> "Pipeline":
+        """맨 뒤에 단계 추가"""
+        return self.insert(stage)
+    
+    def insert(self, stage: Stage, before: Optional[str] = None, after: Optional[str] = None) -> "Pipeline":
+        """
+        단계 삽입
+        
+        Args:
+            stage: 단계 (이름은 파이프라인 안에서 고유해야 함)
+            before: 이 이름의 단계 앞에 넣음
+            after: 이 이름의 단계 뒤에 넣음 (둘 다 없으면 맨 뒤)
+        
+        Returns:
+            self
+        """
+        if any(existing.name == stage.name for existing in self.stages):
+            raise ValueError(f"이미 있는 단계 이름입니다: {stage.name}")
+        if before is not None:
+            self.stages.insert(self._index(before), stage)
+        elif after is not None:
+            self.stages.insert(self._index(after) + 1, stage)
+        else:
+            self.stages.append(stage)
+        return self
+    
+    def replace(self, name: str, stage: Stage) -> "Pipeline":
+        """같은 자리의 단계 교체"""
+        self.stages[self._index(name)] = stage
+        return self
+    
+    def remove(self, name: str) -> "Pipeline":
+        """단계 제거"""
+        del self.stages[self._index(name)]
+        return self
+    
+    def plan(self, provided: Iterable[str], targets: Sequence[str]) -> Tuple[List[int], Dict[int, List[int]]]:
+        """
+        실행 계획
+        
+        이미 주어진 산출물을 출력하는 단계는 실행하지 않는다.
+        
+        Args:
+            provided: 주어진 산출물 이름
+            targets: 필요한 산출물 이름
+        
+        Returns:
+            (실행할 단계 인덱스 목록, {단계 인덱스: 선행 단계 인덱스 목록})
+        """
+        provided = set(provided)
+        runnable = [i for i, stage in enumerate(self.stages) if stage.output not in provided]
+        
+        def producer(name: str, before: int) -> Optional[int]:
+            for i in reversed(runnable):
+                if i < before and self.stages[i].output == name:
+                    return i
+            if name in provided:
+                return None
+            raise ValueError(f"산출물 '{name}'을(를) 만드는 단계가 없습니다")
+        
+        needed: Dict[int, List[int]] = {}
+        stack = [producer(name, len(self.stages)) for name in targets]
+        while stack:
+            index = stack.pop()
+            if index is None or index in needed:
+                continue
+            stage = self.stages[index]
+            deps = [producer(name, index) for name in stage.inputs]
+            needed[index] = sorted({dep for dep in deps if dep is not None})
+            stack.extend(needed[index])
+        return sorted(needed), needed
+
+
+def fingerprint(values: Sequence[Any]) -> Optional[str]:
+    """입력 값 지문 (pickle로 직렬화할 수 없으면 None, 재사용 안 함)"""
+    try:
+        return hashlib.sha256(pickle.dumps(tuple(values), protocol=4)).hexdigest()
+    except Exception:
+        return None
+
+
+class PipelineExecutor:
+    """
+    파이프라인 실행기
+    
+    - 선행 단계가 모두 끝난 단계부터 최대 max_workers개를 동시에 실행 (실행할 단계가 하나뿐이면 호출 스레드에서 바로 실행)
+    - 훅은 항상 run()을 호출한 스레드에서 호출되므로 진행 콜백/체크포인트 저장에 그대로 쓸 수 있음
+    - 실행 스레드로는 현재 문맥(contextvars)을 복사해 넘김 (취소 토큰, 품질 저하 상태 등)
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None, hooks: Iterable[Callable[[StageEvent], None]] = (),
+                 memo_size: Optional[int] = None, pool: Optional[Executor] = None):
+        """
+        초기화
+        
+        Args:
+            max_workers: run() 하나에서 동시에 실행하는 최대 단계 수 (기본: PIPELINE_WORKERS)
+            hooks: 계측 훅 목록 (StageEvent를 받음)
+            memo_size: 순수 단계 결과 재사용 항목 수 (기본: PIPELINE_MEMO_SIZE, 0이면 재사용 안 함)
+            pool: 단계를 실행할 스레드 풀 (없으면 처음 필요할 때 만듦)
+        """
+        self.max_workers = max_workers or PIPELINE_WORKERS
+        self.hooks: List[Callable[[StageEvent], None]] = list(hooks)
+        self.memo_size = PIPELINE_MEMO_SIZE if memo_size is None else memo_size
+        self._pool = pool
+        self._memo: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+    
+    def _executor(self) -> Executor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage")
+        return self._pool
+    
+    def run(self, pipeline: Pipeline, values: Dict[str, Any], targets: Sequence[str],
+            hooks: Iterable[Callable[[StageEvent], None]] = ()) -> Dict[str, Any]:
+        """
+        파이프라인 실행
+        
+        Args:
+            pipeline: 파이프라인
+            values: 주어진 산출물 {이름: 값} (이 이름을 출력하는 단계는 실행하지 않음)
+            targets: 필요한 산출물 이름 (이를 위해 필요한 단계만 실행)
+            hooks: 이번 실행에만 쓸 추가 훅
+        
+        Returns:
+            주어진 산출물 + 실행한 단계 출력 {이름: 값} (같은 이름은 뒤 단계 출력)
+        
+        Raises:
+            ValueError: 필요한 산출물을 만드는 단계가 없을 때
+            TypeError: 단계 출력이 output_type과 다를 때
+        """
+        order, deps = pipeline.plan(values, targets)
+        hooks = self.hooks + list(hooks)
+        stages = pipeline.stages
+        outputs: Dict[int, Any] = {}
+        results = dict(values)
+        
+        def inputs_of(index: int) -> List[Any]:
+            stage = stages[index]
+            args = []
+            for name in stage.inputs:
+                producer = max((dep for dep in deps[index] if stages[dep].output == name), default=None)
+                args.append(outputs[producer] if producer is not None else values[name])
+            return args
+        
+        def emit(event: StageEvent):
+            for hook in hooks:
+                hook(event)
+        
+        def finish(index: int, outcome: Tuple[Any, str, float]):
+            stage = stages[index]
+            value, source, seconds = outcome
+            if stage.output_type is not None and not isinstance(value, stage.output_type):
+                raise TypeError(
+                    f"'{stage.name}' 단계 출력 형식 오류: {stage.output_type.__name__} 필요, {type(value).__name__} 반환"
+                )
+            outputs[index] = value
+            results[stage.output] = value
+            self._record(stage.name, source, seconds)
+            emit(StageEvent(stage.name, "finish", source, seconds, value))
+        
+        pending = list(order)
+        running = {}
+        current = None  # 오류 이벤트용: 결과를 처리 중인 단계
+        try:
+            while pending or running:
+                ready = [index for index in pending if all(dep in outputs for dep in deps[index])]
+                if not running and (len(ready) == 1 or self.max_workers <= 1):
+                    # 병렬로 돌릴 것이 없으면 스레드를 거치지 않고 바로 실행
+                    current = ready[0]
+                    pending.remove(current)
+                    emit(StageEvent(stages[current].name, "start"))
+                    finish(current, self._call(stages[current], inputs_of(current)))
+                    continue
+                for index in ready[:self.max_workers - len(running)]:
+                    pending.remove(index)
+                    emit(StageEvent(stages[index].name, "start"))
+                    future = self._executor().submit(
+                        contextvars.copy_context().run, self._call, stages[index], inputs_of(index)
+                    )
+                    running[future] = index
+                completed, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in sorted(completed, key=lambda f: running[f]):
+                    current = running.pop(future)
+                    finish(current, future.result())
+        except BaseException as e:
+            for future in running:
+                future.cancel()
+            if current is not None and current not in outputs:
+                self._record(stages[current].name, "error", 0.0)
+                emit(StageEvent(stages[current].name, "error", error=e))
+            raise
+        return results
+    
+    def _call(self, stage: Stage, args: List[Any]) -> Tuple[Any, str, float]:
+        """
+        단계 하나 실행 (재사용/캐시 확인 포함)
+        
+        Returns:
+            (출력, 출처 "run"/"memo"/"cache", 소요 시간)
+        """
+        started = time.perf_counter()
+        key = fingerprint(args) if (stage.pure and self.memo_size) or stage.cache is not None else None
+        # 같은 이름으로 교체한 단계가 이전 함수의 결과를 받지 않도록 함수 이름도 키에 포함
+        memo_key = (stage.name, getattr(stage.func, "__qualname__", repr(stage.func)), key)
+        if key is not None and stage.pure and self.memo_size:
+            with self._lock:
+                if memo_key in self._memo:
+                    self._memo.move_to_end(memo_key)
+                    # 호출한 쪽이 결과를 고쳐도 저장본은 그대로 유지
+                    return copy.deepcopy(self._memo[memo_key]), "memo", time.perf_counter() - started
+        if key is not None and stage.cache is not None:
+            cached = stage.cache.get(key)
+            if cached is not None:
+                return cached, "cache", time.perf_counter() - started
+        
+        value = stage.func(*args)
+        
+        if key is not None and stage.pure and self.memo_size:
+            with self._lock:
+                self._memo[memo_key] = copy.deepcopy(value)
+                while len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+        if key is not None and stage.cache is not None:
+            stage.cache.put(key, value)
+        return value, "run", time.perf_counter() - started
+    
+    def _record(self, name: str, source: str, seconds: float):
+        with self._lock:
+            stats = self._stats.setdefault(name, {"run": 0, "memo": 0, "cache": 0, "error": 0, "seconds": 0.0})
+            stats[source] += 1
+            stats["seconds"] += seconds
+    
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """단계별 실행/재사용/캐시 적중/오류 횟수와 누적 시간"""
+        with self._lock:
+            return {
+                name: {**stats, "seconds": round(stats["seconds"], 4)}
+                for name, stats in self._stats.items()
+            }
@@ -0,0 +1,433 @@
+"""
+Prewarmer 모듈
+자주 들어오는 입력 프로필(문서 종류/제출 대상/문체/분량)을 요청 로그에서 학습하고,
+유휴 시간에 주제와 무관한 뼈대(구조, 섹션 프롬프트, 일반 섹션)를 미리 생성해 두는 모듈
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import copy
+import json
+import re
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.models import UserInput
+
+
+# 프로필: (document_type, target_audience, writing_style, length)
+Profile = Tuple[str, str, str, str]
+
+# 미리 생성할 때 주제 자리에 넣는 표식 (실제 요청 시 주제로 치환)
+TOPIC_PLACEHOLDER = "⟪주제⟫"
+
+# 주제에 따라 달라지는 프롬프트 부분: 의존 섹션 요약 (앞선 내용 요약 줄 + 이전 섹션 요약 목록), 필수 키워드 줄
+_PREVIOUS_BLOCK = re.compile(
+    r"(?:앞선 내용 요약: [^\n]*\n)?이전 섹션 요약:\n.*?(?=반드시 포함할 키워드: |위 조건에 맞춰 ')", re.DOTALL
+)
+_KEYWORD_LINE = re.compile(r"^반드시 포함할 키워드: .*\n\n?", re.MULTILINE)
+
+
+def profile_of(user_input: UserInput) -> Profile:
+    """파싱(정규화)된 입력의 프로필"""
+    return (
+        user_input.document_type or "",
+        user_input.target_audience or "",
+        user_input.writing_style or "",
+        user_input.length or "",
+    )
+
+
+class ProfileTracker:
+    """요청 프로필 빈도 집계"""
+    
+    def __init__(self, parser=None):
+        """
+        초기화
+        
+        Args:
+            parser: InputParser (원시 로그 정규화용, 기본: 새 인스턴스)
+        """
+        if parser is None:
+            from src.input_parser import InputParser
+            parser = InputParser()
+        self.parser = parser
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+        self.last_request_at = 0.0
+    
+    def observe(self, user_input: UserInput):
+        """파싱된 요청 하나 기록"""
+        with self._lock:
+            self._counts[profile_of(user_input)] += 1
+            self.last_request_at = time.time()
+    
+    def observe_raw(self, raw_input: dict):
+        """원시 요청 딕셔너리 기록 (InputParser 기본값 적용 후 집계)"""
+        self.observe(self.parser.parse(raw_input))
+    
+    def load_log(self, path: str) -> int:
+        """
+        JSONL 요청 로그 학습
+        
+        Args:
+            path: 한 줄에 요청 본문 하나 (또는 {"input": {...}})
+        
+        Returns:
+            학습한 요청 수
+        """
+        count = 0
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                self.observe_raw(record.get("input", record))
+                count += 1
+        return count
+    
+    def top(self, n: int = 5, min_count: int = 1) -> List[Tuple[Profile, int]]:
+        """빈도 상위 프로필"""
+        with self._lock:
+            return [(p, c) for p, c in self._counts.most_common(n) if c >= min_count]
+
+
+class _SectionEntry:
+    """미리 생성된 일반 섹션"""
+    
+    __slots__ = ("content", "cost_ms")
+    
+    def __init__(self, content: str, cost_ms: float):
+        self.content = content
+        self.cost_ms = cost_ms
+
+
+class ScaffoldCache:
+    """
+    프로필별 뼈대 캐시
+    
+    - 구조: (프로필, 평가 기준) → (DocumentMetadata, DocumentStructure)
+    - 섹션: 주제를 표식으로 바꾸고 의존 섹션 요약과 키워드 줄을 뺀 섹션 프롬프트
+      → 표식이 들어간 원시 출력
+    
+    남은 프롬프트는 프로필과 섹션 정보로만 정해지므로, 표식 주제로 한 번 생성해 두면
+    같은 프로필의 새 주제 요청에서 그대로 재사용된다.
+    """
+    
+    def __init__(self, max_sections: int = 2000):
+        """
+        초기화
+        
+        Args:
+            max_sections: 보관할 최대 섹션 수
+        """
+        self.max_sections = max_sections
+        self._lock = threading.Lock()
+        self._plans: Dict[tuple, Tuple[object, object, float]] = {}
+        self._sections: Dict[str, _SectionEntry] = {}
+        self._served_profiles = set()
+        self._local = threading.local()
+        self._stats = {
+            "plan_hits": 0, "plan_misses": 0,
+            "section_hits": 0, "section_misses": 0,
+            "latency_saved_ms": 0.0,
+            "first_requests": 0, "first_request_saved_ms": 0.0,
+        }
+    
+    @staticmethod
+    def _plan_key(user_input: UserInput) -> tuple:
+        return profile_of(user_input) + (tuple(user_input.evaluation_criteria),)
+    
+    @staticmethod
+    def prompt_key(prompt: str, topic: str) -> str:
+        """섹션 프롬프트의 주제 무관 형태"""
+        if topic:
+            prompt = prompt.replace(topic, TOPIC_PLACEHOLDER)
+        prompt = _PREVIOUS_BLOCK.sub("", prompt)
+        return _KEYWORD_LINE.sub("", prompt)
+    
+    def store_plan(self, user_input: UserInput, plan: tuple, cost_ms: float):
+        """분석/구조 결과 저장"""
+        with self._lock:
+            self._plans[self._plan_key(user_input)] = (plan[0], plan[1], cost_ms)
+    
+    def has_plan(self, user_input: UserInput) -> bool:
+        with self._lock:
+            return self._plan_key(user_input) in self._plans
+    
+    def plan_for(self, user_input: UserInput):
+        """
+        미리 만든 (metadata, structure) 사본 조회
+        
+        Args:
+            user_input: 파싱된 사용자 입력
+        
+        Returns:
+            (DocumentMetadata, DocumentStructure) 또는 None
+        """
+        profile = profile_of(user_input)
+        with self._lock:
+            entry = self._plans.get(self._plan_key(user_input))
+            if entry is None:
+                self._stats["plan_misses"] += 1
+                self._local.first_profile = None
+                return None
+            self._stats["plan_hits"] += 1
+            self._stats["latency_saved_ms"] += entry[2]
+            # 프로필의 첫 요청이면 이 스레드에서 이어지는 섹션 적중도 첫 요청 절약분으로 집계
+            if profile not in self._served_profiles:
+                self._served_profiles.add(profile)
+                self._stats["first_requests"] += 1
+                self._stats["first_request_saved_ms"] += entry[2]
+                self._local.first_profile = profile
+            else:
+                self._local.first_profile = None
+        # 섹션 내용이 채워지므로 요청마다 사본 사용
+        return copy.deepcopy(entry[0]), copy.deepcopy(entry[1])
+    
+    def wrap(self, inner=None) -> "ScaffoldSectionCache":
+        """ContentGenerator용 섹션 캐시 (inner: 뒤에 둘 섹션 캐시, 선택)"""
+        return ScaffoldSectionCache(self, inner)
+    
+    def _lookup_section(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._sections.get(key)
+            if entry is None:
+                self._stats["section_misses"] += 1
+                return None
+            self._stats["section_hits"] += 1
+            self._stats["latency_saved_ms"] += entry.cost_ms
+            if getattr(self._local, "first_profile", None) is not None:
+                self._stats["first_request_saved_ms"] += entry.cost_ms
+            return entry.content
+    
+    def _store_section(self, key: str, content: str, cost_ms: float):
+        with self._lock:
+            if len(self._sections) >= self.max_sections and key not in self._sections:
+                return
+            self._sections[key] = _SectionEntry(content, cost_ms)
+    
+    def stats(self) -> Dict[str, object]:
+        """적중 및 절약 시간 통계"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["plans"] = len(self._plans)
+            stats["sections"] = len(self._sections)
+            stats["latency_saved_ms"] = round(stats["latency_saved_ms"], 3)
+            stats["first_request_saved_ms"] = round(stats["first_request_saved_ms"], 3)
+            return stats
+
+
+class ScaffoldSectionCache:
+    """
+    ScaffoldCache를 ContentGenerator의 section_cache 인터페이스로 노출
+    표식 주제로 생성할 때만 저장하고, 실제 요청에서는 조회 후 표식을 주제로 치환한다.
+    """
+    
+    def __init__(self, scaffold: ScaffoldCache, inner=None):
+        self.scaffold = scaffold
+        self.inner = inner
+    
+    def get_or_generate(self, prompt: str, section_title: str, topic: str,
+                        generate: Callable[[], str]) -> str:
+        """section_cache 인터페이스"""
+        key = ScaffoldCache.prompt_key(prompt, topic)
+        
+        if topic == TOPIC_PLACEHOLDER:
+            started = time.perf_counter()
+            content = generate()
+            self.scaffold._store_section(key, content, (time.perf_counter() - started) * 1000)
+            return content
+        
+        cached = self.scaffold._lookup_section(key)
+        if cached is not None:
+            return cached.replace(TOPIC_PLACEHOLDER, topic)
+        if self.inner is not None:
+            return self.inner.get_or_generate(prompt, section_title, topic, generate)
+        return generate()
+
+
+class Prewarmer:
+    """
+    유휴 시간 뼈대 사전 생성기
+    
+    상위 프로필마다 표식 주제로 분석/구조 설계와 전체 섹션 생성을 한 번 실행해
+    ScaffoldCache에 채운다. 한 번의 예열은 시간 예산과 프로필 수 상한을 넘지 않는다.
+    """
+    
+    def __init__(self, formatter, tracker: ProfileTracker,
+                 budget_seconds: float = 30.0, max_profiles: int = 5,
+                 min_count: int = 2, idle_seconds: float = 5.0):
+        """
+        초기화
+        
+        Args:
+            formatter: scaffold가 연결된 DocumentAutoFormatter
+            tracker: 프로필 빈도 집계기
+            budget_seconds: 예열 1회당 최대 소요 시간
+            max_profiles: 예열할 상위 프로필 수
+            min_count: 예열 대상이 되는 최소 요청 수
+            idle_seconds: 마지막 요청 후 이 시간이 지나야 유휴로 판단
+        """
+        if formatter.scaffold is None:
+            raise ValueError("scaffold가 연결된 DocumentAutoFormatter가 필요합니다.")
+        self.formatter = formatter
+        self.scaffold = formatter.scaffold
+        self.tracker = tracker
+        self.budget_seconds = budget_seconds
+        self.max_profiles = max_profiles
+        self.min_count = min_count
+        self.idle_seconds = idle_seconds
+        
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._warmed = 0
+        self._warm_ms = 0.0
+        self._budget_exhausted = 0
+    
+    def warm_once(self) -> int:
+        """
+        상위 프로필 예열 (이미 예열된 프로필은 건너뜀)
+        
+        Returns:
+            이번에 예열한 프로필 수
+        """
+        deadline = time.monotonic() + self.budget_seconds
+        warmed = 0
+        for profile, _ in self.tracker.top(self.max_profiles, self.min_count):
+            if self._stop.is_set():
+                break
+            if time.monotonic() >= deadline:
+                self._budget_exhausted += 1
+                break
+            user_input = self._placeholder_input(profile)
+            if self.scaffold.has_plan(user_input):
+                continue
+            self._warm_profile(user_input)
+            warmed += 1
+        self._warmed += warmed
+        return warmed
+    
+    def _placeholder_input(self, profile: Profile) -> UserInput:
+        document_type, target_audience, writing_style, length = profile
+        return UserInput(
+            document_type=document_type,
+            target_audience=target_audience,
+            topic=TOPIC_PLACEHOLDER,
+            length=length,
+            writing_style=writing_style,
+        )
+    
+    def _warm_profile(self, user_input: UserInput):
+        """프로필 하나의 구조와 일반 섹션 생성"""
+        started = time.perf_counter()
+        formatter = self.formatter
+        target_length_chars = formatter.input_parser.parse_length_to_chars(user_input.length)
+        metadata = formatter.document_analyzer.analyze(user_input, target_length_chars)
+        structure = formatter.structure_generator.generate(
+            user_input.document_type, metadata, user_input.topic
+        )
+        plan_ms = (time.perf_counter() - started) * 1000
+        plan = (copy.deepcopy(metadata), copy.deepcopy(structure))
+        
+        # 표식 주제로 섹션을 생성하면 ScaffoldSectionCache가 섹션 출력을 저장
+        formatter.content_generator.generate(structure, metadata, user_input)
+        self.scaffold.store_plan(user_input, plan, plan_ms)
+        self._warm_ms += (time.perf_counter() - started) * 1000
+    
+    def is_idle(self) -> bool:
+        """최근 요청이 없는지 여부"""
+        return time.time() - self.tracker.last_request_at >= self.idle_seconds
+    
+    def start(self, interval: float = 10.0):
+        """백그라운드 예열 스레드 시작 (유휴일 때만 예열)"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        
+        def loop():
+            while not self._stop.wait(interval):
+                if self.is_idle():
+                    try:
+                        self.warm_once()
+                    except Exception as e:
+                        print(f"[prewarmer] 예열 실패: {e}")
+        
+        self._thread = threading.Thread(target=loop, name="prewarmer", daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: float = None):
+        """예열 스레드 종료"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def stats(self) -> Dict[str, object]:
+        """예열 및 절약 통계"""
+        stats = self.scaffold.stats()
+        stats.update({
+            "warmed_profiles": self._warmed,
+            "warm_ms": round(self._warm_ms, 3),
+            "budget_exhausted": self._budget_exhausted,
+            "top_profiles": [list(p) + [c] for p, c in self.tracker.top(self.max_profiles)],
+        })
+        return stats
+
+
+def _replay_first_requests(formatter, records: Iterable[dict]) -> Dict[str, float]:
+    """프로필별 첫 요청 지연 측정"""
+    seen = set()
+    latencies = []
+    for raw in records:
+        user_input = formatter.input_parser.parse(raw)
+        profile = profile_of(user_input)
+        if profile in seen:
+            continue
+        seen.add(profile)
+        started = time.perf_counter()
+        formatter.build_document(user_input)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return {"profiles": len(latencies), "total_ms": round(sum(latencies), 3)}
+
+
+def main():
+    """명령행 실행: 로그 학습 → 예열 → 프로필별 첫 요청 재생"""
+    parser = argparse.ArgumentParser(description="입력 프로필 예열")
+    parser.add_argument("log", help="JSONL 요청 로그")
+    parser.add_argument("--budget", type=float, default=30.0, help="예열 시간 예산 (초)")
+    parser.add_argument("--profiles", type=int, default=5)
+    parser.add_argument("--min-count", type=int, default=2)
+    args = parser.parse_args()
+    
+    from src.main import DocumentAutoFormatter
+    
+    with open(args.log, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    records = [r.get("input", r) for r in records]
+    
+    cold = DocumentAutoFormatter(llm_provider_type="mock")
+    cold_result = _replay_first_requests(cold, records)
+    
+    formatter = DocumentAutoFormatter(llm_provider_type="mock", scaffold=ScaffoldCache())
+    tracker = ProfileTracker(formatter.input_parser)
+    for raw in records:
+        tracker.observe_raw(raw)
+    warmer = Prewarmer(formatter, tracker, args.budget, args.profiles, args.min_count)
+    warmer.warm_once()
+    warm_result = _replay_first_requests(formatter, records)
+    
+    print(json.dumps({
+        "cold_first_requests": cold_result,
+        "warm_first_requests": warm_result,
+        "prewarmer": warmer.stats(),
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
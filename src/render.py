@@ -0,0 +1,425 @@
+"""
+Render 모듈
+GeneratedDocument로부터 렌더 트리를 한 번 만들고, 여러 출력 형식(text/markdown/html/docx)으로
+파일에 스트리밍 렌더링
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import io
+import json
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from xml.sax.saxutils import escape
+
+from src.stats import percentile
+from src.models import GeneratedDocument
+
+
+@dataclass
+class RenderNode:
+    """렌더 트리 노드"""
+    kind: str  # document, block, paragraph, outline, section, checklist, raw
+    text: str = ""
+    level: int = 0
+    number: int = 0
+    items: List[str] = field(default_factory=list)
+    children: List["RenderNode"] = field(default_factory=list)
+
+
+def build_render_tree(document: GeneratedDocument) -> RenderNode:
+    """
+    렌더 트리 생성 (형식과 무관, 문서당 한 번)
+    
+    Args:
+        document: 생성된 문서
+    
+    Returns:
+        루트 RenderNode
+    """
+    if document.sections:
+        body = [
+            RenderNode("section", text=section.title, level=section.level,
+                       number=section.order, items=[section.content])
+            for section in document.sections
+        ]
+    else:
+        body = [RenderNode("raw", text=document.content)]
+    
+    return RenderNode("document", text="문서/레포트 자동 생성 결과", children=[
+        RenderNode("block", text="전체 문서 개요", number=1, children=[
+            RenderNode("paragraph", text=document.overview),
+            RenderNode("outline", items=list(document.structure_summary)),
+        ]),
+        RenderNode("block", text="자동 생성된 문서 본문", number=2, children=body),
+        RenderNode("block", text="제출용 체크포인트", number=3, children=[
+            RenderNode("checklist", items=list(document.checkpoints)),
+        ]),
+    ])
+
+
+def _body_text(nodes: List[RenderNode]) -> str:
+    """본문 노드를 기존 본문 형식(# 번호. 제목)으로 복원"""
+    parts = []
+    for node in nodes:
+        if node.kind == "raw":
+            parts.append(node.text)
+            continue
+        prefix = "#" * node.level if 1 <= node.level <= 3 else "####"
+        parts.append(f"{prefix} {node.number}. {node.text}\n")
+        parts.append(node.items[0])
+        parts.append("\n\n")
+    return "".join(parts)
+
+
+class RenderBackend:
+    """출력 형식 백엔드 기본 클래스"""
+    
+    extension = ""
+    
+    def render(self, tree: RenderNode, write: Callable[[str], None]):
+        """
+        트리를 조각 단위로 write에 전달
+        
+        Args:
+            tree: 렌더 트리
+            write: 문자열 조각을 받는 함수
+        """
+        raise NotImplementedError
+    
+    def render_to_file(self, tree: RenderNode, filepath: str):
+        """파일로 스트리밍 출력"""
+        with open(filepath, "w", encoding="utf-8") as f:
+            self.render(tree, f.write)
+    
+    def render_to_string(self, tree: RenderNode) -> str:
+        """문자열로 출력"""
+        buffer = io.StringIO()
+        self.render(tree, buffer.write)
+        return buffer.getvalue()
+
+
+class _LineWriter:
+    """조각 사이에 줄바꿈을 넣어 쓰는 스트리밍 "\n".join"""
+    
+    def __init__(self, write: Callable[[str], None]):
+        self._write = write
+        self._first = True
+    
+    def __call__(self, piece: str):
+        if not self._first:
+            self._write("\n")
+        self._first = False
+        self._write(piece)
+
+
+class TextBackend(RenderBackend):
+    """일반 텍스트 (Formatter.format 형식)"""
+    
+    extension = ".txt"
+    
+    def render(self, tree: RenderNode, write: Callable[[str], None]):
+        line = _LineWriter(write)
+        for block in tree.children:
+            line("=" * 80)
+            line(f"[{block.number}] {block.text}")
+            line("=" * 80)
+            line("")
+            if block.number == 1:
+                paragraph, outline = block.children
+                line(paragraph.text)
+                line("")
+                line("전체 구조:")
+                for item in outline.items:
+                    line(f"  {item}")
+                line("")
+                line("")
+            elif block.number == 2:
+                line(_body_text(block.children))
+                line("")
+            else:
+                for item in block.children[0].items:
+                    line(item)
+                line("")
+
+
+class MarkdownBackend(RenderBackend):
+    """마크다운 (Formatter.format_markdown 형식)"""
+    
+    extension = ".md"
+    
+    TITLES = {1: "## 📋 전체 문서 개요", 2: "## 📄 자동 생성된 문서 본문", 3: "## ✅ 제출용 체크포인트"}
+    
+    def render(self, tree: RenderNode, write: Callable[[str], None]):
+        line = _LineWriter(write)
+        line(f"# {tree.text}\n")
+        for block in tree.children:
+            line(f"{self.TITLES[block.number]}\n")
+            if block.number == 1:
+                paragraph, outline = block.children
+                line(paragraph.text)
+                line("\n")
+                line("### 문서 구조\n")
+                for item in outline.items:
+                    line(f"- {item}")
+            elif block.number == 2:
+                line(_body_text(block.children))
+            else:
+                for item in block.children[0].items:
+                    line(f"- {item}")
+            line("\n")
+
+
+class HTMLBackend(RenderBackend):
+    """HTML 문서"""
+    
+    extension = ".html"
+    
+    def render(self, tree: RenderNode, write: Callable[[str], None]):
+        write('<!DOCTYPE html>\n<html lang="ko">\n<head>\n<meta charset="utf-8">\n')
+        write(f"<title>{escape(tree.text)}</title>\n</head>\n<body>\n")
+        write(f"<h1>{escape(tree.text)}</h1>\n")
+        for block in tree.children:
+            write(f"<section>\n<h2>{escape(block.text)}</h2>\n")
+            for node in block.children:
+                self._render_node(node, write)
+            write("</section>\n")
+        write("</body>\n</html>\n")
+    
+    def _render_node(self, node: RenderNode, write: Callable[[str], None]):
+        if node.kind == "paragraph":
+            write(f"<p>{escape(node.text)}</p>\n")
+        elif node.kind == "outline":
+            write("<h3>문서 구조</h3>\n<ul>\n")
+            for item in node.items:
+                write(f"<li>{escape(item.strip())}</li>\n")
+            write("</ul>\n")
+        elif node.kind == "checklist":
+            write("<ul>\n")
+            for item in node.items:
+                write(f"<li>{escape(item)}</li>\n")
+            write("</ul>\n")
+        elif node.kind == "section":
+            tag = f"h{min(node.level + 2, 6)}"
+            write(f"<{tag}>{node.number}. {escape(node.text)}</{tag}>\n")
+            for line in node.items[0].split("\n"):
+                if line.strip():
+                    write(f"<p>{escape(line.strip())}</p>\n")
+        elif node.kind == "raw":
+            write(f"<pre>{escape(node.text)}</pre>\n")
+
+
+class DOCXBackend(RenderBackend):
+    """DOCX 문서 (zip + WordprocessingML 직접 작성)"""
+    
+    extension = ".docx"
+    
+    _CONTENT_TYPES = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '<Override PartName="/word/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+        '</Types>'
+    )
+    _RELS = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="word/document.xml"/>'
+        '</Relationships>'
+    )
+    _DOCUMENT_RELS = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+        'Target="styles.xml"/>'
+        '</Relationships>'
+    )
+    _W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    
+    def _styles(self) -> str:
+        """제목/소제목 스타일 정의"""
+        styles = [
+            '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/>'
+            '<w:rPr><w:rFonts w:eastAsia="Malgun Gothic"/><w:sz w:val="22"/></w:rPr></w:style>'
+        ]
+        sizes = {"Title": 36, "Heading1": 30, "Heading2": 26, "Heading3": 24, "Heading4": 22}
+        for style_id, size in sizes.items():
+            styles.append(
+                f'<w:style w:type="paragraph" w:styleId="{style_id}"><w:name w:val="{style_id}"/>'
+                f'<w:basedOn w:val="Normal"/><w:pPr><w:keepNext/><w:spacing w:before="240" w:after="120"/></w:pPr>'
+                f'<w:rPr><w:b/><w:sz w:val="{size}"/></w:rPr></w:style>'
+            )
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<w:styles xmlns:w="{self._W}">' + "".join(styles) + '</w:styles>'
+        )
+    
+    @staticmethod
+    def _paragraph(text: str, style: str = "") -> str:
+        style_xml = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+        return f'<w:p>{style_xml}<w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+    
+    def render(self, tree: RenderNode, write: Callable[[str], None]):
+        """word/document.xml 본문 스트리밍"""
+        write('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n')
+        write(f'<w:document xmlns:w="{self._W}"><w:body>')
+        write(self._paragraph(tree.text, "Title"))
+        for block in tree.children:
+            write(self._paragraph(block.text, "Heading1"))
+            for node in block.children:
+                if node.kind == "paragraph":
+                    write(self._paragraph(node.text))
+                elif node.kind == "outline":
+                    write(self._paragraph("문서 구조", "Heading2"))
+                    for item in node.items:
+                        write(self._paragraph(item))
+                elif node.kind == "checklist":
+                    for item in node.items:
+                        write(self._paragraph(f"• {item}"))
+                elif node.kind == "section":
+                    style = f"Heading{min(node.level + 1, 4)}"
+                    write(self._paragraph(f"{node.number}. {node.text}", style))
+                    for line in node.items[0].split("\n"):
+                        if line.strip():
+                            write(self._paragraph(line.strip()))
+                elif node.kind == "raw":
+                    for line in node.text.split("\n"):
+                        write(self._paragraph(line))
+        write('<w:sectPr><w:pgSz w:w="11906" w:h="16838"/></w:sectPr></w:body></w:document>')
+    
+    def render_to_file(self, tree: RenderNode, filepath: str):
+        """DOCX(zip) 파일로 스트리밍 출력"""
+        with zipfile.ZipFile(filepath, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("[Content_Types].xml", self._CONTENT_TYPES)
+            zf.writestr("_rels/.rels", self._RELS)
+            zf.writestr("word/_rels/document.xml.rels", self._DOCUMENT_RELS)
+            zf.writestr("word/styles.xml", self._styles())
+            with zf.open("word/document.xml", "w") as raw:
+                stream = io.TextIOWrapper(raw, encoding="utf-8", write_through=False)
+                self.render(tree, stream.write)
+                stream.flush()
+                stream.detach()
+
+
+BACKENDS: Dict[str, RenderBackend] = {
+    "text": TextBackend(),
+    "markdown": MarkdownBackend(),
+    "html": HTMLBackend(),
+    "docx": DOCXBackend(),
+}
+
+
+def get_backend(format_type: str) -> RenderBackend:
+    """형식 이름으로 백엔드 조회 (알 수 없는 형식은 text)"""
+    return BACKENDS.get(format_type, BACKENDS["text"])
+
+
+def render_many(document: GeneratedDocument, outputs: Dict[str, str],
+                max_workers: int = 4) -> Dict[str, str]:
+    """
+    하나의 렌더 트리로 여러 형식을 병렬 렌더링
+    
+    Args:
+        document: 생성된 문서
+        outputs: {형식: 출력 파일 경로}
+        max_workers: 동시 렌더링 스레드 수 (파일 쓰기/압축은 GIL을 놓으므로 겹쳐 실행됨)
+    
+    Returns:
+        {형식: 출력 파일 경로}
+    """
+    tree = build_render_tree(document)
+    if len(outputs) == 1:
+        format_type, path = next(iter(outputs.items()))
+        get_backend(format_type).render_to_file(tree, path)
+        return dict(outputs)
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(outputs))) as executor:
+        futures = [
+            executor.submit(get_backend(format_type).render_to_file, tree, path)
+            for format_type, path in outputs.items()
+        ]
+        for future in futures:
+            future.result()
+    return dict(outputs)
+
+
+def benchmark_formats(document: GeneratedDocument, formats: Optional[List[str]] = None,
+                      repeat: int = 20, directory: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """
+    형식별 렌더링 시간 측정 (파일 출력 포함)
+    
+    Args:
+        document: 생성된 문서
+        formats: 측정할 형식 목록 (기본: 전체)
+        repeat: 형식별 반복 횟수
+        directory: 출력 디렉터리 (기본: 임시 디렉터리)
+    
+    Returns:
+        {형식: {p50_ms, p90_ms, max_ms, bytes}} 및 순차/병렬 전체 시간
+    """
+    formats = formats or list(BACKENDS)
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        paths = {fmt: os.path.join(tmp, f"document{get_backend(fmt).extension}") for fmt in formats}
+        results: Dict[str, Dict[str, float]] = {}
+        
+        tree_times = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            tree = build_render_tree(document)
+            tree_times.append((time.perf_counter() - started) * 1000)
+        results["tree"] = {"p50_ms": round(percentile(tree_times, 50), 3)}
+        
+        for fmt in formats:
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                get_backend(fmt).render_to_file(tree, paths[fmt])
+                samples.append((time.perf_counter() - started) * 1000)
+            results[fmt] = {
+                "p50_ms": round(percentile(samples, 50), 3),
+                "p90_ms": round(percentile(samples, 90), 3),
+                "max_ms": round(max(samples), 3),
+                "bytes": os.path.getsize(paths[fmt]),
+            }
+        
+        for label, workers in (("sequential", 1), ("parallel", len(formats))):
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                render_many(document, paths, max_workers=workers)
+                samples.append((time.perf_counter() - started) * 1000)
+            results[label] = {"p50_ms": round(percentile(samples, 50), 3)}
+    return results
+
+
+def main():
+    """명령행 실행: 예시 문서로 형식별 렌더링 벤치마크"""
+    parser = argparse.ArgumentParser(description="형식별 렌더링 벤치마크")
+    parser.add_argument("-n", "--repeat", type=int, default=20)
+    parser.add_argument("--formats", nargs="*", choices=list(BACKENDS))
+    args = parser.parse_args()
+    
+    from src.loadtest import DEFAULT_INPUT
+    from src.main import DocumentAutoFormatter
+    
+    formatter = DocumentAutoFormatter(llm_provider_type="mock")
+    document = formatter.build_document(formatter.input_parser.parse(dict(DEFAULT_INPUT)))
+    result = benchmark_formats(document, args.formats, args.repeat)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""
+Replay 모듈
+LLM 호출(프롬프트, 파라미터, 응답, 지연)과 문서 요청을 압축 로그로 기록하고,
+기록된 응답과 지연을 그대로 재생해 오프라인으로 성능 회귀를 비교하는 도구
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from src.cancellation import sleep as cancellable_sleep
+from src.llm_provider import LLMProvider
+from src.stats import percentile
+from src.models import UserInput
+
+
+def call_key(prompt: str, kwargs: Dict[str, Any]) -> str:
+    """프롬프트 + 파라미터 키"""
+    payload = json.dumps([prompt, kwargs], ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+class ReplayMissError(Exception):
+    """기록에 없는 LLM 호출"""
+
+
+class RecordedLLMError(Exception):
+    """기록 당시 발생했던 LLM 오류를 재생"""
+
+
+class RecordingProvider(LLMProvider):
+    """
+    LLM 호출 기록 래퍼
+    
+    로그는 gzip JSONL이며, 같은 프롬프트는 처음 한 번만 본문을 저장한다.
+    - {"type": "llm", "t", "k", "p"(처음만), "kw", "r", "ms", "ft"(스트림), "cl"(스트림), "e"(오류)}
+    - {"type": "request", "t", "input", "msc"(섹션 분할 한도)}
+    """
+    
+    def __init__(self, provider: LLMProvider, log_path: str):
+        """
+        초기화
+        
+        Args:
+            provider: 실제 LLM 제공자
+            log_path: 기록 파일 경로 (.jsonl.gz, 이어쓰기)
+        """
+        self.provider = provider
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._file = gzip.open(log_path, "at", encoding="utf-8")
+        self._seen_keys = set()
+        self._started = time.time()
+        self._records = 0
+    
+    @property
+    def supports_streaming(self) -> bool:
+        return getattr(self.provider, "supports_streaming", False)
+    
+    @property
+    def max_section_chars(self):
+        return getattr(self.provider, "max_section_chars", None)
+    
+    def _write(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._records += 1
+    
+    def _llm_record(self, started: float, prompt: str, kwargs: dict) -> Dict[str, Any]:
+        key = call_key(prompt, kwargs)
+        record = {"type": "llm", "t": round(started - self._started, 4), "k": key, "kw": kwargs}
+        with self._lock:
+            if key not in self._seen_keys:
+                self._seen_keys.add(key)
+                record["p"] = prompt
+        return record
+    
+    def record_request(self, user_input: UserInput):
+        """문서 요청(파싱된 입력) 기록"""
+        record = {
+            "type": "request",
+            "t": round(time.time() - self._started, 4),
+            "input": asdict(user_input),
+        }
+        if self.max_section_chars:
+            # 재생 시 같은 섹션 분할로 같은 조각 프롬프트를 만들기 위해 함께 기록
+            record["msc"] = self.max_section_chars
+        self._write(record)
+    
+    def generate(self, prompt: str, **kwargs) -> str:
+        """호출 후 응답과 지연 기록"""
+        wall_start = time.time()
+        started = time.perf_counter()
+        record = self._llm_record(wall_start, prompt, kwargs)
+        try:
+            response = self.provider.generate(prompt, **kwargs)
+        except Exception as e:
+            record.update({"ms": round((time.perf_counter() - started) * 1000, 3),
+                           "e": f"{type(e).__name__}: {e}"})
+            self._write(record)
+            raise
+        record.update({"r": response, "ms": round((time.perf_counter() - started) * 1000, 3)})
+        self._write(record)
+        return response
+    
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """스트리밍 호출 기록 (첫 조각 지연과 조각 길이)"""
+        wall_start = time.time()
+        started = time.perf_counter()
+        record = self._llm_record(wall_start, prompt, kwargs)
+        chunks: List[str] = []
+        first_ms = None
+        try:
+            for chunk in self.provider.generate_stream(prompt, **kwargs):
+                if first_ms is None:
+                    first_ms = (time.perf_counter() - started) * 1000
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            record["e"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record.update({
+                "r": "".join(chunks),
+                "ms": round((time.perf_counter() - started) * 1000, 3),
+                "ft": round(first_ms or 0.0, 3),
+                "cl": [len(c) for c in chunks],
+            })
+            self._write(record)
+    
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+    
+    def close(self):
+        """기록 파일 닫기"""
+        with self._lock:
+            self._file.close()
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"records": self._records, "unique_prompts": len(self._seen_keys)}
+
+
+def load_log(log_path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    기록 로그 읽기
+    
+    Returns:
+        {"llm": [...], "request": [...]} (각각 기록 순서)
+    """
+    records: Dict[str, List[Dict[str, Any]]] = {"llm": [], "request": []}
+    prompts: Dict[str, str] = {}
+    with gzip.open(log_path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record["type"] == "llm":
+                if "p" in record:
+                    prompts[record["k"]] = record["p"]
+                else:
+                    record["p"] = prompts.get(record["k"], "")
+            records.setdefault(record["type"], []).append(record)
+    return records
+
+
+class ReplayProvider(LLMProvider):
+    """
+    기록 재생 제공자
+    
+    같은 (프롬프트, 파라미터) 호출은 기록된 순서대로 응답/지연/오류를 돌려주고,
+    기록보다 많이 호출되면 마지막 기록을 반복한다.
+    """
+    
+    def __init__(self, log_path: str, timing: bool = True, speed: float = 1.0,
+                 strict: bool = True, fallback: Optional[LLMProvider] = None):
+        """
+        초기화
+        
+        Args:
+            log_path: 기록 파일 경로
+            timing: 기록된 지연을 재현할지 여부
+            speed: 재생 속도 배수 (2.0이면 지연 절반)
+            strict: 기록에 없는 호출이면 ReplayMissError (False면 fallback 사용)
+            fallback: 기록에 없는 호출을 처리할 제공자 (기본: MockLLMProvider)
+        """
+        self.timing = timing
+        self.speed = speed
+        self.strict = strict
+        if fallback is None and not strict:
+            from src.llm_provider import MockLLMProvider
+            fallback = MockLLMProvider()
+        self.fallback = fallback
+        
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Deque[Dict[str, Any]]] = {}
+        log = load_log(log_path)
+        records = log["llm"]
+        for record in records:
+            self._calls.setdefault(record["k"], deque()).append(record)
+        # 스트리밍으로 기록된 트래픽은 스트리밍 경로로 재생해야 같은 후처리 결과가 나옴
+        self.supports_streaming = any("cl" in record for record in records)
+        # 섹션 분할 한도도 기록 당시와 같아야 조각 프롬프트가 일치함
+        self.max_section_chars = next((r["msc"] for r in log["request"] if r.get("msc")), None)
+        self._stats = {"hits": 0, "misses": 0, "replayed_ms": 0.0}
+    
+    def _next(self, prompt: str, kwargs: dict) -> Optional[Dict[str, Any]]:
+        key = call_key(prompt, kwargs)
+        with self._lock:
+            queue = self._calls.get(key)
+            if not queue:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            record = queue.popleft() if len(queue) > 1 else queue[0]
+            self._stats["replayed_ms"] += record.get("ms", 0.0)
+            return record
+    
+    def _sleep(self, ms: float):
+        if self.timing and ms > 0:
+            cancellable_sleep(ms / 1000.0 / self.speed)
+    
+    def _miss(self, prompt: str):
+        if self.strict:
+            raise ReplayMissError(f"기록에 없는 LLM 호출입니다: {prompt[:80]!r}")
+    
+    def generate(self, prompt: str, **kwargs) -> str:
+        """기록된 응답 재생"""
+        record = self._next(prompt, kwargs)
+        if record is None:
+            self._miss(prompt)
+            return self.fallback.generate(prompt, **kwargs)
+        self._sleep(record.get("ms", 0.0))
+        if "e" in record:
+            raise RecordedLLMError(record["e"])
+        return record["r"]
+    
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """기록된 조각 길이와 첫 조각 지연으로 스트리밍 재생"""
+        record = self._next(prompt, kwargs)
+        if record is None:
+            self._miss(prompt)
+            yield from self.fallback.generate_stream(prompt, **kwargs)
+            return
+        
+        text = record.get("r", "")
+        total_ms = record.get("ms", 0.0)
+        first_ms = record.get("ft", total_ms)
+        lengths = record.get("cl") or [len(text)]
+        self._sleep(first_ms)
+        interval = (total_ms - first_ms) / max(len(lengths) - 1, 1)
+        offset = 0
+        for i, length in enumerate(lengths):
+            if i:
+                self._sleep(interval)
+            yield text[offset:offset + length]
+            offset += length
+        if "e" in record:
+            raise RecordedLLMError(record["e"])
+    
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["replayed_ms"] = round(stats["replayed_ms"], 3)
+        return stats
+
+
+def replay_benchmark(log_path: str, concurrency: int = 8, timing: bool = True,
+                     speed: float = 1.0, open_loop: bool = False,
+                     formatter_kwargs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    기록된 하루치 요청을 현재 빌드의 DocumentAutoFormatter로 재생
+    
+    Args:
+        log_path: 기록 파일 경로
+        concurrency: 동시 실행 수
+        timing: 기록된 LLM 지연 재현 여부
+        speed: 재생 속도 배수 (LLM 지연과 도착 간격 모두에 적용)
+        open_loop: True면 기록된 도착 시각에 맞춰 요청 투입, False면 최대 속도
+        formatter_kwargs: DocumentAutoFormatter 추가 인자 (coalesce 등)
+    
+    Returns:
+        요청 수, 처리량, 지연 백분위, 재생 적중/누락 통계
+    """
+    from src.main import DocumentAutoFormatter
+    
+    requests = load_log(log_path)["request"]
+    formatter = DocumentAutoFormatter(
+        llm_provider_type="replay", log_path=log_path, timing=timing, speed=speed,
+        **(formatter_kwargs or {})
+    )
+    replay_provider = formatter.content_generator.llm_provider
+    while not isinstance(replay_provider, ReplayProvider) and hasattr(replay_provider, "provider"):
+        replay_provider = replay_provider.provider
+    
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    lock = threading.Lock()
+    started = time.perf_counter()
+    
+    def run(record: Dict[str, Any]):
+        if open_loop:
+            delay = record["t"] / speed - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+        request_started = time.perf_counter()
+        try:
+            formatter.build_document(UserInput(**record["input"]))
+        except Exception as e:
+            with lock:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            return
+        with lock:
+            latencies.append((time.perf_counter() - request_started) * 1000)
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(run, requests))
+    duration = time.perf_counter() - started
+    
+    return {
+        "requests": len(requests),
+        "completed": len(latencies),
+        "errors": errors,
+        "concurrency": concurrency,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(latencies) / duration, 3) if duration > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p90": round(percentile(latencies, 90), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(max(latencies), 2) if latencies else 0.0,
+        },
+        "replay": replay_provider.stats() if isinstance(replay_provider, ReplayProvider) else {},
+    }
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """두 벤치마크 결과의 처리량/지연 변화율 (%)"""
+    def change(old: float, new: float) -> float:
+        return round((new - old) / old * 100, 2) if old else 0.0
+    
+    return {
+        "throughput_rps": change(baseline["throughput_rps"], current["throughput_rps"]),
+        "latency_ms": {
+            q: change(baseline["latency_ms"][q], current["latency_ms"][q])
+            for q in ("p50", "p90", "p99", "max")
+        },
+    }
+
+
+def main():
+    """명령행 실행: 기록 재생 벤치마크 (기준 결과와 비교 가능)"""
+    parser = argparse.ArgumentParser(description="LLM 기록 재생 벤치마크")
+    parser.add_argument("log", help="기록 파일 (.jsonl.gz)")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("--speed", type=float, default=1.0, help="재생 속도 배수")
+    parser.add_argument("--no-timing", action="store_true", help="LLM 지연 재현 안 함")
+    parser.add_argument("--open-loop", action="store_true", help="기록된 도착 시각대로 요청 투입")
+    parser.add_argument("--save", help="결과 저장 경로 (JSON)")
+    parser.add_argument("--baseline", help="비교할 이전 결과 (JSON)")
+    args = parser.parse_args()
+    
+    result = replay_benchmark(
+        args.log, args.concurrency, timing=not args.no_timing,
+        speed=args.speed, open_loop=args.open_loop
+    )
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            result["change_pct"] = compare_reports(json.load(f), result)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
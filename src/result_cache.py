@@ -0,0 +1,176 @@
+"""
+Result Cache 모듈
+결정적인 생성 결과(정규화된 입력 + 템플릿 + 버전)를 압축 저장하고 ETag를 제공
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hashlib
+import json
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Optional, Tuple, Dict
+
+from src import __version__
+from src.models import UserInput
+from src.structure_generator import StructureGenerator
+from src.template_engine import corpus_fingerprint
+
+
+# 같은 입력에 항상 같은 결과를 내는 제공자만 캐시 대상
+DETERMINISTIC_PROVIDERS = {"MockLLMProvider", "TemplateLLMProvider"}
+
+
+def make_etag(text: str) -> str:
+    """문서 내용 기반 strong ETag"""
+    return '"' + hashlib.sha256(text.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str, method: str = "GET") -> bool:
+    """
+    If-None-Match 헤더가 ETag와 일치하는지 확인
+    
+    Args:
+        if_none_match: If-None-Match 헤더 값 (쉼표 구분 목록 또는 "*")
+        etag: 현재 ETag
+        method: 요청 메서드 ("*"는 GET/HEAD에서만 일치로 봄, POST 등에서는 무시하고 새로 응답)
+    
+    Returns:
+        일치 여부
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        # "*"는 "표현이 있으면"이라는 뜻이라 GET/HEAD가 아니면 304 의미가 없음 (RFC 9110 13.1.2)
+        return method.upper() in ("GET", "HEAD")
+    # If-None-Match는 약한 비교를 사용하므로 W/ 접두사는 무시
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def _template_fingerprint() -> str:
+    """구조 템플릿과 섹션 문장 코퍼스 내용의 해시 (템플릿 변경 시 캐시 무효화)"""
+    payload = json.dumps(
+        [StructureGenerator.STRUCTURE_TEMPLATES, corpus_fingerprint()],
+        ensure_ascii=False, sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    전체 문서 결과 캐시 (LRU, zlib 압축 저장)
+    
+    키: 정규화된 UserInput + 출력 형식 + 구조 템플릿 + 버전 + 제공자
+    """
+    
+    def __init__(self, max_entries: int = 512, version: str = __version__):
+        """
+        초기화
+        
+        Args:
+            max_entries: 최대 보관 문서 수
+            version: 생성기 버전 (버전이 바뀌면 기존 캐시는 자동으로 빗나감)
+        """
+        self.max_entries = max_entries
+        self.version = version
+        self.template_fingerprint = _template_fingerprint()
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._stored_bytes = 0
+    
+    def make_key(self, user_input: UserInput, provider_name: str = "MockLLMProvider",
+                 format_type: str = "text") -> Optional[str]:
+        """
+        캐시 키 생성
+        
+        Args:
+            user_input: 파싱(정규화)된 사용자 입력
+            provider_name: LLM 제공자 클래스 이름
+            format_type: 출력 형식
+        
+        Returns:
+            캐시 키 (결정적이지 않은 제공자면 None)
+        """
+        if provider_name not in DETERMINISTIC_PROVIDERS:
+            return None
+        raw = "|".join([
+            self.version, self.template_fingerprint, provider_name,
+            format_type, user_input.cache_key()
+        ])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    def get(self, key: Optional[str]) -> Optional[Tuple[str, str]]:
+        """
+        캐시 조회
+        
+        Args:
+            key: make_key()로 만든 키
+        
+        Returns:
+            (문서 문자열, ETag) 또는 None
+        """
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        compressed, etag = entry
+        return zlib.decompress(compressed).decode("utf-8"), etag
+    
+    def put(self, key: Optional[str], text: str) -> str:
+        """
+        캐시 저장
+        
+        Args:
+            key: make_key()로 만든 키 (None이면 저장하지 않음)
+            text: 포맷팅된 문서
+        
+        Returns:
+            문서의 ETag
+        """
+        etag = make_etag(text)
+        if key is None:
+            return etag
+        
+        raw = text.encode("utf-8")
+        compressed = zlib.compress(raw, 6)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._stored_bytes -= len(old[0])
+            self._entries[key] = (compressed, etag)
+            self._stored_bytes += len(compressed)
+            while len(self._entries) > self.max_entries:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._stored_bytes -= len(evicted)
+        return etag
+    
+    def stats(self) -> Dict[str, float]:
+        """캐시 통계"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+                "stored_bytes": self._stored_bytes,
+            }
+
+
+# 프로세스 전역 캐시
+RESULT_CACHE = ResultCache()
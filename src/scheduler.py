@@ -0,0 +1,288 @@
+"""
+Scheduler 모듈
+작업 큐의 다음 작업 선택 정책: 예상 비용 기반 최단 작업 우선(SJF) + 레인별 가중 공정 분배 + 대기 시간 노화(aging)
+
+- 레인: 웹에서 바로 기다리는 interactive, 묶음 처리용 batch
+- 레인 선택: 레인마다 처리한 비용 / 가중치(가상 시간)가 가장 작은 레인 (가중 공정 분배)
+- 레인 안에서: 예상 비용이 작은 작업 우선, 기다린 시간만큼 비용을 깎아 큰 작업도 결국 실행됨
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import heapq
+import json
+import random
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.stats import percentile, split_list
+
+
+LANE_INTERACTIVE = "interactive"
+LANE_BATCH = "batch"
+LANES = (LANE_INTERACTIVE, LANE_BATCH)
+
+# 레인 가중치 ("레인=가중치,..."): 두 레인이 모두 밀려 있을 때 처리 비용을 이 비율로 나눔
+SCHEDULER_WEIGHTS = os.getenv("SCHEDULER_WEIGHTS", "interactive=4,batch=1")
+# 대기 1초마다 깎는 예상 비용 (글자). 기본값이면 A4 50장 작업도 10분 남짓 기다리면 작은 작업보다 앞선다
+SCHEDULER_AGING_CHARS_PER_SEC = float(os.getenv("SCHEDULER_AGING_CHARS_PER_SEC", "150"))
+# 섹션 호출 하나의 고정 비용 (글자 환산, 호출 지연/프롬프트 처리)
+SCHEDULER_SECTION_OVERHEAD_CHARS = float(os.getenv("SCHEDULER_SECTION_OVERHEAD_CHARS", "400"))
+# batch 레인이 동시에 실행할 수 있는 작업 수 (비우면 제한 없음, 워커 풀은 워커 수 - 1로 설정)
+SCHEDULER_BATCH_SLOTS = os.getenv("SCHEDULER_BATCH_SLOTS")
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """
+    레인 가중치 문자열 파싱
+    
+    Args:
+        spec: "interactive=4,batch=1" 형식
+    
+    Returns:
+        레인 → 가중치 (없는 레인은 1.0)
+    """
+    weights = {lane: 1.0 for lane in LANES}
+    for part in spec.split(","):
+        if "=" in part:
+            lane, value = part.split("=", 1)
+            weights[lane.strip()] = max(float(value), 1e-6)
+    return weights
+
+
+def estimate_cost(metadata, structure, only_orders: Optional[Sequence[int]] = None) -> float:
+    """
+    작업 예상 비용 (글자 환산)
+    
+    Args:
+        metadata: DocumentMetadata (target_length_chars)
+        structure: DocumentStructure (섹션 수)
+        only_orders: 생성할 섹션 순서 목록 (None이면 전체)
+    
+    Returns:
+        생성할 글자 수 + 섹션 호출 수 * 섹션 고정 비용
+    """
+    if only_orders is None:
+        chars = metadata.target_length_chars
+        count = len(structure.sections)
+    else:
+        selected = set(only_orders)
+        sections = [s for s in structure.sections if s.order in selected]
+        chars = sum(s.target_length_chars for s in sections)
+        count = len(sections)
+    return section_cost(chars, count)
+
+
+def section_cost(chars: int, sections: int) -> float:
+    """글자 수와 섹션 호출 수로 계산한 예상 비용 (구조 설계 없이 추정할 때도 사용)"""
+    return float(chars + sections * SCHEDULER_SECTION_OVERHEAD_CHARS)
+
+
+class Scheduler:
+    """
+    다음 작업 선택 정책 (상태 없음: 레인 가상 시간과 실행 수는 호출자가 보관)
+    
+    작업 후보는 {"id", "lane", "cost", "created_at"} 딕셔너리.
+    """
+    
+    def __init__(self, weights: Optional[Dict[str, float]] = None,
+                 aging_chars_per_second: Optional[float] = None,
+                 batch_slots: Optional[int] = None):
+        """
+        초기화
+        
+        Args:
+            weights: 레인 → 가중치 (기본: SCHEDULER_WEIGHTS)
+            aging_chars_per_second: 대기 1초당 깎는 비용 (기본: SCHEDULER_AGING_CHARS_PER_SEC)
+            batch_slots: batch 레인 동시 실행 한도 (기본: SCHEDULER_BATCH_SLOTS, 없으면 제한 없음)
+        """
+        self.weights = weights or parse_weights(SCHEDULER_WEIGHTS)
+        self.aging = SCHEDULER_AGING_CHARS_PER_SEC if aging_chars_per_second is None else aging_chars_per_second
+        if batch_slots is None and SCHEDULER_BATCH_SLOTS:
+            batch_slots = int(SCHEDULER_BATCH_SLOTS)
+        self.batch_slots = batch_slots
+    
+    def weight(self, lane: str) -> float:
+        return self.weights.get(lane, 1.0)
+    
+    def rank(self, job: Dict[str, Any], now: float) -> float:
+        """레인 안의 우선순위 (작을수록 먼저): 예상 비용 - 대기 시간 * 노화 속도"""
+        return job["cost"] - max(now - job["created_at"], 0.0) * self.aging
+    
+    def pick(self, candidates: List[Dict[str, Any]], vtimes: Dict[str, float],
+             running: Dict[str, int], now: float) -> Optional[Dict[str, Any]]:
+        """
+        다음 작업 선택
+        
+        Args:
+            candidates: 실행 가능한 작업 후보
+            vtimes: 레인 → 가상 시간 (처리한 비용 / 가중치 누적)
+            running: 레인 → 실행 중인 작업 수
+            now: 현재 시각
+        
+        Returns:
+            선택한 작업 (없으면 None)
+        """
+        by_lane: Dict[str, List[Dict[str, Any]]] = {}
+        for job in candidates:
+            by_lane.setdefault(job["lane"], []).append(job)
+        if self.batch_slots is not None and running.get(LANE_BATCH, 0) >= self.batch_slots:
+            # 남은 워커는 interactive 작업 몫으로 비워 둠
+            by_lane.pop(LANE_BATCH, None)
+        if not by_lane:
+            return None
+        
+        lane = min(by_lane, key=lambda name: (vtimes.get(name, 0.0), -self.weight(name)))
+        return min(by_lane[lane], key=lambda job: (self.rank(job, now), job["created_at"]))
+    
+    def charge(self, vtimes: Dict[str, float], lane: str, cost: float,
+               backlogged: Sequence[str]) -> float:
+        """
+        선택한 작업 비용을 레인 가상 시간에 반영
+        
+        한동안 비어 있던 레인은 밀린 레인 중 최소 가상 시간부터 시작해서
+        쉬는 동안 쌓인 몫으로 다른 레인을 오래 막지 않게 한다.
+        
+        Args:
+            vtimes: 레인 → 가상 시간 (갱신됨)
+            lane: 선택한 작업의 레인
+            cost: 선택한 작업의 예상 비용
+            backlogged: 대기 작업이 있는 레인 목록
+        
+        Returns:
+            갱신된 레인 가상 시간
+        """
+        floor = min((vtimes.get(name, 0.0) for name in backlogged), default=0.0)
+        vtimes[lane] = max(vtimes.get(lane, 0.0), floor) + cost / self.weight(lane)
+        return vtimes[lane]
+
+
+def simulate(policy: str, workers: int = 4, batch_jobs: int = 40, interactive_rate: float = 0.1,
+             duration: float = 600.0, chars_per_second: float = 1000.0, seed: int = 7) -> Dict[str, Any]:
+    """
+    혼합 부하 시뮬레이션 (가상 시간, 실제 LLM 호출 없음)
+    
+    시작 시점에 큰 batch 작업 묶음이 한꺼번에 들어오고, 그 동안 작은 interactive 작업이 계속 도착한다.
+    작업 비용은 실제 분석/구조 설계 결과로 estimate_cost()를 계산해 쓴다.
+    
+    Args:
+        policy: "fifo", "sjf"(레인 구분 없음), "lanes"(SJF + 레인 공정 분배 + batch 슬롯)
+        workers: 워커 수
+        batch_jobs: batch 작업 수
+        interactive_rate: 초당 interactive 작업 도착 수
+        duration: interactive 작업이 도착하는 기간 (초)
+        chars_per_second: 워커 하나의 처리 속도 (글자/초)
+        seed: 난수 시드
+    
+    Returns:
+        레인별 대기 시간 p50/p95/최대, 전체 완료 시각
+    """
+    from src.main import DocumentAutoFormatter
+    
+    formatter = DocumentAutoFormatter(llm_provider_type="mock")
+    costs: Dict[tuple, float] = {}
+    
+    def cost_of(document_type: str, length: str) -> float:
+        if (document_type, length) not in costs:
+            user_input = formatter.input_parser.parse({"topic": "시뮬레이션", "document_type": document_type, "length": length})
+            costs[(document_type, length)] = estimate_cost(*formatter.plan(user_input))
+        return costs[(document_type, length)]
+    
+    rng = random.Random(seed)
+    arrivals = []
+    for i in range(batch_jobs):
+        length = rng.choice(["A4 10장", "A4 25장", "A4 50장"])
+        arrivals.append({"id": f"b{i}", "lane": LANE_BATCH, "cost": cost_of("보고서", length), "created_at": 0.0})
+    t, i = 0.0, 0
+    while True:
+        t += rng.expovariate(interactive_rate)
+        if t > duration:
+            break
+        document_type, length = rng.choice([("논술문", "500자"), ("자기소개서", "1000자"), ("레포트", "A4 2장")])
+        arrivals.append({"id": f"i{i}", "lane": LANE_INTERACTIVE, "cost": cost_of(document_type, length), "created_at": t})
+        i += 1
+    arrivals.sort(key=lambda job: job["created_at"])
+    
+    if policy == "lanes":
+        scheduler = Scheduler(batch_slots=max(1, workers - 1))
+    else:
+        scheduler = Scheduler(weights={lane: 1.0 for lane in LANES})
+    
+    waiting: List[Dict[str, Any]] = []
+    finishing: List[tuple] = []  # (완료 시각, 레인)
+    vtimes: Dict[str, float] = {}
+    running = {lane: 0 for lane in LANES}
+    waits: Dict[str, List[float]] = {lane: [] for lane in LANES}
+    now, next_arrival, end = 0.0, 0, 0.0
+    
+    while next_arrival < len(arrivals) or waiting or finishing:
+        # 다음 사건: 도착 또는 완료
+        arrival_at = arrivals[next_arrival]["created_at"] if next_arrival < len(arrivals) else float("inf")
+        finish_at = finishing[0][0] if finishing else float("inf")
+        now = min(arrival_at, finish_at)
+        if finish_at <= arrival_at:
+            _, lane = heapq.heappop(finishing)
+            running[lane] -= 1
+            end = now
+        else:
+            waiting.append(arrivals[next_arrival])
+            next_arrival += 1
+        
+        while waiting and len(finishing) < workers:
+            if policy == "fifo":
+                job = min(waiting, key=lambda j: j["created_at"])
+            else:
+                candidates = waiting if policy == "lanes" else [dict(j, lane=LANE_BATCH) for j in waiting]
+                job = scheduler.pick(candidates, vtimes, running, now)
+                if job is None:
+                    break
+                job = next(j for j in waiting if j["id"] == job["id"])
+                scheduler.charge(vtimes, job["lane"], job["cost"], {j["lane"] for j in waiting})
+            waiting.remove(job)
+            running[job["lane"]] += 1
+            waits[job["lane"]].append(now - job["created_at"])
+            heapq.heappush(finishing, (now + job["cost"] / chars_per_second, job["lane"]))
+    
+    result: Dict[str, Any] = {"policy": policy, "makespan_s": round(end, 1)}
+    for lane, values in waits.items():
+        result[lane] = {
+            "jobs": len(values),
+            "wait_p50_s": round(percentile(values, 50), 1) if values else None,
+            "wait_p95_s": round(percentile(values, 95), 1) if values else None,
+            "wait_max_s": round(max(values), 1) if values else None,
+        }
+    return result
+
+
+def main():
+    """명령행 실행: 정책별 혼합 부하 시뮬레이션"""
+    parser = argparse.ArgumentParser(description="작업 스케줄러 혼합 부하 시뮬레이션")
+    parser.add_argument("--policies", default="fifo,sjf,lanes")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-jobs", type=int, default=40)
+    parser.add_argument("--interactive-rate", type=float, default=0.1, help="초당 interactive 작업 도착 수")
+    parser.add_argument("--duration", type=float, default=600.0, help="interactive 작업 도착 기간 (초)")
+    parser.add_argument("--chars-per-second", type=float, default=1000.0, help="워커 하나의 처리 속도")
+    parser.add_argument("--json", action="store_true", help="JSON으로 출력")
+    args = parser.parse_args()
+    
+    results = [
+        simulate(policy, args.workers, args.batch_jobs, args.interactive_rate,
+                 args.duration, args.chars_per_second)
+        for policy in split_list(args.policies)
+    ]
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    
+    print(f"{'정책':<8}{'레인':<13}{'작업':>6}{'대기 p50':>10}{'p95':>9}{'최대':>9}{'전체 완료':>11}")
+    for result in results:
+        for lane in LANES:
+            lane_result = result[lane]
+            print(f"{result['policy']:<8}{lane:<13}{lane_result['jobs']:>6}{lane_result['wait_p50_s']:>10}"
+                  f"{lane_result['wait_p95_s']:>9}{lane_result['wait_max_s']:>9}{result['makespan_s']:>11}")
+
+
+if __name__ == "__main__":
+    main()
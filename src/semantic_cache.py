@@ -0,0 +1,298 @@
+"""
+Semantic Cache 모듈
+MinHash/LSH 기반 근사 중복 프롬프트 탐지로 섹션 생성 결과를 재사용 (임베딩 없이 오프라인 동작)
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# 2^31 - 1 (메르센 소수): 31비트 해시와 곱해도 64비트 범위를 넘지 않음
+_PRIME = (1 << 31) - 1
+
+
+def normalize_text(text: str) -> str:
+    """공백 정리 및 소문자화"""
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def char_ngrams(text: str, n: int = 3) -> Set[str]:
+    """문자 n-gram 집합"""
+    if len(text) <= n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def containment(a: str, b: str, n: int = 2) -> float:
+    """짧은 쪽 n-gram이 긴 쪽에 포함되는 비율 (주제 유사도)"""
+    grams_a = char_ngrams(normalize_text(a), n)
+    grams_b = char_ngrams(normalize_text(b), n)
+    if not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / min(len(grams_a), len(grams_b))
+
+
+def jaccard(a: str, b: str, n: int = 3) -> float:
+    """n-gram 집합의 Jaccard 유사도"""
+    grams_a = char_ngrams(normalize_text(a), n)
+    grams_b = char_ngrams(normalize_text(b), n)
+    if not grams_a and not grams_b:
+        return 1.0
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+class MinHasher:
+    """문자 n-gram MinHash 서명 생성기"""
+    
+    def __init__(self, num_perm: int = 64, ngram: int = 3, seed: int = 1):
+        """
+        초기화
+        
+        Args:
+            num_perm: 해시 함수(순열) 수
+            ngram: 문자 n-gram 크기
+            seed: 순열 계수 난수 시드
+        """
+        self.num_perm = num_perm
+        self.ngram = ngram
+        rng = random.Random(seed)
+        self._a = [rng.randrange(1, _PRIME) for _ in range(num_perm)]
+        self._b = [rng.randrange(0, _PRIME) for _ in range(num_perm)]
+        if np is not None:
+            self._a_np = np.array(self._a, dtype=np.uint64)
+            self._b_np = np.array(self._b, dtype=np.uint64)
+    
+    def signature(self, text: str) -> Tuple[int, ...]:
+        """
+        MinHash 서명 계산
+        
+        Args:
+            text: 정규화된 텍스트
+        
+        Returns:
+            길이 num_perm의 서명
+        """
+        hashes = [zlib.crc32(g.encode("utf-8")) & _PRIME for g in char_ngrams(text, self.ngram)]
+        if not hashes:
+            return tuple([_PRIME] * self.num_perm)
+        
+        if np is not None:
+            h = np.array(hashes, dtype=np.uint64)
+            values = (np.outer(h, self._a_np) + self._b_np) % _PRIME
+            return tuple(int(v) for v in values.min(axis=0))
+        
+        return tuple(
+            min((a * h + b) % _PRIME for h in hashes)
+            for a, b in zip(self._a, self._b)
+        )
+    
+    @staticmethod
+    def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        """서명 일치 비율 (Jaccard 추정치)"""
+        same = sum(1 for x, y in zip(sig_a, sig_b) if x == y)
+        return same / len(sig_a)
+
+
+class _Entry:
+    """캐시 항목"""
+    
+    __slots__ = ("namespace", "signature", "topic", "content", "bands")
+    
+    def __init__(self, namespace, signature, topic, content, bands):
+        self.namespace = namespace
+        self.signature = signature
+        self.topic = topic
+        self.content = content
+        self.bands = bands
+
+
+class NearDuplicateSectionCache:
+    """
+    섹션 출력 근사 중복 캐시
+    
+    정규화된 프롬프트의 MinHash 서명을 LSH 밴드로 색인해 후보를 찾고,
+    추정 Jaccard 유사도와 주제 유사도가 모두 임계값 이상이면 캐시된 섹션을
+    주제만 치환하여 반환한다. 일부 적중은 실제 생성 결과와 비교(감사)해
+    오탐률을 기록한다.
+    """
+    
+    def __init__(self, threshold: float = 0.85, topic_threshold: float = 0.6,
+                 num_perm: int = 64, bands: int = 16, ngram: int = 3,
+                 audit_rate: float = 0.05, audit_threshold: float = 0.5,
+                 max_entries: int = 10000, seed: int = 1):
+        """
+        초기화
+        
+        Args:
+            threshold: 프롬프트 추정 Jaccard 유사도 임계값
+            topic_threshold: 주제 n-gram 포함도 임계값 (다른 주제 오적중 방지)
+            num_perm: MinHash 순열 수 (bands로 나누어떨어져야 함)
+            bands: LSH 밴드 수
+            ngram: 문자 n-gram 크기
+            audit_rate: 적중 중 실제 생성과 비교할 비율
+            audit_threshold: 감사 시 출력 유사도가 이보다 낮으면 오탐으로 기록
+            max_entries: 최대 항목 수 (초과 시 오래된 순으로 제거)
+            seed: 해시/감사 난수 시드
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm은 bands로 나누어떨어져야 합니다.")
+        self.threshold = threshold
+        self.topic_threshold = topic_threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.audit_rate = audit_rate
+        self.audit_threshold = audit_threshold
+        self.max_entries = max_entries
+        self.hasher = MinHasher(num_perm, ngram, seed)
+        
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._buckets: Dict[tuple, List[int]] = {}
+        self._next_id = 0
+        self._stats = {
+            "lookups": 0, "hits": 0, "misses": 0,
+            "audited": 0, "false_positives": 0,
+        }
+        self._audit_log: List[Dict[str, object]] = []
+    
+    def get_or_generate(self, prompt: str, section_title: str, topic: str,
+                        generate: Callable[[], str]) -> str:
+        """
+        근사 중복 섹션이 있으면 재사용하고, 없으면 생성 후 저장
+        
+        Args:
+            prompt: 섹션 생성 프롬프트
+            section_title: 섹션 제목 (같은 제목끼리만 비교)
+            topic: 현재 주제 (치환 대상)
+            generate: 캐시 미스 시 호출할 생성 함수
+        
+        Returns:
+            섹션 원시 출력
+        """
+        signature = self.hasher.signature(normalize_text(prompt))
+        match = self._lookup(section_title, signature, topic)
+        
+        if match is None:
+            content = generate()
+            self._store(section_title, signature, topic, content)
+            return content
+        
+        served = self._adapt(match.content, match.topic, topic)
+        if self._should_audit():
+            fresh = generate()
+            self._record_audit(section_title, match.topic, topic, served, fresh)
+            return fresh
+        return served
+    
+    def _lookup(self, namespace: str, signature: Tuple[int, ...], topic: str) -> Optional[_Entry]:
+        """LSH 후보 중 가장 유사한 항목 검색"""
+        best, best_score = None, 0.0
+        with self._lock:
+            self._stats["lookups"] += 1
+            candidates = set()
+            for key in self._band_keys(namespace, signature):
+                candidates.update(self._buckets.get(key, ()))
+            
+            for entry_id in candidates:
+                entry = self._entries[entry_id]
+                score = MinHasher.similarity(signature, entry.signature)
+                if score >= self.threshold and score > best_score \
+                        and containment(entry.topic, topic) >= self.topic_threshold:
+                    best, best_score = entry, score
+            
+            self._stats["hits" if best else "misses"] += 1
+        return best
+    
+    def _store(self, namespace: str, signature: Tuple[int, ...], topic: str, content: str):
+        """항목 저장 및 LSH 색인"""
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            keys = self._band_keys(namespace, signature)
+            self._entries[entry_id] = _Entry(namespace, signature, topic, content, keys)
+            for key in keys:
+                self._buckets.setdefault(key, []).append(entry_id)
+            
+            while len(self._entries) > self.max_entries:
+                old_id, old = self._entries.popitem(last=False)
+                for key in old.bands:
+                    bucket = self._buckets.get(key)
+                    if bucket:
+                        bucket.remove(old_id)
+                        if not bucket:
+                            del self._buckets[key]
+    
+    def _band_keys(self, namespace: str, signature: Tuple[int, ...]) -> List[tuple]:
+        """서명을 밴드 단위 버킷 키로 분할"""
+        return [
+            (namespace, band, signature[band * self.rows:(band + 1) * self.rows])
+            for band in range(self.bands)
+        ]
+    
+    def _adapt(self, content: str, cached_topic: str, topic: str) -> str:
+        """
+        캐시된 섹션의 주제를 현재 주제로 치환
+        
+        앞뒤가 다른 단어로 이어지지 않는 주제 표기만 바꾼다 (뒤에 붙는 조사는 허용, 영문/숫자는 불허).
+        한 번의 치환으로 처리하고 이미 들어 있는 현재 주제 표기는 그대로 두므로, 한 주제가 다른 주제를
+        포함해도("인공지능의 미래" ↔ "인공지능의 미래와 사회적 영향") 결과가 겹치지 않는다.
+        """
+        if not cached_topic or not topic or cached_topic == topic:
+            return content
+        # 긴 표기를 먼저 맞춰 보고, 현재 주제와 일치한 부분은 바꾸지 않음
+        alternatives = sorted((cached_topic, topic), key=len, reverse=True)
+        pattern = r"(?<!\w)(?:" + "|".join(re.escape(t) for t in alternatives) + r")(?![0-9A-Za-z_])"
+        return re.sub(pattern, lambda _: topic, content)
+    
+    def _should_audit(self) -> bool:
+        """감사 대상 여부 (시드 고정 난수)"""
+        with self._lock:
+            return self._rng.random() < self.audit_rate
+    
+    def _record_audit(self, namespace: str, cached_topic: str, topic: str,
+                      served: str, fresh: str):
+        """감사 결과 기록"""
+        similarity = jaccard(served, fresh)
+        false_positive = similarity < self.audit_threshold
+        with self._lock:
+            self._stats["audited"] += 1
+            if false_positive:
+                self._stats["false_positives"] += 1
+                self._audit_log.append({
+                    "section": namespace,
+                    "cached_topic": cached_topic,
+                    "topic": topic,
+                    "similarity": round(similarity, 4),
+                })
+                del self._audit_log[:-100]
+    
+    def stats(self) -> Dict[str, object]:
+        """적중률 및 감사 통계"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["hit_rate"] = round(stats["hits"] / stats["lookups"], 4) if stats["lookups"] else 0.0
+            stats["false_positive_rate"] = (
+                round(stats["false_positives"] / stats["audited"], 4) if stats["audited"] else 0.0
+            )
+            stats["recent_false_positives"] = list(self._audit_log[-10:])
+            return stats
+
+
+# 1이면 서비스 경로(api/)의 생성기가 프로세스 공용 섹션 근사 중복 캐시를 사용 (기본 0: 사용 안 함)
+SEMANTIC_CACHE = int(os.getenv("SEMANTIC_CACHE", "0"))
+
+SECTION_CACHE: Optional[NearDuplicateSectionCache] = NearDuplicateSectionCache() if SEMANTIC_CACHE else None
@@ -0,0 +1,253 @@
+"""
+ASGI 서버 모듈
+Vercel 핸들러(api/index.py, api/jobs.py)와 같은 JSON 규약을 자체 호스팅용 ASGI 앱으로 제공
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Callable, Dict, Optional
+from urllib.parse import parse_qs
+
+from src.cancellation import CancelToken
+
+
+def _default_routes() -> Dict[str, Callable]:
+    """경로 → Vercel 스타일 핸들러 매핑 (/api/jobs는 JOB_QUEUE_PATH가 있을 때만)"""
+    from api.index import handler as index_handler
+    from src.job_queue import queue_configured
+    routes = {"/api": index_handler}
+    if queue_configured():
+        from api.jobs import handler as jobs_handler
+        routes["/api/jobs"] = jobs_handler
+    return routes
+
+
+class DocumentASGIApp:
+    """
+    문서 생성 파이프라인 ASGI 앱
+    
+    - 요청 처리는 비동기, 동기 파이프라인은 제한된 스레드 풀에서 실행
+    - Content-Length를 항상 지정하여 서버의 HTTP keep-alive 유지
+    - 요청 본문 크기 제한 (413)
+    - 종료 시 새 요청을 거절(503)하고 진행 중인 생성이 끝날 때까지 대기
+    - 클라이언트가 연결을 끊으면 요청의 취소 토큰을 취소해 남은 LLM 호출을 중단
+    """
+    
+    def __init__(self, max_workers: int = 8, max_body_bytes: int = 64 * 1024,
+                 drain_timeout: float = 30.0, routes: Optional[Dict[str, Callable]] = None):
+        """
+        초기화
+        
+        Args:
+            max_workers: 동기 파이프라인 실행용 스레드 수
+            max_body_bytes: 요청 본문 최대 크기 (바이트)
+            drain_timeout: 종료 시 진행 중인 요청을 기다리는 최대 시간 (초)
+            routes: 경로 → 핸들러 매핑 (기본: api/index.py, JOB_QUEUE_PATH가 있으면 api/jobs.py)
+        """
+        self.max_workers = max_workers
+        self.max_body_bytes = max_body_bytes
+        self.drain_timeout = drain_timeout
+        self.routes = routes
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight = 0
+        self._draining = False
+        self._drained: Optional[asyncio.Event] = None
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+    
+    async def _lifespan(self, receive, send):
+        """시작/종료 이벤트 처리"""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self._startup()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    
+    def _startup(self):
+        """실행기 및 라우팅 준비"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="generate"
+            )
+        if self.routes is None:
+            self.routes = _default_routes()
+        self._drained = asyncio.Event()
+        self._drained.set()
+    
+    async def shutdown(self):
+        """새 요청을 막고 진행 중인 생성이 끝날 때까지 대기"""
+        self._draining = True
+        if self._drained is not None and self._in_flight:
+            print(f"종료 대기 중: 진행 중인 요청 {self._in_flight}개")
+            try:
+                await asyncio.wait_for(self._drained.wait(), self.drain_timeout)
+            except asyncio.TimeoutError:
+                print(f"경고: {self.drain_timeout}초 내에 끝나지 않은 요청 {self._in_flight}개")
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+    
+    async def _http(self, scope, receive, send):
+        """HTTP 요청 처리"""
+        if self._executor is None:
+            # lifespan을 지원하지 않는 서버에서 실행되는 경우
+            self._startup()
+        
+        if self._draining:
+            await self._send_json(send, 503, {
+                'success': False,
+                'message': '서버가 종료 중입니다.'
+            }, extra_headers=[(b"connection", b"close"), (b"retry-after", b"5")])
+            return
+        
+        path = scope["path"].rstrip("/") or "/"
+        handler = self.routes.get(path)
+        if handler is None:
+            await self._send_json(send, 404, {
+                'success': False,
+                'message': f'경로를 찾을 수 없습니다: {path}'
+            })
+            return
+        
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        if int(headers.get("content-length") or 0) > self.max_body_bytes:
+            await self._send_json(send, 413, {
+                'success': False,
+                'message': f'요청 본문이 너무 큽니다 (최대 {self.max_body_bytes}바이트).'
+            }, extra_headers=[(b"connection", b"close")])
+            return
+        
+        body = await self._read_body(receive)
+        if body is None:
+            await self._send_json(send, 413, {
+                'success': False,
+                'message': f'요청 본문이 너무 큽니다 (최대 {self.max_body_bytes}바이트).'
+            }, extra_headers=[(b"connection", b"close")])
+            return
+        
+        query_string = scope.get("query_string", b"").decode("latin-1")
+        # 클라이언트가 연결을 끊으면 취소되는 토큰 (핸들러가 생성 파이프라인에 전달)
+        cancel_token = CancelToken()
+        request = SimpleNamespace(
+            method=scope["method"],
+            body=body.decode("utf-8") if body else "",
+            headers=headers,
+            url=f"{path}?{query_string}" if query_string else path,
+            query={k: v[0] for k, v in parse_qs(query_string).items()},
+            cancel_token=cancel_token,
+        )
+        
+        self._in_flight += 1
+        self._drained.clear()
+        watcher = asyncio.ensure_future(self._watch_disconnect(receive, cancel_token))
+        try:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(self._executor, handler, request)
+        finally:
+            watcher.cancel()
+            cancel_token.close()
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._drained.set()
+        
+        if cancel_token.cancelled:
+            # 응답을 받을 클라이언트가 없음
+            return
+        
+        await self._send_response(send, response)
+    
+    async def _watch_disconnect(self, receive, cancel_token: CancelToken):
+        """본문을 다 읽은 뒤 http.disconnect가 오면 진행 중인 생성 취소"""
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                cancel_token.cancel("client disconnected")
+                return
+    
+    async def _read_body(self, receive) -> Optional[bytes]:
+        """요청 본문 읽기 (크기 초과 시 None)"""
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_bytes:
+                return None
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+    
+    async def _send_response(self, send, response: dict):
+        """Vercel 스타일 응답 딕셔너리 전송"""
+        body = response.get("body") or ""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        headers = [
+            (k.lower().encode("latin-1"), str(v).encode("latin-1"))
+            for k, v in (response.get("headers") or {}).items()
+            if k.lower() != "content-length"
+        ]
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        await send({
+            "type": "http.response.start",
+            "status": response.get("statusCode", 200),
+            "headers": headers,
+        })
+        await send({"type": "http.response.body", "body": body})
+    
+    async def _send_json(self, send, status: int, payload: dict, extra_headers=None):
+        """JSON 오류 응답 전송"""
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        headers = [
+            (b"content-type", b"application/json; charset=utf-8"),
+            (b"access-control-allow-origin", b"*"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+        ] + (extra_headers or [])
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+app = DocumentASGIApp(
+    max_workers=int(os.getenv("SERVER_MAX_WORKERS", "8")),
+    max_body_bytes=int(os.getenv("SERVER_MAX_BODY_BYTES", str(64 * 1024))),
+)
+
+
+def main():
+    """로컬 ASGI 서버 실행: python src/server.py [포트]"""
+    try:
+        import uvicorn
+    except ImportError:
+        raise ImportError("uvicorn 패키지가 설치되지 않았습니다. pip install uvicorn")
+    
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    uvicorn.run(
+        app,
+        host=os.getenv("SERVER_HOST", "127.0.0.1"),
+        port=port,
+        timeout_keep_alive=int(os.getenv("SERVER_KEEP_ALIVE", "30")),
+        limit_concurrency=int(os.getenv("SERVER_LIMIT_CONCURRENCY", "256")),
+        timeout_graceful_shutdown=int(app.drain_timeout),
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Single-flight 모듈
+동일한 입력에 대한 동시 요청을 하나의 생성 작업으로 합침 (요청 병합)
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from src.cancellation import CancelToken, cancel_scope, current_token
+from src.llm_provider import LLMProvider
+
+
+# 취소 토큰이 있는 대기자가 취소 여부를 확인하는 간격 (초)
+_WAIT_POLL_SECONDS = 0.05
+
+
+class _Call:
+    """진행 중인 호출 하나의 상태"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+        # 공유 작업의 취소 토큰: 참여한 호출자가 모두 취소해야 취소됨
+        self.token = CancelToken()
+        self._lock = threading.Lock()
+        self._participants = []
+        self._detached = False
+        self._unlinks = []
+    
+    def join(self, token: Optional[CancelToken]):
+        """호출자 참여 (토큰이 없는 호출자가 하나라도 있으면 공유 작업은 취소되지 않음)"""
+        with self._lock:
+            if token is None:
+                self._detached = True
+                return
+            self._participants.append(token)
+        self._unlinks.append(token.on_cancel(self._participant_cancelled))
+    
+    def _participant_cancelled(self):
+        with self._lock:
+            if self._detached or not all(t.cancelled for t in self._participants):
+                return
+        self.token.cancel("all callers cancelled")
+    
+    def release(self):
+        for unlink in self._unlinks:
+            unlink()
+        self.token.close()
+
+
+class SingleFlight:
+    """
+    키 단위 single-flight 그룹
+    
+    같은 키로 동시에 들어온 호출 중 첫 번째(leader)만 실제로 실행되고,
+    나머지는 완료를 기다렸다가 같은 결과(또는 예외)를 공유한다.
+    
+    취소: 각 호출자는 자기 토큰이 취소되면 바로 OperationCancelled로 빠져나가고,
+    실제 작업은 모든 호출자가 취소했을 때만 중단된다.
+    """
+    
+    def __init__(self, name: str = ""):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._executed = 0
+        self._shared = 0
+    
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        키에 대해 fn을 한 번만 실행
+        
+        Args:
+            key: 병합 기준 키
+            fn: 실제 작업 (인자 없음)
+        
+        Returns:
+            fn의 반환값 (동시 호출자끼리 공유)
+        """
+        token = current_token()
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and not call.token.cancelled:
+                call.waiters += 1
+                self._shared += 1
+                leader = False
+            else:
+                # 이미 취소된 작업에는 합류하지 않고 새로 실행
+                call = _Call()
+                self._calls[key] = call
+                self._executed += 1
+                leader = True
+            call.join(token)
+        
+        if not leader:
+            if token is None:
+                call.done.wait()
+            else:
+                while not call.done.wait(_WAIT_POLL_SECONDS):
+                    token.check()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            with cancel_scope(call.token):
+                call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.release()
+            call.done.set()
+        
+        return call.result
+    
+    def stats(self) -> Dict[str, int]:
+        """병합 통계 (executed: 실제 실행 수, saved: 절약된 호출 수)"""
+        with self._lock:
+            return {
+                "executed": self._executed,
+                "saved": self._shared,
+                "in_flight": len(self._calls),
+            }
+
+
+# 프로세스 전역 그룹 (요청마다 생성기가 새로 만들어지므로 전역으로 공유)
+DOCUMENT_FLIGHT = SingleFlight("document")
+SECTION_FLIGHT = SingleFlight("section")
+
+
+class CoalescingLLMProvider(LLMProvider):
+    """
+    섹션 프롬프트 단위 요청 병합 래퍼
+    동일한 프롬프트/파라미터의 동시 호출은 한 번만 LLM에 전달된다.
+    스트리밍 호출은 호출자마다 목표 분량에서 스트림을 끊으므로 병합하지 않고 그대로 전달한다.
+    """
+    
+    def __init__(self, provider: LLMProvider, flight: SingleFlight = None):
+        self.provider = provider
+        self.flight = flight or SECTION_FLIGHT
+    
+    @property
+    def supports_streaming(self) -> bool:
+        return getattr(self.provider, "supports_streaming", False)
+    
+    @property
+    def max_section_chars(self):
+        return getattr(self.provider, "max_section_chars", None)
+    
+    def generate(self, prompt: str, **kwargs) -> str:
+        """병합된 텍스트 생성"""
+        key = self._make_key(prompt, kwargs)
+        return self.flight.do(key, lambda: self.provider.generate(prompt, **kwargs))
+    
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """스트리밍 생성 (병합하지 않음)"""
+        return self.provider.generate_stream(prompt, **kwargs)
+    
+    def _make_key(self, prompt: str, kwargs: dict) -> str:
+        """프롬프트 + 파라미터 기반 키 (제공자 종류 포함)"""
+        payload = json.dumps(
+            [type(self.provider).__name__, prompt, kwargs],
+            ensure_ascii=False, sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def coalescing_stats() -> Dict[str, Dict[str, int]]:
+    """전역 병합 통계"""
+    return {
+        "document": DOCUMENT_FLIGHT.stats(),
+        "section": SECTION_FLIGHT.stats(),
+    }
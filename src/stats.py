@@ -0,0 +1,46 @@
+"""
+Stats 모듈
+지표 집계와 벤치마크 명령행에서 함께 쓰는 작은 통계/인자 함수
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import Callable, List, Sequence, TypeVar
+
+
+T = TypeVar("T")
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    백분위 계산 (선형 보간)
+    
+    Args:
+        values: 측정값 목록
+        q: 백분위 (0~100)
+    
+    Returns:
+        백분위 값 (값이 없으면 0.0)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def split_list(text: str, cast: Callable[[str], T] = str) -> List[T]:
+    """
+    쉼표로 구분한 명령행 인자 목록 ("A4 3장,A4 10장", "1,4,16")
+    
+    Args:
+        text: 인자 문자열
+        cast: 항목 변환 함수
+    
+    Returns:
+        빈 항목을 뺀 변환된 목록
+    """
+    return [cast(item.strip()) for item in text.split(",") if item.strip()]
@@ -0,0 +1,142 @@
+"""
+Stream Post-processing 모듈
+LLM 출력 스트림을 조각 단위로 후처리 (제외 내용 제거, 키워드 포함 추적, 목표 분량 도달 시 문장 끝에서 조기 종료)
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import re
+from typing import Dict, List, Sequence
+
+
+# 문장 끝: 마침표/물음표/느낌표 뒤에 공백 또는 줄바꿈
+_SENTENCE_END = re.compile(r"[.!?。](?=\s)")
+
+# ContentGenerator._adjust_length와 같은 보완 문장
+_PADDING = " 이에 대해 더 깊이 있게 살펴보면, 다양한 관점에서 접근할 수 있다. " * 3
+
+
+class StreamPostProcessor:
+    """
+    스트리밍 섹션 후처리기
+    
+    - 제외 내용: 가장 긴 제외어 길이 - 1 만큼만 보류하고 나머지는 바로 내보냄 (조각 경계를 넘는 일치도 제거)
+    - 키워드: 실제로 내보낸 텍스트에서 조각 경계를 넘어 온라인으로 포함 여부 추적 (분량 한도로 잘린 부분은 제외)
+    - 분량: 목표 분량에 도달한 뒤 첫 문장 끝에서 종료 (done=True면 상위 생성을 중단해도 됨)
+    """
+    
+    def __init__(self, target_length: int, keywords: Sequence[str] = (),
+                 excluded: Sequence[str] = (), hard_ratio: float = 1.2):
+        """
+        초기화
+        
+        Args:
+            target_length: 목표 글자 수
+            keywords: 반드시 포함할 키워드
+            excluded: 제거할 내용
+            hard_ratio: 문장 끝을 찾지 못할 때 강제로 자르는 분량 비율
+        """
+        self.target_length = target_length
+        self.hard_limit = int(target_length * hard_ratio)
+        self.excluded = [item for item in excluded if item]
+        self.keywords = list(keywords)
+        self.done = False
+        
+        self._missing = [kw for kw in self.keywords if kw]
+        self._kw_tail_size = max((len(kw) for kw in self._missing), default=1) - 1
+        self._kw_tail = ""
+        self._hold = max((len(item) for item in self.excluded), default=1) - 1
+        self._pending = ""
+        self._emitted = 0
+        self._raw_chars = 0
+    
+    def _track_keywords(self, chunk: str):
+        """내보낸 조각에서 키워드 포함 여부 갱신"""
+        if not self._missing:
+            return
+        window = self._kw_tail + chunk
+        self._missing = [kw for kw in self._missing if kw not in window]
+        if self._kw_tail_size:
+            self._kw_tail = window[-self._kw_tail_size:]
+    
+    def _remove_excluded(self, text: str) -> str:
+        for item in self.excluded:
+            text = text.replace(item, "")
+        return text
+    
+    def _emit(self, ready: str, final: bool = False) -> str:
+        """분량 한도를 적용해 내보낼 부분 결정"""
+        if self.done or not ready:
+            return ""
+        if self._emitted + len(ready) >= self.target_length:
+            start = max(self.target_length - self._emitted - 1, 0)
+            match = _SENTENCE_END.search(ready, start)
+            if match is not None and self._emitted + match.end() <= self.hard_limit:
+                ready = ready[:match.end()]
+                self.done = True
+            elif final and self._emitted + len(ready) <= self.hard_limit:
+                self.done = True
+            elif self._emitted + len(ready) >= self.hard_limit:
+                ready = ready[:self.hard_limit - self._emitted]
+                self.done = True
+        self._emitted += len(ready)
+        self._track_keywords(ready)
+        return ready
+    
+    def feed(self, chunk: str) -> str:
+        """
+        스트림 조각 처리
+        
+        Args:
+            chunk: LLM 출력 조각
+        
+        Returns:
+            바로 내보낼 수 있는 후처리된 텍스트 (보류분 제외)
+        """
+        if self.done or not chunk:
+            return ""
+        self._raw_chars += len(chunk)
+        
+        self._pending = self._remove_excluded(self._pending + chunk)
+        if self._hold:
+            ready, self._pending = self._pending[:-self._hold], self._pending[-self._hold:]
+        else:
+            ready, self._pending = self._pending, ""
+        return self._emit(ready)
+    
+    def finish(self) -> str:
+        """
+        스트림 종료 처리 (보류분, 누락 키워드 보완, 분량 부족 보완)
+        
+        Returns:
+            마지막으로 내보낼 텍스트
+        """
+        tail = ""
+        if not self.done:
+            tail = self._emit(self._remove_excluded(self._pending), final=True)
+        self._pending = ""
+        self.done = True
+        
+        if self._missing:
+            addition = f" 또한, {', '.join(self._missing)}에 대해서도 고려할 필요가 있다."
+            addition = self._remove_excluded(addition)
+            tail += addition
+            self._emitted += len(addition)
+        
+        if self._emitted < self.target_length * 0.7:
+            padding = _PADDING
+            if self._emitted + len(padding) > self.target_length * 1.3:
+                padding = padding[:max(int(self.target_length * 1.2) - self._emitted, 0)]
+            tail += padding
+            self._emitted += len(padding)
+        return tail
+    
+    @property
+    def missing_keywords(self) -> List[str]:
+        """아직 나오지 않은 키워드"""
+        return list(self._missing)
+    
+    def stats(self) -> Dict[str, int]:
+        """원시 수신/출력 글자 수"""
+        return {"raw_chars": self._raw_chars, "emitted_chars": self._emitted}
@@ -11,6 +11,7 @@ from src.models import (
     DocumentStructure, Section, DocumentMetadata,
     DocumentType, DocumentPurpose
 )
+from src.context_memory import CONTEXT_PARALLEL, group_dependencies
 
 
 class StructureGenerator:
@@ -72,7 +73,8 @@ class StructureGenerator:
         },
     }
     
-    def generate(self, document_type: str, metadata: DocumentMetadata, topic: str) -> DocumentStructure:
+    def generate(self, document_type: str, metadata: DocumentMetadata, topic: str,
+                 merge_subsections: bool = False) -> DocumentStructure:
         """
         문서 구조 생성
         
@@ -80,6 +82,7 @@ class StructureGenerator:
             document_type: 문서 종류
             metadata: 문서 메타데이터
             topic: 주제
+            merge_subsections: 서브섹션을 상위 섹션 하나로 합칠지 여부 (과부하 시 섹션 호출 수 감소)
         
         Returns:
             DocumentStructure 객체
@@ -89,14 +92,16 @@ class StructureGenerator:
         
         # 섹션 생성
         sections = []
+        groups = []  # 상위 섹션별 order 목록 (문맥 의존 관계용)
         order = 1
         
         for section_def in template["sections"]:
             # 메인 섹션
             section_length = int(metadata.target_length_chars * section_def["ratio"])
+            groups.append([])
             
             # 서브섹션이 있는 경우
-            if section_def["title"] in template.get("subsections", {}):
+            if section_def["title"] in template.get("subsections", {}) and not merge_subsections:
                 subsections = template["subsections"][section_def["title"]]
                 for subsec_def in subsections:
                     subsec_length = int(section_length * subsec_def["ratio"])
@@ -107,6 +112,7 @@ class StructureGenerator:
                         target_length_chars=subsec_length,
                         order=order
                     ))
+                    groups[-1].append(order)
                     order += 1
             else:
                 sections.append(Section(
@@ -116,6 +122,7 @@ class StructureGenerator:
                     target_length_chars=section_length,
                     order=order
                 ))
+                groups[-1].append(order)
                 order += 1
         
         # 목차 생성
@@ -123,9 +130,28 @@ class StructureGenerator:
         
         return DocumentStructure(
             sections=sections,
-            outline=outline
+            outline=outline,
+            # 축소 문맥 동시 생성은 선택 사항 (기본은 앞의 모든 섹션을 문맥으로 순서대로 생성)
+            dependencies=group_dependencies(groups) if CONTEXT_PARALLEL else {}
         )
     
+    def section_count(self, document_type: str, merge_subsections: bool = False) -> int:
+        """
+        생성될 섹션 수 (구조를 만들지 않고 템플릿만으로 계산, 부하 제어/비용 추정용)
+        
+        Args:
+            document_type: 문서 종류
+            merge_subsections: 서브섹션을 상위 섹션으로 합친 구조 기준 여부
+        
+        Returns:
+            섹션 수 (합치지 않으면 서브섹션 수로 셈)
+        """
+        template = self._get_template(document_type)
+        if merge_subsections:
+            return len(template["sections"])
+        subsections = template.get("subsections", {})
+        return sum(len(subsections.get(s["title"], [])) or 1 for s in template["sections"])
+    
     def _get_template(self, document_type: str) -> dict:
         """문서 유형에 맞는 템플릿 가져오기"""
         if document_type in self.STRUCTURE_TEMPLATES:
@@ -0,0 +1,740 @@
+"""
+Template Engine 모듈
+LLM 없이 섹션 템플릿 코퍼스로 실제 문장을 생성하는 오프라인 생성 엔진
+
+- 색인: (섹션 제목, 문서 종류, 제출 대상 그룹, 문체) → 컴파일된 템플릿 (시작 시 한 번 구성, 조회는 dict 한 번)
+- 치환: 선택한 문장을 이어 붙인 뒤 format_map 한 번으로 주제/키워드/조사 자리 채움
+- 분량: 문장별 글자 수를 미리 계산해 목표 분량에 도달할 때까지 문장 단위로 확장
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import re
+import threading
+import zlib
+from functools import lru_cache
+from string import Formatter
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.llm_provider import LLMProvider
+from src.models import DocumentType, Section, TargetAudience, UserInput, WritingStyle
+
+
+# 섹션 제목별 문장 코퍼스
+# - lead: 섹션 첫 문장들 (항상 사용)
+# - body: 분량 확장 문장 (순서대로 사용)
+# - 문서 종류 값 또는 제출 대상 그룹("school", "work")을 키로 lead/body 덮어쓰기
+# 자리 표시: {topic}, {topic_은}/{topic_을}/{topic_이}/{topic_과}/{topic_으로}(조사 포함), {doc}, {audience}
+SECTION_TEMPLATES: Dict[str, dict] = {
+    "연구 배경": {
+        "lead": [
+            "최근 {topic_은} 사회 전반에서 꾸준히 관심을 받고 있는 주제이다.",
+            "기술과 제도, 생활 방식이 빠르게 바뀌면서 {topic_을} 둘러싼 질문도 점점 다양해지고 있다.",
+        ],
+        "body": [
+            "특히 관련 사례가 늘어나면서 {topic}에 대한 막연한 인식만으로는 현상을 설명하기 어려워졌다.",
+            "언론과 학계에서도 {topic_을} 다루는 논의가 늘고 있지만, 핵심 개념과 쟁점을 한눈에 정리한 자료는 많지 않다.",
+            "이러한 상황은 {topic_을} 체계적으로 살펴볼 필요성을 보여 준다.",
+            "또한 {topic_은} 개인의 선택뿐 아니라 공동체의 규칙과도 맞닿아 있어 다양한 관점의 검토가 필요하다.",
+            "이 글은 이러한 문제의식에서 출발하여 {topic}의 현재 모습을 차근차근 짚어 보고자 한다.",
+        ],
+        DocumentType.EXPERIMENT_REPORT.value: {
+            "lead": [
+                "이 실험은 {topic}에 관한 현상을 직접 관찰하고 측정하기 위해 계획되었다.",
+                "교재에서 배운 원리가 실제 조건에서도 그대로 나타나는지 확인하는 것이 출발점이다.",
+            ],
+        },
+        DocumentType.BOOK_REVIEW.value: {
+            "lead": [
+                "이 책을 읽게 된 계기는 {topic}에 대한 평소의 궁금증이었다.",
+                "제목만 보았을 때는 익숙한 이야기라고 생각했지만, 책장을 넘길수록 새로운 질문이 생겨났다.",
+            ],
+        },
+        "school": {
+            "lead": [
+                "요즘 주변에서 {topic}에 대한 이야기를 자주 듣게 된다.",
+                "뉴스나 수업 시간에 {topic_이} 등장할 때마다 정확히 무엇을 뜻하는지 궁금해졌다.",
+            ],
+        },
+    },
+    "연구 목적": {
+        "lead": [
+            "이 글의 목적은 {topic}의 핵심 개념과 주요 쟁점을 정리하고 그 의미를 분석하는 데 있다.",
+            "이를 통해 {topic_을} 바라보는 균형 잡힌 시각을 마련하고자 한다.",
+        ],
+        "body": [
+            "먼저 {topic}의 정의와 범위를 분명히 하여 이후 논의의 기준을 세운다.",
+            "다음으로 {topic_과} 관련된 대표적인 사례를 살펴보며 실제로 어떤 변화가 나타나는지 확인한다.",
+            "마지막으로 분석 결과를 바탕으로 앞으로의 과제와 시사점을 제시한다.",
+            "이러한 과정은 {topic}에 대한 단편적인 이해를 넘어 구조적인 이해로 나아가는 데 도움이 된다.",
+        ],
+        DocumentType.EXPERIMENT_REPORT.value: {
+            "lead": [
+                "이 실험의 목적은 {topic}에 영향을 주는 변인을 확인하고 그 관계를 정량적으로 살펴보는 것이다.",
+                "측정값을 이론값과 비교하여 차이가 생기는 원인도 함께 검토한다.",
+            ],
+        },
+        DocumentType.BOOK_REVIEW.value: {
+            "lead": [
+                "이 감상문에서는 책이 {topic_을} 어떻게 그려 내는지 살펴보고 나의 생각을 정리하고자 한다.",
+                "인상 깊었던 장면과 문장을 중심으로 작가의 의도를 짚어 본다.",
+            ],
+        },
+    },
+    "이론적 배경": {
+        "lead": [
+            "{topic_을} 이해하려면 먼저 그 바탕이 되는 개념과 이론을 살펴볼 필요가 있다.",
+            "{topic}에 관한 기존 논의는 크게 개념 정의, 작동 원리, 영향 요인의 세 갈래로 정리할 수 있다.",
+        ],
+        "body": [
+            "개념 정의의 측면에서 {topic_은} 보는 관점에 따라 조금씩 다르게 설명된다.",
+            "작동 원리의 측면에서는 여러 요인이 서로 영향을 주고받는 과정으로 {topic_을} 이해하는 시각이 일반적이다.",
+            "영향 요인으로는 기술적 조건, 제도적 환경, 사람들의 인식이 주로 거론된다.",
+            "이러한 이론적 틀은 이후의 분석에서 현상을 해석하는 기준으로 활용된다.",
+            "다만 이론은 현실을 단순화한 설명이므로 구체적인 사례와 함께 검토하는 것이 바람직하다.",
+        ],
+        DocumentType.EXPERIMENT_REPORT.value: {
+            "lead": [
+                "이 실험은 {topic}에 관한 기본 원리를 바탕으로 설계되었다.",
+                "이론에 따르면 조건을 바꿀 때 측정값도 일정한 방향으로 변해야 한다.",
+            ],
+        },
+        DocumentType.BOOK_REVIEW.value: {
+            "lead": [
+                "책의 내용을 이해하려면 작가가 {topic_을} 다루게 된 시대적 배경을 먼저 살펴볼 필요가 있다.",
+                "작가는 당시 사회의 분위기와 자신의 경험을 바탕으로 이야기를 풀어 나간다.",
+            ],
+        },
+    },
+    "주요 내용 분석": {
+        "lead": [
+            "이제 {topic}의 주요 내용을 구체적으로 분석해 본다.",
+            "{topic_은} 여러 요소가 맞물려 있어 한 가지 측면만으로 설명하기 쉽지 않다.",
+        ],
+        "body": [
+            "첫째, {topic_은} 개인의 일상과 선택에 직접적인 영향을 준다.",
+            "둘째, {topic_은} 조직과 사회의 운영 방식에도 변화를 가져온다.",
+            "셋째, 이러한 변화는 새로운 기회를 만드는 동시에 해결해야 할 과제도 함께 남긴다.",
+            "세 가지 측면은 서로 밀접하게 연결되어 있으므로 종합적으로 이해해야 한다.",
+            "또한 {topic}에 대해서는 효율을 중시하는 관점과 형평을 중시하는 관점이 함께 존재한다.",
+            "두 관점의 차이를 이해하면 {topic_을} 둘러싼 논쟁의 구조가 더 분명하게 보인다.",
+        ],
+        DocumentType.EXPERIMENT_REPORT.value: {
+            "lead": [
+                "측정 결과를 정리하면 {topic}에 관한 변화가 조건에 따라 뚜렷하게 나타났다.",
+                "반복 측정값의 평균을 기준으로 결과를 비교하였다.",
+            ],
+        },
+        DocumentType.BOOK_REVIEW.value: {
+            "lead": [
+                "책에서 가장 인상 깊었던 부분은 {topic_을} 바라보는 인물들의 서로 다른 태도였다.",
+                "작가는 각 인물의 선택을 통해 독자에게 쉽게 답할 수 없는 질문을 던진다.",
+            ],
+        },
+    },
+    "사례 및 적용": {
+        "lead": [
+            "앞의 분석을 구체적인 사례에 적용해 보면 {topic}의 의미가 더 분명해진다.",
+            "실제 현장에서는 {topic_이} 예상과 다른 방식으로 나타나기도 한다.",
+        ],
+        "body": [
+            "한 사례에서는 {topic_을} 도입한 뒤 업무 처리 시간이 줄고 만족도가 높아졌다.",
+            "반면 다른 사례에서는 준비가 부족한 상태에서 도입하여 오히려 혼란이 커지기도 하였다.",
+            "두 사례의 차이는 충분한 사전 준비와 구성원 간의 소통 여부에서 비롯된다.",
+            "이는 {topic_이} 성공하려면 기술뿐 아니라 운영 방식도 함께 바뀌어야 함을 보여 준다.",
+            "따라서 {topic_을} 적용할 때에는 현장의 조건을 먼저 점검하는 과정이 필요하다.",
+        ],
+        DocumentType.EXPERIMENT_REPORT.value: {
+            "lead": [
+                "실험 결과를 일상 사례에 적용해 보면 {topic}의 원리를 쉽게 확인할 수 있다.",
+                "측정값과 이론값의 차이는 실험 환경의 오차에서 비롯된 것으로 보인다.",
+            ],
+        },
+        DocumentType.BOOK_REVIEW.value: {
+            "lead": [
+                "책의 메시지를 나의 생활에 비추어 보면 {topic}에 대한 생각이 조금 달라진다.",
+                "비슷한 상황에서 나라면 어떤 선택을 했을지 스스로 묻게 된다.",
+            ],
+        },
+    },
+    "요약": {
+        "lead": [
+            "지금까지 {topic}의 배경과 주요 내용, 사례를 차례로 살펴보았다.",
+            "논의를 정리하면 {topic_은} 여러 요인이 함께 작용하는 복합적인 현상이라고 할 수 있다.",
+        ],
+        "body": [
+            "개념과 이론을 통해 {topic}의 기본 구조를 확인하였다.",
+            "주요 내용 분석에서는 개인, 조직, 사회의 측면에서 나타나는 변화를 정리하였다.",
+            "사례를 통해서는 같은 제도라도 운영 방식에 따라 결과가 달라진다는 점을 확인하였다.",
+            "이러한 결과는 {topic_을} 단순한 찬반의 문제로 보기 어렵다는 점을 보여 준다.",
+        ],
+        DocumentType.BOOK_REVIEW.value: {
+            "lead": [
+                "이 책은 {topic_을} 통해 우리가 당연하게 여기던 생각을 다시 돌아보게 한다.",
+                "인물들의 선택과 그 결과는 오래도록 여운을 남긴다.",
+            ],
+        },
+    },
+    "향후 전망": {
+        "lead": [
+            "앞으로 {topic_은} 더 넓은 분야로 확산될 것으로 예상된다.",
+            "이에 따라 제도적 기반을 마련하고 사회적 합의를 이루는 일이 더욱 중요해질 것이다.",
+        ],
+        "body": [
+            "단기적으로는 현장의 경험을 모아 구체적인 기준을 만드는 일이 필요하다.",
+            "장기적으로는 {topic}에 관한 교육과 연구를 꾸준히 이어 가야 한다.",
+            "또한 변화의 혜택과 부담이 한쪽으로 쏠리지 않도록 살피는 노력이 필요하다.",
+            "{topic}에 대한 지속적인 관심과 점검이 이루어질 때 긍정적인 효과를 키울 수 있다.",
+        ],
+        DocumentType.BOOK_REVIEW.value: {
+            "lead": [
+                "책을 덮은 뒤에도 {topic}에 대한 질문은 계속 남아 있다.",
+                "앞으로 비슷한 주제를 다룬 다른 책도 찾아 읽으며 생각을 넓혀 가고 싶다.",
+            ],
+        },
+    },
+    "배경": {
+        "lead": [
+            "최근 {topic_과} 관련된 업무 환경이 빠르게 변화하고 있다.",
+            "이에 따라 현재 방식을 점검하고 개선 방향을 검토할 필요가 생겼다.",
+        ],
+        "body": [
+            "내부적으로는 처리량이 늘면서 기존 절차의 한계가 드러나고 있다.",
+            "외부적으로는 관련 기준과 이용자의 기대 수준이 함께 높아지고 있다.",
+            "본 보고서는 이러한 배경에서 {topic}의 현황을 정리하고 대응 방안을 제시한다.",
+        ],
+    },
+    "문제점 분석": {
+        "lead": [
+            "현재 {topic_과} 관련하여 확인된 주요 문제점은 다음과 같다.",
+            "첫째, 업무 절차가 부서별로 달라 처리 기준이 일관되지 않다.",
+        ],
+        "body": [
+            "둘째, 필요한 정보가 여러 곳에 흩어져 있어 확인에 많은 시간이 걸린다.",
+            "셋째, 문제 발생 시 책임 범위가 분명하지 않아 대응이 늦어진다.",
+            "이러한 문제는 서로 연결되어 있어 하나만 개선해서는 효과가 제한적이다.",
+            "따라서 절차, 정보, 책임 구조를 함께 살펴보는 접근이 필요하다.",
+        ],
+    },
+    "상세 분석": {
+        "lead": [
+            "앞에서 제시한 문제점을 원인별로 자세히 분석하였다.",
+            "분석 결과 {topic_과} 관련된 문제는 대부분 절차 설계와 정보 공유 방식에서 비롯된다.",
+        ],
+        "body": [
+            "절차 측면에서는 승인 단계가 많아 처리 기간이 길어지는 경향이 있다.",
+            "정보 측면에서는 자료 형식이 통일되지 않아 중복 작업이 자주 발생한다.",
+            "인력 측면에서는 담당자의 경험에 따라 처리 품질의 차이가 크다.",
+            "이러한 원인은 개선 우선순위를 정하는 기준으로 활용할 수 있다.",
+        ],
+    },
+    "해결 방안": {
+        "lead": [
+            "분석 결과를 바탕으로 다음과 같은 해결 방안을 제안한다.",
+            "첫째, {topic_과} 관련된 업무 절차를 표준화하여 처리 기준을 통일한다.",
+        ],
+        "body": [
+            "둘째, 흩어진 자료를 한곳에서 확인할 수 있도록 공유 체계를 마련한다.",
+            "셋째, 단계별 책임자를 지정하여 문제 발생 시 신속하게 대응한다.",
+            "각 방안은 시범 적용을 거쳐 효과를 확인한 뒤 단계적으로 확대한다.",
+            "추진 과정에서는 현장의 의견을 수렴하여 세부 내용을 보완한다.",
+        ],
+    },
+    "기대 효과": {
+        "lead": [
+            "제안한 방안을 시행하면 {topic_과} 관련된 업무의 효율과 신뢰도가 함께 높아질 것으로 기대된다.",
+        ],
+        "body": [
+            "처리 기간이 줄어들어 이용자의 만족도가 향상된다.",
+            "표준화된 절차를 통해 담당자 간 품질 차이가 감소한다.",
+            "축적된 자료는 이후 정책 결정과 개선 작업의 근거로 활용할 수 있다.",
+        ],
+    },
+    "주장 제시": {
+        "lead": [
+            "{topic}에 대해서는 다양한 의견이 있지만, 나는 적극적인 대응이 필요하다고 주장한다.",
+            "지금의 선택이 앞으로의 변화 방향을 결정하기 때문이다.",
+        ],
+        "body": [
+            "이 글에서는 두 가지 근거를 통해 주장을 뒷받침하고, 예상되는 반론에도 답하고자 한다.",
+        ],
+    },
+    "근거 1": {
+        "lead": [
+            "첫 번째 근거는 {topic_이} 우리 삶에 미치는 영향이 이미 크다는 점이다.",
+            "이미 나타난 변화를 외면하면 그 비용은 결국 모두가 나누어 지게 된다.",
+        ],
+        "body": [
+            "실제로 여러 분야에서 {topic_과} 관련된 변화가 보고되고 있다.",
+            "이러한 변화는 시간이 지날수록 되돌리기 어려워진다.",
+            "따라서 문제가 커지기 전에 대응하는 것이 합리적이다.",
+            "미리 준비한 사회와 그렇지 않은 사회의 차이는 시간이 갈수록 벌어진다.",
+        ],
+    },
+    "근거 2": {
+        "lead": [
+            "두 번째 근거는 적극적인 대응이 새로운 기회를 만든다는 점이다.",
+            "{topic_을} 잘 활용하면 기존에 해결하기 어려웠던 문제에 새로운 해법을 찾을 수 있다.",
+        ],
+        "body": [
+            "변화에 먼저 대응한 사례에서는 비용이 줄고 성과가 높아지는 결과가 나타났다.",
+            "이는 대응의 시기와 방식이 결과를 크게 좌우한다는 점을 보여 준다.",
+            "결국 적극적인 대응은 위험을 줄이는 동시에 가능성을 넓히는 선택이다.",
+        ],
+    },
+    "반론 및 재반박": {
+        "lead": [
+            "물론 {topic}에 대한 적극적인 대응이 성급하다는 반론도 있다.",
+            "충분한 검증 없이 추진하면 예상하지 못한 부작용이 생길 수 있다는 지적이다.",
+        ],
+        "body": [
+            "이 지적은 타당한 면이 있지만, 대응을 미루는 것의 위험도 함께 고려해야 한다.",
+            "검증과 대응은 서로 배타적인 것이 아니라 함께 진행할 수 있다.",
+            "단계적으로 시행하며 결과를 점검하면 부작용을 줄이면서 변화에 대응할 수 있다.",
+            "따라서 반론은 대응을 멈출 이유가 아니라 더 신중하게 추진해야 할 이유가 된다.",
+        ],
+    },
+    "결론": {
+        "lead": [
+            "이상의 논의를 통해 {topic}에 대한 적극적이고 신중한 대응이 필요함을 살펴보았다.",
+            "변화를 피하기보다 준비된 자세로 맞이할 때 더 나은 결과를 얻을 수 있다.",
+        ],
+        "body": [
+            "앞으로도 {topic}에 대한 관심을 이어 가며 사회적 논의를 넓혀 가야 한다.",
+            "개인과 공동체가 각자의 자리에서 할 수 있는 일을 찾는 것이 그 출발점이다.",
+        ],
+    },
+    "기획 배경": {
+        "lead": [
+            "최근 {topic}에 대한 수요가 꾸준히 늘고 있다.",
+            "그러나 현재 제공되는 서비스는 이러한 수요를 충분히 반영하지 못하고 있다.",
+        ],
+        "body": [
+            "이용자 의견을 살펴보면 접근성과 편의성에 대한 개선 요구가 특히 많다.",
+            "본 기획은 이러한 요구에 대응하여 {topic_과} 관련된 새로운 방안을 제시하기 위해 마련되었다.",
+        ],
+    },
+    "현황 분석": {
+        "lead": [
+            "{topic_과} 관련된 현재 상황을 대상, 환경, 경쟁 측면에서 분석하였다.",
+            "주요 이용자층은 빠르고 간편한 방식을 선호하는 것으로 나타났다.",
+        ],
+        "body": [
+            "환경 측면에서는 관련 기술과 제도가 빠르게 정비되고 있다.",
+            "경쟁 측면에서는 유사한 시도가 있지만 차별화된 경험을 제공하는 사례는 많지 않다.",
+            "이러한 현황은 본 기획이 시장에서 자리 잡을 수 있는 여지가 있음을 보여 준다.",
+        ],
+    },
+    "기획 내용": {
+        "lead": [
+            "본 기획의 핵심은 {topic_을} 이용자 중심으로 재구성하는 것이다.",
+            "이를 위해 세 가지 세부 과제를 추진한다.",
+        ],
+        "body": [
+            "첫째, 이용 절차를 단순화하여 누구나 쉽게 참여할 수 있도록 한다.",
+            "둘째, 이용자의 의견을 모으는 창구를 마련하여 서비스를 지속적으로 개선한다.",
+            "셋째, 관련 기관과 협력하여 필요한 자원과 정보를 함께 활용한다.",
+            "각 과제는 명확한 목표와 담당자를 두고 일정에 맞춰 진행한다.",
+            "운영 과정에서 얻은 자료는 성과 점검과 다음 단계 계획에 반영한다.",
+        ],
+    },
+    "예상 효과": {
+        "lead": [
+            "본 기획이 실행되면 {topic_과} 관련된 이용자 경험이 크게 개선될 것으로 예상된다.",
+        ],
+        "body": [
+            "절차가 간소화되어 참여율이 높아지고 운영 비용은 절감된다.",
+            "이용자 의견이 꾸준히 반영되어 서비스의 신뢰도가 향상된다.",
+            "협력 체계를 통해 다른 사업으로 확장할 수 있는 기반도 마련된다.",
+        ],
+    },
+    "실행 계획": {
+        "lead": [
+            "본 기획은 준비, 시범 운영, 확대의 세 단계로 추진한다.",
+        ],
+        "body": [
+            "준비 단계에서는 세부 계획을 확정하고 필요한 인력과 예산을 확보한다.",
+            "시범 운영 단계에서는 일부 대상에게 먼저 적용하여 효과를 점검한다.",
+            "확대 단계에서는 점검 결과를 반영하여 전체 대상으로 넓혀 간다.",
+        ],
+    },
+}
+
+# 코퍼스에 없는 섹션 제목용 기본 템플릿
+DEFAULT_TEMPLATE = {
+    "lead": [
+        "이 절에서는 {topic}의 {title}에 대해 살펴본다.",
+        "{topic_은} 여러 측면에서 검토할 만한 가치가 있는 주제이다.",
+    ],
+    "body": [
+        "먼저 핵심 내용을 정리하고, 이어서 구체적인 예를 통해 의미를 확인한다.",
+        "이 과정에서 서로 다른 관점을 비교하면 {topic_을} 더 입체적으로 이해할 수 있다.",
+        "정리한 내용은 다음 절의 논의와 자연스럽게 이어진다.",
+    ],
+}
+
+# 제출 대상 그룹별 문장 (첫 섹션에서 한 번 사용)
+AUDIENCE_SENTENCES = {
+    "school": "쉽게 말해 {topic_은} 우리 생활과 가까운 곳에서 이미 영향을 주고 있는 주제이다.",
+    "academic": "학술적으로도 {topic_은} 여러 분야에서 꾸준히 논의되어 온 주제이다.",
+    "work": "실무 관점에서 {topic_은} 비용과 성과에 직접적인 영향을 주는 사안이다.",
+}
+
+# 문체별 문장 (두 번째 섹션에서 한 번 사용)
+STYLE_SENTENCES = {
+    WritingStyle.ARGUMENTATIVE.value: "이러한 점에서 {topic}에 대한 분명한 입장을 세우는 것이 중요하다.",
+    WritingStyle.ACADEMIC.value: "선행 논의를 종합하면 {topic}에 대한 이해는 개념, 맥락, 영향의 세 층위에서 이루어져야 한다.",
+    WritingStyle.NARRATIVE.value: "이야기의 흐름을 따라가다 보면 {topic}의 변화 과정이 자연스럽게 드러난다.",
+    WritingStyle.EXPLANATORY.value: "이해를 돕기 위해 {topic}의 주요 요소를 하나씩 설명하면 다음과 같다.",
+}
+
+# 분량이 모자랄 때 이어 쓰는 공통 확장 문장
+ELABORATION_SENTENCES = [
+    "이 점은 {topic}의 다른 측면과 함께 살펴볼 때 더 분명하게 드러난다.",
+    "구체적인 예를 들어 보면 그 의미를 더 쉽게 이해할 수 있다.",
+    "여기서 중요한 것은 현상의 원인과 결과를 구분하여 살펴보는 일이다.",
+    "이러한 흐름은 앞으로도 한동안 이어질 것으로 보인다.",
+    "관련 자료를 비교해 보면 변화의 방향이 비교적 일관되게 나타난다.",
+    "다만 상황에 따라 결과가 달라질 수 있으므로 일반화에는 주의가 필요하다.",
+    "이를 위해서는 다양한 이해관계자의 의견을 함께 듣는 과정이 필요하다.",
+    "결국 {topic_을} 어떻게 받아들이고 활용하느냐가 결과를 좌우한다.",
+    "이와 같은 변화는 한두 가지 요인만으로 설명하기보다 여러 조건을 함께 고려해야 한다.",
+    "현장의 목소리를 살펴보면 기대와 우려가 함께 존재한다는 것을 알 수 있다.",
+    "{topic}에 대한 평가는 시간이 지나며 조금씩 달라져 왔다.",
+    "따라서 단기적인 성과와 장기적인 영향을 나누어 살펴볼 필요가 있다.",
+    "비슷한 사례를 함께 비교하면 공통점과 차이점이 더 뚜렷하게 드러난다.",
+    "이러한 논의는 {topic_이} 앞으로 나아갈 방향을 정하는 데 중요한 기준이 된다.",
+    "무엇보다 구성원 모두가 변화의 의미를 이해하고 공유하는 것이 중요하다.",
+    "이 과정에서 얻은 경험은 다른 분야에도 참고가 될 수 있다.",
+]
+
+# 필수 키워드를 넣는 문장 ({keywords}: 쉼표로 이은 키워드)
+KEYWORD_SENTENCES = [
+    "이 과정에서 {keywords_은} 빼놓을 수 없는 요소이다.",
+    "특히 {keywords}의 측면을 함께 고려해야 논의가 완결된다.",
+    "{keywords_을} 함께 살펴보면 {topic}의 의미가 더 분명해진다.",
+]
+
+_AUDIENCE_GROUPS = {
+    TargetAudience.MIDDLE_SCHOOL.value: "school",
+    TargetAudience.HIGH_SCHOOL.value: "school",
+    TargetAudience.UNIVERSITY.value: "academic",
+    TargetAudience.COMPANY.value: "work",
+    TargetAudience.PUBLIC_AGENCY.value: "work",
+}
+
+# 받침 있는 글자로 읽히는 숫자/영문자 (영, 일, 삼, 육, 칠, 팔, 엘, 엠, 엔, 알)
+_BATCHIM_NON_HANGUL = set("0136789lmnrLMNR")
+_PARTICLES = {"은": ("은", "는"), "을": ("을", "를"), "이": ("이", "가"), "과": ("과", "와"), "으로": ("으로", "로")}
+_FIELD_NAMES = Formatter()
+
+
+def _final_consonant(word: str) -> int:
+    """마지막 글자의 받침 번호 (없으면 0, 한글이 아니면 읽는 소리 기준으로 추정)"""
+    word = word.rstrip(" )]\"'")
+    if not word:
+        return 0
+    ch = word[-1]
+    if "가" <= ch <= "힣":
+        return (ord(ch) - 0xAC00) % 28
+    return 1 if ch in _BATCHIM_NON_HANGUL else 0
+
+
+def attach_particle(word: str, particle: str) -> str:
+    """
+    받침에 맞는 조사 붙이기
+    
+    Args:
+        word: 단어
+        particle: "은", "을", "이", "과", "으로" 중 하나
+    
+    Returns:
+        조사가 붙은 단어 (예: "기술은", "교육는" 대신 "교육은")
+    """
+    with_batchim, without = _PARTICLES[particle]
+    final = _final_consonant(word)
+    if particle == "으로" and final == 8:  # ㄹ 받침은 "로"
+        return word + without
+    return word + (with_batchim if final else without)
+
+
+def _with_final(ch: str, final: int) -> str:
+    """한글 음절의 받침 교체"""
+    code = ord(ch) - 0xAC00
+    return chr(0xAC00 + code - code % 28 + final)
+
+
+def to_report_style(sentence: str) -> str:
+    """
+    '~다.'로 끝나는 평서문을 보고체 명사형('~함.', '~임.', '~있음.')으로 변환
+    
+    예: 한다 → 함, 된다 → 됨, 주제이다 → 주제임, 있다 → 있음, 나타났다 → 나타났음, 않는다 → 않음
+    """
+    if not sentence.endswith("다.") or len(sentence) < 3:
+        return sentence
+    head, last = sentence[:-3], sentence[-3]
+    if not "가" <= last <= "힣":
+        return sentence
+    if last == "는":
+        # 받침 있는 동사 현재형 (않는다 → 않음)
+        return head + "음."
+    final = _final_consonant(last)
+    if final == 4 or final == 0:
+        # 받침 없는 동사 현재형(-ㄴ다) 또는 받침 없는 형용사 (한다 → 함, 크다 → 큼, 이다 → 임)
+        return head + _with_final(last, 16) + "."
+    # 받침 있는 형용사/과거형 (있다 → 있음, 나타났다 → 나타났음)
+    return head + last + "음."
+
+
+class _Sentence(NamedTuple):
+    """컴파일된 문장 (자리 표시 포함 원문, 고정 글자 수, 자리 표시 이름)"""
+    text: str
+    literal_length: int
+    fields: Tuple[str, ...]
+
+
+class CompiledTemplate(NamedTuple):
+    """색인된 섹션 템플릿"""
+    lead: Tuple[_Sentence, ...]
+    body: Tuple[_Sentence, ...]
+    elaboration: Tuple[_Sentence, ...]
+    keyword: Tuple[_Sentence, ...]
+    audience: _Sentence
+    style: Optional[_Sentence]
+
+
+def _compile_sentence(text: str, style: Optional[str]) -> _Sentence:
+    if style == WritingStyle.REPORT_STYLE.value:
+        text = to_report_style(text)
+    literal = 0
+    fields = []
+    for literal_text, field_name, _, _ in _FIELD_NAMES.parse(text):
+        literal += len(literal_text)
+        if field_name is not None:
+            fields.append(field_name)
+    return _Sentence(text, literal, tuple(fields))
+
+
+class TemplateIndex:
+    """
+    섹션 템플릿 색인
+    
+    (섹션 제목, 문서 종류, 제출 대상 그룹, 문체)의 모든 조합을 미리 컴파일해 두고,
+    조회는 dict 한 번(알 수 없는 문서 종류/문체는 None 키)으로 끝낸다.
+    """
+    
+    def __init__(self, templates: Dict[str, dict] = None):
+        templates = SECTION_TEMPLATES if templates is None else templates
+        doc_types = [t.value for t in DocumentType]
+        styles = [None] + [s.value for s in WritingStyle]
+        groups = sorted(set(_AUDIENCE_GROUPS.values()))
+        
+        self._index: Dict[tuple, CompiledTemplate] = {}
+        self._default: Dict[tuple, CompiledTemplate] = {}
+        # 같은 문장/문체 조합은 한 번만 컴파일해 공유
+        self._sentences: Dict[Tuple[str, Optional[str]], _Sentence] = {}
+        for group in groups:
+            for style in styles:
+                for title, entry in templates.items():
+                    base = self._compile(entry, None, group, style)
+                    self._index[(title, None, group, style)] = base
+                    for doc_type in doc_types:
+                        # 문서 종류별 덮어쓰기가 없는 제목은 기본 템플릿 공유
+                        self._index[(title, doc_type, group, style)] = (
+                            self._compile(entry, doc_type, group, style) if doc_type in entry else base
+                        )
+                self._default[(group, style)] = self._compile(DEFAULT_TEMPLATE, None, group, style)
+    
+    def _sentence(self, text: str, style: Optional[str]) -> _Sentence:
+        key = (text, style)
+        sentence = self._sentences.get(key)
+        if sentence is None:
+            sentence = self._sentences[key] = _compile_sentence(text, style)
+        return sentence
+    
+    def _compile(self, entry: dict, doc_type: Optional[str], group: str,
+                 style: Optional[str]) -> CompiledTemplate:
+        """덮어쓰기 우선순위: 문서 종류 > 제출 대상 그룹 > 기본"""
+        def pick(part: str) -> List[str]:
+            for key in (doc_type, group):
+                override = entry.get(key) if key else None
+                if override and part in override:
+                    return override[part]
+            return entry.get(part, [])
+        
+        return CompiledTemplate(
+            lead=tuple(self._sentence(s, style) for s in pick("lead")),
+            body=tuple(self._sentence(s, style) for s in pick("body")),
+            elaboration=tuple(self._sentence(s, style) for s in ELABORATION_SENTENCES),
+            keyword=tuple(self._sentence(s, style) for s in KEYWORD_SENTENCES),
+            audience=self._sentence(AUDIENCE_SENTENCES[group], style),
+            style=self._sentence(STYLE_SENTENCES[style], style) if style in STYLE_SENTENCES else None,
+        )
+    
+    def lookup(self, title: str, document_type: Optional[str], target_audience: Optional[str],
+               writing_style: Optional[str]) -> Tuple[CompiledTemplate, bool]:
+        """
+        섹션 템플릿 조회
+        
+        Returns:
+            (CompiledTemplate, 코퍼스에 있는 제목인지 여부)
+        """
+        group = _AUDIENCE_GROUPS.get(target_audience, "academic")
+        template = self._index.get((title, document_type, group, writing_style))
+        if template is not None:
+            return template, True
+        # 코퍼스 밖의 문서 종류/문체 값
+        template = self._index.get((title, None, group, None))
+        if template is not None:
+            return template, True
+        return self._default.get((group, writing_style)) or self._default[(group, None)], False
+    
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+@lru_cache(maxsize=1024)
+def _fill_values(topic: str, title: str, document_type: str, target_audience: str,
+                 keywords: Tuple[str, ...]) -> Dict[str, str]:
+    """자리 표시 값 (조사 포함, 같은 입력의 섹션끼리 공유)"""
+    joined_keywords = ", ".join(keywords)
+    values = {
+        "topic": topic,
+        "title": title,
+        "doc": document_type,
+        "audience": target_audience,
+        "keywords": joined_keywords,
+    }
+    for particle in _PARTICLES:
+        values[f"topic_{particle}"] = attach_particle(topic, particle)
+        values[f"keywords_{particle}"] = attach_particle(joined_keywords, particle)
+    return values
+
+
+class TemplateLLMProvider(LLMProvider):
+    """
+    오프라인 템플릿 생성 제공자
+    
+    ContentGenerator는 프롬프트를 만들지 않고 generate_section()에 섹션/입력 정보를 바로 넘긴다.
+    같은 입력에는 항상 같은 결과를 내므로 결과 캐시 대상이다.
+    """
+    
+    supports_sections = True
+    
+    def __init__(self, index: TemplateIndex = None):
+        """
+        초기화
+        
+        Args:
+            index: 섹션 템플릿 색인 (없으면 프로세스 전역 색인 사용)
+        """
+        self.index = index or default_index()
+        self._lock = threading.Lock()
+        self._stats = {"sections": 0, "fallbacks": 0, "chars": 0}
+    
+    def generate_section(self, section: Section, metadata, user_input: UserInput) -> str:
+        """
+        섹션 본문 생성
+        
+        Args:
+            section: 생성할 섹션 (제목, 순서, 목표 분량)
+            metadata: 문서 메타데이터 (사용하지 않음, 인터페이스 호환용)
+            user_input: 사용자 입력 (주제, 문서 종류, 대상, 문체, 키워드)
+        
+        Returns:
+            생성된 본문
+        """
+        return self._render(
+            section.title, section.order, section.target_length_chars, user_input.topic or "주제",
+            user_input.document_type, user_input.target_audience, user_input.writing_style,
+            user_input.required_keywords
+        )
+    
+    def _render(self, title: str, order: int, target_length: int, topic: str,
+                document_type: Optional[str], target_audience: Optional[str],
+                writing_style: Optional[str], keywords: Sequence[str]) -> str:
+        template, found = self.index.lookup(title, document_type, target_audience, writing_style)
+        keywords = tuple(kw for kw in keywords if kw)
+        values = _fill_values(topic, title, document_type or "", target_audience or "", keywords)
+        
+        def filled_length(sentence: _Sentence) -> int:
+            return sentence.literal_length + sum(len(values[name]) for name in sentence.fields) + 1
+        
+        chosen = list(template.lead)
+        # 대상/문체 문장은 문서 앞부분에서 한 번씩만 사용
+        if order == 1:
+            chosen.append(template.audience)
+        elif order == 2 and template.style is not None:
+            chosen.append(template.style)
+        # 주제/제목마다 문장 선택 위치를 달리해 섹션 간 반복을 줄임
+        seed = zlib.crc32(f"{topic}|{title}".encode("utf-8"))
+        if keywords:
+            chosen.append(template.keyword[seed % len(template.keyword)])
+        length = sum(filled_length(s) for s in chosen)
+        
+        # 제목별 본문 문장을 먼저 쓰고, 모자라면 공통 확장 문장을 이어 씀
+        extra = template.body + tuple(
+            template.elaboration[(seed + i) % len(template.elaboration)]
+            for i in range(len(template.elaboration))
+        )
+        i = 0
+        while length < target_length:
+            sentence = extra[i % len(extra)]
+            chosen.append(sentence)
+            length += filled_length(sentence)
+            i += 1
+        
+        text = " ".join(s.text for s in chosen).format_map(values)
+        with self._lock:
+            self._stats["sections"] += 1
+            self._stats["fallbacks"] += int(not found)
+            self._stats["chars"] += len(text)
+        return text
+    
+    # 프롬프트 경로 (기록 래퍼 등 generate_section을 모르는 호출자용)
+    _PROMPT_FIELDS = re.compile(
+        r"^(주제|문서 종류|제출 대상|문체|현재 작성할 섹션|목표 분량|반드시 포함할 키워드): ?(.*)$", re.M
+    )
+    
+    def generate(self, prompt: str, **kwargs) -> str:
+        """ContentGenerator 프롬프트에서 섹션 정보를 읽어 생성 (섹션 순서를 알 수 없어 대상/문체 문장은 생략)"""
+        fields = dict(self._PROMPT_FIELDS.findall(prompt))
+        length_match = re.search(r"\d+", fields.get("목표 분량", ""))
+        target_length = int(length_match.group()) if length_match else int(kwargs.get("max_tokens", 250)) * 2
+        keywords = [kw.strip() for kw in fields.get("반드시 포함할 키워드", "").split(",") if kw.strip()]
+        return self._render(
+            fields.get("현재 작성할 섹션", ""), 0, target_length, fields.get("주제") or "주제",
+            fields.get("문서 종류"), fields.get("제출 대상"), fields.get("문체"), keywords
+        )
+    
+    def stats(self) -> Dict[str, int]:
+        """생성 섹션 수, 기본 템플릿 사용 수, 생성 글자 수"""
+        with self._lock:
+            return dict(self._stats)
+
+
+_DEFAULT_INDEX: Optional[TemplateIndex] = None
+_DEFAULT_INDEX_LOCK = threading.Lock()
+
+
+def default_index() -> TemplateIndex:
+    """프로세스 전역 템플릿 색인 (처음 사용할 때 한 번 컴파일)"""
+    global _DEFAULT_INDEX
+    if _DEFAULT_INDEX is None:
+        with _DEFAULT_INDEX_LOCK:
+            if _DEFAULT_INDEX is None:
+                _DEFAULT_INDEX = TemplateIndex()
+    return _DEFAULT_INDEX
+
+
+def corpus_fingerprint() -> str:
+    """템플릿 코퍼스 내용의 해시 (결과 캐시 무효화용)"""
+    import hashlib
+    import json
+    payload = json.dumps(
+        [SECTION_TEMPLATES, DEFAULT_TEMPLATE, AUDIENCE_SENTENCES, STYLE_SENTENCES,
+         ELABORATION_SENTENCES, KEYWORD_SENTENCES],
+        ensure_ascii=False, sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
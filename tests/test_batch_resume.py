@@ -0,0 +1,38 @@
+"""
+일괄 모드 재개 테스트
+같은 작업 디렉터리로 재개할 때 입력이 바뀐 문서의 이전 결과(같은 custom_id)를 쓰지 않고 다시 제출하는지 확인
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.batch_cli import BatchAPIClient, BulkRun
+from src.document_store import DocumentStore
+from src.loadtest_provider import ChatStandInServer, LoadTestLLMProvider
+from src.main import DocumentAutoFormatter
+
+
+def _inputs(topic):
+    return [("doc0", {"document_type": "과제 레포트", "topic": topic, "length": "A4 1장"})]
+
+
+def test_changed_input_is_resubmitted(tmp_path):
+    provider = LoadTestLLMProvider(latency_ms=0, tokens_per_second=0, seed=1)
+    with ChatStandInServer(provider) as server:
+        def run(topic):
+            bulk = BulkRun(DocumentAutoFormatter(llm_provider_type="mock"), BatchAPIClient(server.base_url),
+                           str(tmp_path / "work"), poll_seconds=0.01, max_rounds=5)
+            with DocumentStore(str(tmp_path / "store")) as store:
+                return bulk.run(_inputs(topic), store), bulk
+        
+        first, _ = run("인공지능 윤리")
+        assert first["stored"] == 1 and first["batches"] == 1
+        
+        # 같은 입력이면 이전 결과를 그대로 사용 (새 배치 없음)
+        same, _ = run("인공지능 윤리")
+        assert same["batches"] == 1
+        
+        # 주제가 바뀌면 custom_id는 같아도 요청 키가 달라 모두 다시 제출
+        changed, bulk = run("기후 변화")
+        assert changed["stored"] == 1 and changed["batches"] == 2
+        assert bulk.state["batches"][-1]["requests"] == changed["requests"]
@@ -0,0 +1,128 @@
+"""
+취소 전파 테스트
+느린 로컬 스탠드인 서버(OpenAI 형식)를 상대로 생성 도중 취소하면 상위 호출과 섹션 진행이 멈추는지 확인
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.cancellation import CancelToken, OperationCancelled, cancel_scope
+from src.llm_provider import HTTPChatProvider
+from src.loadtest_provider import ChatStandInServer, LoadTestLLMProvider
+from src.main import DocumentAutoFormatter
+
+
+USER_INPUT = {
+    "document_type": "과제 레포트",
+    "target_audience": "대학교",
+    "topic": "인공지능 윤리",
+    "length": "A4 2장",
+    "writing_style": "학술적",
+    "required_keywords": ["공정성"],
+}
+
+# 스탠드인이 끊긴 연결을 다음 토큰에서 알아차릴 때까지 기다리는 시간 (초)
+SETTLE_SECONDS = 0.3
+# 취소 후 추가 작업이 없는지 지켜보는 시간 (초)
+OBSERVE_SECONDS = 1.0
+
+
+@pytest.fixture
+def stand_in():
+    """토큰을 천천히 내보내는 스탠드인 (섹션 하나가 수 초 걸림)"""
+    provider = LoadTestLLMProvider(seed=0, latency_ms=50.0, tokens_per_second=100.0)
+    with ChatStandInServer(provider) as server:
+        yield provider, server
+
+
+def _upstream(provider: LoadTestLLMProvider):
+    stats = provider.stats()
+    return stats["calls"], stats["output_tokens"]
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_provider_call_aborts_on_cancel(stand_in, stream):
+    provider, server = stand_in
+    client = HTTPChatProvider(base_url=server.base_url, timeout=30.0)
+    token = CancelToken()
+    threading.Timer(0.3, token.cancel, args=("client disconnected",)).start()
+    
+    started = time.perf_counter()
+    with pytest.raises(OperationCancelled) as caught:
+        with cancel_scope(token):
+            if stream:
+                for _ in client.generate_stream("주제: 취소 확인", max_tokens=2000):
+                    pass
+            else:
+                client.generate("주제: 취소 확인", max_tokens=2000)
+    assert caught.value.reason == "client disconnected"
+    # 끝까지 생성하면 16초 (2000 * 0.8 토큰 / 초당 100)
+    assert time.perf_counter() - started < 2.0
+    
+    time.sleep(SETTLE_SECONDS)
+    after_cancel = _upstream(provider)
+    time.sleep(OBSERVE_SECONDS)
+    assert _upstream(provider) == after_cancel
+    assert 0 < after_cancel[1] < 2000 * provider.output_ratio
+
+
+def test_generation_stops_after_cancel(stand_in):
+    provider, server = stand_in
+    formatter = DocumentAutoFormatter(llm_provider_type="http", base_url=server.base_url)
+    user_input = formatter.input_parser.parse(USER_INPUT)
+    total_sections = len(formatter.plan(user_input)[1].sections)
+    
+    finished = []
+    token = CancelToken()
+    threading.Timer(0.5, token.cancel, args=("client disconnected",)).start()
+    with pytest.raises(OperationCancelled):
+        with cancel_scope(token):
+            formatter.build_document(user_input, on_section=lambda section: finished.append(section.order))
+    
+    sections_at_cancel = list(finished)
+    # 스탠드인은 호출을 끝낼 때 집계하므로 끊긴 호출이 집계될 때까지 기다린 뒤 기준으로 삼음
+    time.sleep(SETTLE_SECONDS)
+    after_cancel = _upstream(provider)
+    time.sleep(OBSERVE_SECONDS)
+    
+    # 취소 후에는 새 상위 호출도, 섹션 완료 콜백도, 진행 중이던 호출의 추가 토큰도 없음
+    assert _upstream(provider) == after_cancel
+    assert finished == sections_at_cancel
+    assert len(sections_at_cancel) < total_sections
+
+
+@pytest.mark.parametrize("cancel, status", [("disconnect", 499), ("deadline", 504)])
+def test_handler_returns_cancel_status(stand_in, monkeypatch, cancel, status):
+    import api.index as index
+    
+    provider, server = stand_in
+    monkeypatch.setattr(index, "SERVICE_LLM_PROVIDER", "http")
+    monkeypatch.setenv("LLM_BASE_URL", server.base_url)
+    parent = CancelToken()
+    if cancel == "deadline":
+        monkeypatch.setattr(index, "REQUEST_DEADLINE_SECONDS", 0.5)
+    else:
+        threading.Timer(0.5, parent.cancel, args=("client disconnected",)).start()
+    
+    request = SimpleNamespace(
+        method="POST",
+        body=json.dumps({"input": USER_INPUT}, ensure_ascii=False),
+        headers={},
+        cancel_token=parent,
+    )
+    started = time.perf_counter()
+    response = index.handler(request)
+    assert response["statusCode"] == status
+    assert time.perf_counter() - started < 3.0
+    
+    time.sleep(SETTLE_SECONDS)
+    after_cancel = _upstream(provider)
+    time.sleep(OBSERVE_SECONDS)
+    assert _upstream(provider) == after_cancel
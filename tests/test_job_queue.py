@@ -0,0 +1,59 @@
+"""
+작업 큐 lease 소유권 테스트
+lease가 만료되어 다른 워커가 가져간 작업을 이전 워커가 덮어쓰거나 완료/실패 처리하지 못하는지 확인
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+import pytest
+
+from src.job_queue import STATUS_DONE, STATUS_RUNNING, JobQueue, LeaseLost, run_job
+from src.main import DocumentAutoFormatter
+
+
+USER_INPUT = {"document_type": "과제 레포트", "topic": "인공지능 윤리", "length": "A4 1장"}
+
+LEASE_SECONDS = 0.05
+
+
+@pytest.fixture
+def reclaimed(tmp_path):
+    """old 워커의 lease가 만료된 뒤 new 워커가 다시 가져간 작업"""
+    queue = JobQueue(str(tmp_path / "jobs.db"), lease_seconds=LEASE_SECONDS)
+    job_id = queue.enqueue(USER_INPUT)
+    stale = queue.claim("old")
+    time.sleep(LEASE_SECONDS * 2)
+    queue.lease_seconds = 60.0
+    assert queue.claim("new")["id"] == job_id
+    return queue, stale
+
+
+def test_stale_worker_writes_are_rejected(reclaimed):
+    queue, stale = reclaimed
+    job_id = stale["id"]
+    
+    assert not queue.owns(job_id, "old")
+    assert not queue.save_section(job_id, "old", 1, "서론", "오래된 내용")
+    assert not queue.set_total_sections(job_id, "old", 99)
+    assert not queue.complete_if_unchanged(job_id, "old", "오래된 문서", None)
+    assert not queue.fail(job_id, "old", "오래된 오류")
+    
+    job = queue.get(job_id)
+    assert job["status"] == STATUS_RUNNING
+    assert job["sections"] == [] and job["result"] is None and job["error"] is None
+    assert queue.save_section(job_id, "new", 1, "서론", "새 내용")
+
+
+def test_stale_worker_stops_running(reclaimed):
+    queue, stale = reclaimed
+    with pytest.raises(LeaseLost):
+        run_job(queue, stale, "old", DocumentAutoFormatter(llm_provider_type="mock"))
+    assert queue.get(stale["id"])["status"] == STATUS_RUNNING
+    
+    run_job(queue, {**stale, "attempts": 2}, "new", DocumentAutoFormatter(llm_provider_type="mock"))
+    job = queue.get(stale["id"])
+    assert job["status"] == STATUS_DONE
+    assert job["progress"]["done_sections"] == job["progress"]["total_sections"] > 0
@@ -0,0 +1,49 @@
+"""
+프로필 예열 테스트
+예열한 프로필의 새 주제 요청이 구조와 모든 섹션을 뼈대 캐시에서 가져오는지 확인
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.main import DocumentAutoFormatter
+from src.prewarmer import TOPIC_PLACEHOLDER, ProfileTracker, Prewarmer, ScaffoldCache
+
+
+USER_INPUT = {
+    "document_type": "과제 레포트",
+    "target_audience": "대학교",
+    "topic": "인공지능 윤리",
+    "length": "A4 2장",
+    "writing_style": "학술적",
+    "required_keywords": ["공정성"],
+}
+
+
+def test_prompt_key_drops_context_block():
+    prompt = (
+        "주제: 인공지능 윤리\n\n현재 작성할 섹션: 결론\n\n"
+        "앞선 내용 요약: 인공지능 윤리의 쟁점을 정리했다.\n"
+        "이전 섹션 요약:\n- 본론 1: 공정성 문제\n- 본론 2: 책임 문제\n\n"
+        "반드시 포함할 키워드: 공정성\n\n"
+        "위 조건에 맞춰 '결론' 섹션을 완성된 문장으로 작성하세요."
+    )
+    key = ScaffoldCache.prompt_key(prompt, "인공지능 윤리")
+    assert key == f"주제: {TOPIC_PLACEHOLDER}\n\n현재 작성할 섹션: 결론\n\n위 조건에 맞춰 '결론' 섹션을 완성된 문장으로 작성하세요."
+
+
+def test_warmed_profile_hits_every_section():
+    formatter = DocumentAutoFormatter(llm_provider_type="mock", scaffold=ScaffoldCache())
+    tracker = ProfileTracker(formatter.input_parser)
+    tracker.observe_raw(USER_INPUT)
+    tracker.observe_raw(USER_INPUT)
+    assert Prewarmer(formatter, tracker).warm_once() == 1
+    
+    user_input = formatter.input_parser.parse(USER_INPUT)
+    total_sections = len(formatter.plan(user_input)[1].sections)
+    document = formatter.build_document(user_input)
+    
+    stats = formatter.scaffold.stats()
+    assert stats["section_hits"] == total_sections == 7
+    assert stats["section_misses"] == 0
+    assert TOPIC_PLACEHOLDER not in document.content
@@ -0,0 +1,32 @@
+"""
+섹션 검증-수리 루프 테스트
+수리/분량 자르기 후에도 문단 구분(빈 줄)이 유지되는지 확인
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm_provider import get_llm_provider
+from src.models import Section, UserInput
+from src.repair import RepairLoop, trim_to_length
+
+
+FIRST = "인공지능은 사회 여러 분야에 쓰인다. 공정성은 핵심 쟁점이다."
+SECOND = "특히 채용 분야에서 편향 문제가 나타난다. 금지어가 들어간 문장이다. 대책이 필요하다."
+
+
+def test_trim_keeps_paragraph_breaks():
+    content = f"{FIRST}\n\n{SECOND}"
+    trimmed = trim_to_length(content, len(FIRST) + 25)
+    assert trimmed == f"{FIRST}\n\n특히 채용 분야에서 편향 문제가 나타난다."
+
+
+def test_repair_keeps_paragraph_breaks():
+    section = Section(title="본론", level=1, content=f"{FIRST}\n\n{SECOND}",
+                      target_length_chars=len(FIRST) + len(SECOND), order=1)
+    user_input = UserInput(topic="인공지능 윤리", required_keywords=["공정성"], excluded_content=["금지어"])
+    report = RepairLoop(get_llm_provider("mock")).run([section], user_input)
+    
+    assert report["failed"] == 1
+    assert "금지어" not in section.content
+    assert section.content.startswith(f"{FIRST}\n\n특히 채용 분야에서")
@@ -0,0 +1,49 @@
+"""
+섹션 완료 순서 테스트
+기본 구조는 섹션 완료 콜백이 문서 순서대로 오고, 축소 문맥 동시 생성(CONTEXT_PARALLEL=1)으로 순서가 바뀌어도
+작업 큐 since 커서로 빠지는 섹션이 없는지 확인
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.job_queue import JobQueue
+from src.main import DocumentAutoFormatter
+
+
+USER_INPUT = {
+    "document_type": "과제 레포트",
+    "target_audience": "대학교",
+    "topic": "인공지능 윤리",
+    "length": "A4 2장",
+    "writing_style": "학술적",
+    "required_keywords": ["공정성"],
+}
+
+
+def test_sections_finish_in_document_order():
+    formatter = DocumentAutoFormatter(llm_provider_type="mock")
+    user_input = formatter.input_parser.parse(USER_INPUT)
+    assert formatter.plan(user_input)[1].dependencies == {}
+    
+    finished = []
+    formatter.build_document(user_input, on_section=lambda section: finished.append(section.order))
+    assert finished == sorted(finished)
+
+
+def test_cursor_returns_sections_finished_out_of_order(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    job_id = queue.enqueue(USER_INPUT)
+    assert queue.claim("w")["id"] == job_id
+    
+    queue.save_section(job_id, "w", 1, "서론", "A")
+    queue.save_section(job_id, "w", 3, "본론 2", "C")
+    first = queue.get(job_id)
+    assert [section["order"] for section in first["sections"]] == [1, 3]
+    
+    # 커서 이후에 끝난 앞 순서 섹션과 다시 저장한(수리된) 섹션도 받음
+    queue.save_section(job_id, "w", 2, "본론 1", "B")
+    queue.save_section(job_id, "w", 1, "서론", "A2")
+    second = queue.get(job_id, since=first["cursor"])
+    assert [(section["order"], section["content"]) for section in second["sections"]] == [(1, "A2"), (2, "B")]
+    assert queue.get(job_id, since=second["cursor"])["sections"] == []
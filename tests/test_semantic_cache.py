@@ -0,0 +1,33 @@
+"""
+섹션 근사 중복 캐시 테스트
+한 주제가 다른 주제를 포함하는 경우에도 캐시된 섹션이 현재 주제로 바뀌는지 확인
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.semantic_cache import NearDuplicateSectionCache
+
+
+SHORT = "인공지능의 미래"
+LONG = "인공지능의 미래와 사회적 영향"
+
+
+def _prompt(topic: str) -> str:
+    return f"주제: {topic}\n문서 종류: 과제 레포트\n현재 작성할 섹션: 서론\n목표 분량: 약 500자\n위 조건에 맞춰 '서론' 섹션을 작성하세요."
+
+
+def test_adapt_when_topics_contain_each_other():
+    cache = NearDuplicateSectionCache()
+    assert cache._adapt(f"{LONG}에 대해 살펴본다.", LONG, SHORT) == f"{SHORT}에 대해 살펴본다."
+    # 이미 들어 있는 현재 주제 표기는 다시 바꾸지 않음
+    assert cache._adapt(f"{SHORT}을 다룬다. 결국 {LONG}이 핵심이다.", SHORT, LONG) == \
+        f"{LONG}을 다룬다. 결국 {LONG}이 핵심이다."
+
+
+def test_hit_serves_current_topic():
+    cache = NearDuplicateSectionCache(audit_rate=0.0)
+    cache.get_or_generate(_prompt(LONG), "서론", LONG, lambda: f"{LONG}은 중요한 주제다.")
+    served = cache.get_or_generate(_prompt(SHORT), "서론", SHORT, lambda: "생성됨")
+    assert cache.stats()["hits"] == 1
+    assert served == f"{SHORT}은 중요한 주제다."
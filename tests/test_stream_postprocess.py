@@ -0,0 +1,31 @@
+"""
+스트리밍 후처리 테스트
+분량 한도로 잘린 부분에만 있던 키워드가 보완되는지, 요청 병합 래퍼를 거쳐도 스트리밍 경로를 쓰는지 확인
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.loadtest_provider import LoadTestLLMProvider
+from src.single_flight import CoalescingLLMProvider
+from src.stream_postprocess import StreamPostProcessor
+
+
+def test_keyword_in_truncated_tail_is_appended():
+    processor = StreamPostProcessor(20, keywords=["머신러닝"])
+    output = processor.feed("첫 문장은 충분히 긴 문장입니다. 둘째 문장에는 머신러닝이 있다. ") + processor.finish()
+    assert "머신러닝" in output
+    assert processor.missing_keywords == ["머신러닝"]
+
+
+def test_keyword_split_across_chunks_counts_once_emitted():
+    processor = StreamPostProcessor(200, keywords=["머신러닝"])
+    output = "".join(processor.feed(chunk) for chunk in ["머신", "러닝은 유용하다. "]) + processor.finish()
+    assert processor.missing_keywords == []
+    assert output.count("머신러닝") == 1
+
+
+def test_coalescing_wrapper_streams():
+    provider = CoalescingLLMProvider(LoadTestLLMProvider(seed=0, sleep=False))
+    assert provider.supports_streaming
+    assert "".join(provider.generate_stream("주제: 스트리밍", max_tokens=50))